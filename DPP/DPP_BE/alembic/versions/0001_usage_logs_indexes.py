@@ -0,0 +1,45 @@
+"""usage_logs 중복 방지 유니크 인덱스 + 시간 범위 조회 인덱스
+
+Revision ID: 0001_usage_logs_indexes
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0001_usage_logs_indexes"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 유니크 인덱스를 만들기 전에 기존 중복 기록 정리 (가장 먼저 저장된 id 만 남긴다)
+    op.execute(
+        """
+        DELETE FROM usage_logs
+        WHERE package_name IS NOT NULL
+          AND first_time_stamp IS NOT NULL
+          AND id NOT IN (
+              SELECT MIN(id) FROM usage_logs
+              GROUP BY user_id, package_name, first_time_stamp
+          )
+        """
+    )
+    op.create_index(
+        "uq_usage_logs_user_package_start",
+        "usage_logs",
+        ["user_id", "package_name", "first_time_stamp"],
+        unique=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_usage_logs_user_start",
+        "usage_logs",
+        ["user_id", "first_time_stamp"],
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("ix_usage_logs_user_start", table_name="usage_logs")
+    op.drop_index("uq_usage_logs_user_package_start", table_name="usage_logs")
@@ -0,0 +1,44 @@
+"""daily_reports 증분 집계 컬럼 + (user_id, date) 유니크 인덱스
+
+Revision ID: 0002_daily_reports_rollup
+Revises: 0001_usage_logs_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_daily_reports_rollup"
+down_revision = "0001_usage_logs_indexes"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # main.py 의 create_all 이 이미 만든 컬럼이면 건너뛴다
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("daily_reports", "unlock_count"):
+        op.add_column("daily_reports", sa.Column("unlock_count", sa.Integer(), nullable=True, server_default="0"))
+    if not _has_column("daily_reports", "package_usage"):
+        op.add_column("daily_reports", sa.Column("package_usage", sa.JSON(), nullable=True))
+    # 유저당 하루 한 줄만 남긴다
+    op.execute(
+        """
+        DELETE FROM daily_reports
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM daily_reports GROUP BY user_id, date
+        )
+        """
+    )
+    op.create_index(
+        "uq_daily_reports_user_date", "daily_reports", ["user_id", "date"], unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_daily_reports_user_date", table_name="daily_reports")
+    with op.batch_alter_table("daily_reports") as batch_op:
+        batch_op.drop_column("package_usage")
+        batch_op.drop_column("unlock_count")
@@ -0,0 +1,30 @@
+"""weekly_reports (user_id, date_week) 유니크 인덱스
+
+Revision ID: 0003_weekly_reports_user_week
+Revises: 0002_daily_reports_rollup
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003_weekly_reports_user_week"
+down_revision = "0002_daily_reports_rollup"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        DELETE FROM weekly_reports
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM weekly_reports GROUP BY user_id, date_week
+        )
+        """
+    )
+    op.create_index(
+        "uq_weekly_reports_user_week", "weekly_reports", ["user_id", "date_week"], unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_weekly_reports_user_week", table_name="weekly_reports")
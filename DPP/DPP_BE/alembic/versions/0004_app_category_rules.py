@@ -0,0 +1,35 @@
+"""app_category_rules 테이블 + 초기 규칙
+
+Revision ID: 0004_app_category_rules
+Revises: 0003_weekly_reports_user_week
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.app_category import DEFAULT_APP_CATEGORIES
+
+revision = "0004_app_category_rules"
+down_revision = "0003_weekly_reports_user_week"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # main.py 의 create_all 이 이미 (빈) 테이블을 만들었을 수 있다
+    table = op.create_table(
+        "app_category_rules",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("pattern", sa.String(255), nullable=False, unique=True),
+        sa.Column("category", sa.String(50), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_app_category_rules_id", "app_category_rules", ["id"], if_not_exists=True)
+    # 초기 규칙은 비어 있을 때만 (관리자가 고친 규칙은 그대로)
+    if op.get_bind().execute(sa.select(sa.func.count()).select_from(table)).scalar() == 0:
+        op.bulk_insert(table, [{"pattern": p, "category": c} for p, c in DEFAULT_APP_CATEGORIES])
+
+
+def downgrade():
+    op.drop_index("ix_app_category_rules_id", table_name="app_category_rules")
+    op.drop_table("app_category_rules")
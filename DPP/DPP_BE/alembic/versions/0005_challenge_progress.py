@@ -0,0 +1,48 @@
+"""챌린지 진행도: conditions.current_value / instance_id 인덱스, 진행 중 인스턴스 조회 인덱스, progress_logs 인스턴스당 한 줄
+
+Revision ID: 0005_challenge_progress
+Revises: 0004_app_category_rules
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_challenge_progress"
+down_revision = "0004_app_category_rules"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # main.py 의 create_all 이 이미 만든 컬럼이면 건너뛴다
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("conditions", "current_value"):
+        op.add_column(
+            "conditions",
+            sa.Column("current_value", sa.Integer(), nullable=False, server_default="0"),
+        )
+    op.create_index("ix_conditions_instance_id", "conditions", ["instance_id"], if_not_exists=True)
+    op.create_index(
+        "ix_challenge_instances_user_status", "challenge_instances", ["user_id", "status"], if_not_exists=True
+    )
+    op.execute(
+        """
+        DELETE FROM progress_logs
+        WHERE id NOT IN (
+            SELECT MAX(id) FROM progress_logs GROUP BY instance_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_progress_logs_instance", "progress_logs", ["instance_id"], unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_progress_logs_instance", table_name="progress_logs")
+    op.drop_index("ix_challenge_instances_user_status", table_name="challenge_instances")
+    op.drop_index("ix_conditions_instance_id", table_name="conditions")
+    op.drop_column("conditions", "current_value")
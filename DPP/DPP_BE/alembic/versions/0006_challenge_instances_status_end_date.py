@@ -0,0 +1,22 @@
+"""challenge_instances (status, end_date) 인덱스 (기간이 끝난 진행 중 인스턴스 찾기)
+
+Revision ID: 0006_challenge_instances_status_end_date
+Revises: 0005_challenge_progress
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0006_challenge_instances_status_end_date"
+down_revision = "0005_challenge_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_challenge_instances_status_end_date", "challenge_instances", ["status", "end_date"], if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_challenge_instances_status_end_date", table_name="challenge_instances")
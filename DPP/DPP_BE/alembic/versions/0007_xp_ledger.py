@@ -0,0 +1,38 @@
+"""xp_ledger 테이블 (XP / 코인 변경 기록)
+
+Revision ID: 0007_xp_ledger
+Revises: 0006_challenge_instances_status_end_date
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_xp_ledger"
+down_revision = "0006_challenge_instances_status_end_date"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # main.py 의 create_all 이 이미 만들었으면 건너뛴다
+    op.create_table(
+        "xp_ledger",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("xp_delta", sa.Integer(), nullable=False),
+        sa.Column("coin_delta", sa.Integer(), nullable=False),
+        sa.Column("xp_balance", sa.Integer(), nullable=False),
+        sa.Column("coin_balance", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(50), nullable=False),
+        sa.Column("ref_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+    op.create_index("ix_xp_ledger_id", "xp_ledger", ["id"], if_not_exists=True)
+    op.create_index("ix_xp_ledger_user_id_id", "xp_ledger", ["user_id", "id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_xp_ledger_user_id_id", table_name="xp_ledger")
+    op.drop_index("ix_xp_ledger_id", table_name="xp_ledger")
+    op.drop_table("xp_ledger")
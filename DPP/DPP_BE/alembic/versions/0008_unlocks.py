@@ -0,0 +1,57 @@
+"""해금: achievements.unlock_type / unlock_value, 유저당 캐릭터 / 업적 한 번씩
+
+Revision ID: 0008_unlocks
+Revises: 0007_xp_ledger
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008_unlocks"
+down_revision = "0007_xp_ledger"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table: str, column: str) -> bool:
+    # main.py 의 create_all 이 이미 만든 컬럼이면 건너뛴다
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("achievements", "unlock_type"):
+        op.add_column("achievements", sa.Column("unlock_type", sa.String(50), nullable=True))
+    if not _has_column("achievements", "unlock_value"):
+        op.add_column("achievements", sa.Column("unlock_value", sa.Integer(), nullable=True))
+    # 같은 캐릭터 / 업적이 여러 줄이면 처음 얻은 것만 남긴다
+    op.execute(
+        """
+        DELETE FROM user_characters
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM user_characters GROUP BY user_id, character_id
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM user_achievements
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM user_achievements GROUP BY user_id, achievement_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_user_characters_user_character", "user_characters", ["user_id", "character_id"], unique=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "uq_user_achievements_user_achievement", "user_achievements", ["user_id", "achievement_id"], unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_index("uq_user_achievements_user_achievement", table_name="user_achievements")
+    op.drop_index("uq_user_characters_user_character", table_name="user_characters")
+    op.drop_column("achievements", "unlock_value")
+    op.drop_column("achievements", "unlock_type")
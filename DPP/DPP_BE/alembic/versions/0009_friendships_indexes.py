@@ -0,0 +1,45 @@
+"""friendships: 같은 방향 신청 한 줄, (requester_id / receiver_id, status) 친구 목록 인덱스
+
+Revision ID: 0009_friendships_indexes
+Revises: 0008_unlocks
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0009_friendships_indexes"
+down_revision = "0008_unlocks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 같은 방향 신청이 여러 줄이면 ACCEPTED 를 우선해서 한 줄만 남긴다
+    op.execute(
+        """
+        DELETE FROM friendships
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM friendships f
+            WHERE status = 'ACCEPTED'
+               OR NOT EXISTS (
+                   SELECT 1 FROM friendships a
+                   WHERE a.requester_id = f.requester_id AND a.receiver_id = f.receiver_id AND a.status = 'ACCEPTED'
+               )
+            GROUP BY requester_id, receiver_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_friendships_requester_receiver", "friendships", ["requester_id", "receiver_id"], unique=True, if_not_exists=True
+    )
+    op.create_index(
+        "ix_friendships_requester_status", "friendships", ["requester_id", "status", "receiver_id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_friendships_receiver_status", "friendships", ["receiver_id", "status", "requester_id"], if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_friendships_receiver_status", table_name="friendships")
+    op.drop_index("ix_friendships_requester_status", table_name="friendships")
+    op.drop_index("uq_friendships_requester_receiver", table_name="friendships")
@@ -0,0 +1,62 @@
+"""챌린지 참여: 같은 기간 한 번 (user_id, challenge_id, start_date) 유니크 + challenges.reward_xp + 보상 없는 진행 중 인스턴스에 보상
+
+Revision ID: 0010_challenge_join_unique
+Revises: 0009_friendships_indexes
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import CHALLENGE_REWARD_XP
+
+revision = "0010_challenge_join_unique"
+down_revision = "0009_friendships_indexes"
+branch_labels = None
+depends_on = None
+
+# 같은 (유저, 챌린지, 기간 시작) 중 처음 만든 것만 남긴다
+_DUPLICATES = """
+    SELECT id FROM challenge_instances
+    WHERE id NOT IN (
+        SELECT MIN(id) FROM challenge_instances GROUP BY user_id, challenge_id, start_date
+    )
+"""
+
+
+def _has_column(table: str, column: str) -> bool:
+    # main.py 의 create_all 이 이미 만든 컬럼이면 건너뛴다
+    return column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("challenges", "reward_xp"):
+        op.add_column("challenges", sa.Column("reward_xp", sa.Integer(), nullable=True))
+
+    for child in ("conditions", "progress_logs", "rewards"):
+        op.execute(f"DELETE FROM {child} WHERE instance_id IN ({_DUPLICATES})")
+    op.execute(f"DELETE FROM challenge_instances WHERE id IN ({_DUPLICATES})")
+    op.create_index(
+        "uq_challenge_instances_user_challenge_start",
+        "challenge_instances",
+        ["user_id", "challenge_id", "start_date"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    # API 로 참여해서 보상 줄이 없는 진행 중 인스턴스 (이대로면 달성해도 XP 0)
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO rewards (instance_id, title, challenge_xp)
+            SELECT i.id, c.title, COALESCE(c.reward_xp, :xp)
+            FROM challenge_instances i JOIN challenges c ON c.id = i.challenge_id
+            WHERE i.status = 'IN_PROGRESS'
+              AND NOT EXISTS (SELECT 1 FROM rewards r WHERE r.instance_id = i.id)
+            """
+        ).bindparams(xp=CHALLENGE_REWARD_XP)
+    )
+
+
+def downgrade():
+    op.drop_index("uq_challenge_instances_user_challenge_start", table_name="challenge_instances")
+    op.drop_column("challenges", "reward_xp")
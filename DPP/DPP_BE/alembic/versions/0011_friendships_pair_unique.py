@@ -0,0 +1,38 @@
+"""friendships: 두 유저 사이에 방향 상관없이 한 줄 (작은 id, 큰 id) 유니크
+
+Revision ID: 0011_friendships_pair_unique
+Revises: 0010_challenge_join_unique
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_friendships_pair_unique"
+down_revision = "0010_challenge_join_unique"
+branch_labels = None
+depends_on = None
+
+_LOW = "(CASE WHEN requester_id < receiver_id THEN requester_id ELSE receiver_id END)"
+_HIGH = "(CASE WHEN requester_id < receiver_id THEN receiver_id ELSE requester_id END)"
+
+
+def upgrade():
+    # 엇갈린 신청 (A->B, B->A) 이 둘 다 있으면 ACCEPTED 를 우선, 같으면 먼저 만든 줄만 남긴다
+    op.execute(
+        """
+        DELETE FROM friendships
+        WHERE id IN (
+            SELECT f.id FROM friendships f
+            JOIN friendships o ON o.requester_id = f.receiver_id AND o.receiver_id = f.requester_id
+            WHERE (o.status = 'ACCEPTED' AND f.status <> 'ACCEPTED')
+               OR ((o.status = 'ACCEPTED') = (f.status = 'ACCEPTED') AND o.id < f.id)
+        )
+        """
+    )
+    op.create_index(
+        "uq_friendships_pair", "friendships", [sa.text(_LOW), sa.text(_HIGH)], unique=True, if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("uq_friendships_pair", table_name="friendships")
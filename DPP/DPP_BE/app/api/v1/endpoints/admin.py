@@ -0,0 +1,32 @@
+# 관리자 API (X-Admin-Key 필요)
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.auth import require_admin
+from app.core.database import get_db
+from app.services.app_category import app_categories
+from app.services.unlocks import unlock_catalog
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.post("/app-categories/reload", response_model=dict)
+def reload_app_categories(db: Session = Depends(get_db)):
+    # app_category_rules 를 수정한 뒤 재시작 없이 반영 (이 요청을 받은 워커는 바로, 다른 워커는 APP_CATEGORY_RELOAD_SECONDS 안에)
+    app_categories.reload(db)
+    return app_categories.stats()
+
+
+@router.get("/app-categories/resolve", response_model=dict)
+def resolve_app_category(package_name: str, db: Session = Depends(get_db)):
+    # 규칙 확인용: 이 패키지가 어떤 카테고리로 저장되는지
+    app_categories.ensure_loaded(db)
+    return {"package_name": package_name, "category": app_categories.lookup(package_name)}
+
+
+@router.post("/unlocks/reload", response_model=dict)
+def reload_unlock_catalog(db: Session = Depends(get_db)):
+    # characters / achievements 의 해금 조건을 수정한 뒤 재시작 없이 반영 (다른 워커는 UNLOCK_CATALOG_RELOAD_SECONDS 안에)
+    unlock_catalog.reload(db)
+    return unlock_catalog.stats()
@@ -1,50 +1,87 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
 from app.models.user import Users
-from google.oauth2 import id_token
-from google.auth.transport import requests
-import os
+from app.core.auth import REFRESH_TOKEN_TYPE, decode_token, google_verifier, issue_tokens
 
 router = APIRouter()
-
-# 구글 클라이언트 ID (콘솔에서 발급받은 것)
-GOOGLE_CLIENT_ID = os.getenv("GOOGLE_WEB_CLIENT_ID")
+# DB_ASYNC=true 일 때 main.py 에서 router 대신 등록 (AsyncSession 사용)
+async_router = APIRouter()
 
 @router.post("/google-login")
 def google_login(token_data: dict, db: Session = Depends(get_db)):
     token = token_data.get("idToken")
     
     try:
-        # 1. 구글 토큰 검증
-        idinfo = id_token.verify_oauth2_token(token, requests.Request(), GOOGLE_CLIENT_ID)
-        email = idinfo['email']
-        nickname = idinfo.get('name', 'User')
-        profile_image = idinfo.get('picture')
-
-        # 2. DB에서 해당 이메일의 유저가 있는지 확인
-        user = db.query(Users).filter(Users.email == email).first()
-
-        # 3. 없으면 새로운 유저 생성 (회원가입)
-        if not user:
-            user = Users(
-                email=email,
-                nickname=nickname,
-                profile_image=profile_image,
-                coin=0,
-                current_xp=0
-            )
-            db.add(user)
-            db.commit()
-            db.refresh(user)
-
-        # 4. 유저 정보 반환 (프론트에서 이 ID를 기억했다가 로그 저장 시 사용)
-        return {
-            "id": user.id,
-            "email": user.email,
-            "nickname": user.nickname,
-            "message": "로그인 성공"
-        }
+        # 1. 구글 토큰 검증 (서명 키 / 검증 결과 캐시 - app/core/auth.py)
+        idinfo = google_verifier.verify(token)
+        return _login_user(db, idinfo)
+
+    except ValueError:
+        raise HTTPException(status_code=400, detail="유효하지 않은 구글 토큰입니다.")
+
+
+@async_router.post("/google-login")
+async def google_login_async(token_data: dict, db: AsyncSession = Depends(get_async_db)):
+    token = token_data.get("idToken")
+
+    try:
+        # 1. 구글 토큰 검증 (키 갱신 시 HTTP 요청이 블로킹이라 스레드풀에서 실행)
+        idinfo = await run_in_threadpool(google_verifier.verify, token)
+        return await db.run_sync(_login_user, idinfo)
 
     except ValueError:
-        raise HTTPException(status_code=400, detail="유효하지 않은 구글 토큰입니다.")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="유효하지 않은 구글 토큰입니다.")
+
+
+def _login_user(db: Session, idinfo: dict) -> dict:
+    email = idinfo['email']
+    nickname = idinfo.get('name', 'User')
+    profile_image = idinfo.get('picture')
+
+    # 2. DB에서 해당 이메일의 유저가 있는지 확인
+    user = db.query(Users).filter(Users.email == email).first()
+
+    # 3. 없으면 새로운 유저 생성 (회원가입)
+    if not user:
+        user = Users(
+            email=email,
+            nickname=nickname,
+            profile_image=profile_image,
+            coin=0,
+            current_xp=0
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    # 4. 유저 정보 + 세션 토큰 반환 (이후 요청은 Authorization: Bearer <access_token>)
+    return {
+        "id": user.id,
+        "email": user.email,
+        "nickname": user.nickname,
+        "message": "로그인 성공",
+        **issue_tokens(user),
+    }
+
+
+@router.post("/refresh")
+def refresh(token_data: dict, db: Session = Depends(get_db)):
+    claims = decode_token(token_data.get("refreshToken") or "", REFRESH_TOKEN_TYPE)
+    return _reissue_tokens(db, int(claims["sub"]))
+
+
+@async_router.post("/refresh")
+async def refresh_async(token_data: dict, db: AsyncSession = Depends(get_async_db)):
+    claims = decode_token(token_data.get("refreshToken") or "", REFRESH_TOKEN_TYPE)
+    return await db.run_sync(_reissue_tokens, int(claims["sub"]))
+
+
+def _reissue_tokens(db: Session, user_id: int) -> dict:
+    # 재발급 때만 DB 를 읽는다 (탈퇴 여부 / 바뀐 야간 모드 설정 반영)
+    user = db.query(Users).filter(Users.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found.")
+    return issue_tokens(user)
@@ -0,0 +1,120 @@
+# 챌린지 참여 / 내 진행 상황
+# 진행도는 로그 업로드 때 갱신된 카운터를 읽기만 한다 (app/services/challenge_engine.py)
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.auth import CurrentUser, get_current_user
+from app.core.config import APP_TIMEZONE, CHALLENGE_REWARD_XP
+from app.core.database import get_db
+from app.models.challenge import Challenge, ChallengeInstances, Condition, ProgressLogs, Rewards
+from app.services.challenge_engine import (
+    IN_PROGRESS, OPERATORS, challenge_window, close_expired_instances, rebuild_counters,
+)
+
+router = APIRouter()
+
+
+@router.post("/{challenge_id}/join", response_model=schemas.ChallengeInstanceProgress)
+def join_challenge(
+    challenge_id: int,
+    body: Optional[schemas.ChallengeJoin] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    body = body or schemas.ChallengeJoin()
+    challenge = db.get(Challenge, challenge_id)
+    if challenge is None:
+        raise HTTPException(status_code=404, detail="Challenge not found.")
+    operator = body.operator or ">="
+    if operator not in OPERATORS:
+        raise HTTPException(status_code=400, detail=f"Unsupported operator: {operator}")
+    try:
+        start, end = challenge_window(challenge.time_scope, datetime.now(APP_TIMEZONE).date())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    instance = ChallengeInstances(
+        user_id=current_user.id, challenge_id=challenge_id, status=IN_PROGRESS, start_date=start, end_date=end
+    )
+    instance.conditions.append(Condition(
+        default_target_value=body.target_value if body.target_value is not None else challenge.default_target_value,
+        operator=operator,
+    ))
+    # 기간이 끝나면 close_expired_instances 가 이 보상으로 XP 를 준다
+    instance.rewards.append(Rewards(
+        title=challenge.title,
+        challenge_xp=challenge.reward_xp if challenge.reward_xp is not None else CHALLENGE_REWARD_XP,
+    ))
+    db.add(instance)
+    try:
+        db.flush()
+    except IntegrityError:
+        # 같은 기간에 이미 참여 (user_id, challenge_id, start_date 유니크 인덱스, 동시 요청도 여기서 걸린다)
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Already joined this challenge.")
+    # 참여 전에 올라온 오늘(이번 주) 기록도 센다
+    rebuild_counters(db, [instance.id])
+    db.commit()
+    return _progress(db, current_user.id, [instance.id])[0]
+
+
+@router.get("/me", response_model=List[schemas.ChallengeInstanceProgress])
+def my_challenges(
+    status: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # 기간이 끝난 것은 읽기 전에 상태를 확정한다 (이 유저 것만)
+    closed = close_expired_instances(db, user_id=current_user.id)
+    if closed["completed"] or closed["failed"]:
+        db.commit()
+    return _progress(db, current_user.id, status=status)
+
+
+def _progress(db: Session, user_id: int, instance_ids: Optional[List[int]] = None, status: Optional[str] = None) -> list:
+    query = (
+        select(
+            ChallengeInstances.id,
+            ChallengeInstances.challenge_id,
+            Challenge.title,
+            Challenge.challenge_type,
+            ChallengeInstances.status,
+            ChallengeInstances.start_date,
+            ChallengeInstances.end_date,
+            ProgressLogs.progress_rate,
+        )
+        .join(Challenge, ChallengeInstances.challenge_id == Challenge.id)
+        .outerjoin(ProgressLogs, ProgressLogs.instance_id == ChallengeInstances.id)
+        .where(ChallengeInstances.user_id == user_id)
+        .order_by(ChallengeInstances.end_date.desc(), ChallengeInstances.id.desc())
+    )
+    if instance_ids is not None:
+        query = query.where(ChallengeInstances.id.in_(instance_ids))
+    if status is not None:
+        query = query.where(ChallengeInstances.status == status)
+    instances = db.execute(query).mappings().all()
+
+    conditions = {}
+    for row in db.execute(
+        select(Condition.id, Condition.instance_id, Condition.operator, Condition.default_target_value, Condition.current_value)
+        .where(Condition.instance_id.in_([i["id"] for i in instances]))
+        .order_by(Condition.id)
+    ):
+        conditions.setdefault(row.instance_id, []).append({
+            "id": row.id,
+            "operator": row.operator or ">=",
+            # 둘 다 분 (카운터는 초로 쌓인다)
+            "target_value": row.default_target_value,
+            "current_value": round((row.current_value or 0) / 60, 2),
+        })
+    return [
+        {**i, "progress_rate": i["progress_rate"] or 0.0, "conditions": conditions.get(i["id"], [])}
+        for i in instances
+    ]
@@ -1,3 +1,53 @@
+# XP / 코인 / 레벨
+# 증가는 app/services/xp.py 의 원자적 UPDATE ... RETURNING + xp_ledger 기록 (읽어서 더한 뒤 저장 X)
+# 유저에게 주는 XP 는 서버가 정한다 (챌린지 보상 등). xp-up 은 내부 서비스 / 운영용 (X-Admin-Key)
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.auth import CurrentUser, get_current_user, require_admin
+from app.core.config import XP_UP_MAX_AMOUNT
+from app.core.database import get_db
+from app.services.xp import get_xp_status, grant, level_for, xp_status
+
+router = APIRouter()
+
 
 # xp/status
+@router.get("/xp/status", response_model=schemas.XpStatus)
+def read_xp_status(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    status = get_xp_status(db, current_user.id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="User not found.")
+    return status
+
+
 # xp/xp-up
+@router.post("/xp/xp-up", response_model=schemas.XpUpResult, dependencies=[Depends(require_admin)])
+def xp_up(
+    body: schemas.XpUp,
+    db: Session = Depends(get_db)
+):
+    for name, amount in (("xp", body.xp), ("coin", body.coin)):
+        if not 0 <= amount <= XP_UP_MAX_AMOUNT:
+            raise HTTPException(status_code=400, detail=f"{name} must be between 0 and {XP_UP_MAX_AMOUNT}.")
+    if not body.xp and not body.coin:
+        raise HTTPException(status_code=400, detail="Nothing to add.")
+    if not 0 < len(body.reason) <= 50:
+        raise HTTPException(status_code=400, detail="reason must be 1 to 50 characters.")
+
+    balance = grant(db, body.user_id, body.xp, body.coin, reason=body.reason)
+    if balance is None:
+        raise HTTPException(status_code=404, detail="User not found.")
+    db.commit()
+    return {
+        "user_id": body.user_id,
+        **xp_status(balance.new_xp, balance.new_coin),
+        "xp_delta": body.xp,
+        "coin_delta": body.coin,
+        "level_up": level_for(balance.new_xp) > level_for(balance.old_xp),
+    }
@@ -1,98 +1,203 @@
 
-from fastapi import APIRouter,Depends,HTTPException
+from fastapi import APIRouter,Depends,HTTPException,Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from typing import List
+from heapq import merge
+from itertools import islice
+from typing import Optional
 
 from app import schemas
-from app.core.database import get_db
-from app.models.usage_log import UsageLog
+from app.core.auth import CurrentUser, get_current_user
+from app.core.database import get_db, SessionLocal, get_async_db, get_async_sessionmaker
 from app.schemas.log import AppUsageLogCreate
-from app.models.user import Users
+from app.services.app_category import app_categories
+from app.services.log_ingest import bulk_ingest_logs, to_ms
+from app.services.daily_rollup import apply_daily_rollup
+from app.services.challenge_engine import apply_challenge_progress
+from app.services.log_query import logs_query, encode_cursor, decode_cursor
+from app.services.log_archive import archived_keys, iter_archived_logs
+
+# NDJSON 스트리밍 시 서버 사이드 커서에서 한 번에 가져오는 row 수
+STREAM_CHUNK_SIZE = 1000
 
 router = APIRouter()
+# DB_ASYNC=true 일 때 main.py 에서 router 대신 등록 (AsyncSession 사용)
+async_router = APIRouter()
 
 @router.post("", response_model=dict)
 def upload_logs(
     log_data: AppUsageLogCreate,
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # 프론트 구현 시, 로그인 유저의 실제 ID로 대체 필요
-    current_user_id=1  # 임시로 사용자 ID를 1로 설정
-    user = db.query(Users).filter(Users.id == current_user_id).first()
-
-    # 유저가 없는 경우 예외 처리
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found.")
-    
-    added_count = 0
-    # 이번 전송 묶음의 첫 번째 로그에만 unlock_count 정보가 담겨옴
-    first_log_flag = True
+    return _upload_logs(db, log_data, current_user)
+
+
+@async_router.post("", response_model=dict)
+async def upload_logs_async(
+    log_data: AppUsageLogCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # 저장 로직은 동기 버전과 같은 코드를 AsyncSession 위에서 실행
+    return await db.run_sync(_upload_logs, log_data, current_user)
+
+
+def _upload_logs(db: Session, log_data: AppUsageLogCreate, current_user: CurrentUser) -> dict:
+    # 유저 id 와 야간 시간대는 access token 에서 (유저 조회 쿼리 없음)
+    current_user_id = current_user.id
+    night = current_user.night
+    # 패키지 -> 카테고리 규칙표 (메모리 캐시, 처음 / 만료 시에만 DB 조회)
+    app_categories.ensure_loaded(db)
+    rows = []
 
     for log_item in log_data.logs:
-        # 1. 중복 검사: 패키지명과 시작 시간이 모두 같은 데이터가 이미 있는지 확인
-        # 밀리초 단위로 변환해서 비교
-        start_ms = int(log_item.start_time.timestamp() * 1000)
-
-        # 2. 야간 모드 판별 
-        log_time_str = log_item.start_time.strftime("%H:%M")
-        is_night_mode = False
-
-        # 야간 종료 시간이 시작 시간보다 빠른 경우 (예: 디폴트로 23:00 ~ 07:00)
-        def to_str(t):
-            if isinstance(t, str):
-                return t[:5]  # "23:00:00" -> "23:00"
-            return t.strftime("%H:%M")
-
-        n_start = to_str(user.night_mode_start)
-        n_end = to_str(user.night_mode_end)
-
-        # 야간 종료 시간이 시작 시간보다 빠른 경우 (날짜를 넘어가는 경우: 예 23:00 ~ 07:00)
-        if n_start > n_end:
-            if log_time_str >= n_start or log_time_str < n_end:
-                is_night_mode = True    
-        else:
-            if n_start <= log_time_str < n_end:
-                is_night_mode = True
-
-        exists = db.query(UsageLog).filter(
-            UsageLog.user_id == current_user_id,
-            UsageLog.package_name == log_item.package_name,
-            UsageLog.first_time_stamp == start_ms
-        ).first()
-
-        # 3. 중복이 아닌 경우에만 저장
-        if not exists:
-            new_log = UsageLog(
-                user_id=current_user_id,
-                package_name=log_item.package_name,
-                app_name=log_item.app_name,
-                usage_duration=log_item.usage_time,
-                first_time_stamp=start_ms,
-                last_time_stamp=int(log_item.end_time.timestamp() * 1000),
-                unlock_count=log_item.unlock_count,
-                is_night_mode=is_night_mode
-            )
-            db.add(new_log)
-            added_count += 1
-            first_log_flag = False # 이후 로그들은 0으로 기록
+        if log_item.end_time < log_item.start_time:
+            raise HTTPException(status_code=400, detail="end_time must not be earlier than start_time.")
+        # 1. 중복 검사용 키: 밀리초 단위 시작 시간 (검사는 bulk_ingest_logs 에서 한 번에)
+        start_ms = to_ms(log_item.start_time)
+
+        rows.append({
+            "package_name": log_item.package_name,
+            "app_name": log_item.app_name,
+            "usage_duration": log_item.usage_time,
+            "first_time_stamp": start_ms,
+            "last_time_stamp": to_ms(log_item.end_time),
+            "unlock_count": log_item.unlock_count,
+            # 규칙표에 없는 앱은 클라이언트가 보낸 카테고리
+            "category": app_categories.resolve(log_item.package_name, log_item.category),
+            # 2. 야간 모드 판별 (시작 시각 기준)
+            "is_night_mode": night.contains(log_item.start_time),
+        })
+
+    # 3. 이미 보관 파일로 옮겨진 기록은 빼고 (다시 올라와도 집계가 두 번 더해지지 않게)
+    archived = archived_keys(current_user_id, ((row["package_name"], row["first_time_stamp"]) for row in rows))
+    if archived:
+        rows = [row for row in rows if (row["package_name"], row["first_time_stamp"]) not in archived]
+
+    # 중복이 아닌 기록만 한 번에 저장
+    new_rows = bulk_ingest_logs(db, current_user_id, rows)
+
+    # 4. 새로 저장된 만큼 일간 집계 갱신 (같은 트랜잭션)
+    apply_daily_rollup(db, current_user_id, new_rows, night)
+
+    # 5. 진행 중인 챌린지 카운터 / 진행도 갱신 (같은 트랜잭션)
+    apply_challenge_progress(db, current_user_id, new_rows, night)
 
     db.commit()
-    return {"message": f"총 {len(log_data.logs)}개 중 {added_count}개의 새로운 기록이 저장되었습니다."}
+    return {"message": f"총 {len(log_data.logs)}개 중 {len(new_rows)}개의 새로운 기록이 저장되었습니다."}
 
 
-@router.get("/{user_id}", response_model=List[schemas.AppUsageLogResponse])
-def get_logs(user_id: int, db: Session = Depends(get_db)):
-    logs = db.query(UsageLog).filter(UsageLog.user_id == user_id).all()
-    if not logs:
-        raise HTTPException(status_code=404, detail="No logs found for the user.")
-    return logs
-
-@router.post("", response_model=dict)
-def upload_logs(
-    log_data: AppUsageLogCreate,
+@router.get("/{user_id}", response_model=schemas.AppUsageLogPage)
+def get_logs(
+    user_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    current_user_id=1  # 임시로 사용자 ID를 1로 설정
-    # currnet_user_id = log_data.user_id  # 프론트 구현 시, 로그인 유저의 실제 ID로 대체 필요
\ No newline at end of file
+    # stream=true : 전체 기록을 NDJSON 으로 한 줄씩 내려줌 (페이지 없이 메모리 일정)
+    if stream:
+        return StreamingResponse(
+            _stream_logs(user_id, since, until),
+            media_type="application/x-ndjson"
+        )
+    return _get_logs_page(db, user_id, since, until, _parse_cursor(cursor), limit)
+
+
+@async_router.get("/{user_id}", response_model=schemas.AppUsageLogPage)
+async def get_logs_async(
+    user_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    if stream:
+        return StreamingResponse(
+            _stream_logs_async(user_id, since, until),
+            media_type="application/x-ndjson"
+        )
+    after = _parse_cursor(cursor)
+    return await db.run_sync(_get_logs_page, user_id, since, until, after, limit)
+
+
+def _parse_cursor(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _log_key(item: schemas.AppUsageLogResponse):
+    return item.first_time_stamp, item.id
+
+
+def _archived_items(user_id: int, since, until, after=None):
+    # 보관 파일(app/jobs/archive_logs.py)로 옮겨진 기록. 보관 파일이 없는 유저는 디렉터리 조회 한 번
+    for row in iter_archived_logs(user_id, since, until, after):
+        yield schemas.AppUsageLogResponse.model_validate(row)
+
+
+def _get_logs_page(db: Session, user_id: int, since, until, after, limit: int) -> dict:
+    # 한 개 더 읽어서 다음 페이지가 있는지 확인
+    logs = db.execute(
+        logs_query(user_id, since, until, after).limit(limit + 1)
+    ).scalars().all()
+    items = [schemas.AppUsageLogResponse.model_validate(log) for log in logs]
+
+    # 보관된 기록도 같은 조건으로 limit + 1 개까지 읽어서 (first_time_stamp, id) 순서로 합친다
+    archived = list(islice(_archived_items(user_id, since, until, after), limit + 1))
+    if archived:
+        items = list(islice(merge(archived, items, key=_log_key), limit + 1))
+
+    if not items and after is None:
+        raise HTTPException(status_code=404, detail="No logs found for the user.")
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].first_time_stamp, items[-1].id)
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _stream_logs(user_id: int, since: Optional[datetime], until: Optional[datetime]):
+    # 응답이 끝날 때까지 세션을 쥐고 있어야 해서 get_db 대신 직접 연다
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            logs_query(user_id, since, until).execution_options(
+                stream_results=True, yield_per=STREAM_CHUNK_SIZE
+            )
+        ).scalars()
+        live = (schemas.AppUsageLogResponse.model_validate(log) for log in rows)
+        for item in merge(_archived_items(user_id, since, until), live, key=_log_key):
+            yield item.model_dump_json() + "\n"
+    finally:
+        db.close()
+
+
+async def _stream_logs_async(user_id: int, since: Optional[datetime], until: Optional[datetime]):
+    async with get_async_sessionmaker()() as db:
+        rows = await db.stream_scalars(
+            logs_query(user_id, since, until).execution_options(yield_per=STREAM_CHUNK_SIZE)
+        )
+        archived = _archived_items(user_id, since, until)
+        pending = next(archived, None)
+        async for log in rows:
+            item = schemas.AppUsageLogResponse.model_validate(log)
+            # 보관된 기록 중 이 기록보다 앞선 것을 먼저
+            while pending is not None and _log_key(pending) < _log_key(item):
+                yield pending.model_dump_json() + "\n"
+                pending = next(archived, None)
+            yield item.model_dump_json() + "\n"
+        while pending is not None:
+            yield pending.model_dump_json() + "\n"
+            pending = next(archived, None)
@@ -0,0 +1,142 @@
+# 친구 신청 / 수락 / 삭제, 친구 목록, 함께 아는 친구 수, 오늘 사용 시간 순위
+# 친구 목록은 app/services/friends.py 의 캐시에서 읽고, 수락 / 삭제 commit 뒤에 두 유저 것을 지운다
+
+from datetime import date, datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.core.auth import CurrentUser, get_current_user
+from app.core.config import APP_TIMEZONE
+from app.core.database import get_db
+from app.models.social import Friendships
+from app.models.user import Users
+from app.services.friends import ACCEPTED, PENDING, friend_graph, friend_list, leaderboard, mutual_counts
+
+router = APIRouter()
+
+
+def _between(a: int, b: int):
+    # 두 유저 사이의 신청 (방향 상관없이)
+    return or_(
+        and_(Friendships.requester_id == a, Friendships.receiver_id == b),
+        and_(Friendships.requester_id == b, Friendships.receiver_id == a),
+    )
+
+
+@router.get("/friends", response_model=List[schemas.Friend])
+def my_friends(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return friend_list(db, current_user.id)
+
+
+@router.delete("/friends/{friend_id}", response_model=dict)
+def remove_friend(
+    friend_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    deleted = db.execute(
+        delete(Friendships).where(_between(current_user.id, friend_id), Friendships.status == ACCEPTED)
+    ).rowcount
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Friend not found.")
+    db.commit()
+    friend_graph.invalidate(current_user.id, friend_id)
+    return {"status": "success"}
+
+
+@router.get("/friends/{friend_id}/mutual", response_model=schemas.MutualFriends)
+def mutual_friends(
+    friend_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return {"user_id": friend_id, "mutual_count": mutual_counts(db, current_user.id, [friend_id])[friend_id]}
+
+
+@router.get("/friends/requests", response_model=List[schemas.FriendRequest])
+def my_friend_requests(
+    sent: bool = False,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # 받은 신청 (sent=true 면 보낸 신청) 중 대기 중인 것
+    column = Friendships.requester_id if sent else Friendships.receiver_id
+    return db.scalars(
+        select(Friendships)
+        .where(column == current_user.id, Friendships.status == PENDING)
+        .order_by(Friendships.id.desc())
+    ).all()
+
+
+@router.post("/friends/requests", response_model=schemas.FriendRequest)
+def send_friend_request(
+    body: schemas.FriendRequestCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if body.receiver_id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot send a friend request to yourself.")
+    if db.get(Users, body.receiver_id) is None:
+        raise HTTPException(status_code=404, detail="User not found.")
+
+    request = Friendships(requester_id=current_user.id, receiver_id=body.receiver_id, status=PENDING)
+    db.add(request)
+    try:
+        db.commit()
+    except IntegrityError:
+        # 두 유저 사이에 이미 신청 / 친구가 있음 (uq_friendships_pair, 동시 / 엇갈린 신청도 여기서 걸린다)
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Friend request already exists.")
+    db.refresh(request)
+    return request
+
+
+@router.post("/friends/requests/{request_id}/accept", response_model=schemas.FriendRequest)
+def accept_friend_request(
+    request_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    request = db.get(Friendships, request_id)
+    if request is None or request.receiver_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Friend request not found.")
+    if request.status != PENDING:
+        raise HTTPException(status_code=409, detail="Friend request is not pending.")
+    request.status = ACCEPTED
+    db.commit()
+    friend_graph.invalidate(request.requester_id, request.receiver_id)
+    return request
+
+
+@router.delete("/friends/requests/{request_id}", response_model=dict)
+def cancel_friend_request(
+    request_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # 받은 신청 거절 / 보낸 신청 취소 (대기 중인 것만. 친구 끊기는 DELETE /friends/{friend_id})
+    request = db.get(Friendships, request_id)
+    if request is None or current_user.id not in (request.requester_id, request.receiver_id) or request.status != PENDING:
+        raise HTTPException(status_code=404, detail="Friend request not found.")
+    db.delete(request)
+    db.commit()
+    return {"status": "success"}
+
+
+@router.get("/leaderboard", response_model=List[schemas.LeaderboardEntry])
+def friend_leaderboard(
+    day: Optional[date] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # 나 + 친구들의 그날(기본: 오늘) 사용 시간 순위
+    return leaderboard(db, current_user.id, day or datetime.now(APP_TIMEZONE).date(), limit)
@@ -1,31 +1,298 @@
 
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from fastapi import HTTPException, status
+import hashlib
+import logging
 import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import requests
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import jwt, JWTError
+
+from app.core.config import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ADMIN_API_KEY,
+    JWT_ALGORITHM,
+    JWT_SECRET_KEY,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
+from app.services.night_mode import NightWindow, to_minutes
+
+logger = logging.getLogger("uvicorn.error")
 
 # 구글 클라우드 콘솔에서 발급받은 클라이언트 ID
-GOOGLE_WEB_CLIENT_ID = os.getenv("GOOGLE_WEB_CLIENT_ID") 
+GOOGLE_WEB_CLIENT_ID = os.getenv("GOOGLE_WEB_CLIENT_ID")
 
-def verify_google_token(token: str) -> dict:
-    try:
-        # 구글 공식 라이브러리 - 서명 위조 여부와 만료 시간을 자동으로 체크함.
-        idinfo = id_token.verify_oauth2_token(
-            token, 
-            requests.Request(), 
-            GOOGLE_WEB_CLIENT_ID
-        )
+# 구글 ID 토큰 서명 키 (JWKS)
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenVerifier:
+    """
+    구글 ID 토큰 검증기 (프로세스당 하나를 만들어서 재사용)
+    - 서명 키(JWKS)는 응답의 Cache-Control max-age 동안 메모리에 보관
+    - HTTP 세션 하나를 계속 재사용 (매 로그인마다 새 연결 X)
+    - 이미 검증한 토큰은 sha256 해시로 잠깐 기억해서, 재시도 로그인은 서명 검증을 건너뜀
+    - 실패하면 ValueError
+    """
+
+    def __init__(
+        self,
+        audience: Optional[str],
+        certs_url: str = GOOGLE_JWKS_URL,
+        session=None,
+        default_max_age: int = 300,
+        verified_ttl: int = 300,
+        verified_max_size: int = 10000,
+        min_refetch_interval: int = 60,
+        clock=time.time,
+    ):
+        self.audience = audience
+        self.certs_url = certs_url
+        self.session = session or requests.Session()
+        self.default_max_age = default_max_age
+        self.verified_ttl = verified_ttl
+        self.verified_max_size = verified_max_size
+        self.min_refetch_interval = min_refetch_interval
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._jwks = None
+        self._jwks_expires_at = 0.0
+        self._jwks_fetched_at = 0.0
+        # sha256(token) -> (만료 시각, claims)
+        self._verified: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # 모니터링용 카운터
+        self.cert_fetches = 0
+        self.verified_hits = 0
+
+    def _fetch_jwks(self):
+        resp = self.session.get(self.certs_url, timeout=5)
+        resp.raise_for_status()
+        match = _MAX_AGE.search(resp.headers.get("Cache-Control", ""))
+        max_age = int(match.group(1)) if match else self.default_max_age
+        self._jwks = resp.json()
+        self._jwks_fetched_at = self.clock()
+        self._jwks_expires_at = self._jwks_fetched_at + max_age
+        self.cert_fetches += 1
+
+    def _find_key(self, kid: Optional[str]) -> Optional[dict]:
+        for key in self._jwks.get("keys", []):
+            if key.get("kid") == kid:
+                return key
+        return None
+
+    def _get_key(self, kid: Optional[str]) -> dict:
+        # 토큰 헤더의 kid 에 해당하는 공개키 하나 (다른 키로는 검증하지 않는다)
+        with self._lock:
+            expired = self._jwks is None or self.clock() >= self._jwks_expires_at
+            key = None if expired else self._find_key(kid)
+            # 키 교체(rotation) 직후라 모르는 kid 면 만료 전이라도 한 번 새로 받는다
+            # (엉터리 kid 로 요청을 계속 보내도 min_refetch_interval 에 한 번만)
+            recently = not expired and self.clock() - self._jwks_fetched_at < self.min_refetch_interval
+            if key is None and not recently:
+                self._fetch_jwks()
+                key = self._find_key(kid)
+        if key is None:
+            raise ValueError("Unknown key id.")
+        return key
+
+    def _remember(self, key: str, claims: dict):
+        expires_at = min(self.clock() + self.verified_ttl, float(claims.get("exp", 0)))
+        with self._lock:
+            self._verified[key] = (expires_at, claims)
+            self._verified.move_to_end(key)
+            while len(self._verified) > self.verified_max_size:
+                self._verified.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[dict]:
+        with self._lock:
+            hit = self._verified.get(key)
+            if hit is None:
+                return None
+            expires_at, claims = hit
+            if self.clock() >= expires_at:
+                del self._verified[key]
+                return None
+            self.verified_hits += 1
+            return claims
+
+    def verify(self, token: str) -> dict:
+        if not token:
+            raise ValueError("Token is empty.")
+
+        key = hashlib.sha256(token.encode()).hexdigest()
+        claims = self._recall(key)
+        if claims is not None:
+            return claims
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            # 서명 / 만료(exp) / audience 를 한 번에 검증
+            claims = jwt.decode(
+                token,
+                self._get_key(kid),
+                algorithms=["RS256"],
+                audience=self.audience,
+                options={"verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise ValueError(str(e))
 
         # 토큰 발행처(iss)가 구글인지 최종 확인
-        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
-            raise ValueError('Wrong issuer.')
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError("Wrong issuer.")
+
+        self._remember(key, claims)
+        return claims
+
+
+# 앱 전체에서 공유하는 검증기
+google_verifier = GoogleTokenVerifier(GOOGLE_WEB_CLIENT_ID)
+
 
+def verify_google_token(token: str) -> dict:
+    try:
         # 검증 성공 시 사용자 정보(이메일, 이름 등) 반환
-        return idinfo
+        return google_verifier.verify(token)
 
     except ValueError as e:
         # 유효하지 않은 토큰일 경우 401 에러 발생
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid Google token: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+# ---------------------------------------------------------------------------
+# 서버 세션 토큰 (구글 로그인 후 우리 서버가 발급)
+# - access token: 짧게 유효. user id 와 야간 모드 구간을 claim 에 담아서 요청마다 DB 조회 없이 사용
+# - refresh token: 길게 유효. /auth/refresh 에서 access token 재발급 (이때만 DB 조회)
+# ---------------------------------------------------------------------------
+
+if JWT_SECRET_KEY:
+    _secret_key = JWT_SECRET_KEY
+else:
+    # 로컬 개발용: 재시작하면 기존 토큰은 전부 무효
+    _secret_key = secrets.token_urlsafe(32)
+    logger.warning("JWT_SECRET_KEY 가 없어서 임시 키를 사용합니다. 서버 재시작 시 토큰이 무효화됩니다.")
+
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+_bearer = HTTPBearer(auto_error=False)
+
+# 이미 디코드한 access token -> (exp, CurrentUser). 같은 토큰이 만료 전까지 계속 오므로
+# 서명 검증(HMAC + JSON 파싱)은 토큰당 한 번만 한다
+ACCESS_CACHE_MAX_SIZE = 10000
+_access_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+class CurrentUser:
+    """
+    access token 에서 꺼낸 로그인 유저 정보 (DB 조회 없음)
+    """
+
+    __slots__ = ("id", "night")
+
+    def __init__(self, id: int, night: NightWindow):
+        self.id = id
+        self.night = night
+
+
+def _encode(claims: dict, expires_in: timedelta) -> str:
+    now = datetime.now(timezone.utc)
+    claims.update({"iat": now, "exp": now + expires_in})
+    return jwt.encode(claims, _secret_key, algorithm=JWT_ALGORITHM)
+
+
+def create_access_token(user) -> str:
+    # ns / ne : 야간 모드 시작 / 끝 (하루 중 몇 분째인지)
+    return _encode(
+        {
+            "sub": str(user.id),
+            "typ": ACCESS_TOKEN_TYPE,
+            "ns": to_minutes(user.night_mode_start),
+            "ne": to_minutes(user.night_mode_end),
+        },
+        timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def create_refresh_token(user) -> str:
+    return _encode(
+        {"sub": str(user.id), "typ": REFRESH_TOKEN_TYPE},
+        timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+
+def issue_tokens(user) -> dict:
+    return {
+        "access_token": create_access_token(user),
+        "refresh_token": create_refresh_token(user),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def decode_token(token: str, token_type: str) -> dict:
+    # 서명 / 만료 / 토큰 종류 확인. 실패하면 401
+    try:
+        claims = jwt.decode(token, _secret_key, algorithms=[JWT_ALGORITHM])
+    except JWTError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Invalid token: {str(e)}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if claims.get("typ") != token_type:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer),
+) -> CurrentUser:
+    """
+    Authorization: Bearer <access token> 을 확인하는 의존성.
+    IO 가 없어서 async 로 둔다 (동기 함수면 요청마다 스레드풀을 한 번 더 거친다)
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    token = credentials.credentials
+    hit = _access_cache.get(token)
+    if hit is not None and time.time() < hit[0]:
+        return hit[1]
+
+    claims = decode_token(token, ACCESS_TOKEN_TYPE)
+    user = CurrentUser(int(claims["sub"]), NightWindow(claims["ns"], claims["ne"]))
+    _access_cache[token] = (claims["exp"], user)
+    if len(_access_cache) > ACCESS_CACHE_MAX_SIZE:
+        _access_cache.popitem(last=False)
+    return user
+
+
+async def require_admin(x_admin_key: Optional[str] = Header(None)) -> None:
+    """
+    관리자 API 의존성. X-Admin-Key 헤더가 ADMIN_API_KEY 와 같아야 한다 (설정이 없으면 항상 403)
+    """
+    if not ADMIN_API_KEY or not x_admin_key or not secrets.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin key required.")
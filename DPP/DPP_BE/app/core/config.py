@@ -0,0 +1,79 @@
+# 환경 변수 기반 설정값 모음
+
+import os
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 일간 집계(날짜 구분, 야간 시간 계산)에 쓰는 기준 시간대
+APP_TIMEZONE = ZoneInfo(os.getenv("APP_TIMEZONE", "Asia/Seoul"))
+
+# 주간 리포트 집계 배치 실행 주기 (초). 0 이면 API 서버 안에서 돌리지 않음 (CLI 로만 실행)
+WEEKLY_JOB_INTERVAL_SECONDS = int(os.getenv("WEEKLY_JOB_INTERVAL_SECONDS", "0"))
+
+# DB 커넥션 풀 (메모리 sqlite 에는 적용하지 않음)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# 풀이 꽉 찼을 때 커넥션을 기다리는 최대 시간 (초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# 이 시간(초)보다 오래된 커넥션은 버리고 새로 연결 (DB/LB 의 idle timeout 보다 짧게)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 커넥션을 꺼낼 때마다 살아있는지 확인 (DB 페일오버 후 끊긴 커넥션 재사용 방지)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# true 면 로그 / 로그인 API 를 async 엔진(AsyncSession)으로 처리
+# postgres 는 asyncpg, sqlite 는 aiosqlite 드라이버 필요
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+# 비동기 드라이버용 DB 주소 (없으면 DATABASE_URL 에서 드라이버만 바꿔서 사용)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# 서버가 발급하는 세션 토큰(JWT) 서명 키. 여러 워커/서버가 같은 값을 써야 한다
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+# access token 은 짧게 (야간 모드 설정 변경도 이 시간 안에 반영됨), refresh token 은 길게
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+
+# AI 입력(ai_features) 계산 기준
+# 같은 앱을 이 간격(초) 안에 다시 열면 한 세션으로 이어 본다
+SESSION_GAP_SECONDS = int(os.getenv("SESSION_GAP_SECONDS", "60"))
+# 이어 붙인 세션이 이 시간(분) 이상이면 긴 세션
+LONG_SESSION_MINUTES = int(os.getenv("LONG_SESSION_MINUTES", "30"))
+
+# 관리자 API (/api/v1/admin) 키. X-Admin-Key 헤더로 보낸다. 비어 있으면 관리자 API 를 쓰지 않음
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
+# 앱 카테고리 규칙을 DB 에서 다시 읽는 주기 (초). reload API 를 받지 않은 다른 워커도 이 주기로 반영
+APP_CATEGORY_RELOAD_SECONDS = int(os.getenv("APP_CATEGORY_RELOAD_SECONDS", "300"))
+
+# 오래된 usage_logs 보관 (app/jobs/archive_logs.py)
+# 이 일수보다 오래된 달(월 단위로 끊음)의 로그를 유저 / 월별 컬럼 파일로 옮기고 DB 에서 지운다
+LOG_ARCHIVE_AFTER_DAYS = int(os.getenv("LOG_ARCHIVE_AFTER_DAYS", "90"))
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "archive/usage_logs")
+# true 면 deflate 압축 (더 작지만 조회 시 memmap 대신 파일 전체를 읽는다)
+LOG_ARCHIVE_COMPRESS = os.getenv("LOG_ARCHIVE_COMPRESS", "false").lower() in ("1", "true", "yes")
+# 보관 배치 실행 주기 (초). 0 이면 API 서버 안에서 돌리지 않음 (CLI 로만 실행)
+LOG_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("LOG_ARCHIVE_INTERVAL_SECONDS", "0"))
+
+# 기간이 끝난 챌린지 확정 배치 (app/jobs/close_challenges.py) 실행 주기 (초). 0 이면 CLI 로만 실행
+# (GET /challenges/me 는 요청한 유저 것을 읽기 전에 따로 확정한다)
+CHALLENGE_CLOSE_INTERVAL_SECONDS = int(os.getenv("CHALLENGE_CLOSE_INTERVAL_SECONDS", "300"))
+
+# 챌린지 달성 보상 XP 기본값 (challenges.reward_xp 가 비어 있을 때, 참여할 때 rewards 에 기록)
+CHALLENGE_REWARD_XP = int(os.getenv("CHALLENGE_REWARD_XP", "100"))
+
+# POST /gamification/xp/xp-up (관리자 / 내부용) 한 번에 올릴 수 있는 XP / 코인 최대값
+XP_UP_MAX_AMOUNT = int(os.getenv("XP_UP_MAX_AMOUNT", "1000"))
+
+# 캐릭터 / 업적 해금 (app/services/unlocks.py)
+# 해금 카탈로그(characters / achievements 의 unlock_type, unlock_value)를 DB 에서 다시 읽는 주기 (초)
+UNLOCK_CATALOG_RELOAD_SECONDS = int(os.getenv("UNLOCK_CATALOG_RELOAD_SECONDS", "300"))
+# 어제까지의 연속 달성 일수로 STREAK 해금을 확인하는 배치 (app/jobs/streak_unlocks.py) 실행 주기 (초). 0 이면 CLI 로만 실행
+STREAK_UNLOCK_INTERVAL_SECONDS = int(os.getenv("STREAK_UNLOCK_INTERVAL_SECONDS", "3600"))
+
+# 친구 목록 캐시 (app/services/friends.py)
+# 수락 / 삭제를 처리한 워커는 바로 지우고, 다른 워커는 이 시간(초) 안에 DB 에서 다시 읽는다
+FRIEND_CACHE_SECONDS = int(os.getenv("FRIEND_CACHE_SECONDS", "60"))
+# 워커 하나가 기억하는 최대 유저 수 (넘으면 오래된 것부터 버린다)
+FRIEND_CACHE_MAX_USERS = int(os.getenv("FRIEND_CACHE_MAX_USERS", "100000"))
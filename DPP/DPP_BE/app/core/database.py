@@ -1,21 +1,53 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from dotenv import load_dotenv
 
+from app.core.config import (
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    ASYNC_DATABASE_URL,
+)
+from app.core.db_metrics import TimedQueuePool, TimedAsyncQueuePool, instrument_engine
+
 # 1. .env 파일 로드
 load_dotenv()
 
 # 2. DB 주소 가져오기
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-<<<<<<< HEAD
 # (안전장치) URL이 없으면 에러 발생
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("DATABASE_URL이 없습니다. .env 파일을 확인해주세요!")
 
-# 3. 엔진 생성
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# 3. 엔진 생성 (커넥션 풀 설정은 app/core/config.py)
+def build_engine(url: str, tuned_pool: bool = True):
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # 메모리 sqlite 는 커넥션 하나를 공유해야 하므로 기본 풀 그대로
+        engine = create_engine(url)
+    elif tuned_pool:
+        engine = create_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    else:
+        # SQLAlchemy 기본값 (pool_size=5, max_overflow=10, pool_timeout=30) - 부하 테스트 비교용
+        engine = create_engine(url, poolclass=TimedQueuePool)
+    instrument_engine(engine)
+    return engine
+
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
 
 # 4. 세션 생성기
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,20 +56,58 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 # 6. DB 세션 가져오는 함수 (Dependency)
-=======
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-
-# 3. 세션 생성기
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# 4. 모델들의 조상님
-Base = declarative_base()
-
-# 5. DB 세션 가져오는 함수 (Dependency)
->>>>>>> 08566d6ed7608b3fc30869a43716f20a3280fc3c
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# 7. ON CONFLICT (upsert) 를 지원하는 dialect 의 insert 함수 반환. 지원 안 하면 None
+_UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+def upsert_insert(bind):
+    return _UPSERT_INSERTS.get(bind.dialect.name)
+
+
+# 8. 비동기 엔진 / 세션 (DB_ASYNC=true 일 때만 사용. 처음 필요할 때 만든다)
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str) -> str:
+    # "postgresql://..." / "postgresql+psycopg2://..." -> "postgresql+asyncpg://..."
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+")[0]
+    return f"{_ASYNC_DRIVERS.get(dialect, scheme)}://{rest}"
+
+_async_sessionmaker = None
+
+def get_async_sessionmaker():
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        url = ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+        if url.startswith("sqlite"):
+            async_engine = create_async_engine(url)
+        else:
+            async_engine = create_async_engine(
+                url,
+                poolclass=TimedAsyncQueuePool,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=DB_POOL_PRE_PING,
+            )
+        instrument_engine(async_engine.sync_engine)
+        _async_sessionmaker = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
+
+# 9. 비동기 DB 세션 (Dependency)
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
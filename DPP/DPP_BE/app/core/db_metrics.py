@@ -0,0 +1,102 @@
+# DB 커넥션 풀 지표 (Prometheus text 형식으로 /metrics 에 노출)
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# 커넥션 획득 대기 시간 히스토그램 구간 (초)
+ACQUIRE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.acquire_count = 0
+        self.acquire_sum = 0.0
+        self.acquire_max = 0.0
+        self.acquire_buckets = [0] * len(ACQUIRE_BUCKETS)
+
+    def observe_acquire(self, seconds: float):
+        with self._lock:
+            self.acquire_count += 1
+            self.acquire_sum += seconds
+            self.acquire_max = max(self.acquire_max, seconds)
+            for i, bound in enumerate(ACQUIRE_BUCKETS):
+                if seconds <= bound:
+                    self.acquire_buckets[i] += 1
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+
+POOL_STATS = PoolStats()
+
+
+class _TimedConnectMixin:
+    """
+    커넥션을 꺼낼 때 걸린 시간(풀 대기 + 필요 시 새 연결)을 기록한다.
+    engine.dispose() 로 풀이 다시 만들어져도 같은 클래스가 유지된다.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            POOL_STATS.observe_acquire(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedConnectMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedConnectMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine):
+    # 풀 이벤트로 체크아웃/체크인/연결/무효화 횟수 집계
+    event.listen(engine, "checkout", lambda *a: POOL_STATS.incr("checkouts"))
+    event.listen(engine, "checkin", lambda *a: POOL_STATS.incr("checkins"))
+    event.listen(engine, "connect", lambda *a: POOL_STATS.incr("connects"))
+    event.listen(engine, "invalidate", lambda *a: POOL_STATS.incr("invalidations"))
+
+
+def render_prometheus(engine) -> str:
+    pool = engine.pool
+    lines = []
+
+    def metric(name, kind, help_text, value):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+
+    # 현재 상태 (QueuePool 이 아니면 0)
+    metric("db_pool_size", "gauge", "Configured pool size.", getattr(pool, "size", lambda: 0)())
+    metric("db_pool_checked_out", "gauge", "Connections currently checked out.", getattr(pool, "checkedout", lambda: 0)())
+    metric("db_pool_checked_in", "gauge", "Idle connections in the pool.", getattr(pool, "checkedin", lambda: 0)())
+    metric("db_pool_overflow", "gauge", "Connections opened beyond pool_size.", max(getattr(pool, "overflow", lambda: 0)(), 0))
+
+    stats = POOL_STATS
+    metric("db_pool_checkouts_total", "counter", "Connection checkouts.", stats.checkouts)
+    metric("db_pool_checkins_total", "counter", "Connection checkins.", stats.checkins)
+    metric("db_pool_connects_total", "counter", "New DBAPI connections opened.", stats.connects)
+    metric("db_pool_invalidations_total", "counter", "Connections invalidated (e.g. failed pre-ping).", stats.invalidations)
+    metric("db_pool_acquire_seconds_max", "gauge", "Longest connection acquire time.", stats.acquire_max)
+
+    lines.append("# HELP db_pool_acquire_seconds Time spent waiting for a pooled connection.")
+    lines.append("# TYPE db_pool_acquire_seconds histogram")
+    for bound, count in zip(ACQUIRE_BUCKETS, stats.acquire_buckets):
+        lines.append(f'db_pool_acquire_seconds_bucket{{le="{bound}"}} {count}')
+    lines.append(f'db_pool_acquire_seconds_bucket{{le="+Inf"}} {stats.acquire_count}')
+    lines.append(f"db_pool_acquire_seconds_sum {stats.acquire_sum}")
+    lines.append(f"db_pool_acquire_seconds_count {stats.acquire_count}")
+
+    return "\n".join(lines) + "\n"
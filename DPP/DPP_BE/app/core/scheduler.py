@@ -0,0 +1,29 @@
+# 프로세스 내부 주기 작업 (별도 cron 없이 API 서버 안에서 배치 실행)
+
+import logging
+import threading
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def run_every(name: str, interval_seconds: float, job, run_now: bool = True) -> threading.Event:
+    """
+    daemon 스레드에서 job() 을 interval_seconds 마다 실행한다.
+    반환된 Event 를 set() 하면 멈춘다.
+    job 에서 난 예외는 로그만 남기고 다음 주기에 다시 시도한다.
+    """
+    stop = threading.Event()
+
+    def loop():
+        if not run_now and stop.wait(interval_seconds):
+            return
+        while True:
+            try:
+                job()
+            except Exception:
+                logger.exception("scheduled job %s failed", name)
+            if stop.wait(interval_seconds):
+                return
+
+    threading.Thread(target=loop, name=f"job-{name}", daemon=True).start()
+    return stop
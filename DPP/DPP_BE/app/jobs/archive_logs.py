@@ -0,0 +1,184 @@
+# 오래된 usage_logs 보관 배치 (usage_logs -> LOG_ARCHIVE_DIR/{user_id}/{YYYY-MM}.npz)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python -m app.jobs.archive_logs
+#   python -m app.jobs.archive_logs --after-days 60 --chunk-size 100
+#
+# - LOG_ARCHIVE_AFTER_DAYS 보다 오래된 "달" 전체를 옮긴다 (달 중간에서 끊지 않음)
+# - 유저를 user_id 순서로 chunk 단위로: 읽기 -> 월별 파일 쓰기(fsync 후 교체) -> 읽은 id 만 DELETE -> commit
+# - 파일을 쓴 뒤 DELETE 전에 끊겨도 다시 돌리면 기존 파일과 합치면서
+#   (package_name, first_time_stamp) 중복은 버리므로 결과는 같다
+# - 이미 보관한 달에 늦게 올라온 로그도 다음 실행 때 같은 파일에 합쳐진다
+
+import argparse
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import APP_TIMEZONE, LOG_ARCHIVE_AFTER_DAYS, LOG_ARCHIVE_DIR, LOG_ARCHIVE_INTERVAL_SECONDS
+from app.core.database import SessionLocal
+from app.core.scheduler import run_every
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.models.usage_log import UsageLog
+from app.services.log_archive import (
+    ARCHIVE_COLUMNS, archive_path, month_start_ms, next_month_key, read_archived_month, write_archive,
+)
+
+logger = logging.getLogger("uvicorn.error")
+
+# 한 번에 DELETE 할 id 수 (sqlite 바인드 변수 제한)
+DELETE_BATCH = 5000
+
+
+def archive_cutoff(today: date, after_days: int) -> Tuple[str, int]:
+    # 이 달(포함)부터는 DB 에 남긴다: (월 key, 그 달 시작 ms)
+    day = today - timedelta(days=after_days)
+    key = f"{day.year}-{day.month:02d}"
+    return key, month_start_ms(key)
+
+
+def _month_of(first: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    # first_time_stamp 배열 -> (월 key 목록, 행마다 월 번호)
+    lo = datetime.fromtimestamp(int(first.min()) / 1000, tz=APP_TIMEZONE)
+    key = f"{lo.year}-{lo.month:02d}"
+    keys, starts = [], []
+    end = int(first.max())
+    while True:
+        start = month_start_ms(key)
+        if start > end:
+            break
+        keys.append(key)
+        starts.append(start)
+        key = next_month_key(key)
+    return keys, np.searchsorted(np.asarray(starts, dtype=np.int64), first, side="right") - 1
+
+
+def _merge_existing(user_id: int, key: str, root: str, new: Dict[str, list]) -> Dict[str, list]:
+    # 이미 보관 파일이 있으면 합친다 (같은 (package_name, first_time_stamp) 는 파일 쪽 유지)
+    month = read_archived_month(user_id, key, root)
+    if month is None:
+        return new
+    merged = {col: [] for col in ARCHIVE_COLUMNS}
+    seen = set()
+    for row in month.rows(0, len(month)):
+        seen.add((row["package_name"], row["first_time_stamp"]))
+        for col in ARCHIVE_COLUMNS:
+            merged[col].append(row[col])
+    for i, (package, stamp) in enumerate(zip(new["package_name"], new["first_time_stamp"])):
+        if (package, stamp) in seen:
+            continue
+        seen.add((package, stamp))
+        for col in ARCHIVE_COLUMNS:
+            merged[col].append(new[col][i])
+    return merged
+
+
+def archive_chunk(
+    db: Session,
+    cutoff_ms: int,
+    after_user_id: int,
+    chunk_size: int,
+    root: str,
+) -> Tuple[int, int, int, Optional[int]]:
+    """
+    after_user_id 다음 유저부터 chunk_size 명의 cutoff_ms 이전 로그를 보관 파일로 옮긴다.
+    반환값: (유저 수, 옮긴 행 수, 쓴 파일 수, 마지막 user_id)
+    """
+    user_ids = db.scalars(
+        select(UsageLog.user_id)
+        .where(UsageLog.user_id > after_user_id, UsageLog.first_time_stamp < cutoff_ms)
+        .group_by(UsageLog.user_id)
+        .order_by(UsageLog.user_id)
+        .limit(chunk_size)
+    ).all()
+    if not user_ids:
+        return 0, 0, 0, None
+
+    rows = db.execute(
+        select(UsageLog.user_id, *(getattr(UsageLog, col) for col in ARCHIVE_COLUMNS)).where(
+            UsageLog.user_id.in_(user_ids),
+            UsageLog.first_time_stamp < cutoff_ms,
+        )
+    ).all()
+    if not rows:
+        return len(user_ids), 0, 0, user_ids[-1]
+
+    # (유저, 월) 별 컬럼 리스트로 나눈다
+    keys, month_idx = _month_of(np.fromiter((r.first_time_stamp for r in rows), dtype=np.int64, count=len(rows)))
+    groups: Dict[Tuple[int, int], Dict[str, list]] = defaultdict(lambda: {col: [] for col in ARCHIVE_COLUMNS})
+    for row, m in zip(rows, month_idx.tolist()):
+        group = groups[(row.user_id, m)]
+        for col in ARCHIVE_COLUMNS:
+            group[col].append(getattr(row, col))
+
+    for (user_id, m), columns in groups.items():
+        key = keys[m]
+        write_archive(archive_path(user_id, key, root), key, _merge_existing(user_id, key, root, columns))
+
+    # 파일을 다 쓴 뒤에 읽은 행만 지운다
+    ids = [row.id for row in rows]
+    for i in range(0, len(ids), DELETE_BATCH):
+        db.execute(delete(UsageLog).where(UsageLog.id.in_(ids[i:i + DELETE_BATCH])))
+    db.commit()
+    return len(user_ids), len(rows), len(groups), user_ids[-1]
+
+
+def run_archive_job(
+    after_days: int = LOG_ARCHIVE_AFTER_DAYS,
+    chunk_size: int = 200,
+    root: Optional[str] = None,
+    today: Optional[date] = None,
+) -> Dict[str, float]:
+    started = time.perf_counter()
+    root = root or LOG_ARCHIVE_DIR
+    key, cutoff_ms = archive_cutoff(today or datetime.now(APP_TIMEZONE).date(), after_days)
+    users = rows = files = 0
+    after_user_id = 0
+    with SessionLocal() as db:
+        while True:
+            u, r, f, last_id = archive_chunk(db, cutoff_ms, after_user_id, chunk_size, root)
+            if not u:
+                break
+            users, rows, files, after_user_id = users + u, rows + r, files + f, last_id
+    logger.info("usage_logs archived before %s: %d rows, %d users, %d files", key, rows, users, files)
+    return {
+        "before_month": key,
+        "users": users,
+        "rows": rows,
+        "files": files,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def start_archive_scheduler():
+    if LOG_ARCHIVE_INTERVAL_SECONDS > 0:
+        return run_every("archive_logs", LOG_ARCHIVE_INTERVAL_SECONDS, run_archive_job, run_now=False)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오래된 usage_logs -> 유저 / 월별 보관 파일")
+    parser.add_argument("--after-days", type=int, default=LOG_ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--dir", default=LOG_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    stats = run_archive_job(args.after_days, args.chunk_size, args.dir)
+    size = sum(
+        os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(args.dir) for name in names
+    ) if os.path.isdir(args.dir) else 0
+    print(
+        f"{stats['rows']} rows of {stats['users']} users before {stats['before_month']} -> "
+        f"{stats['files']} files in {stats['seconds']:.2f}s (archive dir {size / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# 해금 한 번 채우기 (배포 시 1회)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python -m app.jobs.backfill_unlocks
+#   python -m app.jobs.backfill_unlocks --day 2026-03-11 --chunk-size 2000
+#
+# - 해금은 값이 바뀔 때(XP 지급 / STREAK 배치)만 확인하므로, 배포 전에 이미 조건을 넘은 유저나
+#   나중에 카탈로그에 추가된 낮은 조건은 이걸로 채운다
+# - 유저를 user_id 순서로 chunk 단위로: 지금 XP / 레벨 / day(기본: 어제) 까지 연속 일수를 0 -> 현재값 변화로 보고
+#   넘은 조건을 충돌 무시 INSERT -> commit
+# - 이미 가진 해금은 그대로라 여러 번 돌려도 결과 동일
+
+import argparse
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.config import APP_TIMEZONE
+from app.core.database import SessionLocal
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.models.user import Users
+from app.services.unlocks import (
+    ACHIEVEMENT, CHARACTER, LEVEL, STREAK, XP, Change, apply_unlocks, streak_changes, unlock_catalog,
+)
+from app.services.xp import level_for
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def run_unlock_backfill(day: Optional[date] = None, chunk_size: int = 1000) -> Dict[str, float]:
+    started = time.perf_counter()
+    day = day or datetime.now(APP_TIMEZONE).date() - timedelta(days=1)
+    total = {"users": 0, "characters": 0, "achievements": 0}
+    with SessionLocal() as db:
+        unlock_catalog.ensure_loaded(db)
+        after = 0
+        while True:
+            rows = db.execute(
+                select(Users.id, Users.current_xp).where(Users.id > after).order_by(Users.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            changes = [
+                change for user_id, xp in rows
+                for change in (Change(user_id, XP, 0, xp or 0), Change(user_id, LEVEL, 0, level_for(xp)))
+            ]
+            if unlock_catalog.has(STREAK):
+                changes += [
+                    Change(c.user_id, STREAK, 0, c.new) for c in streak_changes(db, day, [user_id for user_id, _ in rows])
+                ]
+            unlocked = apply_unlocks(db, changes)
+            db.commit()
+            after = rows[-1].id
+            total["users"] += len(rows)
+            total["characters"] += len(unlocked[CHARACTER])
+            total["achievements"] += len(unlocked[ACHIEVEMENT])
+    logger.info(
+        "unlock backfill up to %s: %d users, %d characters, %d achievements",
+        day, total["users"], total["characters"], total["achievements"],
+    )
+    total["seconds"] = time.perf_counter() - started
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="지금 XP / 레벨 / 연속 일수로 이미 넘은 캐릭터 / 업적 해금 채우기")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="연속 일수 기준 날짜 YYYY-MM-DD (기본: 어제)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    stats = run_unlock_backfill(args.day, args.chunk_size)
+    print(
+        f"{stats['users']} users checked, {stats['characters']} characters / {stats['achievements']} achievements "
+        f"(already owned included) in {stats['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# 기간이 끝난 챌린지 인스턴스 확정 배치 (IN_PROGRESS -> COMPLETED / FAILED + 보상 XP)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python -m app.jobs.close_challenges
+#   python -m app.jobs.close_challenges --chunk-size 2000
+#
+# - (status, end_date) 인덱스로 end_date 순으로 chunk 개씩: 판정 -> 상태 변경 -> XP 지급 -> commit
+# - 확정된 인스턴스는 IN_PROGRESS 가 아니므로 다음 chunk 조회에서 빠진다 (offset / cursor 없음)
+# - 상태 변경과 XP 지급이 chunk 마다 한 트랜잭션이고, 아직 IN_PROGRESS 인 것만 바꾸므로
+#   중간에 끊겨도 / 워커 여럿이 같이 돌아도 다시 돌리면 남은 것만 처리된다
+
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import APP_TIMEZONE, CHALLENGE_CLOSE_INTERVAL_SECONDS
+from app.core.database import SessionLocal
+from app.core.scheduler import run_every
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.services.challenge_engine import close_expired_chunk
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def run_close_job(chunk_size: int = 1000, now: Optional[datetime] = None) -> Dict[str, float]:
+    started = time.perf_counter()
+    now = now or datetime.now(APP_TIMEZONE).replace(tzinfo=None)
+    total = {"chunks": 0, "completed": 0, "failed": 0, "xp": 0}
+    with SessionLocal() as db:
+        while True:
+            stats = close_expired_chunk(db, now, chunk_size)
+            if not stats["instances"]:
+                break
+            db.commit()
+            # 확정한 인스턴스는 다시 볼 일이 없다
+            db.expunge_all()
+            total["chunks"] += 1
+            for key in ("completed", "failed", "xp"):
+                total[key] += stats[key]
+    if total["chunks"]:
+        logger.info(
+            "challenges closed: %d completed, %d failed, %d xp", total["completed"], total["failed"], total["xp"]
+        )
+    total["seconds"] = time.perf_counter() - started
+    return total
+
+
+def start_close_scheduler():
+    if CHALLENGE_CLOSE_INTERVAL_SECONDS > 0:
+        return run_every("close_challenges", CHALLENGE_CLOSE_INTERVAL_SECONDS, run_close_job)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="기간이 끝난 챌린지 인스턴스 COMPLETED / FAILED 확정")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    stats = run_close_job(args.chunk_size)
+    print(
+        f"{stats['completed']} completed, {stats['failed']} failed, {stats['xp']} xp awarded "
+        f"in {stats['chunks']} chunks, {stats['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# 연속 달성(STREAK) 해금 배치
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python -m app.jobs.streak_unlocks
+#   python -m app.jobs.streak_unlocks --day 2026-03-11 --chunk-size 2000
+#
+# - day(기본: 어제) 에 daily_reports 가 있는 유저만 user_id 순서로 chunk 단위로:
+#   (전날까지 연속 일수) -> (day 까지 연속 일수) 로 새로 넘은 STREAK 조건을 충돌 무시 INSERT -> commit
+# - 카탈로그에 STREAK 조건이 없으면 아무것도 읽지 않는다
+# - 이미 가진 해금은 그대로라 여러 번 돌려도 결과 동일 (주기 실행마다 어제를 다시 봐도 된다)
+
+import argparse
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.config import APP_TIMEZONE, STREAK_UNLOCK_INTERVAL_SECONDS
+from app.core.database import SessionLocal
+from app.core.scheduler import run_every
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.models.calendar import DailyReports
+from app.services.unlocks import ACHIEVEMENT, CHARACTER, STREAK, apply_unlocks, streak_changes, unlock_catalog
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def run_streak_job(day: Optional[date] = None, chunk_size: int = 1000) -> Dict[str, float]:
+    started = time.perf_counter()
+    day = day or datetime.now(APP_TIMEZONE).date() - timedelta(days=1)
+    total = {"users": 0, "characters": 0, "achievements": 0}
+    with SessionLocal() as db:
+        unlock_catalog.ensure_loaded(db)
+        if unlock_catalog.has(STREAK):
+            after = 0
+            while True:
+                user_ids = db.scalars(
+                    select(DailyReports.user_id)
+                    .where(DailyReports.date == day, DailyReports.user_id > after)
+                    .distinct()
+                    .order_by(DailyReports.user_id)
+                    .limit(chunk_size)
+                ).all()
+                if not user_ids:
+                    break
+                unlocked = apply_unlocks(db, streak_changes(db, day, user_ids))
+                db.commit()
+                after = user_ids[-1]
+                total["users"] += len(user_ids)
+                total["characters"] += len(unlocked[CHARACTER])
+                total["achievements"] += len(unlocked[ACHIEVEMENT])
+    if total["characters"] or total["achievements"]:
+        logger.info(
+            "streak unlocks for %s: %d characters, %d achievements", day, total["characters"], total["achievements"]
+        )
+    total["seconds"] = time.perf_counter() - started
+    return total
+
+
+def start_streak_scheduler():
+    if STREAK_UNLOCK_INTERVAL_SECONDS > 0:
+        return run_every("streak_unlocks", STREAK_UNLOCK_INTERVAL_SECONDS, run_streak_job)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="연속 달성 일수로 캐릭터 / 업적 해금")
+    parser.add_argument("--day", type=date.fromisoformat, default=None, help="YYYY-MM-DD (기본: 어제)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    stats = run_streak_job(args.day, args.chunk_size)
+    print(
+        f"{stats['users']} users checked, {stats['characters']} characters / {stats['achievements']} achievements "
+        f"unlocked in {stats['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# 주간 리포트 집계 배치 (daily_reports -> weekly_reports)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python -m app.jobs.weekly_reports
+#   python -m app.jobs.weekly_reports --workers 4 --chunk-size 2000
+#   python -m app.jobs.weekly_reports --from-week 2026-W01
+#
+# - 유저를 user_id 순서로 chunk 단위로 끊어서, chunk 마다 GROUP BY 쿼리 + upsert 한 번
+# - 옵션 없이 실행하면 마지막으로 처리한 주부터 이어서 한다
+#   (마지막 주는 중간에 끊겼을 수 있으니 다시 계산. upsert 라 여러 번 돌려도 결과 동일)
+
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import APP_TIMEZONE, WEEKLY_JOB_INTERVAL_SECONDS
+from app.core.database import SessionLocal, engine, upsert_insert
+from app.core.scheduler import run_every
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.models.calendar import DailyReports, WeeklyReports
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def week_key(monday: date) -> str:
+    year, week, _ = monday.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_start(key: str) -> date:
+    year, week = key.split("-W")
+    return date.fromisocalendar(int(year), int(week), 1)
+
+
+def monday_of(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def pending_weeks(db: Session, from_week: Optional[str] = None) -> List[date]:
+    """
+    처리할 주의 월요일 목록 (지난주까지만. 이번 주는 아직 안 끝났으므로 제외)
+    """
+    if from_week:
+        start = week_start(from_week)
+    else:
+        latest = db.scalar(select(func.max(WeeklyReports.date_week)))
+        if latest:
+            start = week_start(latest)
+        else:
+            first_day = db.scalar(select(func.min(DailyReports.date)))
+            if first_day is None:
+                return []
+            start = monday_of(first_day)
+
+    last = monday_of(datetime.now(APP_TIMEZONE).date()) - timedelta(days=7)
+    weeks = []
+    while start <= last:
+        weeks.append(start)
+        start += timedelta(days=7)
+    return weeks
+
+
+def _merge_category_avg(rows, days_by_user: Dict[int, int]) -> Dict[int, Dict[str, float]]:
+    sums: Dict[int, Dict[str, float]] = {}
+    for user_id, usage in rows:
+        bucket = sums.setdefault(user_id, {})
+        for category, seconds in (usage or {}).items():
+            bucket[category] = bucket.get(category, 0) + seconds
+    return {
+        user_id: {k: v / days_by_user[user_id] for k, v in bucket.items()}
+        for user_id, bucket in sums.items()
+    }
+
+
+def build_week_chunk(
+    db: Session,
+    monday: date,
+    after_user_id: int,
+    upper_user_id: Optional[int],
+    chunk_size: int,
+) -> Tuple[int, Optional[int]]:
+    """
+    after_user_id 다음 유저부터 chunk_size 명의 주간 집계를 한 번에 계산해서 upsert.
+    반환값: (처리한 유저 수, 마지막 user_id)
+    """
+    in_week = (DailyReports.date >= monday, DailyReports.date < monday + timedelta(days=7))
+    user_filter = [DailyReports.user_id > after_user_id]
+    if upper_user_id is not None:
+        user_filter.append(DailyReports.user_id <= upper_user_id)
+
+    # 1. 평균값은 DB 에서 GROUP BY 로
+    agg = db.execute(
+        select(
+            DailyReports.user_id,
+            func.avg(DailyReports.total_time),
+            func.avg(DailyReports.late_night_usage),
+            func.count(),
+        )
+        .where(*in_week, *user_filter)
+        .group_by(DailyReports.user_id)
+        .order_by(DailyReports.user_id)
+        .limit(chunk_size)
+    ).all()
+    if not agg:
+        return 0, None
+
+    first_id, last_id = agg[0][0], agg[-1][0]
+    days_by_user = {user_id: days for user_id, _, _, days in agg}
+
+    # 2. 카테고리별 JSON 은 chunk 전체를 한 번에 읽어서 합산
+    category_avg = _merge_category_avg(
+        db.execute(
+            select(DailyReports.user_id, DailyReports.category_usage).where(
+                *in_week,
+                DailyReports.user_id >= first_id,
+                DailyReports.user_id <= last_id,
+            )
+        ).all(),
+        days_by_user,
+    )
+
+    key = week_key(monday)
+    rows = [
+        {
+            "user_id": user_id,
+            "date_week": key,
+            "total_time_avg": float(total_avg or 0),
+            "late_night_usage_avg": float(night_avg or 0),
+            "category_usage_avg": category_avg.get(user_id, {}),
+        }
+        for user_id, total_avg, night_avg, _ in agg
+    ]
+
+    # 3. chunk 단위 upsert
+    make_insert = upsert_insert(db.get_bind())
+    if make_insert is not None:
+        stmt = make_insert(WeeklyReports)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "date_week"],
+            set_={
+                "total_time_avg": stmt.excluded.total_time_avg,
+                "late_night_usage_avg": stmt.excluded.late_night_usage_avg,
+                "category_usage_avg": stmt.excluded.category_usage_avg,
+            },
+        )
+        db.execute(stmt, rows)
+    else:
+        db.execute(
+            delete(WeeklyReports).where(
+                WeeklyReports.date_week == key,
+                WeeklyReports.user_id.in_(list(days_by_user)),
+            )
+        )
+        db.execute(insert(WeeklyReports), rows)
+
+    db.commit()
+    return len(agg), last_id
+
+
+def run_user_range(monday: date, after_user_id: int, upper_user_id: Optional[int], chunk_size: int) -> int:
+    # 워커 하나가 맡은 user_id 범위 (after_user_id, upper_user_id] 를 끝까지 처리
+    done = 0
+    with SessionLocal() as db:
+        while True:
+            count, last_id = build_week_chunk(db, monday, after_user_id, upper_user_id, chunk_size)
+            if not count:
+                return done
+            done += count
+            after_user_id = last_id
+
+
+def _split_user_range(db: Session, monday: date, workers: int) -> List[Tuple[int, Optional[int]]]:
+    lo, hi = db.execute(
+        select(func.min(DailyReports.user_id), func.max(DailyReports.user_id)).where(
+            DailyReports.date >= monday,
+            DailyReports.date < monday + timedelta(days=7),
+        )
+    ).one()
+    if lo is None:
+        return []
+    step = max(1, (hi - lo + 1) // workers + 1)
+    bounds = list(range(lo - 1, hi, step)) + [hi]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _init_worker():
+    # fork 된 프로세스는 부모의 커넥션을 쓰면 안 된다
+    engine.dispose(close=False)
+
+
+def run_weekly_job(workers: int = 1, chunk_size: int = 1000, from_week: Optional[str] = None) -> Dict[str, float]:
+    started = time.perf_counter()
+    users = 0
+
+    with SessionLocal() as db:
+        weeks = pending_weeks(db, from_week)
+        ranges = {monday: _split_user_range(db, monday, workers) for monday in weeks} if workers > 1 else {}
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for monday in weeks:
+                futures = [
+                    pool.submit(run_user_range, monday, lo, hi, chunk_size)
+                    for lo, hi in ranges[monday]
+                ]
+                users += sum(f.result() for f in futures)
+                logger.info("weekly_reports %s done", week_key(monday))
+    else:
+        for monday in weeks:
+            users += run_user_range(monday, 0, None, chunk_size)
+            logger.info("weekly_reports %s done", week_key(monday))
+
+    elapsed = time.perf_counter() - started
+    return {
+        "weeks": len(weeks),
+        "users": users,
+        "seconds": elapsed,
+        "users_per_second": users / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def start_weekly_scheduler():
+    # API 서버 안에서 주기적으로 실행 (이미 끝난 주는 다시 계산하지 않으므로 자주 돌려도 가볍다)
+    if WEEKLY_JOB_INTERVAL_SECONDS > 0:
+        return run_every("weekly_reports", WEEKLY_JOB_INTERVAL_SECONDS, run_weekly_job)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_reports -> weekly_reports 주간 집계")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--from-week", help="예: 2026-W01 (없으면 마지막 처리 주부터)")
+    args = parser.parse_args()
+
+    stats = run_weekly_job(args.workers, args.chunk_size, args.from_week)
+    print(
+        f"{stats['weeks']} weeks, {stats['users']} user-weeks in {stats['seconds']:.2f}s "
+        f"({stats['users_per_second']:,.0f} users/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,12 @@
 
-<<<<<<< HEAD
 # 1. Base 클래스
 # 2. 각 파일에 정의된 모델 클래스 import 
-=======
-# Base 클래스
-# 각 파일에 정의된 모델 클래스 import 
->>>>>>> 08566d6ed7608b3fc30869a43716f20a3280fc3c
 from .user import Users
 from .usage_log import UsageLog
+from .app_category import AppCategoryRule
 from .calendar import CalendarEvent, CheckIn, DailyReports, WeeklyReports
 # 캐릭터, 업적 달성
-from .gamification import UserAchievements,UserCharacters,Characters, Achievements 
+from .gamification import UserAchievements,UserCharacters,Characters, Achievements, XpLedger
 # 챌린지
 from .challenge import Challenge, ChallengeInstances, Condition, ProgressLogs, Rewards
 # 친구, 그룹
@@ -27,12 +23,14 @@ __all__ = [
     "UserAchievements",
     "UserChallenge",
     "UsageLog",
+    "AppCategoryRule",
     "CalendarEvent",
     "CheckIn",
     "DailyReports",
     "WeeklyReports",
     "Characters",
     "Achievements",
+    "XpLedger",
     "Challenge",
     "ChallengeInstances",
     "Condition",
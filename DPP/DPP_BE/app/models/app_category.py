@@ -0,0 +1,12 @@
+# 앱 패키지 -> 카테고리 규칙 (서버는 app/services/app_category.py 에서 메모리에 캐시)
+
+from sqlalchemy import Column, Integer, String
+from app.core.database import Base
+
+class AppCategoryRule(Base):
+    __tablename__ = "app_category_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "com.kakao.talk" (정확히 일치) / "com.supercell.*" (접두사) / "com.*.webtoon" (* 는 아무 구간 하나)
+    pattern = Column(String(255), nullable=False, unique=True)
+    category = Column(String(50), nullable=False)
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Date, JSON, Float
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Date, JSON, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -37,16 +37,25 @@ class CheckIn(Base):
 
 class DailyReports(Base):
     __tablename__ = "daily_reports"
+    __table_args__ = (
+        # 유저당 하루 한 줄 (로그 업로드 시 증분 집계 대상)
+        Index("uq_daily_reports_user_date", "user_id", "date", unique=True),
+    )
     id = Column(Integer,primary_key=True,index=True)
     user_id = Column(Integer, ForeignKey("users.id"),nullable=False)
 
     date = Column(Date,nullable=False)
     content = Column(Text,nullable=True)
 
+    # 사용 시간 집계는 모두 초 단위 (app/services/daily_rollup.py 에서 채움)
     total_time = Column(Integer,default=0)
     late_night_usage = Column(Integer, default=0)
+    unlock_count = Column(Integer, default=0)
 
+    # {"SNS": 1200, ...}
     category_usage = Column(JSON,nullable=True)
+    # {"com.instagram.android": 900, ...}
+    package_usage = Column(JSON,nullable=True)
 
     # 관계 설정
     user=relationship("Users",back_populates="daily_reports")
@@ -54,15 +63,20 @@ class DailyReports(Base):
 
 class WeeklyReports(Base):
     __tablename__ = "weekly_reports"
+    __table_args__ = (
+        # 유저당 한 주 한 줄 (주간 집계 배치의 upsert 대상)
+        Index("uq_weekly_reports_user_week", "user_id", "date_week", unique=True),
+    )
 
     id = Column(Integer,primary_key=True,index=True)
     user_id = Column(Integer,ForeignKey("users.id"),nullable=False)
 
+    # ISO 주차 "2026-W04" (월요일 시작)
     date_week = Column(String(100),nullable=False)
 
     content_week = Column(Text,nullable=True)
 
-    #
+    # 해당 주 daily_reports 의 하루 평균 (초 단위)
     total_time_avg = Column(Float,default=0.0)
     late_night_usage_avg = Column(Float,default=0.0)
 
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -22,11 +22,22 @@ class Challenge(Base):
     # 기간 범위
     time_scope = Column(String(20),nullable=False)
 
+    # 달성 보상 XP (비우면 CHALLENGE_REWARD_XP). 참여할 때 rewards 에 복사해 둔다
+    reward_xp = Column(Integer, nullable=True)
+
     instances = relationship("ChallengeInstances", back_populates="challenge")
 
 # 사용자별 챌린지 진행 기록
 class ChallengeInstances(Base):
     __tablename__  = "challenge_instances"
+    __table_args__ = (
+        # 로그 업로드 시 이 유저의 진행 중 챌린지만 찾는다 (app/services/challenge_engine.py)
+        Index("ix_challenge_instances_user_status", "user_id", "status"),
+        # 기간이 끝난 진행 중 인스턴스 찾기 (app/jobs/close_challenges.py)
+        Index("ix_challenge_instances_status_end_date", "status", "end_date"),
+        # 같은 기간에 한 번만 참여 (기간 시작은 challenge_window 로 정해진다)
+        Index("uq_challenge_instances_user_challenge_start", "user_id", "challenge_id", "start_date", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -52,18 +63,26 @@ class Condition(Base):
     __tablename__ = "conditions"
 
     id = Column(Integer,primary_key=True,index=True)
-    instance_id = Column(Integer,ForeignKey("challenge_instances.id"),nullable=False)
+    # 인스턴스의 조건 조회 (진행도 계산마다)
+    instance_id = Column(Integer,ForeignKey("challenge_instances.id"),nullable=False,index=True)
     # 이거 외래키 갖고와야 하는 거 아닌가
     default_target_value = Column(Integer,nullable=False)
     # ??
     operator = Column(String(10),default=">=")
 
+    # 기간 안에서 지금까지 쌓인 지표 값 (로그 업로드 시 증분 갱신, 시간 지표는 초 단위)
+    current_value = Column(Integer, default=0, nullable=False, server_default="0")
+
     # 관계 정리
     instance = relationship("ChallengeInstances", back_populates="conditions")
 
 class ProgressLogs(Base):
     # 예약어 충돌 가능성 우려로 테이블 이름 수정함
     __tablename__ = "progress_logs"
+    __table_args__ = (
+        # 인스턴스당 한 줄 (진행도 upsert 대상)
+        Index("uq_progress_logs_instance", "instance_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     instance_id = Column(Integer, ForeignKey("challenge_instances.id"))
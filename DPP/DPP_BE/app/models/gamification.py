@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Date, JSON, Float, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, Date, JSON, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -19,6 +19,10 @@ class Characters(Base):
 
 class UserCharacters(Base):
     __tablename__ = "user_characters"
+    __table_args__ = (
+        # 같은 캐릭터는 한 번만 (해금은 충돌 무시 INSERT, app/services/unlocks.py)
+        Index("uq_user_characters_user_character", "user_id", "character_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -40,11 +44,17 @@ class Achievements(Base):
     description = Column(String(255), nullable=True)
 
     icon_url = Column(Text, nullable=True)
+    # 해금 조건 (Characters 와 같은 방식, app/services/unlocks.py)
+    unlock_type = Column(String(50), nullable=True)
+    unlock_value = Column(Integer, default=0)
     # 관계 설정
     achievers = relationship("UserAchievements", back_populates="achievement")
 
 class UserAchievements(Base):
     __tablename__ = "user_achievements"
+    __table_args__ = (
+        Index("uq_user_achievements_user_achievement", "user_id", "achievement_id", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer,ForeignKey("users.id"), nullable=False)
 
@@ -57,6 +67,26 @@ class UserAchievements(Base):
     achievement = relationship("Achievements", back_populates="achievers")
 
 
+# XP / 코인 변경 기록 (감사용, app/services/xp.py 에서 변경과 같은 트랜잭션에 묶어서 추가)
+class XpLedger(Base):
+    __tablename__ = "xp_ledger"
+    __table_args__ = (
+        # 유저별 최근 기록 조회
+        Index("ix_xp_ledger_user_id_id", "user_id", "id"),
+    )
 
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    xp_delta = Column(Integer, nullable=False, default=0)
+    coin_delta = Column(Integer, nullable=False, default=0)
+    # 변경 후 값
+    xp_balance = Column(Integer, nullable=False)
+    coin_balance = Column(Integer, nullable=False)
 
+    # 'CHALLENGE', 'XP_UP' ...
+    reason = Column(String(50), nullable=False)
+    # reason 에 따른 대상 id (CHALLENGE 면 challenge_instances.id)
+    ref_id = Column(Integer, nullable=True)
 
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,11 +1,18 @@
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, case
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Friendships(Base):
     __tablename__ = "friendships"
+    __table_args__ = (
+        # 같은 방향 신청은 한 줄
+        Index("uq_friendships_requester_receiver", "requester_id", "receiver_id", unique=True),
+        # 친구 목록: (내가 신청한 쪽, 상태) / (내가 받은 쪽, 상태) 로 상대 id 까지 인덱스에서 바로 (app/services/friends.py)
+        Index("ix_friendships_requester_status", "requester_id", "status", "receiver_id"),
+        Index("ix_friendships_receiver_status", "receiver_id", "status", "requester_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -16,11 +23,7 @@ class Friendships(Base):
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # 상태 ('PENDING', 'ACCEPTED')
-<<<<<<< HEAD
     # 차단한 경우도 고려해야 하지 않나?
-=======
-    # 차단한 경우는 제외. 복잡함. 
->>>>>>> 08566d6ed7608b3fc30869a43716f20a3280fc3c
     status = Column(String(20), default="PENDING", nullable=False)
 
     # 생성 시간
@@ -30,6 +33,15 @@ class Friendships(Base):
     requester = relationship("Users", foreign_keys=[requester_id], back_populates="sent_friend_requests")
     receiver = relationship("Users", foreign_keys=[receiver_id], back_populates="received_friend_requests")
 
+# 두 유저 사이에는 방향 상관없이 한 줄 (A->B 와 B->A 가 동시에 들어와도 하나만 저장된다)
+# least / greatest 는 sqlite 에 없어서 CASE 로 (작은 id, 큰 id)
+Index(
+    "uq_friendships_pair",
+    case((Friendships.requester_id < Friendships.receiver_id, Friendships.requester_id), else_=Friendships.receiver_id),
+    case((Friendships.requester_id < Friendships.receiver_id, Friendships.receiver_id), else_=Friendships.requester_id),
+    unique=True,
+)
+
 class Alerts(Base):
     __tablename__ = "alerts"
     id = Column(Integer, primary_key = True, index=True)
@@ -1,13 +1,20 @@
 # 스마트폰 사용 db
 
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, BOOLEAN
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, BigInteger, BOOLEAN, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class UsageLog(Base):
     __tablename__ = "usage_logs"
+    __table_args__ = (
+        # 중복 업로드 방지 키 (ON CONFLICT DO NOTHING 대상)
+        Index("uq_usage_logs_user_package_start", "user_id", "package_name", "first_time_stamp", unique=True),
+        # 유저별 시간 범위 조회용
+        Index("ix_usage_logs_user_start", "user_id", "first_time_stamp"),
+    )
+
     id= Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"),nullable=False)
 
@@ -20,10 +27,8 @@ class UsageLog(Base):
     category = Column(String, default="Uncategorized")
     first_time_stamp = Column(BigInteger, nullable=True)
     last_time_stamp = Column(BigInteger, nullable=True)
-<<<<<<< HEAD
 
     unlock_count = Column(Integer, default=0)
-    category = Column(String, nullable=True)
 
     # log.user.nickname 으로 사용자 닉네임 조회 가능
     user=relationship("Users", back_populates="usage_logs")
@@ -31,7 +36,3 @@ class UsageLog(Base):
     is_night_mode = Column(BOOLEAN, default=False)  
 
     daily_goal_minutes = Column(Integer, default=0)
-=======
-    # log.user.nickname 으로 사용자 닉네임 조회 가능
-    user=relationship("Users", back_populates="usage_logs")
->>>>>>> 08566d6ed7608b3fc30869a43716f20a3280fc3c
@@ -1,27 +1,4 @@
-<<<<<<< HEAD
-
-from .log import AppUsageLogBase, AppUsageLogCreate, AppUsageLogResponse
-
-=======
-from pydantic import BaseModel
-from datetime import datetime
-from typing import List
-
-# 1. 안드로이드에서 보낼 데이터 형식 정의
-class AppUsageLogBase(BaseModel):
-    packagename: str
-    app_name: str
-    usage_time: int  
-    start_time: datetime
-    end_time: datetime
-
-# 2. 안드로이드 -> 서버 
-class AppUsageLogCreate(BaseModel):
-    logs : List[AppUsageLogBase]
-
-# 3. 서버 -> 클라이언트
-# 상속 기능
-class AppUsageLogResponse(AppUsageLogBase):
-    id : int
-    user_id : int
->>>>>>> 08566d6ed7608b3fc30869a43716f20a3280fc3c
+from .log import AppUsageLogBase, AppUsageLogCreate, AppUsageLogResponse, AppUsageLogPage
+from .challenge import ChallengeJoin, ConditionProgress, ChallengeInstanceProgress
+from .gamification import XpUp, XpStatus, XpUpResult
+from .social import FriendRequestCreate, FriendRequest, Friend, MutualFriends, LeaderboardEntry
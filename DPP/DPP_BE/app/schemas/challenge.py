@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+# 1. 클라이언트 -> 서버 (챌린지 참여). 비우면 챌린지 기본값
+class ChallengeJoin(BaseModel):
+    target_value: Optional[int] = None
+    operator: Optional[str] = None
+
+# 2. 서버 -> 클라이언트
+class ConditionProgress(BaseModel):
+    id: int
+    operator: str
+    # 목표값 (분)
+    target_value: int
+    # 지금까지 쌓인 값 (분, 소수 둘째 자리까지)
+    current_value: float
+
+class ChallengeInstanceProgress(BaseModel):
+    id: int
+    challenge_id: int
+    title: str
+    challenge_type: str
+    status: str
+    start_date: datetime
+    end_date: datetime
+    # 0~1 (app/services/challenge_engine.py 의 instance_progress)
+    progress_rate: float = 0.0
+    conditions: List[ConditionProgress] = []
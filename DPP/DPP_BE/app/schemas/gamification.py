@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional
+
+# 1. 내부 서비스 / 운영 -> 서버 (XP / 코인 지급, X-Admin-Key). 양수만, 한 번에 XP_UP_MAX_AMOUNT 까지
+class XpUp(BaseModel):
+    user_id: int
+    xp: int = 0
+    coin: int = 0
+    # xp_ledger.reason 에 남길 지급 사유
+    reason: str = "ADMIN"
+
+# 2. 서버 -> 클라이언트
+class XpStatus(BaseModel):
+    user_id: int
+    current_xp: int
+    coin: int
+    level: int
+    # 지금 레벨이 시작된 누적 XP / 다음 레벨 누적 XP (최고 레벨이면 None)
+    level_xp: int
+    next_level_xp: Optional[int] = None
+    xp_to_next_level: int
+
+class XpUpResult(XpStatus):
+    xp_delta: int
+    coin_delta: int
+    level_up: bool = False
@@ -34,4 +34,10 @@ class AppUsageLogResponse(BaseModel):
     category: Optional[str] = "Uncategorized"
 
     class Config: 
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# 4. 서버 -> 클라이언트 (페이지 단위 조회)
+class AppUsageLogPage(BaseModel):
+    items: List[AppUsageLogResponse]
+    # 다음 페이지 요청 시 cursor 로 그대로 넘기면 됨. 마지막 페이지면 None
+    next_cursor: Optional[str] = None
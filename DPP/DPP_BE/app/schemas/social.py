@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+# 1. 클라이언트 -> 서버 (친구 신청)
+class FriendRequestCreate(BaseModel):
+    receiver_id: int
+
+# 2. 서버 -> 클라이언트
+class FriendRequest(BaseModel):
+    id: int
+    requester_id: int
+    receiver_id: int
+    status: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class Friend(BaseModel):
+    id: int
+    nickname: Optional[str] = None
+    profile_image: Optional[str] = None
+    equipped_character: Optional[str] = None
+    # 나와 함께 아는 친구 수
+    mutual_count: int = 0
+
+class MutualFriends(BaseModel):
+    user_id: int
+    mutual_count: int
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    user_id: int
+    nickname: Optional[str] = None
+    profile_image: Optional[str] = None
+    equipped_character: Optional[str] = None
+    # 그날 사용 시간 (초). 기록이 없으면 None
+    total_time: Optional[int] = None
+    is_me: bool = False
@@ -0,0 +1,421 @@
+# AI 서버 입력 생성 - 하루치 usage_logs 를 유저 여러 명 한 번에 집계
+#
+# 만드는 payload (DPP_AI 쪽 모델과 같은 모양)
+# - ai_comment   : demo_ai_main.py 의 AiCommentRequest (totalTime / lateNightTime / longSessions / 비율 등, 분 단위)
+# - report_input : routers/report.py 의 ReportGenerationInput (ai-test/inputs/report_c1.json 의 today_metrics / profile_metrics 형태)
+#
+# 유저 chunk 마다 쿼리 몇 번(유저 / 로그 / 최근 daily_reports / 체크인)만 하고,
+# 로그 집계는 numpy 배열 연산으로 한 번에 한다 (유저별 반복문 X)
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import LONG_SESSION_MINUTES, SESSION_GAP_SECONDS
+from app.models.calendar import CheckIn, DailyReports
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.daily_rollup import (
+    STREAK_LOOKBACK_DAYS, day_range_ms, extend_streak_history, local_datetime, streak_days,
+)
+from app.services.night_mode import DAY_MINUTES, NightWindow, to_minutes
+from app.services.xp import level_info
+
+# 비율 계산에 쓰는 카테고리 묶음 (UsageLog.category 값 기준)
+SNS_CATEGORIES = {"SNS"}
+GAME_CATEGORIES = {"GAME"}
+SHORT_FORM_CATEGORIES = {"SHORT_FORM"}
+# 카테고리와 상관없이 숏폼으로 보는 앱
+SHORT_FORM_PACKAGES = {"com.zhiliaoapp.musically", "com.ss.android.ugc.trill", "com.ss.android.ugc.aweme"}
+
+# profile_metrics 평균을 낼 기간 (일). 연속 달성 일수는 daily_rollup.streak_days (길면 extend_streak_history 로 더 읽는다)
+BASELINE_DAYS = 14
+TOP_CATEGORIES = 3
+
+
+def _night_minutes_before(x, start, end):
+    # [0, x) 분 중 야간인 분. 매일 반복되는 [start, end) (start > end 면 자정을 넘는 구간)
+    wraps = start > end
+    per_day = np.where(wraps, DAY_MINUTES - start + end, end - start)
+    days, r = np.divmod(x, DAY_MINUTES)
+    part = np.where(
+        wraps,
+        np.minimum(r, end) + np.maximum(r - start, 0),
+        np.clip(r - start, 0, np.maximum(end - start, 0)),
+    )
+    return days * per_day + part
+
+
+def _factorize(values: Iterable[str]):
+    # 문자열 -> (고유값 목록, 정수 코드 배열). np.unique(object) 는 정렬이라 느려서 dict 로 한 번 훑는다
+    codes: Dict[str, int] = {}
+    idx = np.fromiter((codes.setdefault(v, len(codes)) for v in values), dtype=np.int64)
+    return list(codes), idx
+
+
+def compute_day_features(
+    rows: Sequence[tuple],
+    nights: Dict[int, NightWindow],
+    day: date,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    하루치 로그 row (user_id, package_name, category, usage_duration, first_time_stamp, last_time_stamp, unlock_count)
+    -> 유저별 집계 (초 단위)
+    - 야간 시간은 daily_rollup.rollup_rows 와 같은 규칙 (세션이 야간에 걸친 비율만큼)
+    - 같은 앱을 SESSION_GAP_SECONDS 안에 다시 연 로그는 한 세션으로 이어서 긴 세션을 센다
+    - 숏폼은 SHORT_FORM_CATEGORIES 카테고리 또는 SHORT_FORM_PACKAGES 앱
+    """
+    if not rows:
+        return {}
+
+    # zip(*rows) 는 row 가 많으면 느려서 컬럼별로 꺼낸다
+    user_col, package_col, category_col, duration_col, first_col, last_col, unlock_col = (
+        [row[i] for row in rows] for i in range(7)
+    )
+    users, uidx = np.unique(np.asarray(user_col, dtype=np.int64), return_inverse=True)
+    n = len(users)
+
+    first = np.asarray(first_col, dtype=np.int64)
+    last = np.asarray([l if l is not None else f for l, f in zip(last_col, first_col)], dtype=np.int64)
+    seconds = np.asarray([d or 0 for d in duration_col], dtype=np.float64)
+    unlock = np.asarray([u or 0 for u in unlock_col], dtype=np.int64)
+    packages, pidx = _factorize(p or "" for p in package_col)
+    categories, cidx = _factorize(c or "Uncategorized" for c in category_col)
+
+    # 1. 야간 시간: 시작 시각(자정 기준 분)과 길이로 야간 구간과 겹친 분을 구한다
+    day_start, day_end = day_range_ms(day)
+    if local_datetime(day_start).utcoffset() == local_datetime(day_end - 1).utcoffset():
+        start_min = (first - day_start) / 60000.0
+    else:
+        # 서머타임이 바뀌는 날만 행마다 벽시계 시각 계산
+        start_min = np.array([
+            dt.hour * 60 + dt.minute + dt.second / 60 + dt.microsecond / 6e7
+            for dt in map(local_datetime, first_col)
+        ])
+    length = (last - first) / 60000.0
+    night_start = np.array([nights[u].start for u in users.tolist()], dtype=np.float64)[uidx]
+    night_end = np.array([nights[u].end for u in users.tolist()], dtype=np.float64)[uidx]
+
+    night = (_night_minutes_before(start_min + length, night_start, night_end)
+             - _night_minutes_before(start_min, night_start, night_end))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        night_seconds = np.where(length > 0, np.round(seconds * night / length), 0.0)
+    # 길이 0 인 로그는 시작 분이 야간이면 전부 야간
+    minute = np.floor(start_min)
+    in_night = np.where(
+        night_start > night_end,
+        (minute >= night_start) | (minute < night_end),
+        (night_start <= minute) & (minute < night_end),
+    )
+    night_seconds = np.where((length <= 0) & in_night, seconds, night_seconds)
+
+    # 2. 유저별 합계 / 카테고리별 합계
+    total = np.bincount(uidx, weights=seconds, minlength=n)
+    late_night = np.bincount(uidx, weights=night_seconds, minlength=n)
+    unlock_max = np.zeros(n, dtype=np.int64)
+    np.maximum.at(unlock_max, uidx, unlock)
+    by_category = np.bincount(
+        uidx * len(categories) + cidx, weights=seconds, minlength=n * len(categories)
+    ).reshape(n, len(categories))
+
+    short_form = (np.isin(cidx, [i for i, c in enumerate(categories) if c in SHORT_FORM_CATEGORIES])
+                  | np.isin(pidx, [i for i, p in enumerate(packages) if p in SHORT_FORM_PACKAGES]))
+    short_form_seconds = np.bincount(uidx[short_form], weights=seconds[short_form], minlength=n)
+
+    # 3. 긴 세션: (유저, 시작 시각) 순으로 정렬해서 같은 앱이 이어지는 로그를 한 세션으로 묶는다
+    order = np.lexsort((first, uidx))
+    u_s, p_s, f_s, l_s = uidx[order], pidx[order], first[order], last[order]
+    new_session = np.ones(len(order), dtype=bool)
+    new_session[1:] = ((u_s[1:] != u_s[:-1]) | (p_s[1:] != p_s[:-1])
+                       | (f_s[1:] - l_s[:-1] > SESSION_GAP_SECONDS * 1000))
+    session_seconds = np.bincount(np.cumsum(new_session) - 1, weights=seconds[order])
+    long_users = u_s[new_session][session_seconds >= LONG_SESSION_MINUTES * 60]
+    long_sessions = np.bincount(long_users, minlength=n)
+
+    result = {}
+    for i, (user_id, total_s, night_s, unlocks, longs, short_s, cat_row) in enumerate(zip(
+        users.tolist(), total.tolist(), late_night.tolist(), unlock_max.tolist(),
+        long_sessions.tolist(), short_form_seconds.tolist(), by_category.tolist(),
+    )):
+        result[user_id] = {
+            "total_seconds": int(total_s),
+            "late_night_seconds": int(night_s),
+            "unlock_count": unlocks,
+            "long_sessions": longs,
+            "short_form_seconds": int(short_s),
+            "category_seconds": {c: int(s) for c, s in zip(categories, cat_row) if s},
+        }
+    return result
+
+
+def _minutes(seconds: float) -> int:
+    return int((seconds + 30) // 60)
+
+
+def _display(minutes: int) -> Dict[str, int]:
+    return {"hours": minutes // 60, "minutes": minutes % 60}
+
+
+def _ratio(part: float, total: float) -> float:
+    return round(part / total, 3) if total else 0.0
+
+
+def usage_score(total_minutes: int, late_night_minutes: int, target_minutes: Optional[int]) -> int:
+    """
+    0~100 점. 목표 시간 안이면 100 에서 시작하고, 넘긴 비율만큼 / 야간 사용 시간만큼 깎는다
+    """
+    score = 100.0
+    if target_minutes and total_minutes > target_minutes:
+        score *= target_minutes / total_minutes
+    score -= min(30, late_night_minutes / 2)
+    return max(0, int(round(score)))
+
+
+def _empty_features() -> Dict[str, Any]:
+    return {
+        "total_seconds": 0, "late_night_seconds": 0, "unlock_count": 0,
+        "long_sessions": 0, "short_form_seconds": 0, "category_seconds": {},
+    }
+
+
+def build_ai_comment_request(features: Dict[str, Any], profile: Dict[str, Any], checkin: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    total = features["total_seconds"]
+    total_min = _minutes(total)
+    night_min = _minutes(features["late_night_seconds"])
+    category = features["category_seconds"]
+    target = profile["target_time"]
+    level = level_info(profile["current_xp"])
+    return {
+        "totalScore": usage_score(total_min, night_min, target),
+        "usage": {
+            "totalTime": total_min,
+            "lateNightTime": night_min,
+            "longSessions": features["long_sessions"],
+            "shortFormRatio": _ratio(features["short_form_seconds"], total),
+            "snsRatio": _ratio(sum(category.get(c, 0) for c in SNS_CATEGORIES), total),
+            "gameRatio": _ratio(sum(category.get(c, 0) for c in GAME_CATEGORIES), total),
+        },
+        # 알림 데이터는 아직 수집하지 않는다
+        "notifications": {"importantCount": 0, "lowPriorityCount": 0, "hasOverload": False},
+        # 체크인은 선택지 답변만 저장하므로 기분 / 만족도는 중간값
+        "checkIn": {
+            "mood": 3,
+            "satisfaction": 3,
+            "goalAchieved": bool(target) and total_min <= target,
+            "memo": (checkin or {}).get("memo"),
+        },
+        "profile": {
+            "level": level["level"],
+            "experience": profile["current_xp"] or 0,
+            "experienceToNextLevel": level["xp_to_next_level"],
+            "totalDays": profile["total_days"],
+            "currentStreak": profile["streak"],
+            "onboarding": {
+                "targetScreenTime": target or 0,
+                "targetBedTime": profile["night_mode_start"] or "23:00",
+            },
+        },
+    }
+
+
+def _top_categories(category_seconds: Dict[str, float], key: str) -> List[Dict[str, Any]]:
+    top = sorted(category_seconds.items(), key=lambda kv: (-kv[1], kv[0]))[:TOP_CATEGORIES]
+    rows = []
+    for name, seconds in top:
+        minutes = _minutes(seconds)
+        row = {"category": name, key: minutes}
+        if key == "minutes":
+            row["display"] = _display(minutes)
+        rows.append(row)
+    return rows
+
+
+def build_report_input(
+    day: date,
+    features: Dict[str, Any],
+    profile: Dict[str, Any],
+    baseline: Optional[Dict[str, Any]],
+    checkin: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    total_min = _minutes(features["total_seconds"])
+    night_min = _minutes(features["late_night_seconds"])
+    night_window = {"start": profile["night_mode_start"] or "23:00", "end": profile["night_mode_end"] or "07:00"}
+
+    today_metrics = {
+        "date": day.isoformat(),
+        "total_screen_time": {"total_minutes": total_min, "display": _display(total_min)},
+        "top_app_categories": _top_categories(features["category_seconds"], "minutes"),
+        "unlock_count": features["unlock_count"],
+        "late_night_window": night_window,
+        "late_night_minutes": night_min,
+        "late_night_display": _display(night_min),
+        "long_sessions": features["long_sessions"],
+        "short_form_ratio": _ratio(features["short_form_seconds"], features["total_seconds"]),
+    }
+
+    profile_metrics = None
+    if baseline:
+        avg_total = _minutes(baseline["avg_total_time"])
+        avg_night = _minutes(baseline["avg_late_night_usage"])
+        avg_unlock = int(round(baseline["avg_unlock_count"]))
+        profile_metrics = {
+            "range_days": baseline["days"],
+            "baselines": {
+                "avg_total_minutes": avg_total,
+                "avg_unlock_count": avg_unlock,
+                "avg_late_night_minutes": avg_night,
+            },
+            "typical_top_categories": _top_categories(baseline["category_avg"], "avg_minutes"),
+            "deltas_vs_avg": {
+                "total_delta_minutes": total_min - avg_total,
+                "unlock_delta": features["unlock_count"] - avg_unlock,
+                "late_night_delta_minutes": night_min - avg_night,
+            },
+        }
+
+    return {
+        "user_profile": {
+            "user_id": str(profile["id"]),
+            "target_minutes": profile["target_time"],
+            "total_days": profile["total_days"],
+            "current_streak": profile["streak"],
+        },
+        "today_metrics": today_metrics,
+        "profile_metrics": profile_metrics,
+        "checkin_answers": {"answers": checkin["answers"]} if checkin else None,
+        "constraints": None,
+    }
+
+
+def _load_chunk(db: Session, user_ids: List[int], day: date):
+    # chunk 하나에 필요한 데이터를 쿼리 몇 번으로 읽는다
+    start_ms, end_ms = day_range_ms(day)
+
+    profiles = {
+        row.id: {**row._asdict(), "total_days": 0, "streak": 0}
+        for row in db.execute(
+            select(
+                Users.id, Users.target_time, Users.current_xp, Users.night_mode_start, Users.night_mode_end,
+            ).where(Users.id.in_(user_ids))
+        )
+    }
+
+    logs = db.execute(
+        select(
+            UsageLog.user_id,
+            UsageLog.package_name,
+            UsageLog.category,
+            UsageLog.usage_duration,
+            UsageLog.first_time_stamp,
+            UsageLog.last_time_stamp,
+            UsageLog.unlock_count,
+        ).where(
+            UsageLog.user_id.in_(user_ids),
+            UsageLog.first_time_stamp >= start_ms,
+            UsageLog.first_time_stamp < end_ms,
+        )
+    ).all()
+
+    # 최근 daily_reports: 평균(BASELINE_DAYS) / 연속 달성(STREAK_LOOKBACK_DAYS)
+    history = db.execute(
+        select(
+            DailyReports.user_id, DailyReports.date, DailyReports.total_time,
+            DailyReports.late_night_usage, DailyReports.unlock_count, DailyReports.category_usage,
+        ).where(
+            DailyReports.user_id.in_(user_ids),
+            DailyReports.date > day - timedelta(days=STREAK_LOOKBACK_DAYS),
+            DailyReports.date <= day,
+        )
+    ).all()
+
+    total_days = db.execute(
+        select(DailyReports.user_id, func.count())
+        .where(DailyReports.user_id.in_(user_ids), DailyReports.date <= day)
+        .group_by(DailyReports.user_id)
+    ).all()
+
+    checkins = db.execute(
+        select(CheckIn.user_id, CheckIn.user_answer, CheckIn.user_answer_text)
+        .where(CheckIn.user_id.in_(user_ids), CheckIn.date == day)
+        .order_by(CheckIn.user_id, CheckIn.id)
+    ).all()
+
+    return profiles, logs, history, total_days, checkins
+
+
+def _baselines(history, day: date) -> Dict[int, Dict[str, Any]]:
+    since = day - timedelta(days=BASELINE_DAYS)
+    sums: Dict[int, Dict[str, Any]] = {}
+    for user_id, d, total, night, unlock, category in history:
+        if not (since <= d < day):
+            continue
+        b = sums.setdefault(user_id, {
+            "days": 0, "avg_total_time": 0, "avg_late_night_usage": 0, "avg_unlock_count": 0,
+            "category_avg": defaultdict(float),
+        })
+        b["days"] += 1
+        b["avg_total_time"] += total or 0
+        b["avg_late_night_usage"] += night or 0
+        b["avg_unlock_count"] += unlock or 0
+        for name, seconds in (category or {}).items():
+            b["category_avg"][name] += seconds
+    for b in sums.values():
+        days = b["days"]
+        for key in ("avg_total_time", "avg_late_night_usage", "avg_unlock_count"):
+            b[key] /= days
+        b["category_avg"] = {k: v / days for k, v in b["category_avg"].items()}
+    return sums
+
+
+def build_ai_inputs(
+    db: Session,
+    day: date,
+    user_ids: Iterable[int],
+    chunk_size: int = 1000,
+) -> Dict[int, Dict[str, Dict[str, Any]]]:
+    """
+    유저들의 day 하루 AI 입력을 만든다.
+    반환값: {user_id: {"ai_comment": AiCommentRequest, "report_input": ReportGenerationInput}}
+    (로그가 없는 유저도 0 으로 채워서 포함, users 에 없는 id 는 제외)
+    """
+    user_ids = sorted(set(user_ids))
+    result = {}
+    for i in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[i:i + chunk_size]
+        profiles, logs, history, total_days, checkin_rows = _load_chunk(db, chunk, day)
+
+        nights = {
+            user_id: NightWindow(to_minutes(p["night_mode_start"] or "23:00"), to_minutes(p["night_mode_end"] or "07:00"))
+            for user_id, p in profiles.items()
+        }
+        features = compute_day_features(logs, nights, day)
+        baselines = _baselines(history, day)
+
+        history_by_user: Dict[int, Dict[date, int]] = defaultdict(dict)
+        for user_id, d, total, *_ in history:
+            history_by_user[user_id][d] = total or 0
+        for user_id, count in total_days:
+            profiles[user_id]["total_days"] = count
+        targets = {user_id: (p["target_time"] or 0) * 60 for user_id, p in profiles.items()}
+        extend_streak_history(db, history_by_user, day, targets, day - timedelta(days=STREAK_LOOKBACK_DAYS))
+        for user_id, p in profiles.items():
+            p["streak"] = streak_days(history_by_user.get(user_id, {}), day, targets[user_id])
+
+        checkins: Dict[int, Dict[str, Any]] = {}
+        for user_id, answer, text in checkin_rows:
+            c = checkins.setdefault(user_id, {"answers": [], "memo": None})
+            c["answers"].append({"step": len(c["answers"]) + 1, "selected_values": [answer], "free_text": text or ""})
+            c["memo"] = text or c["memo"]
+
+        for user_id, profile in profiles.items():
+            f = features.get(user_id) or _empty_features()
+            result[user_id] = {
+                "ai_comment": build_ai_comment_request(f, profile, checkins.get(user_id)),
+                "report_input": build_report_input(day, f, profile, baselines.get(user_id), checkins.get(user_id)),
+            }
+    return result
+
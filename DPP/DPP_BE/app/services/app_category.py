@@ -0,0 +1,255 @@
+# 앱 패키지 -> 카테고리 분류 (로그 업로드 시 UsageLog.category 결정)
+#
+# 규칙 (app_category_rules 테이블, 비어 있으면 DEFAULT_APP_CATEGORIES)
+# - "com.kakao.talk"     : 정확히 일치
+# - "com.supercell.*"    : 접두사 (뒤에 구간이 하나 이상 더 있는 패키지)
+# - "com.*.webtoon"      : 가운데 * 는 아무 구간 하나
+# 여러 규칙이 맞으면 더 구체적인 규칙 (글자 그대로인 구간이 많은 것 -> 구간이 많은 것 -> 접두사가 아닌 것)
+#
+# 규칙을 "." 구간 단위 trie 로 만든 뒤 * / 접두사까지 미리 합쳐서 결정적 상태표로 바꿔 둔다.
+# 조회는 구간마다 dict 한 번 (패키지 이름 길이에 비례, 되돌아가기 없음)
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import APP_CATEGORY_RELOAD_SECONDS
+from app.models.app_category import AppCategoryRule
+
+logger = logging.getLogger("uvicorn.error")
+
+UNCATEGORIZED = "Uncategorized"
+# 한 번 찾은 패키지 결과를 기억해 두는 최대 개수 (넘으면 비우고 다시)
+MEMO_MAX_SIZE = 100_000
+_MISSING = object()
+
+# 초기 규칙 (마이그레이션 0004 에서 테이블에 넣는 값과 같다)
+DEFAULT_APP_CATEGORIES: List[Tuple[str, str]] = [
+    # SNS
+    ("com.instagram.android", "SNS"),
+    ("com.instagram.barcelona", "SNS"),
+    ("com.facebook.katana", "SNS"),
+    ("com.twitter.android", "SNS"),
+    ("com.zhiliaoapp.musically", "SNS"),
+    ("com.ss.android.ugc.*", "SNS"),
+    ("com.snapchat.android", "SNS"),
+    ("com.pinterest", "SNS"),
+    ("com.reddit.frontpage", "SNS"),
+    ("com.nhn.android.band", "SNS"),
+    ("com.kakao.story", "SNS"),
+    # 메신저
+    ("com.kakao.talk", "MESSENGER"),
+    ("jp.naver.line.android", "MESSENGER"),
+    ("org.telegram.messenger", "MESSENGER"),
+    ("com.whatsapp", "MESSENGER"),
+    ("com.discord", "MESSENGER"),
+    ("com.facebook.orca", "MESSENGER"),
+    # 영상
+    ("com.google.android.youtube", "VIDEO"),
+    ("com.netflix.mediaclient", "VIDEO"),
+    ("com.frograms.wplay", "VIDEO"),
+    ("net.cj.cjhv.gs.tving", "VIDEO"),
+    ("kr.co.captv.pooqV2", "VIDEO"),
+    ("tv.twitch.android.app", "VIDEO"),
+    ("com.naver.vapp", "VIDEO"),
+    # 학습 영상
+    ("kr.co.ebs.*", "STUDY_VIDEO"),
+    ("com.megastudy.*", "STUDY_VIDEO"),
+    ("org.khanacademy.android", "STUDY_VIDEO"),
+    ("org.coursera.android", "STUDY_VIDEO"),
+    ("com.udemy.android", "STUDY_VIDEO"),
+    # 게임
+    ("com.supercell.*", "GAME"),
+    ("com.nexon.*", "GAME"),
+    ("com.netmarble.*", "GAME"),
+    ("com.ncsoft.*", "GAME"),
+    ("com.kakaogames.*", "GAME"),
+    ("com.krafton.*", "GAME"),
+    ("com.pubg.*", "GAME"),
+    ("com.tencent.ig", "GAME"),
+    ("com.riotgames.*", "GAME"),
+    ("com.devsisters.*", "GAME"),
+    ("com.king.*", "GAME"),
+    ("com.mojang.minecraftpe", "GAME"),
+    ("com.roblox.client", "GAME"),
+    ("com.*.game", "GAME"),
+    # 웹툰
+    ("com.nhn.android.webtoon", "WEBTOON"),
+    ("com.naver.linewebtoon", "WEBTOON"),
+    ("com.kakao.page", "WEBTOON"),
+    # 음악
+    ("com.spotify.music", "MUSIC"),
+    ("com.iloen.melon", "MUSIC"),
+    ("com.google.android.apps.youtube.music", "MUSIC"),
+    # 브라우저
+    ("com.android.chrome", "BROWSER"),
+    ("com.sec.android.app.sbrowser", "BROWSER"),
+    ("com.nhn.android.search", "BROWSER"),
+    # 쇼핑
+    ("com.coupang.mobile", "SHOPPING"),
+    ("com.ebay.*", "SHOPPING"),
+]
+
+
+class _Node:
+    # 규칙 trie 노드. rest 는 접두사 규칙 (남은 구간이 몇 개든 계속 자기 자신으로)
+    __slots__ = ("children", "star", "rest", "rule", "loops")
+
+    def __init__(self, loops: bool = False):
+        self.children: Dict[str, "_Node"] = {}
+        self.star: Optional["_Node"] = None
+        self.rest: Optional["_Node"] = None
+        self.rule: Optional[tuple] = None  # (구체성, -규칙 순서, 카테고리)
+        self.loops = loops
+
+
+def _compile(rules: Iterable[Tuple[str, str]]):
+    """
+    규칙 -> (상태별 {구간: 다음 상태}, 상태별 그 밖의 구간일 때 다음 상태, 상태별 카테고리)
+    상태 0 은 시작, 상태 1 은 더 볼 필요 없는 상태 (어떤 규칙도 맞을 수 없음)
+    """
+    root = _Node()
+    for order, (pattern, category) in enumerate(rules):
+        parts = pattern.strip().split(".")
+        prefix = len(parts) > 1 and parts[-1] == "*"
+        if prefix:
+            parts = parts[:-1]
+        node = root
+        for part in parts:
+            if part == "*":
+                node.star = node.star or _Node()
+                node = node.star
+            else:
+                node = node.children.setdefault(part, _Node())
+        if prefix:
+            node.rest = node.rest or _Node(loops=True)
+            node = node.rest
+        literal = sum(1 for p in parts if p != "*")
+        rank = (literal, len(parts), not prefix)
+        # 같은 규칙이 두 번이면 먼저 나온 것
+        if node.rule is None or (rank, -order) > node.rule[:2]:
+            node.rule = (rank, -order, category)
+
+    def step(nodes, part):
+        out = set()
+        for node in nodes:
+            child = node.children.get(part)
+            if child is not None:
+                out.add(child)
+            if node.star is not None:
+                out.add(node.star)
+            if node.rest is not None:
+                out.add(node.rest)
+            if node.loops:
+                out.add(node)
+        return frozenset(out)
+
+    # 부분집합 구성: 상태 = 지금 맞을 수 있는 trie 노드 집합
+    start, dead = frozenset([root]), frozenset()
+    index = {start: 0, dead: 1}
+    pending = [start]
+    transitions: List[Dict[str, int]] = [{}, {}]
+    defaults = [1, 1]
+    categories: List[Optional[str]] = [None, None]
+
+    def state_of(nodes):
+        if nodes not in index:
+            index[nodes] = len(transitions)
+            transitions.append({})
+            defaults.append(1)
+            categories.append(None)
+            pending.append(nodes)
+        return index[nodes]
+
+    while pending:
+        nodes = pending.pop()
+        i = index[nodes]
+        best = max((n.rule for n in nodes if n.rule is not None), default=None)
+        categories[i] = best[2] if best else None
+        if not nodes:
+            continue
+        labels = {part for n in nodes for part in n.children}
+        defaults[i] = state_of(step(nodes, None))
+        transitions[i] = {part: state_of(step(nodes, part)) for part in labels}
+
+    return transitions, defaults, categories
+
+
+class AppCategoryClassifier:
+    """
+    패키지 -> 카테고리 조회표 (프로세스당 하나, 조회는 락 없이)
+    - load(rules) 로 새 표를 만든 뒤 한 번에 교체
+    - 찾은 결과는 표마다 dict 에 기억 (실제 로그는 같은 앱이 계속 반복된다)
+    - ensure_loaded(db): 처음이거나 APP_CATEGORY_RELOAD_SECONDS 가 지났으면 DB 에서 다시 읽는다
+      (워커가 여럿이면 reload API 를 받은 워커만 바로 바뀌고, 나머지는 이 주기로 따라온다)
+    """
+
+    def __init__(self, reload_seconds: int = APP_CATEGORY_RELOAD_SECONDS, clock=time.monotonic):
+        self.reload_seconds = reload_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._table = None
+        self._loaded_at = 0.0
+        self.rule_count = 0
+        self.source = None
+
+    def load(self, rules: Iterable[Tuple[str, str]], source: str = "custom") -> None:
+        rules = list(rules)
+        # 상태표와 결과 memo 를 한 번에 바꿔서, 조회 중에 옛 표 결과가 새 memo 에 섞이지 않게
+        self._table = (*_compile(rules), {})
+        self._loaded_at = self.clock()
+        self.rule_count = len(rules)
+        self.source = source
+
+    def reload(self, db: Session) -> None:
+        rows = db.execute(
+            select(AppCategoryRule.pattern, AppCategoryRule.category).order_by(AppCategoryRule.id)
+        ).all()
+        if rows:
+            self.load([tuple(r) for r in rows], source="db")
+        else:
+            self.load(DEFAULT_APP_CATEGORIES, source="default")
+        logger.info("app category rules loaded: %d (%s)", self.rule_count, self.source)
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._table is not None and self.clock() - self._loaded_at < self.reload_seconds:
+            return
+        with self._lock:
+            if self._table is None or self.clock() - self._loaded_at >= self.reload_seconds:
+                self.reload(db)
+
+    def lookup(self, package_name: Optional[str]) -> Optional[str]:
+        # 규칙표에 없으면 None
+        transitions, defaults, categories, memo = self._table
+        category = memo.get(package_name, _MISSING)
+        if category is not _MISSING:
+            return category
+
+        state = 0
+        for part in (package_name or "").split("."):
+            state = transitions[state].get(part, defaults[state])
+            if state == 1:
+                break
+        category = categories[state]
+        if len(memo) >= MEMO_MAX_SIZE:
+            memo.clear()
+        memo[package_name] = category
+        return category
+
+    def resolve(self, package_name: Optional[str], client_category: Optional[str] = None) -> str:
+        """
+        저장할 카테고리: 규칙표 -> 클라이언트가 보낸 값 -> "Uncategorized"
+        """
+        return self.lookup(package_name) or client_category or UNCATEGORIZED
+
+    def stats(self) -> dict:
+        transitions, _, _, memo = self._table
+        return {"rules": self.rule_count, "states": len(transitions), "memo": len(memo), "source": self.source}
+
+
+# 앱 전체에서 공유하는 분류기
+app_categories = AppCategoryClassifier()
@@ -0,0 +1,399 @@
+# 챌린지 진행도 계산 (로그 업로드 시 증분 갱신 + 기간이 끝나면 상태 확정)
+#
+# Challenge.challenge_type (측정 지표)      목표값(default_target_value) 단위
+# - "TOTAL_TIME"             전체 사용 시간        분
+# - "NIGHT_TIME"             야간 사용 시간        분  (daily_rollup 과 같은 방식으로 야간 몫만)
+# - "CATEGORY:<카테고리>"     카테고리 사용 시간    분  (예: "CATEGORY:SNS")
+# - "APP:<패키지>"            앱 사용 시간          분  (예: "APP:com.instagram.android")
+#
+# 조건(conditions) 한 줄 = (지표, operator, 목표값) 을 미리 컴파일한 판정 함수 + 카운터(conditions.current_value, 초)
+# - 로그 업로드: 새로 저장된 기록이 기간 안에 들어가는 "이 유저의 진행 중 인스턴스" 만 골라
+#   카운터에 증분을 더한다 (원본 로그를 다시 훑지 않음). progress_logs 는 바뀐 인스턴스만 한 번에 upsert
+# - 기간 종료: 모든 조건을 만족하면 COMPLETED(+ 보상 XP, app/services/xp.py), 아니면 FAILED (배치는 app/jobs/close_challenges.py)
+# 인스턴스 기간(start_date / end_date)은 APP_TIMEZONE 기준 시각 (timezone 없이 저장)
+
+import logging
+import operator
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import APP_TIMEZONE
+from app.core.database import upsert_insert
+from app.models.challenge import Challenge, ChallengeInstances, Condition, ProgressLogs
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.daily_rollup import local_datetime, night_seconds
+from app.services.log_ingest import to_ms
+from app.services.night_mode import NightWindow
+from app.services.xp import Grant, grant_many
+
+logger = logging.getLogger("uvicorn.error")
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+FAILED = "FAILED"
+
+OPERATORS = {
+    ">=": operator.ge,
+    ">": operator.gt,
+    "<=": operator.le,
+    "<": operator.lt,
+    "==": operator.eq,
+}
+# 값이 늘수록 불리한 조건 (사용 시간 제한)
+LIMIT_OPERATORS = {"<=", "<"}
+
+# 한 번에 보내는 UPDATE / upsert 행 수
+WRITE_BATCH = 1000
+
+
+def _usage_seconds(row: Dict[str, Any], night: NightWindow) -> int:
+    return row.get("usage_duration") or 0
+
+
+def _night_seconds(row: Dict[str, Any], night: NightWindow) -> int:
+    return night_seconds(row, night)
+
+
+def _metric(challenge_type: str) -> Optional[Callable[[Dict[str, Any], NightWindow], int]]:
+    # 지표 이름 -> 기록 한 줄이 더하는 값(초)
+    if challenge_type == "TOTAL_TIME":
+        return _usage_seconds
+    if challenge_type == "NIGHT_TIME":
+        return _night_seconds
+    kind, _, name = challenge_type.partition(":")
+    if kind == "CATEGORY" and name:
+        return lambda row, night: (row.get("usage_duration") or 0) if (row.get("category") or "Uncategorized") == name else 0
+    if kind == "APP" and name:
+        return lambda row, night: (row.get("usage_duration") or 0) if row.get("package_name") == name else 0
+    return None
+
+
+class CompiledCondition(NamedTuple):
+    metric: str  # 지표 이름 (같은 지표끼리는 증분 계산을 한 번만)
+    value_of: Callable[[Dict[str, Any], NightWindow], int]
+    target: int  # 초
+    check: Callable[[int], bool]
+    limit: bool
+
+    def progress(self, value: int) -> float:
+        # 0~1. 목표형은 목표까지 채운 비율, 제한형은 남은 여유 비율 (넘으면 0)
+        if self.target <= 0:
+            return 1.0 if self.check(value) else 0.0
+        ratio = value / self.target
+        return max(0.0, 1.0 - ratio) if self.limit else min(1.0, ratio)
+
+
+@lru_cache(maxsize=4096)
+def compile_condition(challenge_type: Optional[str], op: Optional[str], target: Optional[int]) -> Optional[CompiledCondition]:
+    """
+    (지표, operator, 목표값(분)) -> 판정 함수. 같은 조합은 한 번만 만든다
+    모르는 지표 / operator 면 None (진행도 계산에서 빠진다)
+    """
+    value_of = _metric(challenge_type or "")
+    op = op or ">="
+    compare = OPERATORS.get(op)
+    if value_of is None or compare is None:
+        logger.warning("challenge condition ignored: %r %r %r", challenge_type, op, target)
+        return None
+    seconds = (target or 0) * 60
+    return CompiledCondition(challenge_type, value_of, seconds, lambda value: compare(value, seconds), op in LIMIT_OPERATORS)
+
+
+def challenge_window(time_scope: Optional[str], day: date) -> Tuple[datetime, datetime]:
+    # time_scope -> day 가 들어가는 기간 [시작, 끝) (APP_TIMEZONE 기준 시각)
+    scope = (time_scope or "DAILY").upper()
+    if scope == "DAILY":
+        start, end = day, day + timedelta(days=1)
+    elif scope == "WEEKLY":
+        start = day - timedelta(days=day.weekday())
+        end = start + timedelta(days=7)
+    elif scope == "MONTHLY":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError(f"unknown time_scope: {time_scope}")
+    return datetime.combine(start, time.min), datetime.combine(end, time.min)
+
+
+def window_ms(start: datetime, end: datetime) -> Tuple[int, int]:
+    # 인스턴스 기간 -> first_time_stamp 비교용 밀리초 범위
+    return to_ms(_aware(start)), to_ms(_aware(end))
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo else dt.replace(tzinfo=APP_TIMEZONE)
+
+
+def _naive_local(ms: int) -> datetime:
+    return local_datetime(ms).replace(tzinfo=None)
+
+
+def instance_progress(conditions: Iterable[Tuple[Optional[CompiledCondition], int]]) -> float:
+    # 인스턴스 진행도 = 가장 뒤처진 조건의 진행도
+    rates = [compiled.progress(value) for compiled, value in conditions if compiled is not None]
+    return min(rates) if rates else 0.0
+
+
+def decide_status(conditions: Iterable[Tuple[Optional[CompiledCondition], int]]) -> str:
+    # 기간이 끝났을 때: 판정할 수 있는 조건이 모두 만족이면 COMPLETED
+    checks = [compiled.check(value) for compiled, value in conditions if compiled is not None]
+    return COMPLETED if checks and all(checks) else FAILED
+
+
+class _WindowSums:
+    """
+    새 기록들을 시작 시각 순으로 정렬해 두고 지표별 누적합을 만들어서,
+    인스턴스 기간 [start, end) 안의 증분을 이분 탐색 두 번으로 구한다
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], night: NightWindow):
+        self.rows = sorted(rows, key=lambda r: r["first_time_stamp"])
+        self.stamps = [r["first_time_stamp"] for r in self.rows]
+        self.night = night
+        self._cumsum: Dict[str, List[int]] = {}
+
+    def total(self, compiled: CompiledCondition, start_ms: int, end_ms: int) -> int:
+        cumsum = self._cumsum.get(compiled.metric)
+        if cumsum is None:
+            cumsum = [0, *accumulate(compiled.value_of(row, self.night) for row in self.rows)]
+            self._cumsum[compiled.metric] = cumsum
+        return cumsum[bisect_left(self.stamps, end_ms)] - cumsum[bisect_left(self.stamps, start_ms)]
+
+
+def _condition_rows():
+    return (
+        select(
+            Condition.id,
+            Condition.instance_id,
+            Condition.default_target_value,
+            Condition.operator,
+            Condition.current_value,
+            Challenge.challenge_type,
+            ChallengeInstances.start_date,
+            ChallengeInstances.end_date,
+        )
+        .join(ChallengeInstances, Condition.instance_id == ChallengeInstances.id)
+        .join(Challenge, ChallengeInstances.challenge_id == Challenge.id)
+    )
+
+
+def _compiled(row) -> Optional[CompiledCondition]:
+    return compile_condition(row.challenge_type, row.operator, row.default_target_value)
+
+
+def _add_to_counters(db: Session, deltas: List[Dict[str, int]]) -> None:
+    # 카운터는 DB 에서 더한다 (동시 업로드가 있어도 증분이 사라지지 않게)
+    table = Condition.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("condition_id"))
+        .values(current_value=table.c.current_value + bindparam("delta"))
+    )
+    for i in range(0, len(deltas), WRITE_BATCH):
+        db.execute(stmt, deltas[i:i + WRITE_BATCH])
+
+
+def write_progress(db: Session, rates: Dict[int, float]) -> None:
+    """
+    progress_logs (인스턴스당 한 줄) 를 WRITE_BATCH 개씩 upsert
+    """
+    rows = [{"instance_id": instance_id, "progress_rate": rate} for instance_id, rate in rates.items()]
+    make_insert = upsert_insert(db.get_bind())
+    for i in range(0, len(rows), WRITE_BATCH):
+        batch = rows[i:i + WRITE_BATCH]
+        if make_insert is not None:
+            stmt = make_insert(ProgressLogs)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["instance_id"],
+                    set_={"progress_rate": stmt.excluded.progress_rate},
+                ),
+                batch,
+            )
+        else:
+            db.execute(delete(ProgressLogs).where(ProgressLogs.instance_id.in_([r["instance_id"] for r in batch])))
+            db.execute(insert(ProgressLogs), batch)
+
+
+def apply_challenge_progress(db: Session, user_id: int, new_rows: List[Dict[str, Any]], night: NightWindow) -> int:
+    """
+    새로 저장된 로그만큼 진행 중 챌린지의 카운터 / 진행도를 갱신한다.
+    로그 INSERT 와 같은 트랜잭션 안에서 호출하고, commit 은 호출하는 쪽에서 한다.
+    반환값: 진행도가 바뀐 인스턴스 수
+    """
+    if not new_rows:
+        return 0
+    stamps = [row["first_time_stamp"] for row in new_rows]
+
+    # 1. 새 기록과 기간이 겹치는 이 유저의 진행 중 인스턴스 조건만 (user_id, status) 인덱스로
+    rows = db.execute(
+        _condition_rows()
+        .where(
+            ChallengeInstances.user_id == user_id,
+            ChallengeInstances.status == IN_PROGRESS,
+            ChallengeInstances.start_date <= _naive_local(max(stamps)),
+            ChallengeInstances.end_date > _naive_local(min(stamps)),
+        )
+        .with_for_update(of=Condition)
+    ).all()
+    if not rows:
+        return 0
+
+    # 2. 조건마다 기간 안 증분 (지표별 누적합 + 이분 탐색)
+    sums = _WindowSums(new_rows, night)
+    deltas: List[Dict[str, int]] = []
+    conditions: Dict[int, List[Tuple[Optional[CompiledCondition], int]]] = defaultdict(list)
+    changed = set()
+    for row in rows:
+        compiled = _compiled(row)
+        value = row.current_value or 0
+        if compiled is not None:
+            delta = sums.total(compiled, *window_ms(row.start_date, row.end_date))
+            if delta:
+                deltas.append({"condition_id": row.id, "delta": delta})
+                value += delta
+                changed.add(row.instance_id)
+        conditions[row.instance_id].append((compiled, value))
+    if not deltas:
+        return 0
+
+    # 3. 카운터 증분 / 바뀐 인스턴스 진행도를 묶어서 쓴다
+    _add_to_counters(db, deltas)
+    write_progress(db, {instance_id: instance_progress(conditions[instance_id]) for instance_id in changed})
+    return len(changed)
+
+
+def rebuild_counters(db: Session, instance_ids: List[int]) -> Dict[int, float]:
+    """
+    원본 usage_logs 로 카운터를 처음부터 다시 계산해서 덮어쓴다 (참여 직후 / 정합성 검사용)
+    commit 은 호출하는 쪽에서. 반환값: {instance_id: 진행도}
+    """
+    if not instance_ids:
+        return {}
+    rows = db.execute(
+        _condition_rows()
+        .add_columns(ChallengeInstances.user_id, Users.night_mode_start, Users.night_mode_end)
+        .join(Users, ChallengeInstances.user_id == Users.id)
+        .where(Condition.instance_id.in_(instance_ids))
+    ).all()
+
+    values = []
+    conditions: Dict[int, List[Tuple[Optional[CompiledCondition], int]]] = defaultdict(list)
+    logs_by_window: Dict[Tuple[int, int, int], List[Dict[str, Any]]] = {}
+    for row in rows:
+        compiled = _compiled(row)
+        value = 0
+        if compiled is not None:
+            start_ms, end_ms = window_ms(row.start_date, row.end_date)
+            key = (row.user_id, start_ms, end_ms)
+            if key not in logs_by_window:
+                logs_by_window[key] = [dict(r) for r in db.execute(
+                    select(
+                        UsageLog.package_name,
+                        UsageLog.category,
+                        UsageLog.usage_duration,
+                        UsageLog.first_time_stamp,
+                        UsageLog.last_time_stamp,
+                    ).where(
+                        UsageLog.user_id == row.user_id,
+                        UsageLog.first_time_stamp >= start_ms,
+                        UsageLog.first_time_stamp < end_ms,
+                    )
+                ).mappings()]
+            night = NightWindow.from_user(row)
+            value = sum(compiled.value_of(log, night) for log in logs_by_window[key])
+        values.append({"condition_id": row.id, "value": value})
+        conditions[row.instance_id].append((compiled, value))
+
+    table = Condition.__table__
+    stmt = update(table).where(table.c.id == bindparam("condition_id")).values(current_value=bindparam("value"))
+    for i in range(0, len(values), WRITE_BATCH):
+        db.execute(stmt, values[i:i + WRITE_BATCH])
+    rates = {instance_id: instance_progress(pairs) for instance_id, pairs in conditions.items()}
+    write_progress(db, rates)
+    return rates
+
+
+def close_expired_chunk(db: Session, now: datetime, limit: int, user_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    기간이 끝난(end_date <= now) 진행 중 인스턴스를 end_date 순으로 limit 개까지 COMPLETED / FAILED 로 확정한다.
+    - (status, end_date) 인덱스로 찾고, 조건 / 보상 / 챌린지는 selectinload 로 한 번에 (인스턴스마다 조회 X)
+    - 아직 IN_PROGRESS 인 것만 바꾸고(RETURNING), 실제로 바꾼 COMPLETED 인스턴스의 보상 XP 만 지급
+      -> 중간에 끊기거나 두 번 돌아도 XP 가 두 번 들어가지 않는다
+    commit 은 호출하는 쪽에서 (상태 변경과 XP 지급이 같은 트랜잭션)
+    """
+    query = select(ChallengeInstances).where(
+        ChallengeInstances.status == IN_PROGRESS, ChallengeInstances.end_date <= now
+    )
+    if user_id is not None:
+        query = query.where(ChallengeInstances.user_id == user_id)
+    instances = db.scalars(
+        query.order_by(ChallengeInstances.end_date, ChallengeInstances.id)
+        .limit(limit)
+        .options(
+            selectinload(ChallengeInstances.conditions),
+            selectinload(ChallengeInstances.rewards),
+            selectinload(ChallengeInstances.challenge),
+        )
+    ).all()
+    stats = {"instances": len(instances), "completed": 0, "failed": 0, "xp": 0}
+    if not instances:
+        return stats
+
+    decided: Dict[str, List[int]] = {COMPLETED: [], FAILED: []}
+    rates: Dict[int, float] = {}
+    for instance in instances:
+        challenge_type = instance.challenge.challenge_type if instance.challenge is not None else None
+        pairs = [
+            (compile_condition(challenge_type, c.operator, c.default_target_value), c.current_value or 0)
+            for c in instance.conditions
+        ]
+        decided[decide_status(pairs)].append(instance.id)
+        rates[instance.id] = instance_progress(pairs)
+
+    table = ChallengeInstances.__table__
+    changed: Dict[str, set] = {}
+    for status, ids in decided.items():
+        changed[status] = set(db.execute(
+            update(table)
+            .where(table.c.id.in_(ids), table.c.status == IN_PROGRESS)
+            .values(status=status)
+            .returning(table.c.id)
+        ).scalars()) if ids else set()
+
+    # 보상 XP 는 인스턴스마다 ledger 한 줄 (ref_id = 인스턴스 id), users 는 유저별로 합쳐서 UPDATE 한 번
+    grants = [
+        Grant(instance.user_id, sum(r.challenge_xp or 0 for r in instance.rewards), reason="CHALLENGE", ref_id=instance.id)
+        for instance in instances
+        if instance.id in changed[COMPLETED]
+    ]
+    grant_many(db, grants)
+    write_progress(db, {i: rates[i] for ids in changed.values() for i in ids})
+
+    stats.update(completed=len(changed[COMPLETED]), failed=len(changed[FAILED]), xp=sum(g.xp for g in grants))
+    return stats
+
+
+def close_expired_instances(
+    db: Session, now: Optional[datetime] = None, user_id: Optional[int] = None, chunk_size: int = WRITE_BATCH
+) -> Dict[str, int]:
+    """
+    기간이 끝난 진행 중 인스턴스를 모두 확정한다 (user_id 를 주면 그 유저 것만). commit 은 호출하는 쪽에서
+    전체 배치는 chunk 마다 commit 하는 app/jobs/close_challenges.py
+    """
+    now = now or datetime.now(APP_TIMEZONE).replace(tzinfo=None)
+    total = {"completed": 0, "failed": 0, "xp": 0}
+    while True:
+        stats = close_expired_chunk(db, now, chunk_size, user_id)
+        if not stats["instances"]:
+            return total
+        for key in total:
+            total[key] += stats[key]
@@ -0,0 +1,229 @@
+# 일간 사용량 집계 (daily_reports) - 로그 업로드 시 증분 갱신
+
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import APP_TIMEZONE
+from app.core.database import upsert_insert
+from app.models.calendar import DailyReports
+from app.models.usage_log import UsageLog
+from app.services.log_archive import iter_archived_logs
+from app.services.log_ingest import to_ms
+from app.services.night_mode import NightWindow
+
+# 비교/재계산 대상 컬럼
+ROLLUP_FIELDS = ["total_time", "late_night_usage", "unlock_count", "category_usage", "package_usage"]
+# 연속 달성 일수를 한 번에 거슬러 읽는 기간 (일). 연속이 이 끝에 닿은 유저만 그만큼씩 더 읽는다 (상한 없음)
+STREAK_LOOKBACK_DAYS = 60
+
+
+def _empty() -> Dict[str, Any]:
+    return {
+        "total_time": 0,
+        "late_night_usage": 0,
+        "unlock_count": 0,
+        "category_usage": defaultdict(int),
+        "package_usage": defaultdict(int),
+    }
+
+
+def local_datetime(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=APP_TIMEZONE)
+
+
+def day_range_ms(day: date):
+    # 해당 날짜(APP_TIMEZONE 기준)의 [00:00, 다음날 00:00) 밀리초 범위
+    start = datetime.combine(day, time.min, tzinfo=APP_TIMEZONE)
+    return to_ms(start), to_ms(start + timedelta(days=1))
+
+
+def night_seconds(row: Dict[str, Any], night: NightWindow, start: Optional[datetime] = None) -> int:
+    # 기록 하나의 사용 시간 중 야간 몫 (세션 구간이 야간에 걸친 비율만큼)
+    start = start or local_datetime(row["first_time_stamp"])
+    end = local_datetime(row["last_time_stamp"] or row["first_time_stamp"])
+    seconds = row.get("usage_duration") or 0
+    night_min, day_min = night.split_minutes(start, end)
+    if night_min + day_min > 0:
+        return round(seconds * night_min / (night_min + day_min))
+    return seconds if night.contains(start) else 0
+
+
+def streak_days(days: Dict[date, int], day: date, target_seconds: Optional[int]) -> int:
+    # days = {날짜: total_time}. day 부터 거꾸로 목표(target_time) 안으로 쓴 날이 몇 일 연속인지 (목표가 없으면 기록이 있는 날)
+    streak = 0
+    while True:
+        used = days.get(day - timedelta(days=streak))
+        if used is None or (target_seconds and used > target_seconds):
+            return streak
+        streak += 1
+
+
+def extend_streak_history(
+    db: Session,
+    history: Dict[int, Dict[date, int]],
+    day: date,
+    targets: Dict[int, Optional[int]],
+    since: date,
+) -> None:
+    """
+    history[user_id] = {날짜: total_time} 에 (since, day] 기록이 읽혀 있을 때,
+    day 까지의 연속 일수가 since 에 닿은 유저만 STREAK_LOOKBACK_DAYS 씩 더 이전 기록을 이어 읽는다
+    (targets = {user_id: 목표 초}. 긴 연속을 가진 유저만 더 읽으므로 연속 일수에 상한이 없다)
+    """
+    while True:
+        window = (day - since).days
+        need = [
+            user_id for user_id, target_seconds in targets.items()
+            if streak_days(history.get(user_id, {}), day, target_seconds) >= window
+        ]
+        if not need:
+            return
+        older = since - timedelta(days=STREAK_LOOKBACK_DAYS)
+        for user_id, d, total in db.execute(
+            select(DailyReports.user_id, DailyReports.date, DailyReports.total_time).where(
+                DailyReports.user_id.in_(need),
+                DailyReports.date > older,
+                DailyReports.date <= since,
+            )
+        ):
+            history.setdefault(user_id, {})[d] = total or 0
+        since = older
+
+
+def rollup_rows(rows: Iterable[Dict[str, Any]], night: NightWindow) -> Dict[date, Dict[str, Any]]:
+    """
+    로그 row 들을 날짜별 집계값으로 묶는다. (날짜는 시작 시각 기준)
+    - 사용 시간(usage_duration, 초)을 그대로 더한다
+    - 야간 사용 시간은 세션 구간 중 야간에 걸친 비율만큼 나눠서 더한다
+    - unlock_count 는 하루 누적값이 매번 같이 올라오므로 최댓값을 쓴다
+    """
+    days: Dict[date, Dict[str, Any]] = defaultdict(_empty)
+    for row in rows:
+        start = local_datetime(row["first_time_stamp"])
+        seconds = row.get("usage_duration") or 0
+
+        agg = days[start.date()]
+        agg["total_time"] += seconds
+        agg["late_night_usage"] += night_seconds(row, night, start)
+        agg["unlock_count"] = max(agg["unlock_count"], row.get("unlock_count") or 0)
+        agg["category_usage"][row.get("category") or "Uncategorized"] += seconds
+        agg["package_usage"][row["package_name"]] += seconds
+    return days
+
+
+def _merge_counts(current: Dict[str, int], delta: Dict[str, int]) -> Dict[str, int]:
+    merged = dict(current or {})
+    for key, value in delta.items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def apply_daily_rollup(db: Session, user_id: int, new_rows: List[Dict[str, Any]], night: NightWindow) -> None:
+    """
+    새로 저장된 로그만큼 daily_reports 를 증분 갱신한다.
+    로그 INSERT 와 같은 트랜잭션 안에서 호출하고, commit 은 호출하는 쪽에서 한다.
+    """
+    deltas = rollup_rows(new_rows, night)
+    if not deltas:
+        return
+
+    # 1. 날짜별 row 가 없으면 빈 row 먼저 생성 (동시 업로드 시 중복 생성 방지)
+    placeholders = [
+        {"user_id": user_id, "date": day, "total_time": 0, "late_night_usage": 0, "unlock_count": 0}
+        for day in deltas
+    ]
+    make_insert = upsert_insert(db.get_bind())
+    if make_insert is not None:
+        db.execute(
+            make_insert(DailyReports).on_conflict_do_nothing(index_elements=["user_id", "date"]),
+            placeholders,
+        )
+    else:
+        existing_days = set(db.scalars(
+            select(DailyReports.date).where(
+                DailyReports.user_id == user_id,
+                DailyReports.date.in_(list(deltas)),
+            )
+        ))
+        missing = [p for p in placeholders if p["date"] not in existing_days]
+        if missing:
+            db.execute(insert(DailyReports), missing)
+
+    # 2. 잠금을 잡고 한 번에 읽어서 더한다
+    reports = db.scalars(
+        select(DailyReports)
+        .where(DailyReports.user_id == user_id, DailyReports.date.in_(list(deltas)))
+        .with_for_update()
+    ).all()
+
+    for report in reports:
+        delta = deltas[report.date]
+        report.total_time = (report.total_time or 0) + delta["total_time"]
+        report.late_night_usage = (report.late_night_usage or 0) + delta["late_night_usage"]
+        report.unlock_count = max(report.unlock_count or 0, delta["unlock_count"])
+        # JSON 컬럼은 새 dict 를 넣어야 변경이 감지된다
+        report.category_usage = _merge_counts(report.category_usage, delta["category_usage"])
+        report.package_usage = _merge_counts(report.package_usage, delta["package_usage"])
+
+    db.flush()
+
+
+def get_daily_rollup(db: Session, user_id: int, day: date):
+    # 리포트 / AI 입력 생성용: 원본 로그 대신 집계 row 하나만 읽는다
+    return db.scalars(
+        select(DailyReports).where(DailyReports.user_id == user_id, DailyReports.date == day)
+    ).first()
+
+
+def rebuild_daily_rollup(db: Session, user_id: int, day: date, night: NightWindow) -> Dict[str, Any]:
+    """
+    원본 로그에서 하루 집계를 처음부터 다시 계산한다. (정합성 검사용)
+    usage_logs 와 보관 파일(app/jobs/archive_logs.py)로 옮겨진 기록을 함께 읽는다
+    """
+    start_ms, end_ms = day_range_ms(day)
+    live = db.execute(
+        select(
+            UsageLog.package_name,
+            UsageLog.category,
+            UsageLog.usage_duration,
+            UsageLog.first_time_stamp,
+            UsageLog.last_time_stamp,
+            UsageLog.unlock_count,
+        ).where(
+            UsageLog.user_id == user_id,
+            UsageLog.first_time_stamp >= start_ms,
+            UsageLog.first_time_stamp < end_ms,
+        )
+    ).mappings()
+    start = datetime.combine(day, time.min, tzinfo=APP_TIMEZONE)
+    # 같은 (package_name, first_time_stamp) 는 한 번만 (보관 직전 / 직후에 겹쳐 보일 수 있다)
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for row in (*iter_archived_logs(user_id, start, start + timedelta(days=1)), *live):
+        rows.setdefault((row["package_name"], row["first_time_stamp"]), row)
+    agg = rollup_rows(rows.values(), night).get(day, _empty())
+    agg["category_usage"] = dict(agg["category_usage"])
+    agg["package_usage"] = dict(agg["package_usage"])
+    return agg
+
+
+def diff_daily_rollup(db: Session, user_id: int, day: date, night: NightWindow) -> Dict[str, Any]:
+    """
+    저장된 집계와 원본 로그로 다시 계산한 집계를 비교한다.
+    반환값: {컬럼명: {"stored": ..., "rebuilt": ...}} (일치하면 빈 dict)
+    """
+    rebuilt = rebuild_daily_rollup(db, user_id, day, night)
+    report = get_daily_rollup(db, user_id, day)
+    diff = {}
+    for field in ROLLUP_FIELDS:
+        stored = getattr(report, field, None) if report else None
+        if field in ("category_usage", "package_usage"):
+            stored = stored or {}
+        else:
+            stored = stored or 0
+        if stored != rebuilt[field]:
+            diff[field] = {"stored": stored, "rebuilt": rebuilt[field]}
+    return diff
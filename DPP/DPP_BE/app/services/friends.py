@@ -0,0 +1,163 @@
+# 친구 그래프 (friendships 의 ACCEPTED 줄 = 양방향 친구)
+#
+# - 친구 목록은 유저별 친구 id 집합(adjacency)으로 워커마다 기억해 둔다
+#   requester 쪽 / receiver 쪽을 OR 로 찾지 않고, 방향별 (id, status, 상대 id) 인덱스 두 개를 UNION ALL 로 읽는다
+#   여러 유저 것이 필요하면 (친구들의 친구 = 함께 아는 친구) 없는 것만 한 번에 읽는다
+# - 수락 / 삭제를 처리한 워커는 두 유저 것을 바로 지우고, 다른 워커는 FRIEND_CACHE_SECONDS 안에 다시 읽는다
+# - 오늘 사용 시간 순위는 친구 id 집합 + users + 오늘 daily_reports 를 조인한 쿼리 한 번
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from sqlalchemy import and_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import FRIEND_CACHE_MAX_USERS, FRIEND_CACHE_SECONDS
+from app.models.calendar import DailyReports
+from app.models.social import Friendships
+from app.models.user import Users
+
+PENDING = "PENDING"
+ACCEPTED = "ACCEPTED"
+
+# IN (...) 한 번에 넣는 유저 수
+READ_BATCH = 1000
+
+
+def _adjacency_query(user_ids: List[int]):
+    # (user_id, friend_id): 방향별 인덱스 (requester_id, status, receiver_id) / (receiver_id, status, requester_id)
+    return union_all(
+        select(Friendships.requester_id.label("user_id"), Friendships.receiver_id.label("friend_id"))
+        .where(Friendships.requester_id.in_(user_ids), Friendships.status == ACCEPTED),
+        select(Friendships.receiver_id.label("user_id"), Friendships.requester_id.label("friend_id"))
+        .where(Friendships.receiver_id.in_(user_ids), Friendships.status == ACCEPTED),
+    )
+
+
+class FriendGraph:
+    """
+    유저별 친구 id 집합 캐시 (프로세스당 하나)
+    - friends_of(db, ids): 없는 / 오래된 것만 DB 에서 한 번에 읽는다
+    - invalidate(*ids): 친구 관계가 바뀐 유저 것을 지운다 (수락 / 삭제한 요청에서 commit 뒤에)
+    """
+
+    def __init__(self, ttl_seconds: int = FRIEND_CACHE_SECONDS, max_users: int = FRIEND_CACHE_MAX_USERS, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self.clock = clock
+        self._lock = threading.Lock()
+        # user_id -> (읽은 시각, 친구 id 집합). 오래 안 쓴 것부터 버린다
+        self._cache: "OrderedDict[int, tuple]" = OrderedDict()
+        # invalidate 할 때마다 +1. 읽는 도중에 바뀌었으면 읽은 값을 캐시에 넣지 않는다 (지운 직후 옛 값이 다시 들어가지 않게)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def friends_of(self, db: Session, user_ids: Iterable[int]) -> Dict[int, FrozenSet[int]]:
+        now = self.clock()
+        result: Dict[int, FrozenSet[int]] = {}
+        missing: List[int] = []
+        with self._lock:
+            for user_id in dict.fromkeys(user_ids):
+                cached = self._cache.get(user_id)
+                if cached is not None and now - cached[0] < self.ttl_seconds:
+                    self._cache.move_to_end(user_id)
+                    result[user_id] = cached[1]
+                else:
+                    missing.append(user_id)
+            self.hits += len(result)
+            self.misses += len(missing)
+            generation = self._generation
+
+        loaded: Dict[int, set] = {user_id: set() for user_id in missing}
+        for i in range(0, len(missing), READ_BATCH):
+            for user_id, friend_id in db.execute(_adjacency_query(missing[i:i + READ_BATCH])):
+                loaded[user_id].add(friend_id)
+
+        with self._lock:
+            for user_id, friends in loaded.items():
+                result[user_id] = frozenset(friends)
+                if generation == self._generation:
+                    self._cache[user_id] = (now, result[user_id])
+                    self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+        return result
+
+    def friends(self, db: Session, user_id: int) -> FrozenSet[int]:
+        return self.friends_of(db, [user_id])[user_id]
+
+    def invalidate(self, *user_ids: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._cache.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"users": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+# 앱 전체에서 공유하는 친구 그래프
+friend_graph = FriendGraph()
+
+
+def mutual_counts(db: Session, user_id: int, other_ids: Iterable[int]) -> Dict[int, int]:
+    # user_id 와 other_ids 각각이 함께 아는 친구 수 (친구 집합 교집합)
+    other_ids = list(other_ids)
+    graph = friend_graph.friends_of(db, [user_id, *other_ids])
+    mine = graph[user_id]
+    return {other_id: len(mine & graph[other_id]) for other_id in other_ids}
+
+
+def friend_list(db: Session, user_id: int) -> List[Dict[str, Any]]:
+    """
+    친구 프로필 + 함께 아는 친구 수 (닉네임 순)
+    """
+    friends = friend_graph.friends(db, user_id)
+    if not friends:
+        return []
+    mutual = mutual_counts(db, user_id, friends)
+    rows = []
+    ids = sorted(friends)
+    for i in range(0, len(ids), READ_BATCH):
+        rows += db.execute(
+            select(Users.id, Users.nickname, Users.profile_image, Users.equipped_character)
+            .where(Users.id.in_(ids[i:i + READ_BATCH]))
+        ).mappings().all()
+    rows.sort(key=lambda r: (r["nickname"] or "", r["id"]))
+    return [{**r, "mutual_count": mutual[r["id"]]} for r in rows]
+
+
+def leaderboard(db: Session, user_id: int, day: date, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    나 + 친구들의 day 하루 사용 시간(daily_reports.total_time, 초) 순위. 적게 쓴 순서, 기록이 없으면 맨 뒤
+    """
+    member_ids = sorted(friend_graph.friends(db, user_id) | {user_id})
+    total_time = DailyReports.total_time
+    query = (
+        select(Users.id, Users.nickname, Users.profile_image, Users.equipped_character, total_time)
+        .outerjoin(DailyReports, and_(DailyReports.user_id == Users.id, DailyReports.date == day))
+        .where(Users.id.in_(member_ids))
+        .order_by(total_time.is_(None), total_time, Users.id)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    board = []
+    for rank, row in enumerate(db.execute(query), start=1):
+        board.append({
+            "rank": rank,
+            "user_id": row.id,
+            "nickname": row.nickname,
+            "profile_image": row.profile_image,
+            "equipped_character": row.equipped_character,
+            "total_time": row.total_time,
+            "is_me": row.id == user_id,
+        })
+    return board
@@ -0,0 +1,321 @@
+# 오래된 usage_logs 보관 파일 (유저 / 월 단위 컬럼 파일)
+#
+# LOG_ARCHIVE_DIR/{user_id}/{YYYY-MM}.npz  (월은 APP_TIMEZONE 기준, first_time_stamp 로 나눔)
+# - 문자열(package_name / app_name / category)은 파일마다 사전(vocab) + 정수 코드
+# - 시간은 월 시작 기준 ms 오프셋(uint32), 종료 시각은 시작 기준 ms 오프셋
+#   종료 오프셋(uint32) / usage_duration, unlock_count(int32) 는 범위를 벗어난 값이 하나라도 있으면 그 파일만 int64
+# - (first_time_stamp, id) 순서로 정렬해서 저장 -> 기간 조회는 searchsorted
+# - 기본은 압축 없이(zip STORED) 저장해서 파일을 mmap 하고 컬럼은 그 위의 view 로 연다 (파일 전체를 읽지 않음)
+#   LOG_ARCHIVE_COMPRESS=true 면 deflate 압축 (더 작지만 열 때 전부 읽는다)
+# 보관은 app/jobs/archive_logs.py, 조회 합치기는 api/v1/endpoints/log.py
+
+import io
+import math
+import mmap
+import os
+import re
+import struct
+import zipfile
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import APP_TIMEZONE, LOG_ARCHIVE_COMPRESS, LOG_ARCHIVE_DIR
+from app.services.log_ingest import to_ms
+
+# None 을 담는 값 (정수 컬럼)
+_NONE_U32 = np.iinfo(np.uint32).max
+_NONE_I32 = np.iinfo(np.int32).min
+_NONE_I64 = np.iinfo(np.int64).min
+_NONE = {np.dtype(np.uint32): _NONE_U32, np.dtype(np.int32): _NONE_I32, np.dtype(np.int64): _NONE_I64}
+
+# np.save 가 쓰는 .npy 헤더 모양
+_NPY_HEADER = re.compile(rb"\{'descr': '([^']+)', 'fortran_order': (True|False), 'shape': \(([0-9, ]*)\), \}")
+
+# 보관 파일에 저장하는 컬럼 (usage_logs 와 같은 이름)
+ARCHIVE_COLUMNS = [
+    "id", "package_name", "app_name", "category", "usage_duration",
+    "first_time_stamp", "last_time_stamp", "unlock_count", "is_night_mode", "date",
+]
+
+
+def month_key(ms: int) -> str:
+    dt = datetime.fromtimestamp(ms / 1000, tz=APP_TIMEZONE)
+    return f"{dt.year}-{dt.month:02d}"
+
+
+def month_start_ms(key: str) -> int:
+    year, month = key.split("-")
+    return to_ms(datetime.combine(date(int(year), int(month), 1), time.min, tzinfo=APP_TIMEZONE))
+
+
+def next_month_key(key: str) -> str:
+    year, month = (int(x) for x in key.split("-"))
+    return f"{year + month // 12}-{month % 12 + 1:02d}"
+
+
+def archive_path(user_id: int, key: str, root: Optional[str] = None) -> str:
+    return os.path.join(root or LOG_ARCHIVE_DIR, str(user_id), f"{key}.npz")
+
+
+def archived_months(user_id: int, root: Optional[str] = None) -> List[str]:
+    # 보관 파일이 있는 월 (오래된 순)
+    try:
+        names = os.listdir(os.path.join(root or LOG_ARCHIVE_DIR, str(user_id)))
+    except FileNotFoundError:
+        return []
+    return sorted(n[:-4] for n in names if n.endswith(".npz"))
+
+
+def _encode(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    # 문자열 -> (사전, 코드). None 은 코드 -1
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32, count=len(values)
+    )
+    dtype = np.int16 if len(vocab) < 2 ** 15 else np.int32
+    return np.array(list(vocab), dtype=str), codes.astype(dtype)
+
+
+def _nullable(values, dtype) -> np.ndarray:
+    # dtype 에 안 들어가는 값 (음수 종료 오프셋, 49.7 일 넘는 세션 등) 이 있으면 int64 로
+    info, none = np.iinfo(dtype), _NONE[np.dtype(dtype)]
+    if any(v is not None and not (info.min <= v <= info.max and v != none) for v in values):
+        dtype, none = np.int64, _NONE_I64
+    return np.array([none if v is None else v for v in values], dtype=dtype)
+
+
+def _none_to(values: np.ndarray) -> List[Optional[int]]:
+    none = _NONE[values.dtype]
+    return [None if v == none else v for v in values.tolist()]
+
+
+def _epoch_seconds(d: Optional[datetime]) -> int:
+    if d is None:
+        return 0
+    # sqlite 는 timezone 없이 돌려준다 (server_default now() = UTC)
+    return int((d if d.tzinfo else d.replace(tzinfo=timezone.utc)).timestamp())
+
+
+def write_archive(path: str, key: str, rows: Dict[str, List[Any]]) -> None:
+    """
+    컬럼별 리스트(rows[col]) -> 보관 파일 (임시 파일에 쓴 뒤 교체)
+    first_time_stamp 는 모두 key 월 안이어야 한다
+    """
+    base = month_start_ms(key)
+    first = np.asarray(rows["first_time_stamp"], dtype=np.int64)
+    ids = np.asarray(rows["id"], dtype=np.int64)
+    order = np.lexsort((ids, first))
+
+    def pick(col):
+        values = rows[col]
+        return [values[i] for i in order.tolist()]
+
+    last = pick("last_time_stamp")
+    first_sorted = first[order]
+    columns = {
+        "base": np.array([base], dtype=np.int64),
+        "id": ids[order],
+        "first_offset": (first_sorted - base).astype(np.uint32),
+        "last_offset": _nullable([None if l is None else l - f for l, f in zip(last, first_sorted.tolist())], np.uint32),
+        "usage_duration": _nullable(pick("usage_duration"), np.int32),
+        "unlock_count": _nullable(pick("unlock_count"), np.int32),
+        "is_night_mode": np.array([bool(v) for v in pick("is_night_mode")], dtype=bool),
+        # 저장 시각(date) 은 초 단위 epoch (0 = 없음)
+        "date": np.array([_epoch_seconds(d) for d in pick("date")], dtype=np.int64),
+    }
+    for col in ("package_name", "app_name", "category"):
+        columns[f"{col}_vocab"], columns[col] = _encode(pick(col))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        (np.savez_compressed if LOG_ARCHIVE_COMPRESS else np.savez)(f, **columns)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _npy_header(mm: mmap.mmap, start: int) -> Optional[Tuple[tuple, bool, np.dtype, int]]:
+    """
+    .npy 헤더 -> (shape, fortran_order, dtype, 데이터 시작 위치). 1.0 / 2.0 형식이 아니면 None
+    np.save 가 쓰는 모양 그대로면 정규식으로 (literal_eval 이 파일 여는 시간 대부분이라서), 아니면 numpy 로
+    """
+    if mm[start:start + 6] != b"\x93NUMPY":
+        return None
+    major = mm[start + 6]
+    if major == 1:
+        (length,) = struct.unpack_from("<H", mm, start + 8)
+        data = start + 10 + length
+    elif major == 2:
+        (length,) = struct.unpack_from("<I", mm, start + 8)
+        data = start + 12 + length
+    else:
+        return None
+    header = mm[data - length:data]
+    match = _NPY_HEADER.match(header)
+    if match is not None:
+        descr, fortran, shape = match.groups()
+        return tuple(int(x) for x in shape.split(b",") if x.strip()), fortran == b"True", np.dtype(descr.decode()), data
+    stream = io.BytesIO(mm[start:data])
+    version = np.lib.format.read_magic(stream)
+    read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+    shape, fortran, dtype = read_header(stream)
+    return shape, fortran, dtype, data
+
+
+def _open_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    파일을 mmap 한 번으로 열고, 압축 없이 저장된 멤버는 그 위의 배열 view 로 (복사 없음)
+    (np.load 는 npz 에 mmap_mode 를 적용하지 않는다). 압축된 멤버는 읽어서 배열로
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # zip 목차 / 압축된 멤버는 파일에서 바로 읽는다 (mmap 을 BytesIO 로 감싸면 파일 전체가 복사된다)
+        with zipfile.ZipFile(f) as zf:
+            for info in zf.infolist():
+                name = info.filename[:-4]
+                header = None
+                if info.compress_type == zipfile.ZIP_STORED:
+                    # local file header(30 바이트) + 이름 + extra 다음부터 .npy 내용
+                    name_len, extra_len = struct.unpack_from("<HH", mm, info.header_offset + 26)
+                    header = _npy_header(mm, info.header_offset + 30 + name_len + extra_len)
+                if header is None or header[2].hasobject:
+                    with zf.open(info) as member:
+                        arrays[name] = np.lib.format.read_array(member)
+                    continue
+                shape, fortran, dtype, offset = header
+                array = np.frombuffer(mm, dtype=dtype, count=math.prod(shape), offset=offset)
+                arrays[name] = array.reshape(shape, order="F" if fortran else "C")
+    return arrays
+
+
+class ArchiveMonth:
+    """
+    보관 파일 하나 (유저 한 명의 한 달). 컬럼은 mmap 위의 view 라서 필요한 부분만 읽힌다
+    """
+
+    def __init__(self, user_id: int, path: str):
+        self.user_id = user_id
+        self.arrays = _open_npz(path)
+        self.base = int(self.arrays["base"][0])
+
+    def __len__(self) -> int:
+        return len(self.arrays["id"])
+
+    def first_time_stamps(self) -> np.ndarray:
+        return self.arrays["first_offset"].astype(np.int64) + self.base
+
+    def slice(self, start_ms: Optional[int], end_ms: Optional[int], after: Optional[Tuple[int, int]]) -> Tuple[int, int]:
+        # [start_ms, end_ms) 이면서 (first_time_stamp, id) > after 인 행 범위 (정렬돼 있으므로 이분 탐색)
+        offsets = self.arrays["first_offset"]
+        lo, hi = 0, len(offsets)
+        if start_ms is not None:
+            lo = int(np.searchsorted(offsets, max(start_ms - self.base, 0), side="left"))
+        if end_ms is not None:
+            if end_ms - self.base <= 0:
+                return 0, 0
+            hi = int(np.searchsorted(offsets, min(end_ms - self.base, _NONE_U32), side="left"))
+        if after is not None:
+            stamp, log_id = after
+            lo = max(lo, int(np.searchsorted(offsets, max(stamp - self.base, 0), side="left")))
+            ids = self.arrays["id"]
+            # 같은 시각인 행은 id 로 한 번 더 거른다 (보통 0~1 개)
+            while lo < hi and int(offsets[lo]) + self.base == stamp and int(ids[lo]) <= log_id:
+                lo += 1
+        return lo, max(lo, hi)
+
+    def rows(self, lo: int, hi: int) -> List[Dict[str, Any]]:
+        # [lo, hi) 행 -> usage_logs 와 같은 모양의 dict
+        a = self.arrays
+        first = (a["first_offset"][lo:hi].astype(np.int64) + self.base).tolist()
+        last = _none_to(a["last_offset"][lo:hi])
+        duration = _none_to(a["usage_duration"][lo:hi])
+        unlock = _none_to(a["unlock_count"][lo:hi])
+        saved = a["date"][lo:hi].tolist()
+        columns = {
+            col: [None if c < 0 else vocab[c] for c in a[col][lo:hi].tolist()]
+            for col, vocab in (
+                (col, a[f"{col}_vocab"].tolist()) for col in ("package_name", "app_name", "category")
+            )
+        }
+        return [
+            {
+                "id": log_id,
+                "user_id": self.user_id,
+                "package_name": columns["package_name"][i],
+                "app_name": columns["app_name"][i],
+                "category": columns["category"][i],
+                "usage_duration": duration[i],
+                "first_time_stamp": first[i],
+                "last_time_stamp": None if last[i] is None else first[i] + last[i],
+                "unlock_count": unlock[i],
+                "is_night_mode": night,
+                "date": datetime.fromtimestamp(saved[i], tz=timezone.utc) if saved[i] else None,
+            }
+            for i, (log_id, night) in enumerate(zip(a["id"][lo:hi].tolist(), a["is_night_mode"][lo:hi].tolist()))
+        ]
+
+
+def read_archived_month(user_id: int, key: str, root: Optional[str] = None) -> Optional[ArchiveMonth]:
+    path = archive_path(user_id, key, root)
+    return ArchiveMonth(user_id, path) if os.path.exists(path) else None
+
+
+def archived_keys(
+    user_id: int, keys: Iterable[Tuple[str, int]], root: Optional[str] = None
+) -> Set[Tuple[str, int]]:
+    """
+    (package_name, first_time_stamp) 중 이미 보관 파일에 있는 것 (업로드 중복 제거용)
+    보관 파일이 있는 월만 열고, 월 안에서는 시작 시각으로 이분 탐색
+    """
+    by_month: Dict[str, List[Tuple[str, int]]] = {}
+    for package, stamp in keys:
+        by_month.setdefault(month_key(stamp), []).append((package, stamp))
+    found: Set[Tuple[str, int]] = set()
+    for key, wanted in by_month.items():
+        month = read_archived_month(user_id, key, root)
+        if month is None:
+            continue
+        offsets = month.arrays["first_offset"]
+        codes = month.arrays["package_name"]
+        vocab = month.arrays["package_name_vocab"].tolist()
+        for package, stamp in wanted:
+            i = int(np.searchsorted(offsets, stamp - month.base, side="left"))
+            while i < len(offsets) and int(offsets[i]) + month.base == stamp:
+                code = int(codes[i])
+                if code >= 0 and vocab[code] == package:
+                    found.add((package, stamp))
+                    break
+                i += 1
+    return found
+
+
+def iter_archived_logs(
+    user_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[Tuple[int, int]] = None,
+    root: Optional[str] = None,
+    batch_size: int = 1000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    보관된 기록을 (first_time_stamp, id) 순서로 (logs_query 와 같은 조건)
+    기간과 겹치는 월 파일만 연다
+    """
+    start_ms = to_ms(since) if since is not None else None
+    end_ms = to_ms(until) if until is not None else None
+    if after is not None:
+        start_ms = after[0] if start_ms is None else max(start_ms, after[0])
+    for key in archived_months(user_id, root):
+        month_begin = month_start_ms(key)
+        if end_ms is not None and month_begin >= end_ms:
+            break
+        if start_ms is not None and month_start_ms(next_month_key(key)) <= start_ms:
+            continue
+        month = ArchiveMonth(user_id, archive_path(user_id, key, root))
+        lo, hi = month.slice(start_ms, end_ms, after)
+        for i in range(lo, hi, batch_size):
+            yield from month.rows(i, min(i + batch_size, hi))
@@ -0,0 +1,69 @@
+# 사용 기록 일괄 저장 (bulk ingest)
+
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.database import upsert_insert
+from app.models.usage_log import UsageLog
+
+# (user_id, package_name, first_time_stamp) 유니크 인덱스 컬럼
+DEDUP_KEY = ["user_id", "package_name", "first_time_stamp"]
+
+
+def to_ms(dt: datetime) -> int:
+    # datetime -> 밀리초 timestamp (안드로이드 UsageStats 와 같은 단위)
+    return int(dt.timestamp() * 1000)
+
+
+def bulk_ingest_logs(db: Session, user_id: int, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    한 번의 전송 묶음을 집합 단위로 저장한다.
+    - 중복 기준: (user_id, package_name, first_time_stamp)
+    - postgres / sqlite: INSERT ... ON CONFLICT DO NOTHING 한 번
+    - 그 외 dialect: 기존 키 조회 1번 + multi-row INSERT 1번
+    - commit 은 호출하는 쪽에서 한다.
+    반환값: 새로 저장된 기록들 (중복으로 건너뛴 것은 제외)
+    """
+    if not rows:
+        return []
+
+    # 1. 묶음 안에서의 중복 제거 (먼저 들어온 것을 유지)
+    batch: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (row["package_name"], row["first_time_stamp"])
+        if key not in batch:
+            batch[key] = {**row, "user_id": user_id}
+
+    make_insert = upsert_insert(db.get_bind())
+    if make_insert is not None:
+        # 2-a. 유니크 인덱스에 맡기고, 실제로 들어간 row 만 RETURNING 으로 돌려받는다
+        stmt = (
+            make_insert(UsageLog)
+            .on_conflict_do_nothing(index_elements=DEDUP_KEY)
+            .returning(UsageLog.package_name, UsageLog.first_time_stamp)
+        )
+        inserted = db.execute(stmt, list(batch.values())).all()
+        return [batch[tuple(r)] for r in inserted]
+
+    # 2-b. 이미 저장된 키를 한 번에 조회
+    stamps = {stamp for _, stamp in batch}
+    existing = {
+        tuple(r)
+        for r in db.execute(
+            select(UsageLog.package_name, UsageLog.first_time_stamp).where(
+                UsageLog.user_id == user_id,
+                UsageLog.first_time_stamp.in_(stamps),
+            )
+        )
+    }
+
+    new_rows = [row for key, row in batch.items() if key not in existing]
+
+    # 3. 새 기록만 multi-row INSERT
+    if new_rows:
+        db.execute(insert(UsageLog), new_rows)
+
+    return new_rows
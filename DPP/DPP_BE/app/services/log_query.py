@@ -0,0 +1,51 @@
+# 사용 기록 조회 (keyset 페이지네이션)
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+
+from app.models.usage_log import UsageLog
+from app.services.log_ingest import to_ms
+
+Cursor = Tuple[int, int]  # (first_time_stamp, id)
+
+
+def encode_cursor(first_time_stamp: int, log_id: int) -> str:
+    raw = f"{first_time_stamp}:{log_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    잘못된 토큰이면 ValueError
+    """
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        stamp, log_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(stamp), int(log_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+
+def logs_query(
+    user_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[Cursor] = None,
+) -> Select:
+    """
+    (first_time_stamp, id) 순서로 정렬된 조회 쿼리.
+    - since 이상, until 미만 (first_time_stamp 기준)
+    - after: 직전 페이지 마지막 기록의 (first_time_stamp, id)
+    ix_usage_logs_user_start 인덱스 범위 스캔으로 처리된다.
+    """
+    stmt = select(UsageLog).where(UsageLog.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(UsageLog.first_time_stamp >= to_ms(since))
+    if until is not None:
+        stmt = stmt.where(UsageLog.first_time_stamp < to_ms(until))
+    if after is not None:
+        stmt = stmt.where(tuple_(UsageLog.first_time_stamp, UsageLog.id) > tuple_(*after))
+    return stmt.order_by(UsageLog.first_time_stamp, UsageLog.id)
@@ -0,0 +1,76 @@
+# 야간 모드 판별 (분 단위 night window)
+
+from datetime import datetime, time
+from typing import Tuple, Union
+
+DAY_MINUTES = 24 * 60
+
+TimeLike = Union[str, time]
+
+
+def to_minutes(t: TimeLike) -> int:
+    """
+    "23:00" / "23:00:00" / time(23, 0) -> 하루 중 몇 분째인지 (1380)
+    """
+    if isinstance(t, str):
+        hour, minute = t.split(":")[:2]
+        return int(hour) * 60 + int(minute)
+    return t.hour * 60 + t.minute
+
+
+class NightWindow:
+    """
+    유저의 야간 모드 시간대. 요청마다 한 번만 만들고 로그마다 재사용한다.
+    - start 이상, end 미만 (분 단위)
+    - start > end 이면 자정을 넘어가는 구간 (예: 23:00 ~ 07:00)
+    - start == end 이면 야간 구간 없음
+    """
+
+    __slots__ = ("start", "end", "wraps")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.wraps = start > end
+
+    @classmethod
+    def from_user(cls, user) -> "NightWindow":
+        return cls(to_minutes(user.night_mode_start), to_minutes(user.night_mode_end))
+
+    def contains_minute(self, minute: int) -> bool:
+        if self.wraps:
+            return minute >= self.start or minute < self.end
+        return self.start <= minute < self.end
+
+    def contains(self, dt: datetime) -> bool:
+        # 기존 "%H:%M" 문자열 비교와 같은 결과 (초 단위는 버림)
+        return self.contains_minute(dt.hour * 60 + dt.minute)
+
+    def split_minutes(self, start: datetime, end: datetime) -> Tuple[float, float]:
+        """
+        [start, end) 세션을 (야간 분, 야간 아닌 분) 으로 나눈다.
+        자정이나 야간 경계를 걸치는 세션도 실제로 겹친 만큼만 야간으로 계산.
+        시각은 start 의 벽시계(wall clock) 기준.
+        """
+        total = (end - start).total_seconds() / 60
+        if total <= 0:
+            return 0.0, 0.0
+
+        midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        s = (start - midnight).total_seconds() / 60
+        e = s + total
+
+        night = 0.0
+        # 자정을 넘는 구간은 전날 start 부터 시작하므로 하루 전부터 훑는다
+        day = -1
+        while day * DAY_MINUTES < e:
+            base = day * DAY_MINUTES
+            lo = base + self.start
+            hi = base + self.end + (DAY_MINUTES if self.wraps else 0)
+            overlap = min(e, hi) - max(s, lo)
+            if overlap > 0:
+                night += overlap
+            day += 1
+
+        return night, total - night
+
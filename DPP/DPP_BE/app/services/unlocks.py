@@ -0,0 +1,199 @@
+# 캐릭터 / 업적 해금
+#
+# Characters / Achievements 의 (unlock_type, unlock_value) = "이 지표가 unlock_value 이상이 되면 해금"
+# - "XP"      누적 XP (users.current_xp)
+# - "LEVEL"   레벨 (app/services/xp.py 의 구간표)
+# - "STREAK"  목표 시간 안으로 쓴 연속 일수 (daily_rollup.streak_days)
+# 그 밖의 unlock_type (상점 구매 등) 은 여기서 다루지 않는다
+#
+# 카탈로그를 지표별로 unlock_value 정렬 배열로 한 번 읽어 두고, 값이 old -> new 로 바뀌면
+# old < unlock_value <= new 인 구간만 이분 탐색으로 잘라낸다 (전체 카탈로그 / 보유 목록을 다시 보지 않음)
+# 해금 INSERT 는 (user_id, character_id) / (user_id, achievement_id) 유니크 인덱스에 충돌 무시로 한 번에
+
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import UNLOCK_CATALOG_RELOAD_SECONDS
+from app.core.database import upsert_insert
+from app.models.calendar import DailyReports
+from app.models.gamification import Achievements, Characters, UserAchievements, UserCharacters
+from app.models.user import Users
+from app.services.daily_rollup import STREAK_LOOKBACK_DAYS, extend_streak_history, streak_days
+
+logger = logging.getLogger("uvicorn.error")
+
+XP = "XP"
+LEVEL = "LEVEL"
+STREAK = "STREAK"
+UNLOCK_TYPES = (XP, LEVEL, STREAK)
+
+CHARACTER = "character"
+ACHIEVEMENT = "achievement"
+# 종류별 (보유 테이블, 대상 id 컬럼 이름)
+_OWNED = {
+    CHARACTER: (UserCharacters, "character_id"),
+    ACHIEVEMENT: (UserAchievements, "achievement_id"),
+}
+
+# INSERT 한 번에 넣는 행 수
+WRITE_BATCH = 1000
+
+
+class Change(NamedTuple):
+    user_id: int
+    unlock_type: str
+    old: int
+    new: int
+
+
+def _compile(entries: Iterable[Tuple[str, int, Optional[str], Optional[int]]]):
+    """
+    (종류, id, unlock_type, unlock_value) -> {unlock_type: (unlock_value 정렬 배열, 같은 순서의 (종류, id))}
+    """
+    by_type: Dict[str, List[Tuple[int, str, int]]] = defaultdict(list)
+    for kind, target_id, unlock_type, unlock_value in entries:
+        unlock_type = (unlock_type or "").strip().upper()
+        if unlock_type in UNLOCK_TYPES:
+            by_type[unlock_type].append((unlock_value or 0, kind, target_id))
+    table = {}
+    for unlock_type, items in by_type.items():
+        items.sort()
+        table[unlock_type] = ([value for value, _, _ in items], [(kind, target_id) for _, kind, target_id in items])
+    return table
+
+
+class UnlockCatalog:
+    """
+    해금 카탈로그 (프로세스당 하나, 조회는 락 없이) - app_category 분류기와 같은 방식
+    - load(entries) 로 새 표를 만든 뒤 한 번에 교체
+    - ensure_loaded(db): 처음이거나 UNLOCK_CATALOG_RELOAD_SECONDS 가 지났으면 DB 에서 다시 읽는다
+    """
+
+    def __init__(self, reload_seconds: int = UNLOCK_CATALOG_RELOAD_SECONDS, clock=time.monotonic):
+        self.reload_seconds = reload_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._table = None
+        self._loaded_at = 0.0
+
+    def load(self, entries: Iterable[Tuple[str, int, Optional[str], Optional[int]]]) -> None:
+        self._table = _compile(entries)
+        self._loaded_at = self.clock()
+
+    def reload(self, db: Session) -> None:
+        entries = [
+            (CHARACTER, *row)
+            for row in db.execute(select(Characters.id, Characters.unlock_type, Characters.unlock_value))
+        ] + [
+            (ACHIEVEMENT, *row)
+            for row in db.execute(select(Achievements.id, Achievements.unlock_type, Achievements.unlock_value))
+        ]
+        self.load(entries)
+        logger.info("unlock catalog loaded: %s", self.stats())
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._table is not None and self.clock() - self._loaded_at < self.reload_seconds:
+            return
+        with self._lock:
+            if self._table is None or self.clock() - self._loaded_at >= self.reload_seconds:
+                self.reload(db)
+
+    def has(self, unlock_type: str) -> bool:
+        return unlock_type in self._table
+
+    def crossed(self, unlock_type: str, old: Optional[int], new: Optional[int]) -> List[Tuple[str, int]]:
+        # old < unlock_value <= new 인 (종류, id). 값이 줄었거나 그대로면 빈 목록
+        thresholds = self._table.get(unlock_type)
+        if thresholds is None:
+            return []
+        values, targets = thresholds
+        return targets[bisect_right(values, old or 0):bisect_right(values, new or 0)]
+
+    def stats(self) -> dict:
+        return {unlock_type: len(values) for unlock_type, (values, _) in self._table.items()}
+
+
+# 앱 전체에서 공유하는 카탈로그
+unlock_catalog = UnlockCatalog()
+
+
+def _insert_owned(db: Session, kind: str, pairs: List[Tuple[int, int]]) -> None:
+    model, column = _OWNED[kind]
+    make_insert = upsert_insert(db.get_bind())
+    for i in range(0, len(pairs), WRITE_BATCH):
+        batch = pairs[i:i + WRITE_BATCH]
+        if make_insert is None:
+            # 충돌 무시 INSERT 가 없는 DB: 이미 가진 것을 빼고 넣는다
+            owned = set(db.execute(
+                select(model.user_id, getattr(model, column)).where(tuple_(model.user_id, getattr(model, column)).in_(batch))
+            ).all())
+            batch = [pair for pair in batch if pair not in owned]
+            if batch:
+                db.execute(insert(model), [{"user_id": u, column: t} for u, t in batch])
+            continue
+        db.execute(
+            make_insert(model).on_conflict_do_nothing(index_elements=["user_id", column]),
+            [{"user_id": u, column: t} for u, t in batch],
+        )
+
+
+def apply_unlocks(db: Session, changes: Iterable[Change]) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    지표 변화(old -> new)로 새로 넘은 해금 조건을 찾아 user_characters / user_achievements 에 충돌 무시로 넣는다.
+    (이미 가진 것은 그대로. 여러 번 호출해도 결과 같음) commit 은 호출하는 쪽에서.
+    반환값: {종류: [(user_id, 대상 id)]} (이번에 넘은 조건 전부, 이미 가진 것 포함)
+    """
+    changes = [c for c in changes if (c.new or 0) > (c.old or 0)]
+    unlocked: Dict[str, List[Tuple[int, int]]] = {CHARACTER: [], ACHIEVEMENT: []}
+    if not changes:
+        return unlocked
+    unlock_catalog.ensure_loaded(db)
+    seen = set()
+    for change in changes:
+        for kind, target_id in unlock_catalog.crossed(change.unlock_type, change.old, change.new):
+            if (kind, change.user_id, target_id) not in seen:
+                seen.add((kind, change.user_id, target_id))
+                unlocked[kind].append((change.user_id, target_id))
+    for kind, pairs in unlocked.items():
+        if pairs:
+            _insert_owned(db, kind, pairs)
+    return unlocked
+
+
+def streak_changes(db: Session, day: date, user_ids: List[int]) -> List[Change]:
+    """
+    day 하루가 끝난 뒤 연속 달성 일수 변화: (day 전날까지 연속 일수) -> (day 까지 연속 일수)
+    """
+    targets = {
+        user_id: (target or 0) * 60
+        for user_id, target in db.execute(select(Users.id, Users.target_time).where(Users.id.in_(user_ids)))
+    }
+    since = day - timedelta(days=STREAK_LOOKBACK_DAYS)
+    days: Dict[int, Dict[date, int]] = defaultdict(dict)
+    for user_id, d, total in db.execute(
+        select(DailyReports.user_id, DailyReports.date, DailyReports.total_time).where(
+            DailyReports.user_id.in_(user_ids),
+            DailyReports.date > since,
+            DailyReports.date <= day,
+        )
+    ):
+        days[user_id][d] = total or 0
+    # 연속이 STREAK_LOOKBACK_DAYS 를 넘는 유저는 더 이전 기록까지
+    extend_streak_history(db, days, day, targets, since)
+    return [
+        Change(
+            user_id,
+            STREAK,
+            streak_days(days[user_id], day - timedelta(days=1), target_seconds),
+            streak_days(days[user_id], day, target_seconds),
+        )
+        for user_id, target_seconds in targets.items()
+    ]
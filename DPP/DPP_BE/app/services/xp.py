@@ -0,0 +1,151 @@
+# XP / 코인 / 레벨
+#
+# - 증가는 항상 DB 안에서: UPDATE users SET current_xp = current_xp + :n ... RETURNING
+#   (읽어서 더한 뒤 저장하지 않으므로 챌린지 확정 / xp-up 이 동시에 와도 증분이 사라지지 않는다)
+# - 여러 건은 유저별로 합쳐서 UPDATE 한 번 (CASE id WHEN .. THEN ..) + xp_ledger INSERT 한 번
+#   ledger 의 변경 후 값(xp_balance / coin_balance)은 RETURNING 값에서 계산 (같은 트랜잭션)
+# - 레벨은 누적 XP 구간표(LEVEL_THRESHOLDS)에서 이분 탐색
+# - XP 가 오르면 같은 트랜잭션에서 XP / LEVEL 해금 확인 (app/services/unlocks.py)
+
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.gamification import XpLedger
+from app.models.user import Users
+from app.services.unlocks import LEVEL, XP, Change, apply_unlocks
+
+MAX_LEVEL = 100
+# 레벨 n -> n+1 에 필요한 XP = LEVEL_XP_STEP * n (1 -> 2: 100, 2 -> 3: 200, ...)
+LEVEL_XP_STEP = 100
+# LEVEL_THRESHOLDS[n - 1] = 레벨 n 이 되는 누적 XP
+LEVEL_THRESHOLDS = list(accumulate((LEVEL_XP_STEP * n for n in range(1, MAX_LEVEL)), initial=0))
+
+# UPDATE 한 번에 넣는 유저 수 / INSERT 한 번에 넣는 ledger 행 수
+GRANT_BATCH = 1000
+
+
+class Grant(NamedTuple):
+    user_id: int
+    xp: int = 0
+    coin: int = 0
+    reason: str = "XP_UP"
+    ref_id: Optional[int] = None
+
+
+class Balance(NamedTuple):
+    user_id: int
+    old_xp: int
+    new_xp: int
+    old_coin: int
+    new_coin: int
+
+
+def level_for(xp: Optional[int]) -> int:
+    return bisect_right(LEVEL_THRESHOLDS, max(xp or 0, 0))
+
+
+def level_info(xp: Optional[int]) -> Dict[str, Any]:
+    xp = max(xp or 0, 0)
+    level = level_for(xp)
+    next_level_xp = LEVEL_THRESHOLDS[level] if level < MAX_LEVEL else None
+    return {
+        "level": level,
+        # 지금 레벨이 시작된 누적 XP / 다음 레벨 누적 XP (최고 레벨이면 None)
+        "level_xp": LEVEL_THRESHOLDS[level - 1],
+        "next_level_xp": next_level_xp,
+        "xp_to_next_level": next_level_xp - xp if next_level_xp is not None else 0,
+    }
+
+
+def xp_status(current_xp: Optional[int], coin: Optional[int]) -> Dict[str, Any]:
+    return {"current_xp": current_xp or 0, "coin": coin or 0, **level_info(current_xp)}
+
+
+def get_xp_status(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+    row = db.execute(select(Users.current_xp, Users.coin).where(Users.id == user_id)).first()
+    if row is None:
+        return None
+    return {"user_id": user_id, **xp_status(row.current_xp, row.coin)}
+
+
+def _add(column, amounts: Dict[int, int], id_column):
+    return func.coalesce(column, 0) + case(amounts, value=id_column, else_=0)
+
+
+def grant_many(db: Session, grants: Iterable[Grant]) -> Dict[int, Balance]:
+    """
+    XP / 코인 지급을 유저별로 합쳐서 GRANT_BATCH 명씩 UPDATE ... RETURNING 한 번 + xp_ledger INSERT 한 번.
+    commit 은 호출하는 쪽에서 (지급 조건이 되는 상태 변경과 같은 트랜잭션으로).
+    반환값: {user_id: 변경 전 / 후 값} (없는 유저는 빠진다)
+    """
+    grants = [g for g in grants if g.xp or g.coin]
+    xp_by_user: Dict[int, int] = defaultdict(int)
+    coin_by_user: Dict[int, int] = defaultdict(int)
+    for g in grants:
+        xp_by_user[g.user_id] += g.xp
+        coin_by_user[g.user_id] += g.coin
+
+    table = Users.__table__
+    balances: Dict[int, Balance] = {}
+    user_ids = list(xp_by_user)
+    for i in range(0, len(user_ids), GRANT_BATCH):
+        batch = user_ids[i:i + GRANT_BATCH]
+        xp = {user_id: xp_by_user[user_id] for user_id in batch}
+        coin = {user_id: coin_by_user[user_id] for user_id in batch}
+        # 지급이 없는 컬럼은 건드리지 않는다 (NULL 이 0 으로 바뀌지 않도록)
+        values = {}
+        if any(xp.values()):
+            values["current_xp"] = _add(table.c.current_xp, xp, table.c.id)
+        if any(coin.values()):
+            values["coin"] = _add(table.c.coin, coin, table.c.id)
+        for user_id, new_xp, new_coin in db.execute(
+            update(table)
+            .where(table.c.id.in_(batch))
+            .values(**values)
+            .returning(table.c.id, table.c.current_xp, table.c.coin)
+        ):
+            new_xp, new_coin = new_xp or 0, new_coin or 0
+            balances[user_id] = Balance(user_id, new_xp - xp[user_id], new_xp, new_coin - coin[user_id], new_coin)
+
+    # 지급 건마다 ledger 한 줄 (같은 유저 여러 건이면 변경 전 값부터 차례로)
+    running = {user_id: (b.old_xp, b.old_coin) for user_id, b in balances.items()}
+    ledger: List[Dict[str, Any]] = []
+    for g in grants:
+        if g.user_id not in running:
+            continue
+        xp_balance, coin_balance = running[g.user_id]
+        xp_balance, coin_balance = xp_balance + g.xp, coin_balance + g.coin
+        running[g.user_id] = (xp_balance, coin_balance)
+        ledger.append({
+            "user_id": g.user_id,
+            "xp_delta": g.xp,
+            "coin_delta": g.coin,
+            "xp_balance": xp_balance,
+            "coin_balance": coin_balance,
+            "reason": g.reason,
+            "ref_id": g.ref_id,
+        })
+    for i in range(0, len(ledger), GRANT_BATCH):
+        db.execute(insert(XpLedger), ledger[i:i + GRANT_BATCH])
+
+    apply_unlocks(db, [
+        change
+        for b in balances.values() if b.new_xp > b.old_xp
+        for change in (
+            Change(b.user_id, XP, b.old_xp, b.new_xp),
+            Change(b.user_id, LEVEL, level_for(b.old_xp), level_for(b.new_xp)),
+        )
+    ])
+    return balances
+
+
+def grant(
+    db: Session, user_id: int, xp: int = 0, coin: int = 0, reason: str = "XP_UP", ref_id: Optional[int] = None
+) -> Optional[Balance]:
+    # 한 건 지급 (없는 유저면 None). commit 은 호출하는 쪽에서
+    return grant_many(db, [Grant(user_id, xp, coin, reason, ref_id)]).get(user_id)
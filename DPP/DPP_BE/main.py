@@ -1,17 +1,24 @@
 
-from app.api.v1.endpoints.log import router as log_router
-from app.api.v1.endpoints.auth import router as auth_router
-from app.api.v1.endpoints.log import router as log_router
-
-from pydoc import describe
-from fastapi import FastAPI, Depends, HTTPException
+from app.api.v1.endpoints.log import router as log_router, async_router as log_async_router, _upload_logs
+from app.api.v1.endpoints.auth import router as auth_router, async_router as auth_async_router
+from app.api.v1.endpoints.admin import router as admin_router
+from app.api.v1.endpoints.challenges import router as challenges_router
+from app.api.v1.endpoints.gamification import router as gamification_router
+from app.api.v1.endpoints.social import router as social_router
+
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from app.core.auth import CurrentUser, get_current_user
+from app.core.config import DB_ASYNC
 from app.core.database import engine, Base, get_db
+from app.core.db_metrics import render_prometheus
 from app import models, schemas
 from sqlalchemy.orm import Session
-from app.models.usage_log import UsageLog
-from app.models.user import Users
-from sqlalchemy.orm import Session
+from app.jobs.weekly_reports import start_weekly_scheduler
+from app.jobs.archive_logs import start_archive_scheduler
+from app.jobs.close_challenges import start_close_scheduler
+from app.jobs.streak_unlocks import start_streak_scheduler
 
 # from fastapi.responses import JSONResponse
 # import traceback
@@ -45,8 +52,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(log_router, prefix="/api/v1/logs",tags=["logs"])
-app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
+# DB_ASYNC=true 면 로그 / 로그인 API 를 async 버전으로 등록
+if DB_ASYNC:
+    app.include_router(log_async_router, prefix="/api/v1/logs",tags=["logs"])
+    app.include_router(auth_async_router, prefix="/api/v1/auth", tags=["auth"])
+else:
+    app.include_router(log_router, prefix="/api/v1/logs",tags=["logs"])
+    app.include_router(auth_router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(admin_router, prefix="/api/v1/admin", tags=["admin"])
+app.include_router(challenges_router, prefix="/api/v1/challenges", tags=["challenges"])
+app.include_router(gamification_router, prefix="/api/v1/gamification", tags=["gamification"])
+app.include_router(social_router, prefix="/api/v1/social", tags=["social"])
+
+
+@app.on_event("startup")
+def start_jobs():
+    # 주간 리포트 집계 (WEEKLY_JOB_INTERVAL_SECONDS 설정 시에만)
+    start_weekly_scheduler()
+    # 오래된 로그 보관 (LOG_ARCHIVE_INTERVAL_SECONDS 설정 시에만)
+    start_archive_scheduler()
+    # 기간이 끝난 챌린지 확정 + 보상 XP (CHALLENGE_CLOSE_INTERVAL_SECONDS 마다)
+    start_close_scheduler()
+    # 어제까지의 연속 달성 일수로 캐릭터 / 업적 해금 (STREAK_UNLOCK_INTERVAL_SECONDS 마다)
+    start_streak_scheduler()
 
 
 @app.get("/")
@@ -57,30 +85,20 @@ def dolphin_pod_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # DB 커넥션 풀 지표 (Prometheus scrape 용)
+    return render_prometheus(engine)
+
+
 @app.post("/logs",response_model=dict)
 def upload_logs(
     log_data:schemas.AppUsageLogCreate,
+    current_user:CurrentUser=Depends(get_current_user),
     db:Session=Depends(get_db)
-):  
-    for log_item in log_data.logs:
-        new_log = UsageLog(
-            user_id=1,  # 유저는 일단 1번으로 고정! (log_data에 없음)
-            
-            package_name=log_item.packagename,
-            app_name=log_item.app_name,
-            
-            usage_duration=log_item.usage_time,
-            
-            first_time_stamp=int(log_item.start_time.timestamp() * 1000),
-            last_time_stamp=int(log_item.end_time.timestamp() * 1000),
-            
-            category="Uncategorized",
-            date=log_item.start_time # 날짜는 시작 시간으로 기록
-        )
-
-        db.add(new_log)
-    db.commit()
-    return {"status":"success", "message":f"{len(log_data.logs)}개 기록이 저장되었습니다."}
+):
+    # 예전 클라이언트용 경로. 저장(중복 제거 / 일간 집계 / 챌린지 진행도)은 /api/v1/logs 와 같은 코드
+    return _upload_logs(db, log_data, current_user)
 
 
 # API 엔드포인트 추가 예정
@@ -0,0 +1,223 @@
+# 앱 카테고리 분류기(app/services/app_category.py) 확인 + 조회 속도
+# - 규칙 몇 천 개짜리 가짜 표로 모든 규칙을 하나씩 대조하는 방식(before)과 결과가 같은지
+# - 초당 조회 수 (기본 규칙표 / 큰 규칙표, 아는 앱 / 모르는 앱 섞어서)
+# - 로그 업로드 시 category 저장 (규칙표 -> 클라이언트 값), 관리자 reload API 로 재시작 없이 반영
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_app_category.py
+#   python scripts/bench_app_category.py --rules 20000 --lookups 1000000
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--rules", type=int, default=5000, help="큰 규칙표의 규칙 수")
+parser.add_argument("--lookups", type=int, default=500000)
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+os.environ["ADMIN_API_KEY"] = "bench-admin"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app.core.auth import create_access_token
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.admin import router as admin_router
+from app.api.v1.endpoints.log import router as log_router
+from app.models.app_category import AppCategoryRule
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.app_category import DEFAULT_APP_CATEGORIES, AppCategoryClassifier, app_categories
+
+WORDS = ["com", "kr", "net", "org", "app", "android", "game", "play", "music", "video", "talk", "shop",
+         "naver", "kakao", "nexon", "google", "mobile", "lite", "pro", "global", "studio", "tv", "webtoon"]
+
+
+def linear_lookup(rules, package_name):
+    # before: 모든 규칙을 대조해서 가장 구체적인 것 (같은 우선순위면 먼저 나온 규칙)
+    parts = package_name.split(".")
+    best = None
+    for order, (pattern, category) in enumerate(rules):
+        p = pattern.split(".")
+        prefix = len(p) > 1 and p[-1] == "*"
+        if prefix:
+            p = p[:-1]
+            ok = len(parts) > len(p)
+        else:
+            ok = len(parts) == len(p)
+        if not ok or any(a != "*" and a != b for a, b in zip(p, parts)):
+            continue
+        key = ((sum(1 for a in p if a != "*"), len(p), not prefix), -order)
+        if best is None or key > best[0]:
+            best = (key, category)
+    return best[1] if best else None
+
+
+def random_rules(rng, n):
+    rules = {}
+    while len(rules) < n:
+        parts = [rng.choice(WORDS) for _ in range(rng.randint(2, 5))]
+        kind = rng.random()
+        if kind < 0.3:
+            parts.append("*")
+        elif kind < 0.45:
+            parts[rng.randrange(1, len(parts))] = "*"
+        rules.setdefault(".".join(parts), rng.choice(["SNS", "GAME", "VIDEO", "MUSIC", "SHOPPING"]))
+    return list(rules.items())
+
+
+def random_packages(rng, n, unknown_pool=None):
+    # 60% 는 규칙표에 있는 앱, 나머지는 모르는 앱 (unknown_pool 개 중에서 반복, None 이면 매번 새로)
+    known = [p.replace("*", rng.choice(WORDS)) for p, _ in DEFAULT_APP_CATEGORIES]
+    pool = None
+    if unknown_pool:
+        pool = [".".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) for _ in range(unknown_pool)]
+    out = []
+    for _ in range(n):
+        if rng.random() < 0.6:
+            out.append(rng.choice(known))
+        elif pool:
+            out.append(rng.choice(pool))
+        else:
+            out.append(".".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))))
+    return out
+
+
+def rate(label, fn, packages):
+    started = time.perf_counter()
+    for name in packages:
+        fn(name)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {len(packages) / elapsed / 1e6:7.2f} M lookups/s ({elapsed / len(packages) * 1e9:6.0f} ns)")
+    return elapsed
+
+
+def check_correctness(rng):
+    classifier = AppCategoryClassifier()
+    classifier.load(DEFAULT_APP_CATEGORIES)
+    cases = {
+        "com.kakao.talk": "MESSENGER",
+        "com.kakao.story": "SNS",
+        "com.supercell.clashroyale": "GAME",
+        "com.supercell": None,
+        "com.ss.android.ugc.trill": "SNS",
+        "com.google.android.youtube": "VIDEO",
+        "com.google.android.apps.youtube.music": "MUSIC",
+        "kr.co.ebs.middle": "STUDY_VIDEO",
+        "com.example.game": "GAME",
+        "com.example.game.lite": None,
+        "com.unknown.app": None,
+        "": None,
+    }
+    for name, expected in cases.items():
+        got = classifier.lookup(name)
+        assert got == expected, (name, got, expected)
+    assert classifier.resolve("com.unknown.app", "STUDY") == "STUDY"
+    assert classifier.resolve("com.kakao.talk", "SNS") == "MESSENGER"
+    assert classifier.resolve("com.unknown.app", None) == "Uncategorized"
+
+    rules = random_rules(rng, args.rules)
+    classifier.load(rules)
+    # --rules 가 2000 보다 작으면 규칙 전부
+    sampled = rng.sample(rules, min(2000, len(rules)))
+    packages = random_packages(rng, 2000) + [p.replace("*", rng.choice(WORDS)) for p, _ in sampled]
+    wrong = [p for p in packages if classifier.lookup(p) != linear_lookup(rules, p)]
+    print(f"correctness : {len(cases)} 고정 케이스 OK, 무작위 {len(packages)} 개 before 와 다른 결과 {len(wrong)}")
+    assert not wrong, wrong[:5]
+    return rules
+
+
+def bench(rng, rules):
+    # 실제 로그처럼 앱 종류는 한정 (모르는 앱 5000 종)
+    packages = random_packages(rng, args.lookups, unknown_pool=5000)
+    classifier = AppCategoryClassifier()
+
+    print(f"speed       : {len(packages)} lookups (60% 아는 앱, {len(set(packages))} 종류)")
+    classifier.load(DEFAULT_APP_CATEGORIES)
+    rate("after  (default table, cold)", classifier.lookup, packages)
+    rate("after  (default table, warm memo)", classifier.lookup, packages)
+    print(f"  기본 규칙표 {classifier.stats()}")
+    # memo 없이 상태표만 (매번 처음 보는 패키지)
+    rate("after  (default table, no memo)", lambda p: (classifier._table[3].clear(), classifier.lookup(p)), packages)
+    few = packages[: max(1, len(packages) // 100)]
+    before = rate("before (default table, linear)", lambda p: linear_lookup(DEFAULT_APP_CATEGORIES, p), few)
+
+    started = time.perf_counter()
+    classifier.load(rules)
+    print(f"  큰 규칙표 {classifier.stats()} compiled in {(time.perf_counter() - started) * 1000:.0f} ms")
+    after = rate(f"after  ({len(rules)} rules, cold)", classifier.lookup, packages)
+    fewer = packages[: max(1, len(packages) // 1000)]
+    before = rate(f"before ({len(rules)} rules, linear)", lambda p: linear_lookup(rules, p), fewer)
+    print(f"  x{(before / len(fewer)) / (after / len(packages)):.0f} faster on the large table")
+
+
+def check_ingest_and_reload():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"id": 1, "nickname": "bench", "night_mode_start": "23:00", "night_mode_end": "07:00"}])
+        conn.execute(insert(AppCategoryRule), [{"pattern": p, "category": c} for p, c in DEFAULT_APP_CATEGORIES])
+
+    bench_app = FastAPI()
+    bench_app.include_router(log_router, prefix="/api/v1/logs")
+    bench_app.include_router(admin_router, prefix="/api/v1/admin")
+    client = TestClient(bench_app)
+    with SessionLocal() as db:
+        token = create_access_token(db.get(Users, 1))
+    auth = {"Authorization": f"Bearer {token}"}
+
+    def upload(package, category, minute):
+        start = datetime(2026, 3, 2, 12, minute)
+        r = client.post("/api/v1/logs", headers=auth, json={"unlock_count": 0, "logs": [{
+            "package_name": package, "app_name": package, "usage_time": 30, "category": category,
+            "start_time": start.isoformat(), "end_time": (start + timedelta(seconds=30)).isoformat(),
+        }]})
+        assert r.status_code == 200, r.text
+
+    upload("com.instagram.android", "Uncategorized", 0)
+    upload("com.my.studyapp", "STUDY", 1)
+    upload("com.my.studyapp", None, 2)
+
+    # 관리자가 규칙을 추가하고 reload
+    with engine.begin() as conn:
+        conn.execute(insert(AppCategoryRule), [{"pattern": "com.my.*", "category": "STUDY_VIDEO"}])
+    assert client.post("/api/v1/admin/app-categories/reload").status_code == 403
+    r = client.post("/api/v1/admin/app-categories/reload", headers={"X-Admin-Key": "bench-admin"})
+    assert r.status_code == 200, r.text
+    upload("com.my.studyapp", None, 3)
+
+    with SessionLocal() as db:
+        stored = [tuple(row) for row in db.execute(
+            select(UsageLog.package_name, UsageLog.category).order_by(UsageLog.first_time_stamp)
+        )]
+    print(f"ingest      : {stored}")
+    assert stored == [
+        ("com.instagram.android", "SNS"),
+        ("com.my.studyapp", "STUDY"),
+        ("com.my.studyapp", "Uncategorized"),
+        ("com.my.studyapp", "STUDY_VIDEO"),
+    ]
+    print(f"reload      : {r.json()}")
+    assert app_categories.rule_count == len(DEFAULT_APP_CATEGORIES) + 1
+
+
+def main():
+    rng = random.Random(7)
+    rules = check_correctness(rng)
+    bench(rng, rules)
+    check_ingest_and_reload()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# access token 의존성(get_current_user) 요청당 오버헤드 측정
+# - decode    : 토큰 디코드 + CurrentUser 생성만 (함수 직접 호출, 매번 새 토큰 / 같은 토큰 재사용)
+# - endpoint  : 빈 API 를 인증 없이 / 인증 붙여서 호출했을 때 요청당 차이
+# - upload    : 로그 업로드 한 번에 나가는 SQL 수 (users 조회가 없는지 확인)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_auth_dependency.py
+#   python scripts/bench_auth_dependency.py --calls 50000 --requests 5000
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app.core.auth import CurrentUser, _access_cache, create_access_token, get_current_user
+from app.core.database import Base, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.log import router as log_router
+from app.models.user import Users
+
+
+def bench_decode(token: str, calls: int) -> tuple:
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    async def cold():
+        for _ in range(calls):
+            _access_cache.clear()
+            await get_current_user(credentials)
+
+    async def warm():
+        for _ in range(calls):
+            await get_current_user(credentials)
+
+    results = []
+    for loop in (cold, warm):
+        started = time.perf_counter()
+        asyncio.run(loop())
+        results.append((time.perf_counter() - started) / calls)
+    return tuple(results)
+
+
+def bench_endpoint(token: str, requests: int) -> tuple:
+    bench_app = FastAPI()
+
+    @bench_app.get("/open")
+    async def open_endpoint():
+        return {}
+
+    @bench_app.get("/auth")
+    async def auth_endpoint(current_user: CurrentUser = Depends(get_current_user)):
+        return {}
+
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(bench_app) as client:
+        results = []
+        for path in ("/open", "/auth"):
+            client.get(path, headers=headers).raise_for_status()
+            started = time.perf_counter()
+            for _ in range(requests):
+                client.get(path, headers=headers)
+            results.append((time.perf_counter() - started) / requests)
+    return tuple(results)
+
+
+def count_upload_queries(token: str) -> list:
+    bench_app = FastAPI()
+    bench_app.include_router(log_router, prefix="/api/v1/logs")
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(" ".join(statement.split())[:70])
+
+    body = {"logs": [
+        {
+            "package_name": f"com.example.app{i}",
+            "app_name": "bench",
+            "usage_time": 60,
+            "start_time": f"2026-01-20T23:{i:02d}:00+09:00",
+            "end_time": f"2026-01-20T23:{i:02d}:30+09:00",
+            "unlock_count": i,
+        }
+        for i in range(10)
+    ], "unlock_count": 9}
+    with TestClient(bench_app) as client:
+        event.listen(engine, "before_cursor_execute", on_execute)
+        resp = client.post("/api/v1/logs", json=body, headers={"Authorization": f"Bearer {token}"})
+        event.remove(engine, "before_cursor_execute", on_execute)
+        resp.raise_for_status()
+        # 토큰 없이는 401
+        assert client.post("/api/v1/logs", json=body).status_code == 401
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"id": 7, "nickname": "bench", "night_mode_start": "23:00", "night_mode_end": "07:00"}])
+    user = Users(id=7, night_mode_start="23:00", night_mode_end="07:00")
+    token = create_access_token(user)
+
+    cold, warm = bench_decode(token, args.calls)
+    print(f"decode    : first use {cold * 1e6:7.1f} us/call, cached {warm * 1e6:5.2f} us/call  ({args.calls} calls)")
+
+    open_s, auth_s = bench_endpoint(token, args.requests)
+    print(f"endpoint  : open {open_s * 1e6:7.1f} us/req, auth {auth_s * 1e6:7.1f} us/req "
+          f"-> +{(auth_s - open_s) * 1e6:.1f} us/req")
+
+    statements = count_upload_queries(token)
+    users_queries = [s for s in statements if "FROM users" in s]
+    print(f"upload    : {len(statements)} SQL statements, users lookups={len(users_queries)}")
+    for s in statements:
+        print(f"    {s}")
+    assert not users_queries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# 기간이 끝난 챌린지 확정 배치(app/jobs/close_challenges.py) 확인 + 속도
+# 유저 N 명 x 인스턴스 10 개 (지난 날짜 = 기간 끝남 / 이번 주 = 진행 중) 를 sqlite 에 만들고, 같은 DB 복사본에서
+# - before: 인덱스 없이 전체 조회 + 인스턴스마다 conditions / challenge / rewards / user lazy load + 유저 XP 읽고 쓰기
+# - after : (status, end_date) 인덱스 + selectinload + chunk 마다 상태 UPDATE / XP UPDATE 한 번 + commit
+# 두 결과(인스턴스 상태, 유저 XP)가 같은지, 중간에 죽은 뒤 다시 돌려도 같은지, 한 번 더 돌리면 아무것도 안 하는지
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_challenge_closer.py
+#   python scripts/bench_challenge_closer.py --users 20000 --chunk-size 2000
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--users", type=int, default=5000)
+parser.add_argument("--chunk-size", type=int, default=1000)
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(tmp.name, "bench.db")
+BASE_PATH = os.path.join(tmp.name, "base.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import event, insert, select, text
+
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.jobs import close_challenges
+from app.jobs.close_challenges import run_close_job
+from app.models.challenge import Challenge, ChallengeInstances, Condition, Rewards
+from app.models.user import Users
+from app.services.challenge_engine import COMPLETED, IN_PROGRESS, challenge_window, compile_condition, decide_status
+
+TODAY = date(2026, 3, 12)
+NOW = datetime.combine(TODAY, datetime.min.time()).replace(hour=9)
+CHALLENGES = [
+    # (지표, 목표값(분), 기간, operator, 보상 XP)
+    ("TOTAL_TIME", 180, "DAILY", "<=", 30),
+    ("CATEGORY:SNS", 60, "DAILY", "<=", 20),
+    ("NIGHT_TIME", 20, "DAILY", "<=", 20),
+    ("CATEGORY:STUDY_VIDEO", 30, "DAILY", ">=", 40),
+    ("TOTAL_TIME", 1200, "WEEKLY", "<=", 100),
+]
+
+
+def seed(rng):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [
+            {"id": u, "nickname": f"bench{u}", "current_xp": rng.choice([None, 0, rng.randrange(1000)])}
+            for u in range(1, args.users + 1)
+        ])
+        conn.execute(insert(Challenge), [
+            {"id": i + 1, "title": kind, "challenge_type": kind, "default_target_value": target, "time_scope": scope}
+            for i, (kind, target, scope, _, _) in enumerate(CHALLENGES)
+        ])
+        instances, conditions, rewards = [], [], []
+        joined = set()
+        for u in range(1, args.users + 1):
+            # 지난 8 일 중 하루 챌린지 2 개 (끝남) + 이번 주 챌린지 (진행 중 / 지난주 것은 끝남)
+            for k in range(10):
+                c = rng.randrange(len(CHALLENGES))
+                kind, target, scope, op, xp = CHALLENGES[c]
+                day = TODAY - timedelta(days=rng.randrange(0, 9)) if scope == "DAILY" else TODAY - timedelta(days=7 * rng.randrange(0, 2))
+                start, end = challenge_window(scope, day)
+                # 같은 기간에는 한 번만 참여 (uq_challenge_instances_user_challenge_start)
+                if (u, c, start) in joined:
+                    continue
+                joined.add((u, c, start))
+                instance_id = len(instances) + 1
+                instances.append({
+                    "id": instance_id, "user_id": u, "challenge_id": c + 1, "status": IN_PROGRESS,
+                    "start_date": start, "end_date": end,
+                })
+                conditions.append({
+                    "instance_id": instance_id, "default_target_value": target, "operator": op,
+                    "current_value": rng.randrange(0, target * 60 * 2),
+                })
+                for _ in range(rng.randrange(0, 3)):
+                    rewards.append({"instance_id": instance_id, "title": "XP", "challenge_xp": xp})
+        conn.execute(insert(ChallengeInstances), instances)
+        conn.execute(insert(Condition), conditions)
+        conn.execute(insert(Rewards), rewards)
+    engine.dispose()
+    shutil.copyfile(DB_PATH, BASE_PATH)
+    return len(instances)
+
+
+def restore():
+    engine.dispose()
+    shutil.copyfile(BASE_PATH, DB_PATH)
+
+
+def snapshot():
+    with SessionLocal() as db:
+        statuses = dict(db.execute(select(ChallengeInstances.id, ChallengeInstances.status)).all())
+        xp = dict(db.execute(select(Users.id, Users.current_xp)).all())
+    return statuses, xp
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *a):
+        self.count += 1
+
+
+def close_naive(now):
+    # before: 끝난 인스턴스를 한 번에 읽고, 관계는 lazy load, 유저 XP 는 읽어서 더한 뒤 저장
+    with SessionLocal() as db:
+        instances = db.scalars(
+            select(ChallengeInstances).where(ChallengeInstances.status == IN_PROGRESS, ChallengeInstances.end_date <= now)
+        ).all()
+        for instance in instances:
+            pairs = [
+                (compile_condition(instance.challenge.challenge_type, c.operator, c.default_target_value), c.current_value or 0)
+                for c in instance.conditions
+            ]
+            instance.status = decide_status(pairs)
+            xp = sum(r.challenge_xp or 0 for r in instance.rewards)
+            if instance.status == COMPLETED and xp:
+                user = instance.user
+                user.current_xp = (user.current_xp or 0) + xp
+        db.commit()
+        return len(instances)
+
+
+def query_plan():
+    sql = ("EXPLAIN QUERY PLAN SELECT id FROM challenge_instances "
+           "WHERE status = 'IN_PROGRESS' AND end_date <= :now ORDER BY end_date, id LIMIT 1000")
+    with engine.connect() as conn:
+        return " / ".join(row[-1] for row in conn.execute(text(sql), {"now": NOW}))
+
+
+def main():
+    rng = random.Random(5)
+    n = seed(rng)
+    statements = StatementCounter()
+
+    # before (인덱스 없는 상태)
+    restore()
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_challenge_instances_status_end_date"))
+    plan_before = query_plan()
+    count = statements.count
+    started = time.perf_counter()
+    expired = close_naive(NOW)
+    before_seconds = time.perf_counter() - started
+    before_statements = statements.count - count
+    before = snapshot()
+
+    # after
+    restore()
+    plan_after = query_plan()
+    count = statements.count
+    stats = run_close_job(args.chunk_size, NOW)
+    after_statements = statements.count - count
+    after = snapshot()
+
+    print(f"seed        : {args.users} users, {n} instances, {expired} past end_date at {NOW}")
+    print(f"query plan  : before {plan_before}")
+    print(f"              after  {plan_after}")
+    print(f"before      : {before_seconds:6.2f}s  {before_statements} SQL")
+    print(f"after       : {stats['seconds']:6.2f}s  {after_statements} SQL in {stats['chunks']} chunks "
+          f"(COMPLETED {stats['completed']}, FAILED {stats['failed']}, +{stats['xp']} xp)  -> x{before_seconds / stats['seconds']:.1f}")
+    assert after == before, "status / xp differ from the naive closer"
+    assert stats["completed"] + stats["failed"] == expired
+
+    # 다시 돌리면 아무것도 안 한다
+    again = run_close_job(args.chunk_size, NOW)
+    assert again["chunks"] == 0 and snapshot() == after
+
+    # 3 번째 chunk 를 처리한 뒤 commit 전에 죽으면 -> 다시 돌려서 같은 결과
+    restore()
+    calls = {"n": 0}
+    original = close_challenges.close_expired_chunk
+
+    def crashing(db, now, limit, user_id=None):
+        stats = original(db, now, limit, user_id)
+        calls["n"] += 1
+        if calls["n"] == 3:
+            raise RuntimeError("crash before commit")
+        return stats
+
+    close_challenges.close_expired_chunk = crashing
+    try:
+        run_close_job(args.chunk_size, NOW)
+    except RuntimeError:
+        pass
+    close_challenges.close_expired_chunk = original
+    partial = snapshot()
+    done = sum(1 for s in partial[0].values() if s != IN_PROGRESS)
+    resumed = run_close_job(args.chunk_size, NOW)
+    print(f"crash       : died in chunk 3 with {done} closed, rerun closed {resumed['completed'] + resumed['failed']} more "
+          f"-> same statuses / xp: {snapshot() == after}")
+    assert done == 2 * args.chunk_size and snapshot() == after
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
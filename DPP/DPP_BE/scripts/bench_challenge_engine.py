@@ -0,0 +1,329 @@
+# 챌린지 진행도 엔진(app/services/challenge_engine.py) 확인 + 속도
+# 유저 N 명 x 챌린지 10 개 (하루 / 주간, 제한형 / 목표형) = 진행 중 인스턴스 N*10 개를 sqlite 에 만들고
+# - 업로드 한 번마다 진행도 갱신 시간: 엔진(새 기록 증분만) vs 매번 기간 안 로그를 다시 읽어 계산 (before)
+#   + 업로드당 SQL 문 수
+# - 업로드를 여러 번 한 뒤의 카운터가 원본 로그로 처음부터 다시 계산한 값과 같은지
+# - 하루 기간이 끝난 인스턴스 상태 확정 (COMPLETED / FAILED) + 다시 돌려도 그대로인지
+# - API: 참여 -> 로그 업로드 -> 내 진행 상황
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_challenge_engine.py
+#   python scripts/bench_challenge_engine.py --users 20000 --uploads 3000
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--users", type=int, default=10000)
+parser.add_argument("--uploads", type=int, default=2000, help="엔진 / before 각각 업로드 횟수")
+parser.add_argument("--logs-per-upload", type=int, default=10)
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'bench.db')}"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.auth import create_access_token
+from app.core.config import APP_TIMEZONE, CHALLENGE_REWARD_XP
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.challenges import router as challenges_router
+from app.api.v1.endpoints.log import router as log_router
+from app.models.challenge import Challenge, ChallengeInstances, Condition, ProgressLogs, Rewards
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.challenge_engine import (
+    COMPLETED, FAILED, IN_PROGRESS, apply_challenge_progress, challenge_window, close_expired_instances,
+    compile_condition, decide_status, instance_progress, rebuild_counters, window_ms, write_progress,
+)
+from app.services.daily_rollup import apply_daily_rollup
+from app.services.log_ingest import bulk_ingest_logs, to_ms
+from app.services.night_mode import NightWindow
+
+DAY = date(2026, 3, 4)  # 수요일 (주간 챌린지는 3/2 ~ 3/9)
+NIGHT = NightWindow.from_user(Users(night_mode_start="23:00", night_mode_end="07:00"))
+CHALLENGES = [
+    # (제목, 지표, 목표값(분), 기간, operator)
+    ("하루 3시간 이하", "TOTAL_TIME", 180, "DAILY", "<="),
+    ("SNS 하루 1시간 이하", "CATEGORY:SNS", 60, "DAILY", "<="),
+    ("게임 하루 30분 이하", "CATEGORY:GAME", 30, "DAILY", "<="),
+    ("유튜브 하루 1시간 이하", "APP:com.google.android.youtube", 60, "DAILY", "<="),
+    ("야간 하루 20분 이하", "NIGHT_TIME", 20, "DAILY", "<="),
+    ("학습 영상 하루 30분 이상", "CATEGORY:STUDY_VIDEO", 30, "DAILY", ">="),
+    ("주간 20시간 이하", "TOTAL_TIME", 1200, "WEEKLY", "<="),
+    ("주간 야간 2시간 이하", "NIGHT_TIME", 120, "WEEKLY", "<="),
+    ("주간 웹툰 3시간 이하", "CATEGORY:WEBTOON", 180, "WEEKLY", "<="),
+    ("주간 음악 2시간 이상", "CATEGORY:MUSIC", 120, "WEEKLY", ">="),
+]
+PACKAGES = [
+    ("com.instagram.android", "SNS"),
+    ("com.google.android.youtube", "VIDEO"),
+    ("com.kakao.talk", "MESSENGER"),
+    ("com.supercell.clashroyale", "GAME"),
+    ("com.nhn.android.webtoon", "WEBTOON"),
+    ("com.spotify.music", "MUSIC"),
+    ("kr.co.ebs.middle", "STUDY_VIDEO"),
+]
+
+
+def random_logs(rng, day, n, after_hour=0):
+    start = datetime.combine(day, datetime.min.time(), tzinfo=APP_TIMEZONE).replace(hour=after_hour)
+    out = []
+    for _ in range(n):
+        begin = start + timedelta(seconds=rng.randrange(0, (24 - after_hour) * 3600 - 3600))
+        seconds = rng.randrange(30, 1500)
+        package, category = rng.choice(PACKAGES)
+        out.append({
+            "package_name": package,
+            "app_name": package,
+            "category": category,
+            "usage_duration": seconds,
+            "first_time_stamp": to_ms(begin) + rng.randrange(1000),
+            "last_time_stamp": to_ms(begin) + seconds * 1000,
+            "unlock_count": 0,
+            "is_night_mode": False,
+        })
+    return out
+
+
+def seed(rng):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    n = args.users
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"id": u, "nickname": f"bench{u}"} for u in range(1, n + 1)])
+        conn.execute(insert(Challenge), [
+            {"id": i + 1, "title": title, "challenge_type": kind, "default_target_value": target, "time_scope": scope}
+            for i, (title, kind, target, scope, _) in enumerate(CHALLENGES)
+        ])
+        instances, conditions = [], []
+        for u in range(1, n + 1):
+            for c, (_, _, target, scope, op) in enumerate(CHALLENGES):
+                instance_id = len(instances) + 1
+                start, end = challenge_window(scope, DAY)
+                instances.append({
+                    "id": instance_id, "user_id": u, "challenge_id": c + 1, "status": IN_PROGRESS,
+                    "start_date": start, "end_date": end,
+                })
+                conditions.append({"instance_id": instance_id, "default_target_value": target, "operator": op})
+        conn.execute(insert(ChallengeInstances), instances)
+        conn.execute(insert(Condition), conditions)
+        # 이번 주 월 / 화 20 개씩 + 오늘 오전 10 개
+        for day, k in ((DAY - timedelta(days=2), 20), (DAY - timedelta(days=1), 20), (DAY, 10)):
+            conn.execute(insert(UsageLog), [
+                {**row, "user_id": u} for u in range(1, n + 1) for row in random_logs(rng, day, k)
+            ])
+    return len(instances)
+
+
+def counters(db, user_ids):
+    return dict(db.execute(
+        select(Condition.id, Condition.current_value)
+        .join(ChallengeInstances, Condition.instance_id == ChallengeInstances.id)
+        .where(ChallengeInstances.user_id.in_(user_ids))
+    ).all())
+
+
+def rescan_progress(db, user_id, night):
+    # before: 업로드마다 진행 중 인스턴스를 ORM 으로 하나씩 읽고, 기간 안 로그를 다시 읽어 처음부터 계산
+    instances = db.scalars(
+        select(ChallengeInstances).where(
+            ChallengeInstances.user_id == user_id, ChallengeInstances.status == IN_PROGRESS
+        )
+    ).all()
+    rates = {}
+    for instance in instances:
+        start_ms, end_ms = window_ms(instance.start_date, instance.end_date)
+        logs = [dict(r) for r in db.execute(
+            select(UsageLog.package_name, UsageLog.category, UsageLog.usage_duration,
+                   UsageLog.first_time_stamp, UsageLog.last_time_stamp)
+            .where(UsageLog.user_id == user_id, UsageLog.first_time_stamp >= start_ms, UsageLog.first_time_stamp < end_ms)
+        ).mappings()]
+        pairs = []
+        for condition in instance.conditions:
+            compiled = compile_condition(instance.challenge.challenge_type, condition.operator, condition.default_target_value)
+            condition.current_value = sum(compiled.value_of(log, night) for log in logs)
+            pairs.append((compiled, condition.current_value))
+        rates[instance.id] = instance_progress(pairs)
+    write_progress(db, rates)
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *a):
+        self.count += 1
+
+
+def run_uploads(rng, user_ids, step, statements):
+    per_upload, counted = [], 0
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            rows = random_logs(rng, DAY, args.logs_per_upload, after_hour=12)
+            new_rows = bulk_ingest_logs(db, user_id, rows)
+            apply_daily_rollup(db, user_id, new_rows, NIGHT)
+            before = statements.count
+            started = time.perf_counter()
+            step(db, user_id, new_rows)
+            db.flush()
+            per_upload.append(time.perf_counter() - started)
+            counted += statements.count - before
+            db.commit()
+    per_upload.sort()
+    return per_upload, counted / len(user_ids)
+
+
+def check_api():
+    # 참여 -> 업로드 -> 내 진행 상황 (오늘 날짜 기준)
+    bench_app = FastAPI()
+    bench_app.include_router(log_router, prefix="/api/v1/logs")
+    bench_app.include_router(challenges_router, prefix="/api/v1/challenges")
+    client = TestClient(bench_app)
+    with SessionLocal() as db:
+        user = Users(id=args.users + 1, nickname="api", night_mode_start="23:00", night_mode_end="07:00")
+        db.add(user)
+        db.commit()
+        auth = {"Authorization": f"Bearer {create_access_token(user)}"}
+
+    now = datetime.now(APP_TIMEZONE).replace(microsecond=0)
+    start = max(now - timedelta(minutes=40), now.replace(hour=0, minute=0, second=0))
+
+    def upload(minute, seconds):
+        begin = start + timedelta(minutes=minute)
+        r = client.post("/api/v1/logs", headers=auth, json={"unlock_count": 0, "logs": [{
+            "package_name": "com.instagram.android", "app_name": "Instagram", "usage_time": seconds, "category": "SNS",
+            "start_time": begin.isoformat(), "end_time": (begin + timedelta(seconds=seconds)).isoformat(),
+        }]})
+        assert r.status_code == 200, r.text
+
+    upload(0, 600)  # 참여 전 기록도 센다
+    r = client.post("/api/v1/challenges/2/join", headers=auth, json={"target_value": 30, "operator": "<="})
+    assert r.status_code == 200, r.text
+    assert r.json()["conditions"][0]["current_value"] == 10
+    assert client.post("/api/v1/challenges/2/join", headers=auth).status_code == 409
+    assert client.post("/api/v1/challenges/2/join", headers=auth, json={"operator": "~"}).status_code == 400
+    upload(20, 300)
+    me = client.get("/api/v1/challenges/me", headers=auth).json()
+    assert me[0]["conditions"][0]["current_value"] == 15 and me[0]["status"] == IN_PROGRESS, me
+    assert abs(me[0]["progress_rate"] - 0.5) < 1e-9, me
+
+    # 참여할 때 만든 보상으로 기간이 끝나면 XP
+    instance_id = me[0]["id"]
+    with SessionLocal() as db:
+        assert [r.challenge_xp for r in db.scalars(select(Rewards).where(Rewards.instance_id == instance_id))] == [
+            CHALLENGE_REWARD_XP
+        ]
+        end = db.get(ChallengeInstances, instance_id).end_date
+        closed = close_expired_instances(db, now=end, user_id=user.id)
+        db.commit()
+        xp = db.get(Users, user.id).current_xp
+    assert closed["completed"] == 1 and xp == CHALLENGE_REWARD_XP, (closed, xp)
+
+    # 같은 챌린지에 동시에 참여해도 한 번만 (나머지는 409)
+    with ThreadPoolExecutor(8) as pool:
+        statuses = sorted(pool.map(lambda _: client.post("/api/v1/challenges/1/join", headers=auth).status_code, range(8)))
+    with SessionLocal() as db:
+        joined = db.scalars(select(ChallengeInstances.id).where(
+            ChallengeInstances.user_id == user.id, ChallengeInstances.challenge_id == 1
+        )).all()
+    assert statuses == [200] + [409] * 7 and len(joined) == 1, statuses
+    print(f"api         : join -> upload -> /me {me[0]['title']} {me[0]['conditions'][0]['current_value']:g}min "
+          f"/ {me[0]['conditions'][0]['target_value']}min progress {me[0]['progress_rate']:.2f}, "
+          f"closed -> +{xp} xp from join-time reward, 8 concurrent joins -> {statuses.count(200)} instance")
+
+
+def main():
+    rng = random.Random(11)
+    started = time.perf_counter()
+    n_instances = seed(rng)
+    print(f"seed        : {args.users} users x {len(CHALLENGES)} challenges = {n_instances} in-progress instances "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        ids = list(range(1, n_instances + 1))
+        for i in range(0, len(ids), 5000):
+            rebuild_counters(db, ids[i:i + 5000])
+        db.commit()
+    print(f"rebuild     : counters for {n_instances} instances from usage_logs in {time.perf_counter() - started:.1f}s")
+
+    statements = StatementCounter()
+    users = list(range(1, args.users + 1))
+    rng.shuffle(users)
+    engine_users = users[:args.uploads]
+    rescan_users = users[args.uploads:2 * args.uploads]
+
+    after, after_statements = run_uploads(rng, engine_users, lambda db, u, rows: apply_challenge_progress(db, u, rows, NIGHT), statements)
+    before, before_statements = run_uploads(rng, rescan_users, lambda db, u, rows: rescan_progress(db, u, NIGHT), statements)
+
+    def ms(values, q):
+        return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+    print(f"per upload  : {len(CHALLENGES)} active instances/user, {args.logs_per_upload} new logs, {args.uploads} uploads each")
+    print(f"  before (rescan)  p50 {ms(before, .5):6.2f} ms  p95 {ms(before, .95):6.2f} ms  {before_statements:5.1f} SQL/upload")
+    print(f"  after  (engine)  p50 {ms(after, .5):6.2f} ms  p95 {ms(after, .95):6.2f} ms  {after_statements:5.1f} SQL/upload"
+          f"  -> x{sum(before) / sum(after):.1f}")
+
+    # 증분으로 쌓인 카운터 == 원본 로그로 다시 계산한 값
+    with SessionLocal() as db:
+        incremental = counters(db, engine_users)
+        progress = dict(db.execute(select(ProgressLogs.instance_id, ProgressLogs.progress_rate)).all())
+        instance_ids = db.scalars(select(ChallengeInstances.id).where(ChallengeInstances.user_id.in_(engine_users))).all()
+        rebuilt_rates = rebuild_counters(db, list(instance_ids))
+        rebuilt = counters(db, engine_users)
+        db.rollback()
+    wrong = [cid for cid in rebuilt if rebuilt[cid] != incremental[cid]]
+    wrong_rates = [i for i, rate in rebuilt_rates.items() if abs(progress[i] - rate) > 1e-9]
+    print(f"correctness : {len(rebuilt)} counters / {len(rebuilt_rates)} progress rates after uploads vs rebuild -> "
+          f"{len(wrong)} / {len(wrong_rates)} mismatches")
+    assert not wrong and not wrong_rates
+
+    # 하루 기간이 끝난 뒤 상태 확정
+    close_at = datetime.combine(DAY + timedelta(days=1), datetime.min.time())
+    with SessionLocal() as db:
+        expected = defaultdict(list)
+        for instance in db.scalars(
+            select(ChallengeInstances)
+            .where(ChallengeInstances.status == IN_PROGRESS, ChallengeInstances.end_date <= close_at)
+            .options(selectinload(ChallengeInstances.conditions), selectinload(ChallengeInstances.challenge))
+        ):
+            expected[decide_status([
+                (compile_condition(instance.challenge.challenge_type, c.operator, c.default_target_value), c.current_value)
+                for c in instance.conditions
+            ])].append(instance.id)
+        started = time.perf_counter()
+        closed = close_expired_instances(db, close_at)
+        db.commit()
+        elapsed = time.perf_counter() - started
+        again = close_expired_instances(db, close_at)
+        statuses = defaultdict(set)
+        for instance_id, status in db.execute(select(ChallengeInstances.id, ChallengeInstances.status)):
+            statuses[status].add(instance_id)
+    print(f"close       : {closed['completed'] + closed['failed']} daily instances in {elapsed:.2f}s "
+          f"(COMPLETED {closed['completed']}, FAILED {closed['failed']}), "
+          f"{len(statuses[IN_PROGRESS])} weekly still IN_PROGRESS")
+    assert statuses[COMPLETED] == set(expected[COMPLETED]) and statuses[FAILED] == set(expected[FAILED])
+    assert again == {"completed": 0, "failed": 0, "xp": 0}
+    assert len(statuses[IN_PROGRESS]) == args.users * sum(1 for c in CHALLENGES if c[3] == "WEEKLY")
+
+    check_api()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
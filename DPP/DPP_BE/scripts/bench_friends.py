@@ -0,0 +1,264 @@
+# 친구 그래프(app/services/friends.py) 확인 + 속도
+# 유저 N 명 x 평균 친구 D 명 (방향 무작위, 일부는 대기 중) + 오늘 daily_reports 를 sqlite 에 만들고, 같은 DB 복사본에서
+# - before: 새 인덱스 없이 (requester_id = :u OR receiver_id = :u) 로 친구 찾기, 친구마다 프로필 / 친구의 친구 / 오늘 기록 조회
+# - after : 방향별 (id, status, 상대 id) 인덱스 + 유저별 친구 집합 캐시 (처음 / 캐시된 뒤), 순위는 조인 쿼리 한 번
+# 친구 목록 + 함께 아는 친구 수, 오늘 순위 결과가 같은지 / 요청당 시간과 SQL 수
+# API: 신청 -> 수락 -> 목록 / 순위 -> 삭제 (수락 / 삭제 뒤 캐시가 바로 바뀌는지), 다른 워커 캐시는 FRIEND_CACHE_SECONDS 뒤에
+#      같은 방향 동시 신청 / 엇갈린 동시 신청 (A->B, B->A) 이 한 줄만 남고 나머지는 409 인지
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_friends.py
+#   python scripts/bench_friends.py --users 50000 --degree 100 --requests 500
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--users", type=int, default=10000)
+parser.add_argument("--degree", type=int, default=50, help="유저당 평균 친구 수")
+parser.add_argument("--requests", type=int, default=50, help="목록 / 순위를 요청할 유저 수 (before 가 느려서 적게)")
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(tmp.name, "bench.db")
+BASE_PATH = os.path.join(tmp.name, "base.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, or_, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.auth import create_access_token
+from app.core.config import APP_TIMEZONE
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.social import _between, router as social_router
+from app.models.calendar import DailyReports
+from app.models.social import Friendships
+from app.models.user import Users
+from app.services.friends import ACCEPTED, PENDING, FriendGraph, friend_graph, friend_list, leaderboard
+
+TODAY = datetime.now(APP_TIMEZONE).date()
+NEW_INDEXES = ["uq_friendships_pair", "uq_friendships_requester_receiver", "ix_friendships_requester_status", "ix_friendships_receiver_status"]
+
+
+def seed(rng):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    pairs = set()
+    target = args.users * args.degree // 2
+    while len(pairs) < target:
+        a, b = rng.randrange(1, args.users + 1), rng.randrange(1, args.users + 1)
+        if a != b and (b, a) not in pairs:
+            pairs.add((a, b))
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [
+            {"id": u, "nickname": f"bench{u:06d}", "profile_image": None} for u in range(1, args.users + 1)
+        ])
+        conn.execute(insert(Friendships), [
+            {"requester_id": a, "receiver_id": b, "status": ACCEPTED if rng.random() < 0.9 else PENDING}
+            for a, b in pairs
+        ])
+        conn.execute(insert(DailyReports), [
+            {"user_id": u, "date": TODAY, "total_time": rng.randrange(0, 10 * 3600)}
+            for u in range(1, args.users + 1) if rng.random() < 0.8
+        ])
+    engine.dispose()
+    shutil.copyfile(DB_PATH, BASE_PATH)
+    return len(pairs)
+
+
+def restore():
+    engine.dispose()
+    shutil.copyfile(BASE_PATH, DB_PATH)
+    friend_graph.clear()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *a):
+        self.count += 1
+
+
+def naive_friend_ids(db, user_id):
+    rows = db.execute(
+        select(Friendships.requester_id, Friendships.receiver_id).where(
+            or_(Friendships.requester_id == user_id, Friendships.receiver_id == user_id),
+            Friendships.status == ACCEPTED,
+        )
+    ).all()
+    return {b if a == user_id else a for a, b in rows}
+
+
+def naive_friend_list(db, user_id):
+    # before: 친구마다 프로필 + 그 친구의 친구 목록
+    mine = naive_friend_ids(db, user_id)
+    out = []
+    for friend_id in mine:
+        user = db.get(Users, friend_id)
+        out.append({
+            "id": user.id, "nickname": user.nickname, "profile_image": user.profile_image,
+            "equipped_character": user.equipped_character,
+            "mutual_count": len(mine & naive_friend_ids(db, friend_id)),
+        })
+    out.sort(key=lambda r: (r["nickname"] or "", r["id"]))
+    return out
+
+
+def naive_leaderboard(db, user_id, day):
+    # before: 친구마다 오늘 기록 조회 후 파이썬에서 정렬
+    rows = []
+    for member_id in naive_friend_ids(db, user_id) | {user_id}:
+        user = db.get(Users, member_id)
+        total = db.scalar(select(DailyReports.total_time).where(DailyReports.user_id == member_id, DailyReports.date == day))
+        rows.append((total is None, total, member_id, user))
+    rows.sort(key=lambda r: r[:3])
+    return [
+        {"rank": rank, "user_id": member_id, "nickname": user.nickname, "profile_image": user.profile_image,
+         "equipped_character": user.equipped_character, "total_time": total, "is_me": member_id == user_id}
+        for rank, (_, total, member_id, user) in enumerate(rows, start=1)
+    ]
+
+
+def query_plan():
+    sql = ("EXPLAIN QUERY PLAN SELECT receiver_id FROM friendships WHERE requester_id = 1 AND status = 'ACCEPTED' "
+           "UNION ALL SELECT requester_id FROM friendships WHERE receiver_id = 1 AND status = 'ACCEPTED'")
+    with engine.connect() as conn:
+        return " / ".join(row[-1] for row in conn.execute(text(sql)))
+
+
+def timed(statements, fn, users):
+    results, times = {}, []
+    count = statements.count
+    for user_id in users:
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            results[user_id] = fn(db, user_id)
+            times.append(time.perf_counter() - started)
+    times.sort()
+    return results, times[len(times) // 2], (statements.count - count) / len(users)
+
+
+def check_api():
+    restore()
+    check_app = FastAPI()
+    check_app.include_router(social_router, prefix="/api/v1/social")
+    client = TestClient(check_app)
+    a, b = args.users + 1, args.users + 2
+    with SessionLocal() as db:
+        users = [Users(id=a, nickname="api_a"), Users(id=b, nickname="api_b")]
+        db.add_all(users + [DailyReports(user_id=b, date=TODAY, total_time=600)])
+        db.commit()
+        auth_a, auth_b = ({"Authorization": f"Bearer {create_access_token(u)}"} for u in users)
+
+    # 다른 워커 (캐시를 따로 가진) 흉내: 시계를 직접 움직인다
+    now = [0.0]
+    other_worker = FriendGraph(ttl_seconds=60, clock=lambda: now[0])
+
+    assert client.get("/api/v1/social/friends", headers=auth_a).json() == []
+    with SessionLocal() as db:
+        assert other_worker.friends(db, a) == frozenset()
+    r = client.post("/api/v1/social/friends/requests", headers=auth_a, json={"receiver_id": b})
+    assert r.status_code == 200, r.text
+    request_id = r.json()["id"]
+    assert client.post("/api/v1/social/friends/requests", headers=auth_b, json={"receiver_id": a}).status_code == 409
+    assert client.post("/api/v1/social/friends/requests", headers=auth_a, json={"receiver_id": a}).status_code == 400
+    assert [x["id"] for x in client.get("/api/v1/social/friends/requests", headers=auth_b).json()] == [request_id]
+    assert client.post(f"/api/v1/social/friends/requests/{request_id}/accept", headers=auth_a).status_code == 404
+    r = client.post(f"/api/v1/social/friends/requests/{request_id}/accept", headers=auth_b)
+    assert r.status_code == 200 and r.json()["status"] == ACCEPTED, r.text
+
+    friends = client.get("/api/v1/social/friends", headers=auth_a).json()
+    assert [f["id"] for f in friends] == [b], friends
+    board = client.get("/api/v1/social/leaderboard", headers=auth_a).json()
+    assert [(e["user_id"], e["total_time"], e["is_me"]) for e in board] == [(b, 600, False), (a, None, True)], board
+    with SessionLocal() as db:
+        stale = other_worker.friends(db, a)
+        now[0] = 61
+        fresh = other_worker.friends(db, a)
+    assert stale == frozenset() and fresh == {b}
+
+    assert client.delete(f"/api/v1/social/friends/{b}", headers=auth_a).status_code == 200
+    assert client.get("/api/v1/social/friends", headers=auth_b).json() == []
+    assert client.delete(f"/api/v1/social/friends/{b}", headers=auth_a).status_code == 404
+
+    # 동시 신청: 같은 방향 4 개 + 반대 방향 4 개
+    senders = [(auth_a, b), (auth_b, a)] * 4
+    with ThreadPoolExecutor(8) as pool:
+        statuses = sorted(pool.map(
+            lambda s: client.post("/api/v1/social/friends/requests", headers=s[0], json={"receiver_id": s[1]}).status_code,
+            senders,
+        ))
+    with SessionLocal() as db:
+        rows = db.scalar(select(func.count()).select_from(Friendships).where(_between(a, b)))
+    assert statuses == [200] + [409] * 7 and rows == 1, (statuses, rows)
+    with SessionLocal() as db:
+        # sqlite 는 요청을 한 줄로 세워서 경합이 잘 안 나므로, 엇갈린 줄을 DB 에 바로 넣어서도 확인
+        existing = db.scalar(select(Friendships).where(_between(a, b)))
+        db.add(Friendships(requester_id=existing.receiver_id, receiver_id=existing.requester_id, status=PENDING))
+        try:
+            db.commit()
+            raise AssertionError("crossing friendship row stored")
+        except IntegrityError:
+            db.rollback()
+    print(f"api         : request -> accept -> friends / leaderboard -> remove, cache updated on accept / remove, "
+          f"other worker after {other_worker.ttl_seconds}s, 8 concurrent / crossing requests -> {rows} row")
+
+
+def main():
+    rng = random.Random(3)
+    started = time.perf_counter()
+    n = seed(rng)
+    print(f"seed        : {args.users} users, {n} friendships (~{args.degree} per user, 10% pending) in "
+          f"{time.perf_counter() - started:.1f}s")
+    statements = StatementCounter()
+    users = rng.sample(range(1, args.users + 1), args.requests)
+
+    # before (새 인덱스 없이)
+    restore()
+    with engine.begin() as conn:
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX {name}"))
+    plan_before = query_plan()
+    naive_lists, list_before, list_sql_before = timed(statements, naive_friend_list, users)
+    naive_boards, board_before, board_sql_before = timed(statements, lambda db, u: naive_leaderboard(db, u, TODAY), users)
+
+    restore()
+    plan_after = query_plan()
+    lists, list_cold, list_sql_cold = timed(statements, friend_list, users)
+    _, list_warm, list_sql_warm = timed(statements, friend_list, users)
+    friend_graph.clear()
+    boards, board_cold, board_sql_cold = timed(statements, lambda db, u: leaderboard(db, u, TODAY), users)
+    _, board_warm, board_sql_warm = timed(statements, lambda db, u: leaderboard(db, u, TODAY), users)
+
+    print(f"query plan  : before {plan_before}")
+    print(f"              after  {plan_after}")
+    print(f"friends     : before p50 {list_before * 1000:7.2f} ms {list_sql_before:6.1f} SQL | "
+          f"cold {list_cold * 1000:6.2f} ms {list_sql_cold:4.1f} SQL | warm {list_warm * 1000:6.2f} ms {list_sql_warm:4.1f} SQL"
+          f"  -> x{list_before / list_warm:.0f}")
+    print(f"leaderboard : before p50 {board_before * 1000:7.2f} ms {board_sql_before:6.1f} SQL | "
+          f"cold {board_cold * 1000:6.2f} ms {board_sql_cold:4.1f} SQL | warm {board_warm * 1000:6.2f} ms {board_sql_warm:4.1f} SQL"
+          f"  -> x{board_before / board_warm:.0f}")
+    print(f"cache       : {friend_graph.stats()}")
+    assert lists == naive_lists, "friend lists / mutual counts differ"
+    assert boards == naive_boards, "leaderboards differ"
+
+    check_api()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# 오래된 usage_logs 보관(app/jobs/archive_logs.py) 용량 / 조회 속도 비교
+# 유저 N 명 x 넉 달치 가짜 로그를 sqlite 에 넣고, 30 일보다 오래된 달을 보관 파일로 옮긴다.
+# - 용량: 옮기기 전 / 후 DB 파일(VACUUM 후) + 보관 폴더 (압축 안 함 = memmap, deflate 는 참고용)
+# - 조회: 유저 한 명의 오래된 기간 전체 (DB 범위 조회 vs 보관 파일), 전체 유저 카테고리 합계 (SQL vs memmap 컬럼)
+# - get_logs 페이지를 옮기기 전 / 후로 끝까지 넘겨서 결과가 같은지 (보관 / DB 경계를 넘는 cursor 포함)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_log_archive.py
+#   python scripts/bench_log_archive.py --users 2000 --logs-per-day 30
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--users", type=int, default=1000)
+parser.add_argument("--days", type=int, default=120)
+parser.add_argument("--logs-per-day", type=int, default=20)
+parser.add_argument("--after-days", type=int, default=30)
+parser.add_argument("--sample-users", type=int, default=50)
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(tmp.name, "bench.db")
+ARCHIVE_DIR = os.path.join(tmp.name, "archive")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["LOG_ARCHIVE_DIR"] = ARCHIVE_DIR
+
+import numpy as np
+from sqlalchemy import func, insert, select, text
+
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.log import _get_logs_page
+from app.jobs.archive_logs import archive_cutoff, run_archive_job
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.daily_rollup import day_range_ms
+from app.services.log_archive import ArchiveMonth, archive_path, archived_months, iter_archived_logs
+from app.services.log_query import decode_cursor
+
+TODAY = date(2026, 6, 15)
+PACKAGES = [
+    ("com.instagram.android", "Instagram", "SNS"),
+    ("com.google.android.youtube", "YouTube", "VIDEO"),
+    ("com.kakao.talk", "KakaoTalk", "MESSENGER"),
+    ("com.supercell.clashroyale", "Clash Royale", "GAME"),
+    ("com.nhn.android.webtoon", "네이버 웹툰", "WEBTOON"),
+    ("com.android.chrome", "Chrome", "BROWSER"),
+    ("com.spotify.music", "Spotify", "MUSIC"),
+    ("kr.co.ebs.middle", "EBS 중학", "STUDY_VIDEO"),
+    ("com.coupang.mobile", "쿠팡", "SHOPPING"),
+    ("com.my.unknown.app", "Unknown", "Uncategorized"),
+]
+
+
+def seed(rng):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    n, k = args.users, args.logs_per_day
+    first_day = TODAY - timedelta(days=args.days - 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [{"id": u, "nickname": f"bench{u}"} for u in range(1, n + 1)])
+        for d in range(args.days):
+            start_ms, _ = day_range_ms(first_day + timedelta(days=d))
+            starts = np.sort(rng.integers(0, 86_000, size=(n, k)), axis=1)
+            pkg = rng.integers(0, len(PACKAGES), size=(n, k))
+            duration = rng.integers(1, 1800, size=(n, k))
+            first = start_ms + starts * 1000 + np.arange(k)
+            unlock = np.cumsum(rng.integers(0, 3, size=(n, k)), axis=1)
+            conn.execute(insert(UsageLog), [
+                {
+                    "user_id": u + 1,
+                    "package_name": PACKAGES[p][0],
+                    "app_name": PACKAGES[p][1],
+                    "category": PACKAGES[p][2],
+                    "usage_duration": dur,
+                    "first_time_stamp": f,
+                    "last_time_stamp": f + dur * 1000,
+                    "unlock_count": un,
+                    "is_night_mode": bool(f % 5 == 0),
+                }
+                for u, p, dur, f, un in zip(
+                    np.repeat(np.arange(n), k).tolist(), pkg.ravel().tolist(), duration.ravel().tolist(),
+                    first.ravel().tolist(), unlock.ravel().tolist(),
+                )
+            ])
+
+
+def db_size() -> int:
+    with engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+    return os.path.getsize(DB_PATH)
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, names in os.walk(path) for f in names)
+
+
+def deflated_size(path: str) -> int:
+    # 같은 배열을 deflate 압축으로 저장했을 때 크기 (LOG_ARCHIVE_COMPRESS=true)
+    total = 0
+    for d, _, names in os.walk(path):
+        for name in names:
+            with np.load(os.path.join(d, name)) as data:
+                buf = io.BytesIO()
+                np.savez_compressed(buf, **{k: data[k] for k in data.files})
+                total += buf.tell()
+    return total
+
+
+def all_pages(user_ids, limit=700):
+    # get_logs 를 끝까지 넘긴 결과
+    result = {}
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            items, after = [], None
+            while True:
+                page = _get_logs_page(db, user_id, None, None, after, limit)
+                items += [item.model_dump() for item in page["items"]]
+                if not page["next_cursor"]:
+                    break
+                after = decode_cursor(page["next_cursor"])
+            result[user_id] = items
+    return result
+
+
+def old_range(cutoff_ms):
+    first_day = TODAY - timedelta(days=args.days - 1)
+    return day_range_ms(first_day)[0], cutoff_ms
+
+
+def scan_db(user_ids, start_ms, end_ms):
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        rows = 0
+        for user_id in user_ids:
+            rows += len(db.execute(
+                select(UsageLog.__table__).where(
+                    UsageLog.user_id == user_id,
+                    UsageLog.first_time_stamp >= start_ms,
+                    UsageLog.first_time_stamp < end_ms,
+                ).order_by(UsageLog.first_time_stamp, UsageLog.id)
+            ).all())
+        return rows, time.perf_counter() - started
+
+
+def category_totals_db(start_ms, end_ms):
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        totals = dict(db.execute(
+            select(UsageLog.category, func.sum(UsageLog.usage_duration))
+            .where(UsageLog.first_time_stamp >= start_ms, UsageLog.first_time_stamp < end_ms)
+            .group_by(UsageLog.category)
+        ).all())
+        return totals, time.perf_counter() - started
+
+
+def category_totals_archive(user_ids):
+    # 컬럼만 memmap 으로: category 코드 + usage_duration (문자열 / 다른 컬럼은 읽지 않음)
+    started = time.perf_counter()
+    totals = defaultdict(int)
+    for user_id in user_ids:
+        for key in archived_months(user_id):
+            month = ArchiveMonth(user_id, archive_path(user_id, key))
+            a = month.arrays
+            sums = np.bincount(a["category"], weights=a["usage_duration"], minlength=len(a["category_vocab"]))
+            for name, seconds in zip(a["category_vocab"].tolist(), sums.tolist()):
+                totals[name] += int(seconds)
+    return dict(totals), time.perf_counter() - started
+
+
+def main():
+    rng = np.random.default_rng(3)
+    started = time.perf_counter()
+    seed(rng)
+    total_rows = args.users * args.days * args.logs_per_day
+    print(f"seed        : {args.users} users x {args.days} days = {total_rows} logs in {time.perf_counter() - started:.1f}s")
+
+    key, cutoff_ms = archive_cutoff(TODAY, args.after_days)
+    start_ms, end_ms = old_range(cutoff_ms)
+    sample = list(range(1, args.users + 1, max(1, args.users // args.sample_users)))[:args.sample_users]
+
+    before_size = db_size()
+    before_pages = all_pages(sample)
+    old_rows, db_scan = scan_db(sample, start_ms, end_ms)
+    db_totals, db_agg = category_totals_db(start_ms, end_ms)
+
+    stats = run_archive_job(args.after_days, chunk_size=200, root=ARCHIVE_DIR, today=TODAY)
+    print(f"archive job : {stats['rows']} rows before {key} -> {stats['files']} files in {stats['seconds']:.1f}s "
+          f"({stats['rows'] / stats['seconds']:,.0f} rows/s)")
+
+    after_size = db_size()
+    stored = dir_size(ARCHIVE_DIR)
+    deflated = deflated_size(ARCHIVE_DIR)
+    moved = stats["rows"]
+    print(f"storage     : DB {before_size / 1e6:7.1f} MB -> {after_size / 1e6:7.1f} MB "
+          f"(freed {(before_size - after_size) / 1e6:.1f} MB for {moved} rows, {(before_size - after_size) / moved:.0f} B/row)")
+    print(f"  archive   : {stored / 1e6:7.1f} MB stored ({stored / moved:.1f} B/row, memmap)  "
+          f"{deflated / 1e6:7.1f} MB deflate ({deflated / moved:.1f} B/row)  -> "
+          f"x{(before_size - after_size) / stored:.1f} / x{(before_size - after_size) / deflated:.1f} smaller")
+
+    started = time.perf_counter()
+    archived_rows = sum(1 for user_id in sample for _ in iter_archived_logs(
+        user_id, datetime.fromtimestamp(start_ms / 1000), datetime.fromtimestamp(end_ms / 1000)))
+    archive_scan = time.perf_counter() - started
+    assert archived_rows == old_rows, (archived_rows, old_rows)
+    print(f"scan        : {len(sample)} users, {old_rows} old rows (rows -> dict)  "
+          f"DB {db_scan * 1000:6.0f} ms / archive {archive_scan * 1000:6.0f} ms  x{db_scan / archive_scan:.1f}")
+
+    archive_totals, archive_agg = category_totals_archive(range(1, args.users + 1))
+    assert archive_totals == db_totals, (archive_totals, db_totals)
+    print(f"aggregate   : category totals over all {moved} old rows  "
+          f"SQL {db_agg * 1000:6.0f} ms / memmap columns {archive_agg * 1000:6.0f} ms  x{db_agg / archive_agg:.1f}")
+
+    after_pages = all_pages(sample)
+    same = sum(before_pages[u] == after_pages[u] for u in sample)
+    print(f"get_logs    : {same}/{len(sample)} users identical across all pages "
+          f"({sum(len(v) for v in after_pages.values())} rows, archive + live)")
+    assert same == len(sample)
+
+    # 다시 돌려도 바뀌지 않는다
+    again = run_archive_job(args.after_days, chunk_size=200, root=ARCHIVE_DIR, today=TODAY)
+    assert again["rows"] == 0 and dir_size(ARCHIVE_DIR) == stored
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
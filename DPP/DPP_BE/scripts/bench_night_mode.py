@@ -0,0 +1,73 @@
+# 야간 모드 판별 마이크로 벤치마크
+# - legacy : 로그마다 to_str 클로저 정의 + "%H:%M" 문자열 비교 (기존 upload_logs 방식)
+# - window : 요청당 한 번 만든 NightWindow 로 분 단위 정수 비교
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_night_mode.py --n 1000000
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.night_mode import NightWindow
+
+
+class FakeUser:
+    night_mode_start = "23:00"
+    night_mode_end = "07:00"
+
+
+def legacy_is_night(user, start_time):
+    log_time_str = start_time.strftime("%H:%M")
+    is_night_mode = False
+
+    def to_str(t):
+        if isinstance(t, str):
+            return t[:5]
+        return t.strftime("%H:%M")
+
+    n_start = to_str(user.night_mode_start)
+    n_end = to_str(user.night_mode_end)
+
+    if n_start > n_end:
+        if log_time_str >= n_start or log_time_str < n_end:
+            is_night_mode = True
+    else:
+        if n_start <= log_time_str < n_end:
+            is_night_mode = True
+    return is_night_mode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    base = datetime(2025, 1, 1)
+    times = [base + timedelta(minutes=random.randrange(60 * 24 * 30)) for _ in range(args.n)]
+    user = FakeUser()
+
+    started = time.perf_counter()
+    legacy = [legacy_is_night(user, t) for t in times]
+    legacy_sec = time.perf_counter() - started
+
+    started = time.perf_counter()
+    window = NightWindow.from_user(user)
+    fast = [window.contains(t) for t in times]
+    window_sec = time.perf_counter() - started
+
+    assert legacy == fast, "결과가 기존 방식과 다릅니다"
+
+    print(f"legacy : {legacy_sec:6.3f}s ({args.n / legacy_sec:12,.0f} logs/s)")
+    print(f"window : {window_sec:6.3f}s ({args.n / window_sec:12,.0f} logs/s)")
+    print(f"speedup: x{legacy_sec / window_sec:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# 캐릭터 / 업적 해금(app/services/unlocks.py) 확인 + 속도
+# 해금 조건 수천 개 (XP / LEVEL / STREAK + 다루지 않는 SHOP) 카탈로그와 유저 N 명을 sqlite 에 만들고, 같은 DB 복사본에서
+# - before: XP 가 바뀔 때마다 카탈로그 전체와 그 유저의 보유 목록을 읽어 모든 조건을 대조
+# - after : 카탈로그를 지표별 정렬 배열로 한 번 읽어 두고 old -> new 사이만 이분 탐색 + 충돌 무시 INSERT
+#   (둘 다 XP 지급은 grant_many 로 같게, 100 건마다 commit)
+# 두 결과(보유 캐릭터 / 업적)가 같은지, 판정만의 속도, 한 번에 수천 개 해금,
+# STREAK: 긴 기록(STREAK_LOOKBACK_DAYS 보다 긴 연속 포함) 위에서 배포 시 채우기 + 마지막 며칠 배치 (결과 = 직접 계산)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/bench_unlocks.py
+#   python scripts/bench_unlocks.py --users 20000 --catalog 10000 --grants 3000
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--users", type=int, default=2000)
+parser.add_argument("--catalog", type=int, default=5000, help="캐릭터 + 업적 수 (절반씩)")
+parser.add_argument("--grants", type=int, default=1000, help="before 가 느려서 (지급마다 카탈로그 전체) 적게")
+parser.add_argument("--batch", type=int, default=100, help="commit 한 번에 처리하는 지급 건수")
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(tmp.name, "bench.db")
+BASE_PATH = os.path.join(tmp.name, "base.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from sqlalchemy import event, insert, select
+
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.jobs.backfill_unlocks import run_unlock_backfill
+from app.jobs.streak_unlocks import run_streak_job
+from app.models.calendar import DailyReports
+from app.models.gamification import Achievements, Characters, UserAchievements, UserCharacters
+from app.models.user import Users
+from app.services import xp as xp_service
+from app.services.daily_rollup import STREAK_LOOKBACK_DAYS, streak_days
+from app.services.unlocks import (
+    ACHIEVEMENT, CHARACTER, LEVEL, STREAK, XP, Change, UnlockCatalog, apply_unlocks, unlock_catalog,
+)
+from app.services.xp import Grant, grant_many, level_for
+
+DAY = date(2026, 3, 1)
+# daily_reports 기록 일수 / 그중 마지막 며칠은 날마다 배치 (그 전날 기준으로 배포 시 채우기)
+STREAK_DAYS = 150
+RUN_DAYS = 10
+# (unlock_type, 비율, 값 범위)
+KINDS = [(XP, 0.55, (1, 200_000)), (LEVEL, 0.2, (1, 100)), (STREAK, 0.15, (1, STREAK_DAYS)), ("SHOP", 0.1, (100, 5000))]
+
+
+def random_catalog(rng, n):
+    entries = []
+    for i in range(n):
+        unlock_type, _, (lo, hi) = rng.choices(KINDS, weights=[k[1] for k in KINDS])[0]
+        # 대소문자 / 공백이 섞여 들어와도 같은 지표
+        raw = rng.choice([unlock_type, unlock_type.lower(), f" {unlock_type} "])
+        entries.append((CHARACTER if i % 2 else ACHIEVEMENT, i // 2 + 1, raw, rng.randint(lo, hi)))
+    return entries
+
+
+def seed(rng):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    catalog = random_catalog(rng, args.catalog)
+    with engine.begin() as conn:
+        conn.execute(insert(Users), [
+            {"id": u, "nickname": f"bench{u}", "current_xp": rng.randrange(0, 20_000), "target_time": rng.choice([None, 180])}
+            for u in range(1, args.users + 1)
+        ])
+        conn.execute(insert(Characters), [
+            {"id": i, "name": f"c{i}", "unlock_type": t, "unlock_value": v} for kind, i, t, v in catalog if kind == CHARACTER
+        ])
+        conn.execute(insert(Achievements), [
+            {"id": i, "title": f"a{i}", "unlock_type": t, "unlock_value": v} for kind, i, t, v in catalog if kind == ACHIEVEMENT
+        ])
+    # 지금 XP / 레벨까지의 해금은 이미 가진 상태로 (배포할 때 한 번 채우기)
+    backfill = run_unlock_backfill(DAY)
+    engine.dispose()
+    shutil.copyfile(DB_PATH, BASE_PATH)
+    return catalog, backfill
+
+
+def restore():
+    engine.dispose()
+    shutil.copyfile(BASE_PATH, DB_PATH)
+    # 다음 ensure_loaded 에서 다시 읽는다
+    unlock_catalog._table = None
+
+
+def owned():
+    with SessionLocal() as db:
+        return (
+            set(db.execute(select(UserCharacters.user_id, UserCharacters.character_id)).all()),
+            set(db.execute(select(UserAchievements.user_id, UserAchievements.achievement_id)).all()),
+        )
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *a):
+        self.count += 1
+
+
+def naive_unlocks(db, balances):
+    # before: 바뀐 유저마다 카탈로그 전체 + 보유 목록을 읽어 모든 조건 대조
+    for b in balances.values():
+        level = level_for(b.new_xp)
+        for model, owned_model, column in (
+            (Characters, UserCharacters, "character_id"),
+            (Achievements, UserAchievements, "achievement_id"),
+        ):
+            have = set(db.scalars(select(getattr(owned_model, column)).where(owned_model.user_id == b.user_id)))
+            for target in db.scalars(select(model)):
+                unlock_type = (target.unlock_type or "").strip().upper()
+                value = {XP: b.new_xp, LEVEL: level}.get(unlock_type)
+                if value is not None and (target.unlock_value or 0) <= value and target.id not in have:
+                    db.add(owned_model(user_id=b.user_id, **{column: target.id}))
+        db.flush()
+
+
+def run_grants(grants, before):
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for i in range(0, len(grants), args.batch):
+            balances = grant_many(db, grants[i:i + args.batch])
+            if before:
+                naive_unlocks(db, balances)
+            db.commit()
+    return time.perf_counter() - started
+
+
+def bench_evaluate(rng, catalog):
+    # 판정만 (DB 없이): 카탈로그 전체 대조 vs 정렬 배열 이분 탐색
+    evaluator = UnlockCatalog()
+    evaluator.load(catalog)
+    entries = [(kind, i, (t or "").strip().upper(), v) for kind, i, t, v in catalog]
+    changes = []
+    for _ in range(20000):
+        old = rng.randrange(0, 200_000)
+        changes.append(Change(1, XP, old, old + rng.randrange(1, 3000)))
+    started = time.perf_counter()
+    linear = [
+        [(kind, i) for kind, i, t, v in entries if t == c.unlock_type and c.old < v <= c.new] for c in changes
+    ]
+    linear_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    fast = [evaluator.crossed(c.unlock_type, c.old, c.new) for c in changes]
+    fast_seconds = time.perf_counter() - started
+    assert [sorted(a) for a in linear] == [sorted(b) for b in fast]
+    print(f"evaluate    : {len(changes)} XP changes vs {len(catalog)} unlocks ({evaluator.stats()}) "
+          f"scan {linear_seconds * 1e6 / len(changes):7.1f} us / bisect {fast_seconds * 1e6 / len(changes):5.2f} us per change "
+          f"-> x{linear_seconds / fast_seconds:.0f}")
+
+
+def bench_bulk():
+    # 한 번에 수천 개: 모든 유저에게 큰 XP (챌린지 확정 배치처럼 유저별로 합쳐서)
+    restore()
+    before = owned()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        grant_many(db, [Grant(u, 20_000, reason="BENCH") for u in range(1, args.users + 1)])
+        db.commit()
+    seconds = time.perf_counter() - started
+    after = owned()
+    added = len(after[0] - before[0]) + len(after[1] - before[1])
+    print(f"bulk        : +20000 xp to {args.users} users -> {added} unlocks in {seconds:.2f}s "
+          f"({added / seconds:,.0f} unlocks/s incl. XP update + ledger)")
+
+
+def bench_streak(rng):
+    # 배포 시 채우기(전날까지 연속 일수) + 날마다 배치를 돌린 결과 = 그 기간 유저별 최대 연속 일수 이상인 STREAK 조건 전부
+    restore()
+    reports = []
+    for u in range(1, args.users + 1):
+        # 20% 는 하루도 빠지지 않고 목표 안으로 (연속이 STREAK_LOOKBACK_DAYS 를 넘는다)
+        steady = rng.random() < 0.2
+        good = 1.0 if steady else rng.random()
+        for d in range(STREAK_DAYS):
+            if steady or rng.random() < 0.9:
+                total = rng.randrange(0, 180 * 60) if rng.random() < good else rng.randrange(180 * 60 + 1, 400 * 60)
+                reports.append({"user_id": u, "date": DAY + timedelta(days=d), "total_time": total})
+    with engine.begin() as conn:
+        conn.execute(insert(DailyReports), reports)
+    before = owned()
+    first_run = STREAK_DAYS - RUN_DAYS
+    started = time.perf_counter()
+    backfill = run_unlock_backfill(DAY + timedelta(days=first_run - 1))
+    backfill_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    stats = [run_streak_job(DAY + timedelta(days=d)) for d in range(first_run, STREAK_DAYS)]
+    seconds = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        targets = dict(db.execute(select(Users.id, Users.target_time)).all())
+        thresholds = [
+            (CHARACTER, i, v) for i, t, v in db.execute(select(Characters.id, Characters.unlock_type, Characters.unlock_value))
+            if t.strip().upper() == STREAK
+        ] + [
+            (ACHIEVEMENT, i, v) for i, t, v in db.execute(select(Achievements.id, Achievements.unlock_type, Achievements.unlock_value))
+            if t.strip().upper() == STREAK
+        ]
+    days = defaultdict(dict)
+    for r in reports:
+        days[r["user_id"]][r["date"]] = r["total_time"]
+    expected = (set(before[0]), set(before[1]))
+    longest = 0
+    for u in range(1, args.users + 1):
+        best = max(
+            streak_days(days[u], DAY + timedelta(days=d), (targets[u] or 0) * 60) for d in range(first_run - 1, STREAK_DAYS)
+        )
+        longest = max(longest, best)
+        for kind, i, v in thresholds:
+            if v <= best:
+                expected[0 if kind == CHARACTER else 1].add((u, i))
+    after = owned()
+    added = len(after[0] - before[0]) + len(after[1] - before[1])
+    long_unlocks = sum(
+        1 for kind, i, v in thresholds if v > STREAK_LOOKBACK_DAYS
+        for u in range(1, args.users + 1) if (u, i) in after[0 if kind == CHARACTER else 1]
+    )
+    print(f"streak      : backfill at day {first_run} in {backfill_seconds:.2f}s + {RUN_DAYS} daily runs for {args.users} users "
+          f"in {seconds:.2f}s ({seconds / RUN_DAYS * 1000:.0f} ms/day) -> {added} unlocks "
+          f"({long_unlocks} over {STREAK_LOOKBACK_DAYS} days, longest streak {longest}), "
+          f"same as direct calculation: {after == expected}")
+    assert after == expected
+    assert long_unlocks > 0
+    again = run_streak_job(DAY + timedelta(days=STREAK_DAYS - 1))
+    assert owned() == after and again["users"] > 0
+
+
+def main():
+    rng = random.Random(7)
+    catalog, backfill = seed(rng)
+    statements = StatementCounter()
+    grants = [Grant(rng.randrange(1, args.users + 1), rng.randrange(1, 3000), reason="BENCH") for _ in range(args.grants)]
+    print(f"seed        : {args.users} users, {len(catalog)} unlocks, "
+          f"{backfill['characters'] + backfill['achievements']} already owned from current xp / level (backfill job)")
+
+    # before: grant_many 의 해금 확인을 끄고 전체 대조로
+    restore()
+    original = xp_service.apply_unlocks
+    xp_service.apply_unlocks = lambda db, changes: None
+    count = statements.count
+    before_seconds = run_grants(grants, before=True)
+    before_statements = statements.count - count
+    xp_service.apply_unlocks = original
+    before = owned()
+
+    restore()
+    count = statements.count
+    after_seconds = run_grants(grants, before=False)
+    after_statements = statements.count - count
+    after = owned()
+
+    base = backfill["characters"] + backfill["achievements"]
+    print(f"before      : {before_seconds:6.2f}s  {before_statements} SQL  ({args.grants} grants, "
+          f"{len(before[0]) + len(before[1]) - base} new unlocks)")
+    print(f"after       : {after_seconds:6.2f}s  {after_statements} SQL  "
+          f"({len(after[0]) + len(after[1]) - base} new unlocks)  -> x{before_seconds / after_seconds:.1f}")
+    assert after == before, "owned characters / achievements differ from the full scan"
+
+    bench_evaluate(rng, catalog)
+    bench_bulk()
+    bench_streak(rng)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
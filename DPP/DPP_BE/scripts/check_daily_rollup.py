@@ -0,0 +1,60 @@
+# daily_reports 집계 정합성 검사
+# 원본 로그(usage_logs + 보관 파일)로 하루 집계를 다시 계산해서 저장된 값과 비교한다.
+#
+# 사용법 (DPP_BE 폴더에서, .env 의 DATABASE_URL 사용)
+#   python scripts/check_daily_rollup.py --user-id 1 --date 2026-01-20
+#   python scripts/check_daily_rollup.py --user-id 1 --date 2026-01-20 --fix   # 다시 계산한 값으로 덮어쓰기
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+import app.models  # noqa: F401  (relationship 문자열 참조 해석용)
+from app.models.calendar import DailyReports
+from app.models.user import Users
+from app.services.daily_rollup import diff_daily_rollup, get_daily_rollup, ROLLUP_FIELDS
+from app.services.night_mode import NightWindow
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--date", type=date.fromisoformat, required=True)
+    parser.add_argument("--fix", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.get(Users, args.user_id)
+        if not user:
+            sys.exit(f"user {args.user_id} not found")
+
+        diff = diff_daily_rollup(db, args.user_id, args.date, NightWindow.from_user(user))
+        if not diff:
+            print("OK: 저장된 집계와 원본 로그가 일치합니다.")
+            return
+
+        print(json.dumps(diff, ensure_ascii=False, indent=2, default=str))
+        if args.fix:
+            report = get_daily_rollup(db, args.user_id, args.date)
+            if report is None:
+                report = DailyReports(user_id=args.user_id, date=args.date)
+                db.add(report)
+            for field in ROLLUP_FIELDS:
+                if field in diff:
+                    setattr(report, field, diff[field]["rebuilt"])
+            db.commit()
+            print("FIXED")
+        else:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
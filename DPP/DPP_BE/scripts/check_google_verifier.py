@@ -0,0 +1,159 @@
+# 구글 ID 토큰 검증기(GoogleTokenVerifier) 오프라인 점검
+# 로컬에서 RSA 키를 만들고, 가짜 인증서(JWKS) 서버를 띄워서 구글 없이 검증 흐름을 확인한다.
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/check_google_verifier.py
+#   python scripts/check_google_verifier.py --logins 1000   (토큰 서명이 느려서 준비 시간이 꽤 걸림)
+#
+# 확인하는 것
+# - 로그인 N번에 인증서 요청은 한 번만 나가는지 (Cache-Control max-age 캐시)
+# - 같은 토큰 재시도는 서명 검증 없이 캐시에서 바로 나오는지
+# - 키 교체(모르는 kid) 시 한 번 다시 받아오는지, 엉터리 kid 로는 계속 받아오지 않는지
+# - audience 불일치 / 만료 토큰 / 발행처 불일치는 ValueError 인지
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.auth import GoogleTokenVerifier
+
+AUDIENCE = "test-client.apps.googleusercontent.com"
+
+
+def make_key(kid: str):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public = jwk.construct(
+        private.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode(),
+        "RS256",
+    ).to_dict()
+    public.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return pem, public
+
+
+def sign(pem: str, kid: str, sub: str, aud: str = AUDIENCE, iss: str = "https://accounts.google.com", exp_in: int = 3600):
+    now = int(time.time())
+    claims = {
+        "iss": iss,
+        "aud": aud,
+        "sub": sub,
+        "email": f"{sub}@example.com",
+        "name": sub,
+        "iat": now,
+        "exp": now + exp_in,
+    }
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+def serve_jwks(state: dict):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = json.dumps({"keys": state["keys"]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Cache-Control", "public, max-age=3600")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/certs"
+
+
+def expect_invalid(verifier: GoogleTokenVerifier, token: str, label: str):
+    try:
+        verifier.verify(token)
+    except ValueError as e:
+        print(f"  {label:<20} -> ValueError ({e})")
+        return
+    raise SystemExit(f"FAIL: {label} 토큰이 통과했습니다")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=300, help="서로 다른 토큰 개수")
+    args = parser.parse_args()
+
+    pem1, pub1 = make_key("key-1")
+    state = {"keys": [pub1]}
+    server, url = serve_jwks(state)
+    now = [time.time()]
+    verifier = GoogleTokenVerifier(AUDIENCE, certs_url=url, clock=lambda: now[0])
+
+    tokens = [sign(pem1, "key-1", f"user{i}") for i in range(args.logins)]
+
+    # 1. 서로 다른 토큰 N개: 인증서 요청은 한 번
+    started = time.perf_counter()
+    for token in tokens:
+        verifier.verify(token)
+    first = time.perf_counter() - started
+    print(f"{args.logins} logins (signature check): {first * 1000 / args.logins:.3f} ms/login, "
+          f"cert fetches={verifier.cert_fetches}")
+    assert verifier.cert_fetches == 1
+
+    # 2. 같은 토큰 재시도: 검증 결과 캐시
+    started = time.perf_counter()
+    for token in tokens:
+        verifier.verify(token)
+    again = time.perf_counter() - started
+    print(f"{args.logins} retries (verified cache): {again * 1000 / args.logins:.4f} ms/login, "
+          f"hits={verifier.verified_hits}")
+    assert verifier.verified_hits == args.logins
+
+    # 3. 키 교체: 모르는 kid 가 오면 만료 전이라도 다시 받는다 (min_refetch_interval 이후)
+    pem2, pub2 = make_key("key-2")
+    state["keys"] = [pub1, pub2]
+    rotated = sign(pem2, "key-2", "rotated")
+    expect_invalid(verifier, rotated, "rotated (too soon)")
+    now[0] += verifier.min_refetch_interval
+    claims = verifier.verify(rotated)
+    print(f"key rotation: sub={claims['sub']}, cert fetches={verifier.cert_fetches}")
+    assert verifier.cert_fetches == 2
+
+    # 엉터리 kid 를 계속 보내도 인증서 요청은 늘지 않는다
+    unknown = sign(pem1, "nope", "x")
+    for _ in range(100):
+        try:
+            verifier.verify(unknown)
+        except ValueError:
+            pass
+    expect_invalid(verifier, unknown, "unknown kid")
+    assert verifier.cert_fetches == 2
+
+    # 4. 잘못된 토큰들
+    print("invalid tokens")
+    expect_invalid(verifier, sign(pem1, "key-1", "x", aud="other-client"), "wrong audience")
+    expect_invalid(verifier, sign(pem1, "key-1", "x", exp_in=-60), "expired")
+    expect_invalid(verifier, sign(pem1, "key-1", "x", iss="https://evil.example.com"), "wrong issuer")
+    expect_invalid(verifier, sign(pem2, "key-1", "x"), "bad signature")
+    expect_invalid(verifier, "not-a-jwt", "malformed")
+    expect_invalid(verifier, "", "empty")
+
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
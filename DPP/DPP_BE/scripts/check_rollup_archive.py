@@ -0,0 +1,156 @@
+# 보관(app/jobs/archive_logs.py) 뒤 daily_reports 정합성 확인
+# 오래된 달 / 이번 달 로그를 API 로 올리고 보관 배치를 돌린 뒤
+# - diff_daily_rollup (check_daily_rollup.py 가 쓰는 것) 이 보관된 날도 일치로 보는지
+# - 보관된 기록을 다시 올리면 저장 0 건, daily_reports 가 그대로인지
+# - 보관된 달에 늦게 올라온 새 기록은 저장되고, 보관 파일 + usage_logs 를 합쳐서 다시 계산해도 일치하는지
+# - end_time < start_time 업로드는 400, 이미 DB 에 있는 이상한 행 (종료 < 시작, 50 일 세션, int32 밖 값) 도
+#   보관이 멈추지 않고 (뒤 유저까지) 값 그대로 보관되는지
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/check_rollup_archive.py
+
+import os
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+tmp = tempfile.TemporaryDirectory()
+ARCHIVE_DIR = os.path.join(tmp.name, "archive")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp.name, 'check.db')}"
+os.environ["LOG_ARCHIVE_DIR"] = ARCHIVE_DIR
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select
+
+from app.core.auth import create_access_token
+from app.core.config import APP_TIMEZONE
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.log import router as log_router
+from app.jobs.archive_logs import run_archive_job
+from app.models.usage_log import UsageLog
+from app.models.user import Users
+from app.services.daily_rollup import ROLLUP_FIELDS, diff_daily_rollup, get_daily_rollup
+from app.services.log_archive import archived_months, iter_archived_logs
+from app.services.log_ingest import to_ms
+from app.services.night_mode import NightWindow
+
+TODAY = date(2026, 6, 15)
+OLD_DAY = date(2026, 4, 10)
+NEW_DAY = date(2026, 6, 14)
+PACKAGES = [("com.instagram.android", "Instagram", "SNS"), ("com.google.android.youtube", "YouTube", "VIDEO")]
+
+
+def body(day: date, hours, unlock_count: int = 5) -> dict:
+    logs = []
+    for i, hour in enumerate(hours):
+        package, name, category = PACKAGES[i % len(PACKAGES)]
+        start = datetime.combine(day, time(hour, 10), tzinfo=APP_TIMEZONE)
+        logs.append({
+            "package_name": package, "app_name": name, "category": category, "usage_time": 600 + i,
+            "start_time": start.isoformat(), "end_time": (start + timedelta(minutes=10)).isoformat(),
+            "unlock_count": unlock_count + i,
+        })
+    return {"logs": logs, "unlock_count": unlock_count}
+
+
+def stored(db, user_id: int, day: date) -> dict:
+    db.expire_all()
+    report = get_daily_rollup(db, user_id, day)
+    return {field: getattr(report, field) for field in ROLLUP_FIELDS}
+
+
+def main():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    check_app = FastAPI()
+    check_app.include_router(log_router, prefix="/api/v1/logs")
+    client = TestClient(check_app)
+    with SessionLocal() as db:
+        user = Users(nickname="archive_check")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+        auth = {"Authorization": f"Bearer {create_access_token(user)}"}
+        night = NightWindow.from_user(user)
+
+    def upload(payload) -> str:
+        r = client.post("/api/v1/logs", json=payload, headers=auth)
+        assert r.status_code == 200, r.text
+        return r.json()["message"]
+
+    old, new = body(OLD_DAY, [1, 9, 13, 23]), body(NEW_DAY, [8, 22])
+    upload(old)
+    upload(new)
+    with SessionLocal() as db:
+        assert diff_daily_rollup(db, user_id, OLD_DAY, night) == {}
+        before = stored(db, user_id, OLD_DAY)
+
+    stats = run_archive_job(after_days=30, root=ARCHIVE_DIR, today=TODAY)
+    with SessionLocal() as db:
+        live = db.scalar(select(func.count()).select_from(UsageLog).where(UsageLog.user_id == user_id))
+        assert stats["rows"] == 4 and live == 2 and archived_months(user_id, ARCHIVE_DIR) == ["2026-04"], (stats, live)
+        for day in (OLD_DAY, NEW_DAY):
+            assert diff_daily_rollup(db, user_id, day, night) == {}, (day, diff_daily_rollup(db, user_id, day, night))
+    print(f"archive     : {stats['rows']} rows of {OLD_DAY} moved, diff_daily_rollup still matches for both days")
+
+    message = upload(old)
+    with SessionLocal() as db:
+        live = db.scalar(select(func.count()).select_from(UsageLog).where(UsageLog.user_id == user_id))
+        assert "0개의 새로운" in message and live == 2, (message, live)
+        assert stored(db, user_id, OLD_DAY) == before
+    print(f"re-upload   : {message} -> daily_reports unchanged")
+
+    message = upload(body(OLD_DAY, [15], unlock_count=20))
+    with SessionLocal() as db:
+        assert "1개의 새로운" in message, message
+        assert stored(db, user_id, OLD_DAY)["total_time"] == before["total_time"] + 600
+        assert diff_daily_rollup(db, user_id, OLD_DAY, night) == {}, diff_daily_rollup(db, user_id, OLD_DAY, night)
+    print(f"late upload : {message} -> archive + usage_logs rebuild matches")
+
+    bad = body(OLD_DAY, [18])
+    bad["logs"][0]["end_time"] = bad["logs"][0]["start_time"].replace("T18:10", "T17:10")
+    r = client.post("/api/v1/logs", json=bad, headers=auth)
+    assert r.status_code == 400, r.text
+
+    # 검사가 생기기 전에 저장된 행 흉내 (DB 에 바로 넣는다)
+    start = to_ms(datetime.combine(OLD_DAY, time(20), tzinfo=APP_TIMEZONE))
+    odd = [
+        {"package_name": "odd.backwards", "first_time_stamp": start, "last_time_stamp": start - 500,
+         "usage_duration": 60, "unlock_count": 1},
+        {"package_name": "odd.long", "first_time_stamp": start + 1, "last_time_stamp": start + 1 + 50 * 86_400_000,
+         "usage_duration": 50 * 86_400, "unlock_count": 2 ** 31},
+        {"package_name": "odd.huge", "first_time_stamp": start + 2, "last_time_stamp": None,
+         "usage_duration": -(2 ** 40), "unlock_count": -1},
+    ]
+    with SessionLocal() as db:
+        later = Users(nickname="archive_check_later")
+        db.add(later)
+        db.commit()
+        later_id = later.id
+        db.execute(insert(UsageLog), [
+            {**row, "user_id": user_id, "app_name": row["package_name"], "category": "ETC", "is_night_mode": False}
+            for row in odd
+        ])
+        db.commit()
+        upload_as = {"Authorization": f"Bearer {create_access_token(later)}"}
+    r = client.post("/api/v1/logs", json=body(OLD_DAY, [7]), headers=upload_as)
+    assert r.status_code == 200, r.text
+
+    stats = run_archive_job(after_days=30, root=ARCHIVE_DIR, today=TODAY)
+    # 앞에서 늦게 올라온 1 건 + 이상한 행 3 건 + 뒤 유저 1 건
+    assert stats["rows"] == 5 and archived_months(later_id, ARCHIVE_DIR) == ["2026-04"], stats
+    got = {
+        row["package_name"]: {col: row[col] for col in ("first_time_stamp", "last_time_stamp", "usage_duration", "unlock_count")}
+        for row in iter_archived_logs(user_id, root=ARCHIVE_DIR) if row["package_name"].startswith("odd.")
+    }
+    assert got == {row["package_name"]: {k: v for k, v in row.items() if k != "package_name"} for row in odd}, got
+    print(f"odd rows    : end < start upload -> 400, {len(odd)} odd stored rows archived as-is, next user archived too")
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
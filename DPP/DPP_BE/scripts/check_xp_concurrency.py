@@ -0,0 +1,186 @@
+# XP / 코인 지급(app/services/xp.py) 동시성 확인
+# 스레드 N 개가 같은 유저에게 M 번씩 지급 (지급마다 세션 / commit 따로) 한 뒤
+# - 원자적 UPDATE ... RETURNING (grant): 최종 XP = 처음 값 + 지급 합, ledger 가 N*M 줄, 변경 후 값이 모두 다른지
+# - before: 읽어서 더한 뒤 저장 (user.current_xp = user.current_xp + n): 사라진 증분 / 에러 수
+# - 여러 유저 한 번에 지급(grant_many) = 한 건씩 지급한 결과와 같은지, 레벨 구간표 경계
+# - API: /xp/status, /xp/xp-up (X-Admin-Key 만, 상한 / level_up)
+#
+# 사용법 (DPP_BE 폴더에서)
+#   python scripts/check_xp_concurrency.py
+#   python scripts/check_xp_concurrency.py --threads 16 --grants 200
+#   python scripts/check_xp_concurrency.py --database-url postgresql://user:pw@localhost/dpp_check   (빈 DB 로)
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--threads", type=int, default=8)
+parser.add_argument("--grants", type=int, default=100, help="스레드마다 지급 횟수")
+parser.add_argument("--database-url", default=None, help="비우면 임시 sqlite (테이블을 지우고 다시 만든다)")
+args = parser.parse_args()
+
+tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'check.db')}"
+os.environ["ADMIN_API_KEY"] = "check-admin"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.core.auth import create_access_token
+from app.core.config import XP_UP_MAX_AMOUNT
+from app.core.database import Base, SessionLocal, engine
+import app.models  # noqa: F401
+from app.api.v1.endpoints.gamification import router as gamification_router
+from app.models.gamification import XpLedger
+from app.models.user import Users
+from app.services.xp import LEVEL_THRESHOLDS, MAX_LEVEL, Grant, grant, grant_many, level_for, level_info
+
+START_XP = 50
+
+
+def reset():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add_all([
+            Users(id=1, nickname="hot", current_xp=START_XP, coin=0),
+            Users(id=2, nickname="naive", current_xp=START_XP, coin=0),
+        ] + [Users(id=u, nickname=f"u{u}", current_xp=None if u % 2 else 7, coin=None) for u in range(10, 40)])
+        db.commit()
+
+
+def run_threads(worker):
+    errors = []
+    barrier = threading.Barrier(args.threads)
+
+    def run(t):
+        barrier.wait()
+        for i in range(args.grants):
+            try:
+                worker(t, i)
+            except Exception as e:  # 잠금 타임아웃 등은 세고 계속
+                errors.append(type(e).__name__)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in range(args.threads)]
+    started = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    return time.perf_counter() - started, errors
+
+
+def amount(t, i):
+    return t + i % 7 + 1
+
+
+def atomic(t, i):
+    with SessionLocal() as db:
+        grant(db, 1, amount(t, i), 1, reason="CHECK", ref_id=t * args.grants + i)
+        db.commit()
+
+
+def naive(t, i):
+    with SessionLocal() as db:
+        user = db.get(Users, 2)
+        user.current_xp = (user.current_xp or 0) + amount(t, i)
+        user.coin = (user.coin or 0) + 1
+        db.commit()
+
+
+def check_concurrency():
+    expected = START_XP + sum(amount(t, i) for t in range(args.threads) for i in range(args.grants))
+    total = args.threads * args.grants
+
+    seconds, errors = run_threads(atomic)
+    with SessionLocal() as db:
+        xp, coin = db.execute(select(Users.current_xp, Users.coin).where(Users.id == 1)).one()
+        rows = db.execute(
+            select(func.count(), func.count(func.distinct(XpLedger.xp_balance)), func.max(XpLedger.xp_balance))
+            .where(XpLedger.user_id == 1)
+        ).one()
+    print(f"atomic      : {args.threads} threads x {args.grants} grants in {seconds:.2f}s -> xp {xp} (expected {expected}), "
+          f"coin {coin}, ledger {rows[0]} rows / {rows[1]} distinct balances, errors {len(errors)}")
+    assert not errors, errors
+    assert xp == expected and coin == total
+    assert rows == (total, total, expected)
+
+    seconds, errors = run_threads(naive)
+    with SessionLocal() as db:
+        xp = db.scalar(select(Users.current_xp).where(Users.id == 2))
+    applied = total - len(errors)
+    print(f"before      : read-modify-write in {seconds:.2f}s -> xp {xp} (expected {expected}), "
+          f"lost {expected - xp} xp, errors {len(errors)} {sorted(set(errors))}, {applied} commits")
+
+
+def check_grant_many():
+    # 여러 유저 / 한 유저 여러 건을 한 번에 = 한 건씩
+    grants = [Grant(u, xp=(u * k) % 13, coin=k % 3, reason="BATCH", ref_id=k) for k in range(1, 6) for u in range(10, 40)]
+    with SessionLocal() as db:
+        before = dict(db.execute(select(Users.id, func.coalesce(Users.current_xp, 0)).where(Users.id >= 10)).all())
+        balances = grant_many(db, grants)
+        db.commit()
+        after = dict(db.execute(select(Users.id, Users.current_xp).where(Users.id >= 10)).all())
+        last = {}
+        for row in db.scalars(select(XpLedger).where(XpLedger.reason == "BATCH").order_by(XpLedger.id)):
+            last[row.user_id] = row.xp_balance
+    for u in range(10, 40):
+        added = sum(g.xp for g in grants if g.user_id == u)
+        assert after[u] == before[u] + added == balances[u].new_xp == last[u], (u, after[u], before[u], added)
+    assert grant_many(db, []) == {}
+    print(f"grant_many  : {len(grants)} grants for 30 users in one UPDATE + one INSERT -> balances match ledger")
+
+    assert level_for(None) == level_for(0) == level_for(99) == 1 and level_for(100) == 2 and level_for(299) == 2
+    assert level_for(LEVEL_THRESHOLDS[-1]) == MAX_LEVEL and level_info(10 ** 9)["xp_to_next_level"] == 0
+    assert level_info(250) == {"level": 2, "level_xp": 100, "next_level_xp": 300, "xp_to_next_level": 50}
+    print(f"levels      : {MAX_LEVEL} levels, lv2 at {LEVEL_THRESHOLDS[1]} xp, lv{MAX_LEVEL} at {LEVEL_THRESHOLDS[-1]} xp")
+
+
+def check_api():
+    check_app = FastAPI()
+    check_app.include_router(gamification_router, prefix="/api/v1/gamification")
+    client = TestClient(check_app)
+    with SessionLocal() as db:
+        user = Users(id=100, nickname="api", current_xp=90)
+        db.add(user)
+        db.commit()
+        auth = {"Authorization": f"Bearer {create_access_token(user)}"}
+
+    r = client.get("/api/v1/gamification/xp/status", headers=auth)
+    assert r.status_code == 200 and r.json()["level"] == 1 and r.json()["xp_to_next_level"] == 10, r.text
+    # 유저 토큰으로는 지급 불가 (XP 는 서버가 정한다)
+    assert client.post("/api/v1/gamification/xp/xp-up", headers=auth, json={"user_id": 100, "xp": 15}).status_code == 403
+    admin = {"X-Admin-Key": "check-admin"}
+    r = client.post("/api/v1/gamification/xp/xp-up", headers=admin, json={"user_id": 100, "xp": 15, "coin": 3})
+    body = r.json()
+    assert r.status_code == 200 and body["current_xp"] == 105 and body["coin"] == 3 and body["level_up"], r.text
+    r = client.post("/api/v1/gamification/xp/xp-up", headers=admin, json={"user_id": 100, "xp": 5, "reason": "EVENT"})
+    assert r.status_code == 200 and not r.json()["level_up"], r.text
+    with SessionLocal() as db:
+        reasons = db.scalars(select(XpLedger.reason).where(XpLedger.user_id == 100).order_by(XpLedger.id)).all()
+    assert reasons == ["ADMIN", "EVENT"], reasons
+    for bad in ({"xp": XP_UP_MAX_AMOUNT + 1}, {"xp": -5}, {}, {"xp": 1, "reason": ""}):
+        assert client.post("/api/v1/gamification/xp/xp-up", headers=admin, json={"user_id": 100, **bad}).status_code == 400
+    assert client.post("/api/v1/gamification/xp/xp-up", headers=admin, json={"user_id": 999, "xp": 1}).status_code == 404
+    assert client.get("/api/v1/gamification/xp/status").status_code in (401, 403)
+    print(f"api         : /xp/status lv1 -> admin /xp/xp-up +15 -> {body['current_xp']} xp lv{body['level']} (level_up), "
+          f"user token -> 403")
+
+
+def main():
+    reset()
+    check_concurrency()
+    check_grant_many()
+    check_api()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
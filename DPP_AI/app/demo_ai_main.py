@@ -3,7 +3,7 @@ from pydantic import BaseModel
 from typing import Optional
 import os
 from dotenv import load_dotenv
-from openai import OpenAI, APIStatusError, APIConnectionError, APITimeoutError
+from openai import APIStatusError, APIConnectionError, APITimeoutError
 import json
 import logging
 
@@ -14,12 +14,20 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
     raise RuntimeError("OPENAI_API_KEY가 .env에 없습니다. AI 서버 실행 불가!")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+from app.services.llm import create_openai_client
+
+# 앱 전체에서 공유하는 AsyncOpenAI 클라이언트 (keep-alive 커넥션 재사용)
+client = create_openai_client()
 
 app = FastAPI(title="DPP AI Server")
 logger = logging.getLogger("uvicorn.error")
 
 
+@app.on_event("shutdown")
+async def close_openai_client():
+    await client.close()
+
+
 # ----- Pydantic 모델들 -----
 
 class UsageData(BaseModel):
@@ -112,7 +120,7 @@ async def daily_report(body: AiCommentRequest):
 
     try:
         # ----- OpenAI 호출 -----
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model="gpt-4o-mini",  # 필요하면 접근 가능한 모델로 수정
             messages=[
                 {"role": "system", "content": system_prompt},
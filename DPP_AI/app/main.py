@@ -1,5 +1,7 @@
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -25,7 +27,36 @@ def create_app() -> FastAPI:
     require_env("OPENAI_API_KEY")
     require_env("AI_TEST_ROOT")
 
-    app = FastAPI(title="DPP AI Server", version="0.1.0")
+    from app.services.llm import create_openai_client, llm_usage, set_client
+    from app.services.llm_cache import report_cache
+    from app.services.single_flight import llm_flight
+    from app.services.prompt_loader import get_prompt_registry
+    from app.services.structured import structured_stats
+
+    # 프롬프트 파일은 시작할 때 전부 읽어 둔다 (요청 처리 중 파일 I/O 없음)
+    prompt_registry = get_prompt_registry()
+
+    # OpenAI 클라이언트는 앱 전체에서 하나만 (keep-alive 커넥션 재사용)
+    openai_client = create_openai_client()
+    set_client(openai_client)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        purged = report_cache.purge_expired()
+        if purged:
+            logger.info(f"LLM cache: purged {purged} expired entries")
+        # 프롬프트 파일 수정 시 자동 반영 (PROMPT_POLL_INTERVAL 초마다 mtime 확인)
+        watcher = None
+        if prompt_registry.poll_interval > 0:
+            watcher = asyncio.create_task(prompt_registry.watch())
+        yield
+        if watcher:
+            watcher.cancel()
+        set_client(None)
+        await openai_client.close()
+
+    app = FastAPI(title="DPP AI Server", version="0.1.0", lifespan=lifespan)
+    app.state.openai_client = openai_client
 
     app.add_middleware(
         CORSMiddleware,
@@ -41,6 +72,11 @@ def create_app() -> FastAPI:
             "status": "ok",
             "openai_key_loaded": True,
             "ai_test_root_loaded": True,
+            "llm_cache": report_cache.stats(),
+            "single_flight": llm_flight.stats(),
+            "llm_usage": llm_usage.stats(),
+            "structured_output": structured_stats.stats(),
+            "prompts": prompt_registry.stats(),
         }
 
     from app.routers.checkin_question import router as checkin_question_router
@@ -1,12 +1,18 @@
 import os
 import json
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, Dict, List, Literal, Optional
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
-from openai import OpenAI  # pip3 install openai
+from app.services.llm import get_client
+from app.services.llm_cache import canonical_json, text_hash
+from app.services.single_flight import llm_flight
+from app.services.prompt_loader import PromptEntry, get_prompt_registry
+from app.services.structured import (
+    OPENAI_STRUCTURED_OUTPUT, StructuredOutputError, json_schema_spec, parse_output, reask_messages,
+)
 
 router = APIRouter(prefix="/ai", tags=["ai"])
 
@@ -31,24 +37,40 @@ class CheckInQuestionRequest(BaseModel):
     question_policy: Dict[str, Any]
     prompt_ref: PromptRef
 
+# ----------------------------
+# Output schema (prompts/checkin/checkin_v1.txt 의 CheckInQuestionOutput)
+# ----------------------------
+class CheckInOption(BaseModel):
+    value: str
+    label: str = Field(..., max_length=24)
+
+class SelectionLimits(BaseModel):
+    min: int
+    max: int
+
+class CheckInQuestionOutput(BaseModel):
+    step: int
+    type: Literal["multi_choice"]
+    question: str = Field(..., max_length=80)
+    options: List[CheckInOption] = Field(..., min_length=1, max_length=5)
+    selection_limits: SelectionLimits
+    allow_free_text: bool
+    free_text_max_length: int
+
 # ----------------------------
 # Helpers
 # ----------------------------
-def _safe_read_text(ai_test_root: str, rel_path: str) -> str:
+def _get_prompt(rel_path: str) -> PromptEntry:
     """
-    ai-test root 아래 파일만 읽도록 안전장치 포함.
+    ai-test root 아래 프롬프트만 (메모리에 올려 둔 내용, 요청 중 파일 I/O 없음)
     """
-    root = Path(ai_test_root).resolve()
-    target = (root / rel_path).resolve()
-
-    if not str(target).startswith(str(root)):
+    try:
+        return get_prompt_registry().get(rel_path)
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid prompt path (path traversal blocked).")
-
-    if not target.exists() or not target.is_file():
+    except FileNotFoundError:
         raise HTTPException(status_code=400, detail=f"Prompt file not found: {rel_path}")
 
-    return target.read_text(encoding="utf-8")
-
 def _build_messages(policy_text: str, template_text: str, req: CheckInQuestionRequest) -> List[Dict[str, Any]]:
     """
     OpenAI Responses API에 넣을 메시지 구성.
@@ -73,37 +95,59 @@ def _build_messages(policy_text: str, template_text: str, req: CheckInQuestionRe
         {"role": "user", "content": json.dumps(user_payload, ensure_ascii=False)},
     ]
 
+async def _responses(model: str, messages: List[Dict[str, Any]]) -> str:
+    # 앱 공용 AsyncOpenAI 클라이언트 (요청마다 새로 만들지 않음)
+    kwargs = {}
+    if OPENAI_STRUCTURED_OUTPUT:
+        # 출력 형식을 CheckInQuestionOutput 스키마로 제한
+        kwargs["text"] = {"format": {"type": "json_schema", **json_schema_spec(CheckInQuestionOutput)}}
+    resp = await get_client().responses.create(
+        model=model,
+        input=messages,
+        **kwargs,
+    )
+    return (resp.output_text or "").strip()
+
+async def _create_question(model: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    raw = await _responses(model, messages)
+    if not raw:
+        raise HTTPException(status_code=500, detail="Empty model output")
+
+    # 모델 출력은 "JSON ONLY"가 이상적. 그래도 보정 + 스키마 검증으로 보장 (안 맞으면 한 번 다시 물어봄)
+    try:
+        return parse_output(raw, CheckInQuestionOutput).model_dump()
+    except StructuredOutputError as e:
+        raw = await _responses(model, messages + reask_messages(e))
+    try:
+        return parse_output(raw, CheckInQuestionOutput).model_dump()
+    except StructuredOutputError:
+        raise HTTPException(status_code=500, detail=f"Model did not return valid JSON: {raw[:200]}")
+
 @router.post("/checkin-question")
-def generate_checkin_question(req: CheckInQuestionRequest):
+async def generate_checkin_question(req: CheckInQuestionRequest):
     try:
         ai_test_root = os.getenv("AI_TEST_ROOT")
         if not ai_test_root:
             raise HTTPException(status_code=500, detail="AI_TEST_ROOT env missing")
 
-        policy_text = _safe_read_text(ai_test_root, req.prompt_ref.policy_path)
-        template_text = _safe_read_text(ai_test_root, req.prompt_ref.template_path)
+        policy = _get_prompt(req.prompt_ref.policy_path)
+        template = _get_prompt(req.prompt_ref.template_path)
 
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         model = os.getenv("OPENAI_MODEL", "gpt-5")
+        messages = _build_messages(policy.text, template.text, req)
 
-        resp = client.responses.create(
-            model=model,
-            input=_build_messages(policy_text, template_text, req),
-        )
-
-        raw = (resp.output_text or "").strip()
-        if not raw:
-            raise HTTPException(status_code=500, detail="Empty model output")
-
-        # 모델 출력은 "JSON ONLY"가 이상적. 그래도 파싱으로 보장.
-        try:
-            data = json.loads(raw)
-        except Exception:
-            raise HTTPException(status_code=500, detail=f"Model did not return valid JSON: {raw[:200]}")
-
-        return data
+        # 앱 재시도 등으로 같은 질문 요청이 동시에 오면 OpenAI 호출은 한 번만
+        key = "responses:" + text_hash(canonical_json({
+            "model": model,
+            "policy": policy.hash,
+            "template": template.hash,
+            "input": req.model_dump(exclude={"prompt_ref"}),
+        }))
+        return await llm_flight.do(key, lambda: _create_question(model, messages))
 
     except HTTPException:
         raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="checkin-question timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"checkin-question failed: {e}")
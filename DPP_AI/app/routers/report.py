@@ -1,12 +1,30 @@
-from fastapi import APIRouter
-from pydantic import BaseModel, Field
-from typing import List, Literal, Optional, Any, Dict
+import os
+import json
+import asyncio
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Literal, Optional, Any, Dict, Tuple
 
-from app.services.llm import call_llm
-from app.services.prompt_loader import load_prompt_from_ai_test
+from app.services.batch import (
+    BATCH_CHECKPOINT_DIR, BATCH_CONCURRENCY, BATCH_MAX_ITEMS, BATCH_RATE_PER_SEC,
+    BatchCheckpoint, BatchRunner,
+)
+from app.services.json_stream import JsonFieldStream
+from app.services.llm import build_messages, call_llm, reask_llm, stream_llm
+from app.services.llm_cache import make_cache_key, report_cache
+from app.services.prompt_loader import get_prompt_registry
+from app.services.structured import StructuredOutputError, parse_output
 
 router = APIRouter()
 
+REPORT_PROMPT_PATH = "prompts/report_v1.txt"
+REPORT_MODEL = os.getenv("OPENAI_REPORT_MODEL", "gpt-4o-mini")
+REPORT_TEMPERATURE = 0.4
+# 스트리밍 모드에서 완성되는 즉시 따로 보내는 필드
+REPORT_STREAM_FIELDS = ("title", "summary")
+
 class Suggestion(BaseModel):
     title: str = Field(..., max_length=16)
     description: str
@@ -26,35 +44,234 @@ class ReportGenerationInput(BaseModel):
     checkin_answers: Optional[Dict[str, Any]] = None
     constraints: Optional[Dict[str, Any]] = None
 
-@router.post("/ai/daily-report", response_model=ReportGenerationOutput)
-def daily_report(input: ReportGenerationInput):
-    # ✅ ai-test에 있는 프롬프트 파일을 그대로 읽어서 사용
-    system_prompt = load_prompt_from_ai_test("prompts/report_v1.txt")
+# 모델 출력에서 비었거나 형식이 틀린 필드를 대신 채울 기본값 (최소 길이 보장)
+REPORT_DEFAULTS = {
+    "comments": ["오늘의 흐름을 한 번 정리해보는 단계예요."],
+    "suggestions": [{
+        "title": "짧게 숨 고르기",
+        "description": "오늘 중 편한 순간에 30초만 눈을 감고 숨을 3번 천천히 쉬어봐요.",
+        "difficulty": "easy",
+        "why_this": "리포트 출력 형식을 안정적으로 만들기 위한 최소 제안이에요."
+    }],
+}
+
+
+def _get_cached(cache_key: str) -> Optional[ReportGenerationOutput]:
+    cached = report_cache.get(cache_key)
+    if cached is not None:
+        try:
+            return ReportGenerationOutput.model_validate(cached)
+        except ValidationError:
+            # 스키마가 바뀌어서 예전 캐시가 안 맞으면 버리고 새로 생성
+            report_cache.discard(cache_key)
+    return None
+
+
+def _finish_report(cache_key: str, report: ReportGenerationOutput) -> ReportGenerationOutput:
+    # 검증을 통과한 리포트만 캐시에 저장
+    report_cache.set(cache_key, report.model_dump())
+    return report
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_report(system_prompt: str, payload: dict, cache_key: str):
+    """
+    daily-report SSE 스트림
+    - event: token  -> LLM 이 만든 텍스트 조각 그대로
+    - event: field  -> title / summary 가 완성되는 즉시 {"name", "value"}
+    - event: report -> 마지막에 검증된 ReportGenerationOutput (캐시 저장까지 끝난 값)
+    - event: error  -> 실패 시 {"status", "detail"} (헤더는 이미 200 으로 나갔으므로)
+    """
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        for name in REPORT_STREAM_FIELDS:
+            yield _sse("field", {"name": name, "value": getattr(cached, name)})
+        yield _sse("report", cached.model_dump())
+        return
+
+    parser = JsonFieldStream()
+    parts = []
+    try:
+        async for delta in stream_llm(
+            system_prompt=system_prompt,
+            user_content=payload,
+            model=REPORT_MODEL,
+            temperature=REPORT_TEMPERATURE,
+            output_model=ReportGenerationOutput,
+        ):
+            parts.append(delta)
+            yield _sse("token", {"text": delta})
+            for name, value in parser.feed(delta):
+                if name in REPORT_STREAM_FIELDS:
+                    yield _sse("field", {"name": name, "value": value})
 
-    result = call_llm(
+        try:
+            report = parse_output("".join(parts), ReportGenerationOutput, REPORT_DEFAULTS)
+        except StructuredOutputError as e:
+            # 틀린 곳만 알려주고 한 번 더 (이번엔 스트리밍 없이)
+            report = await reask_llm(
+                build_messages(system_prompt, payload), e,
+                REPORT_MODEL, REPORT_TEMPERATURE, ReportGenerationOutput, REPORT_DEFAULTS,
+            )
+        report = _finish_report(cache_key, report)
+    except APIStatusError as e:
+        yield _sse("error", {"status": 502, "detail": f"daily-report upstream error: {e.status_code}"})
+        return
+    except (APIConnectionError, APITimeoutError, asyncio.TimeoutError):
+        yield _sse("error", {"status": 504, "detail": "daily-report timed out"})
+        return
+    except StructuredOutputError as e:
+        yield _sse("error", {"status": 502, "detail": f"daily-report invalid model output: {e}"})
+        return
+
+    yield _sse("report", report.model_dump())
+
+
+def _prepare(input: ReportGenerationInput) -> Tuple[str, dict, str]:
+    # ✅ ai-test에 있는 프롬프트 파일을 그대로 사용 (시작 시 메모리에 올려 둔 내용)
+    prompt = get_prompt_registry().get(REPORT_PROMPT_PATH)
+    payload = input.model_dump()
+    # 같은 프롬프트 + 모델 + 입력이면 저장해 둔 리포트 재사용 (재시도 / 테스트 반복 시 LLM 호출 X)
+    cache_key = make_cache_key(prompt.hash, REPORT_MODEL, REPORT_TEMPERATURE, payload)
+    return prompt.text, payload, cache_key
+
+
+async def generate_report(input: ReportGenerationInput) -> Tuple[ReportGenerationOutput, bool]:
+    """
+    캐시 확인 -> LLM 호출(스키마 제한 + 보정 / 검증) -> 캐시 저장
+    - 반환: (리포트, 캐시에서 나왔는지)
+    - OpenAI 오류는 그대로 올린다 (HTTP 응답으로 바꾸는 건 호출하는 쪽)
+    """
+    system_prompt, payload, cache_key = _prepare(input)
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        return cached, True
+
+    result = await call_llm(
         system_prompt=system_prompt,
-        user_content=input.dict()
+        user_content=payload,
+        model=REPORT_MODEL,
+        temperature=REPORT_TEMPERATURE,
+        output_model=ReportGenerationOutput,
+        defaults=REPORT_DEFAULTS,
+    )
+    return _finish_report(cache_key, ReportGenerationOutput.model_validate(result)), False
+
+
+def _error_status(e: Exception) -> Tuple[int, str]:
+    if isinstance(e, APIStatusError):
+        # 같은 요청을 기다리던 다른 요청들도 같은 오류를 받는다
+        return 502, f"daily-report upstream error: {e.status_code}"
+    if isinstance(e, (APIConnectionError, APITimeoutError, asyncio.TimeoutError)):
+        return 504, "daily-report timed out"
+    if isinstance(e, StructuredOutputError):
+        # 다시 물어봐도 JSON 이 아니거나 스키마에 안 맞음
+        return 502, f"daily-report invalid model output: {e}"
+    return 500, f"daily-report failed: {e}"
+
+
+@router.post("/ai/daily-report", response_model=ReportGenerationOutput)
+async def daily_report(input: ReportGenerationInput, stream: bool = False):
+    # ?stream=true : 토큰 / 완성된 필드를 SSE 로 먼저 보내고 마지막에 검증된 리포트
+    if stream:
+        system_prompt, payload, cache_key = _prepare(input)
+        return StreamingResponse(
+            _stream_report(system_prompt, payload, cache_key),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    try:
+        report, _ = await generate_report(input)
+    except (APIStatusError, APIConnectionError, APITimeoutError, asyncio.TimeoutError, StructuredOutputError) as e:
+        status, detail = _error_status(e)
+        raise HTTPException(status_code=status, detail=detail)
+    return report
+
+
+# ----------------------------
+# Batch (야간 일괄 생성)
+# ----------------------------
+class ReportBatchItem(BaseModel):
+    # 호출하는 쪽에서 정한 식별자 (보통 user_id). 결과 줄 / 체크포인트에 그대로 쓴다
+    id: str = Field(..., min_length=1, max_length=128)
+    input: ReportGenerationInput
+
+class ReportBatchRequest(BaseModel):
+    items: List[ReportBatchItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+    # 주면 체크포인트 파일에 성공 결과를 남기고, 같은 job_id 로 다시 보내면 이어서 처리
+    job_id: Optional[str] = Field(None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+    rate_per_sec: Optional[float] = Field(None, ge=0)
+
+# 지금 돌고 있는 job_id (같은 체크포인트 파일에 두 번 쓰지 않도록)
+_active_jobs = set()
+
+
+async def report_batch_item(input: ReportGenerationInput) -> dict:
+    report, cached = await generate_report(input)
+    return {"report": report.model_dump(), "cached": cached}
+
+
+def report_batch_error(e: Exception) -> dict:
+    status, detail = _error_status(e)
+    return {"status_code": status, "error": detail}
+
+
+async def _stream_batch(runner: BatchRunner, items: list):
+    async for row in runner.run(items, report_batch_error):
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+    yield json.dumps(runner.summary(), ensure_ascii=False) + "\n"
+
+
+class _BatchJobResponse(StreamingResponse):
+    """
+    응답이 어떻게 끝나든 (다 보냄 / 중간에 끊김 / 본문 시작 전에 끊김) 체크포인트 파일을 닫고 job_id 를 풀어준다
+    - 본문을 보내기 전에 끊기면 제너레이터의 finally 가 안 돌고 (BatchRunner.run 도 시작 전), uvicorn 에서는 BackgroundTask 도 안 돈다
+    - 풀기 전에 제너레이터를 닫아서 남은 worker 가 체크포인트 파일에 쓰지 않게 한다
+    """
+
+    def __init__(self, content, job_id: Optional[str], checkpoint: Optional[BatchCheckpoint], **kwargs):
+        super().__init__(content, **kwargs)
+        self.job_id = job_id
+        self.checkpoint = checkpoint
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+            if self.checkpoint:
+                self.checkpoint.close()
+            _active_jobs.discard(self.job_id)
+
+
+@router.post("/ai/daily-report:batch")
+async def daily_report_batch(req: ReportBatchRequest):
+    """
+    여러 사용자의 리포트를 한 요청으로 생성해서 NDJSON 으로 흘려보낸다
+    - 한 줄 = 끝난 item 하나 (끝난 순서), 마지막 줄 = {"type": "summary", ...} 처리량 / 재시도 / 토큰 / 비용
+    - 동시 처리 수 / 초당 호출 수 제한, upstream 429 는 retry-after 만큼 쉬었다가 재시도
+    """
+    ids = [item.id for item in req.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate item id in batch.")
+
+    checkpoint = None
+    if req.job_id:
+        if req.job_id in _active_jobs:
+            raise HTTPException(status_code=409, detail=f"Batch job already running: {req.job_id}")
+        checkpoint = BatchCheckpoint(os.path.join(BATCH_CHECKPOINT_DIR, f"{req.job_id}.ndjson"))
+        _active_jobs.add(req.job_id)
+
+    runner = BatchRunner(
+        report_batch_item,
+        concurrency=req.concurrency or BATCH_CONCURRENCY,
+        rate_per_sec=req.rate_per_sec if req.rate_per_sec is not None else BATCH_RATE_PER_SEC,
+        checkpoint=checkpoint,
     )
-    
-        # 1) suggestions dict -> list 보정 (이미 넣었으면 유지)
-    if isinstance(result, dict) and "suggestions" in result:
-        if isinstance(result["suggestions"], dict):
-            result["suggestions"] = [result["suggestions"]]
-
-    # 2) ✅ 최소 길이 보장: comments/suggestions가 비면 기본값 채우기
-    if not isinstance(result, dict):
-        result = {}
-
-    if not result.get("comments"):
-        result["comments"] = ["오늘의 흐름을 한 번 정리해보는 단계예요."]
-
-    if not result.get("suggestions"):
-        result["suggestions"] = [{
-            "title": "짧게 숨 고르기",
-            "description": "오늘 중 편한 순간에 30초만 눈을 감고 숨을 3번 천천히 쉬어봐요.",
-            "difficulty": "easy",
-            "why_this": "리포트 출력 형식을 안정적으로 만들기 위한 최소 제안이에요."
-        }]
-
-    
-    return result
+    items = [(item.id, item.input) for item in req.items]
+    return _BatchJobResponse(_stream_batch(runner, items), req.job_id, checkpoint, media_type="application/x-ndjson")
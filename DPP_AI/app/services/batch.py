@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError
+
+from app.services.llm import estimate_cost, llm_usage
+
+logger = logging.getLogger("dpp_ai")
+
+# 동시에 처리할 item 수 (요청에서 따로 안 주면)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# 초당 upstream 호출 수 상한 (token bucket). 0 이면 제한 없음
+BATCH_RATE_PER_SEC = float(os.getenv("BATCH_RATE_PER_SEC", "5"))
+# item 하나당 재시도 횟수 (429 / 5xx / 연결 오류)
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "5000"))
+# job_id 별 체크포인트 파일(NDJSON)을 두는 폴더
+BATCH_CHECKPOINT_DIR = os.getenv("BATCH_CHECKPOINT_DIR") or os.path.join(tempfile.gettempdir(), "dpp_ai_batch")
+
+
+class TokenBucket:
+    """
+    초당 rate 개씩 토큰이 차는 bucket (최대 capacity 개까지 몰아서 사용 가능)
+    - acquire() 는 토큰이 생길 때까지 기다린다 (먼저 온 순서대로)
+    - upstream 이 429 + retry-after 를 주면 pause() 로 그 시간 동안 전체를 멈춘다
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = self.clock()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    return
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        now = self.clock()
+        self.paused_until = max(self.paused_until, now + seconds)
+        # 멈춘 동안 쌓인 토큰으로 한꺼번에 다시 몰리지 않도록 비운다
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+class BatchCheckpoint:
+    """
+    성공한 item 결과를 한 줄씩(NDJSON) 붙여 쓰는 파일
+    - 다시 실행하면 이미 끝난 id 는 upstream 호출 없이 저장된 결과를 돌려준다
+    - 중간에 죽어서 마지막 줄이 잘렸으면 그 줄만 무시한다
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.done[row["id"]] = row
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, row: dict):
+        self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.done[row["id"]] = row
+
+    def close(self):
+        self._file.close()
+
+
+def retry_after_seconds(e: APIStatusError) -> Optional[float]:
+    # OpenAI 는 retry-after-ms / retry-after(초) 헤더를 준다
+    headers = e.response.headers
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+class BatchRunner:
+    """
+    item 들을 동시에 concurrency 개씩, bucket 속도에 맞춰 fn 으로 처리하고 끝나는 순서대로 결과를 넘긴다.
+    - fn(item) 은 dict 를 돌려준다 ("cached": True 면 캐시에서 나온 결과로 센다)
+    - 429 는 retry-after 만큼 bucket 을 멈추고 재시도, 5xx / 연결 오류는 지수 backoff 후 재시도
+    - 결과 줄: {"type": "result", "id", "status": "ok" | "error", ...}
+    - 다 끝나면 summary() 로 처리량 / 재시도 / 토큰 / 비용 요약
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[Any], Awaitable[dict]],
+        concurrency: int = BATCH_CONCURRENCY,
+        rate_per_sec: float = BATCH_RATE_PER_SEC,
+        max_retries: int = BATCH_MAX_RETRIES,
+        checkpoint: Optional[BatchCheckpoint] = None,
+    ):
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate_per_sec)
+        self.max_retries = max_retries
+        self.checkpoint = checkpoint
+
+        self.counts = {"total": 0, "ok": 0, "failed": 0, "resumed": 0, "cache_hits": 0, "retries": 0, "rate_limited": 0}
+        self.started = 0.0
+        self.finished = 0.0
+        self._usage_before = {}
+
+    async def _call(self, item) -> dict:
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                return await self.fn(item)
+            except APIStatusError as e:
+                retryable = e.status_code == 429 or e.status_code >= 500
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                wait = None
+                if e.status_code == 429:
+                    self.counts["rate_limited"] += 1
+                    # 한 요청이 429 를 받으면 다른 worker 도 같이 쉰다 (bucket 에서 기다림)
+                    pause = retry_after_seconds(e)
+                    pause = pause if pause is not None else 2 ** attempt
+                    logger.warning(f"batch: upstream 429, pausing {pause:.2f}s")
+                    self.bucket.pause(pause)
+                    wait = 0
+            except (APIConnectionError, APITimeoutError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    raise
+                wait = None
+            attempt += 1
+            self.counts["retries"] += 1
+            await asyncio.sleep(wait if wait is not None else min(30, 0.5 * 2 ** attempt))
+
+    async def _worker(self, queue: asyncio.Queue, out: asyncio.Queue, error_row: Callable[[Exception], dict]):
+        while True:
+            item_id, item = await queue.get()
+            try:
+                result = await self._call(item)
+                row = {"type": "result", "id": item_id, "status": "ok", **result}
+                if self.checkpoint:
+                    self.checkpoint.record(row)
+            except Exception as e:
+                row = {"type": "result", "id": item_id, "status": "error", **error_row(e)}
+            await out.put(row)
+
+    async def run(
+        self,
+        items: List[Tuple[str, Any]],
+        error_row: Callable[[Exception], dict] = lambda e: {"error": str(e)},
+    ) -> AsyncIterator[dict]:
+        self.started = time.perf_counter()
+        self._usage_before = llm_usage.stats()
+        self.counts["total"] = len(items)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        out: asyncio.Queue = asyncio.Queue()
+        workers = []
+        try:
+            done = self.checkpoint.done if self.checkpoint else {}
+            for item_id, item in items:
+                if item_id in done:
+                    self.counts["resumed"] += 1
+                    yield {**done[item_id], "resumed": True}
+                else:
+                    queue.put_nowait((item_id, item))
+
+            pending = queue.qsize()
+            workers = [
+                asyncio.create_task(self._worker(queue, out, error_row))
+                for _ in range(min(self.concurrency, pending))
+            ]
+            for _ in range(pending):
+                row = await out.get()
+                if row["status"] == "ok":
+                    self.counts["ok"] += 1
+                    if row.get("cached"):
+                        self.counts["cache_hits"] += 1
+                else:
+                    self.counts["failed"] += 1
+                yield row
+        finally:
+            # 클라이언트가 중간에 끊으면 남은 작업도 멈춘다 (체크포인트에 남은 것부터 다시 시작)
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.finished = time.perf_counter()
+            if self.checkpoint:
+                self.checkpoint.close()
+
+    def summary(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        processed = self.counts["ok"] + self.counts["failed"]
+        # 같은 프로세스의 다른 요청 토큰도 섞일 수 있는 근사치
+        usage = llm_usage.stats()
+        prompt_tokens = usage["prompt_tokens"] - self._usage_before.get("prompt_tokens", 0)
+        completion_tokens = usage["completion_tokens"] - self._usage_before.get("completion_tokens", 0)
+        return {
+            "type": "summary",
+            **self.counts,
+            "upstream_calls": usage["calls"] - self._usage_before.get("calls", 0),
+            "elapsed_sec": round(elapsed, 3),
+            "items_per_sec": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated_cost_usd": estimate_cost(prompt_tokens, completion_tokens),
+        }
@@ -0,0 +1,110 @@
+import json
+from typing import Any, List, Tuple
+
+
+class JsonFieldStream:
+    """
+    스트리밍으로 들어오는 JSON 객체 텍스트에서 최상위 필드가 끝나는 즉시 꺼낸다.
+    - feed(chunk) 마다 새로 완성된 (key, value) 목록을 돌려준다
+    - 문자열 / 이스케이프 / 중첩 객체·배열을 한 글자씩 한 번만 훑는다 (전체 재파싱 X)
+    - 첫 "{" 앞의 텍스트(코드펜스 등)는 건너뛴다
+    - 완성된 값만 json.loads 하므로 잘린 값은 내보내지 않는다
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0          # 다음에 볼 글자 위치
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.done = False
+
+        # 최상위(depth 1) 상태: key -> colon -> value -> comma -> key ...
+        self.state = "key"
+        self.key = None
+        self.token_start = -1  # 현재 key / value 가 시작된 위치
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        i = self.pos
+        n = len(buf)
+
+        while i < n and not self.done:
+            ch = buf[i]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 1:
+                        self._end_token(i, completed)
+                i += 1
+                continue
+
+            if self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+                i += 1
+                continue
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.token_start = i
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 2:
+                    self.token_start = i
+            elif ch in "}]":
+                if self.depth == 1:
+                    # 마지막 필드가 숫자 / true 같은 값이면 여기서 끝난다
+                    self._end_primitive(i, completed)
+                    self.done = True
+                else:
+                    self.depth -= 1
+                    if self.depth == 1:
+                        self._end_token(i, completed)
+            elif self.depth == 1:
+                if ch == ":":
+                    self.state = "value"
+                elif ch == ",":
+                    self._end_primitive(i, completed)
+                    self.state = "key"
+                elif not ch.isspace() and self.state == "value" and self.token_start < 0:
+                    # 숫자 / true / false / null 시작
+                    self.token_start = i
+            i += 1
+
+        self.pos = i
+        return completed
+
+    def _end_token(self, end: int, completed: list):
+        # buffer[token_start:end+1] 이 문자열 / 객체 / 배열 하나
+        text = self.buffer[self.token_start:end + 1]
+        self.token_start = -1
+        if self.state == "key":
+            self.key = json.loads(text)
+            self.state = "colon"
+        elif self.state == "value":
+            self._emit(text, completed)
+
+    def _end_primitive(self, end: int, completed: list):
+        if self.state == "value" and self.token_start >= 0:
+            text = self.buffer[self.token_start:end].strip()
+            self.token_start = -1
+            self._emit(text, completed)
+
+    def _emit(self, text: str, completed: list):
+        self.state = "comma"
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        self.fields[self.key] = value
+        completed.append((self.key, value))
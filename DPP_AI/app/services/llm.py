@@ -1,41 +1,244 @@
 import os
+import copy
+import importlib.util
 import json
-from openai import OpenAI
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
 
-_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import httpx
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 
-def call_llm(
+from app.services.llm_cache import canonical_json, text_hash
+from app.services.single_flight import llm_flight
+from app.services.structured import (
+    OPENAI_STRUCTURED_OUTPUT, StructuredOutputError, json_schema_spec, parse_json_lenient, parse_output, reask_messages,
+)
+
+logger = logging.getLogger("dpp_ai")
+
+# OpenAI 커넥션 풀 설정 (서버 하나당 클라이언트 하나를 계속 재사용)
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "true").lower() in ("1", "true", "yes")  # pip3 install h2
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+# 유지할 idle 커넥션 수. 동시 요청 수보다 작으면 매번 커넥션을 끊고 다시 맺는다
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "100"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# 비용 추정용 단가 (USD / 1M tokens, 기본값은 gpt-4o-mini)
+OPENAI_PRICE_INPUT_PER_1M = float(os.getenv("OPENAI_PRICE_INPUT_PER_1M", "0.15"))
+OPENAI_PRICE_OUTPUT_PER_1M = float(os.getenv("OPENAI_PRICE_OUTPUT_PER_1M", "0.60"))
+
+_client: Optional[AsyncOpenAI] = None
+
+
+class LLMUsage:
+    """
+    chat completion 호출 수 / 토큰 사용량 누적 (/health, batch 요약용)
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def add(self, usage) -> None:
+        self.calls += 1
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_cost_usd": estimate_cost(self.prompt_tokens, self.completion_tokens),
+        }
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return round(
+        prompt_tokens * OPENAI_PRICE_INPUT_PER_1M / 1e6
+        + completion_tokens * OPENAI_PRICE_OUTPUT_PER_1M / 1e6,
+        6,
+    )
+
+
+llm_usage = LLMUsage()
+
+
+def create_openai_client() -> AsyncOpenAI:
+    """
+    keep-alive 커넥션 풀을 가진 AsyncOpenAI 클라이언트
+    - 요청마다 새로 만들면 매번 TLS 핸드셰이크부터 다시 하므로 앱 시작 시 한 번만 만든다
+    - HTTP/2 면 커넥션 하나로 여러 요청을 동시에 보낸다 (h2 패키지가 없으면 HTTP/1.1)
+    """
+    http2 = OPENAI_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("h2 package not installed. OpenAI client falls back to HTTP/1.1")
+        http2 = False
+
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=10.0),
+    )
+    return AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        http_client=http_client,
+        max_retries=OPENAI_MAX_RETRIES,
+    )
+
+
+def set_client(client: Optional[AsyncOpenAI]) -> None:
+    # create_app 에서 만든 클라이언트를 등록 (종료 시 None)
+    global _client
+    _client = client
+
+
+def get_client() -> AsyncOpenAI:
+    # create_app 을 거치지 않은 경우(스크립트 등)에는 처음 쓸 때 만든다
+    global _client
+    if _client is None:
+        _client = create_openai_client()
+    return _client
+
+
+def build_messages(system_prompt: str, user_content: dict) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system_prompt},
+        {
+            "role": "user",
+            "content": json.dumps(user_content, ensure_ascii=False)
+        }
+    ]
+
+
+def _output_kwargs(output_model: Optional[Type[BaseModel]]) -> Dict[str, Any]:
+    # 스키마가 있으면 모델이 그 JSON 스키마대로만 출력하도록 요청 (structured outputs)
+    if output_model is None or not OPENAI_STRUCTURED_OUTPUT:
+        return {}
+    return {"response_format": {"type": "json_schema", "json_schema": json_schema_spec(output_model)}}
+
+
+async def call_llm(
     system_prompt: str,
     user_content: dict,
     model: str = "gpt-4o-mini",
-    temperature: float = 0.4
+    temperature: float = 0.4,
+    output_model: Optional[Type[BaseModel]] = None,
+    defaults: Optional[Dict[str, Any]] = None,
 ) -> dict:
     """
     공통 LLM 호출 함수
     - 질문 생성 / 리포트 생성 공용
     - JSON 응답만 반환하도록 설계
+    - output_model 을 주면 그 스키마로 출력을 제한하고, 검증(+보정)을 통과한 dict 만 돌려준다
+      (그래도 안 맞으면 틀린 곳을 알려주고 한 번만 다시 물어본다)
+    - 같은 입력으로 동시에 들어온 호출은 OpenAI 요청 하나를 같이 기다린다
     """
+    key = "chat:" + text_hash(canonical_json({
+        "system": text_hash(system_prompt),
+        "model": model,
+        "temperature": temperature,
+        "input": user_content,
+        "output": output_model.__name__ if output_model else None,
+    }))
+    result = await llm_flight.do(
+        key, lambda: _call_llm(system_prompt, user_content, model, temperature, output_model, defaults)
+    )
+    # 같은 dict 를 여러 요청이 나눠 가지므로 각자 복사본을 쓴다 (호출하는 쪽에서 값을 고침)
+    return copy.deepcopy(result)
+
 
-    response = _client.chat.completions.create(
+async def _chat(messages: list, model: str, temperature: float, output_model: Optional[Type[BaseModel]]) -> str:
+    response = await get_client().chat.completions.create(
         model=model,
         temperature=temperature,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {
-                "role": "user",
-                "content": json.dumps(user_content, ensure_ascii=False)
-            }
-        ],
+        messages=messages,
+        **_output_kwargs(output_model),
     )
+    llm_usage.add(response.usage)
+    return response.choices[0].message.content or ""
 
-    text = response.choices[0].message.content.strip()
 
-    # JSON만 안전하게 파싱
+async def _call_llm(
+    system_prompt: str,
+    user_content: dict,
+    model: str,
+    temperature: float,
+    output_model: Optional[Type[BaseModel]],
+    defaults: Optional[Dict[str, Any]],
+) -> dict:
+    messages = build_messages(system_prompt, user_content)
+    text = await _chat(messages, model, temperature, output_model)
+
+    if output_model is None:
+        # JSON만 안전하게 파싱
+        try:
+            return parse_json_lenient(text)
+        except ValueError:
+            raise RuntimeError(f"LLM returned non-JSON output:\n{text}")
+
+    try:
+        return parse_output(text, output_model, defaults).model_dump()
+    except StructuredOutputError as e:
+        return (await reask_llm(messages, e, model, temperature, output_model, defaults)).model_dump()
+
+
+async def reask_llm(
+    messages: list,
+    error: StructuredOutputError,
+    model: str,
+    temperature: float,
+    output_model: Type[BaseModel],
+    defaults: Optional[Dict[str, Any]] = None,
+) -> BaseModel:
+    """
+    스키마 검증에 실패한 출력을 오류 목록과 함께 돌려주고 한 번만 고쳐 달라고 한다
+    두 번째도 안 맞으면 StructuredOutputError
+    """
+    text = await _chat(messages + reask_messages(error), model, temperature, output_model)
+    return parse_output(text, output_model, defaults)
+
+
+async def stream_llm(
+    system_prompt: str,
+    user_content: dict,
+    model: str = "gpt-4o-mini",
+    temperature: float = 0.4,
+    output_model: Optional[Type[BaseModel]] = None,
+) -> AsyncIterator[str]:
+    """
+    call_llm 의 스트리밍 버전: 모델이 만드는 텍스트 조각을 도착하는 대로 넘긴다
+    - 요청마다 응답 순서가 달라서 single-flight 로 합치지 않는다
+    - 전체 텍스트 파싱 / 검증은 호출하는 쪽에서 (parse_output, 실패 시 reask_llm)
+    """
+    stream = await get_client().chat.completions.create(
+        model=model,
+        temperature=temperature,
+        stream=True,
+        # 마지막 chunk 에 토큰 사용량을 받는다 (choices 가 빈 chunk)
+        stream_options={"include_usage": True},
+        messages=build_messages(system_prompt, user_content),
+        **_output_kwargs(output_model),
+    )
+    usage = None
     try:
-        return json.loads(text)
-    except Exception:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(text[start:end + 1])
-        raise RuntimeError(f"LLM returned non-JSON output:\n{text}")
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        llm_usage.add(usage)
+        # 클라이언트가 중간에 끊어도 upstream 커넥션은 바로 돌려준다
+        await stream.close()
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("dpp_ai")
+
+# LLM 응답 캐시 설정
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+# 디스크 캐시(SQLite) 파일 경로. 비어 있으면 메모리 캐시만 사용
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", "")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def canonical_json(data: Any) -> str:
+    # 키 순서 / 공백이 달라도 같은 입력이면 같은 문자열
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def make_cache_key(prompt_hash: str, model: str, temperature: float, payload: Any) -> str:
+    """
+    프롬프트 파일 내용 + 모델 + temperature + 입력 JSON 이 모두 같을 때만 같은 키.
+    프롬프트를 고치면 해시가 바뀌므로 예전 응답은 자연스럽게 안 쓰인다.
+    """
+    return text_hash(canonical_json({
+        "prompt": prompt_hash,
+        "model": model,
+        "temperature": temperature,
+        "input": payload,
+    }))
+
+
+class LLMCache:
+    """
+    LLM 응답 캐시 (content-addressed)
+    - 1단계: 메모리 LRU (max_entries 개)
+    - 2단계: SQLite 파일 (db_path 가 있을 때만). 서버 재시작 후에도 유지
+    - 두 단계 모두 ttl 초가 지나면 버린다
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: int = 24 * 3600, db_path: str = "", clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        # key -> (만료 시각, value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # /health 에 노출하는 카운터
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_expires ON llm_cache (expires_at)")
+        return self._db
+
+    def _remember(self, key: str, expires_at: float, value: Dict[str, Any]):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = self.clock()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if now < hit[0]:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return hit[1]
+                del self._memory[key]
+
+            if self.db_path:
+                row = self._conn().execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if now < row[1]:
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self.disk_hits += 1
+                        return value
+                    self._conn().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self.db_path:
+                self._conn().execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at),
+                )
+            self.stores += 1
+
+    def discard(self, key: str):
+        # 캐시된 값이 검증에 실패한 경우 등
+        with self._lock:
+            self._memory.pop(key, None)
+            if self.db_path:
+                self._conn().execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        # 만료된 디스크 row 정리 (앱 시작 시 한 번)
+        if not self.db_path:
+            return 0
+        with self._lock:
+            return self._conn().execute(
+                "DELETE FROM llm_cache WHERE expires_at <= ?", (self.clock(),)
+            ).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "disk_enabled": bool(self.db_path),
+        }
+
+
+# 리포트 생성 응답 캐시 (앱 전체 공유)
+report_cache = LLMCache(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS, LLM_CACHE_DB)
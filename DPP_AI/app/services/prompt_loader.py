@@ -1,17 +1,162 @@
 import os
+import asyncio
+import hashlib
+import logging
+import posixpath
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
-def load_prompt_from_ai_test(relative_path: str) -> str:
+logger = logging.getLogger("dpp_ai")
+
+# AI_TEST_ROOT 아래에서 프롬프트로 읽어 둘 폴더 (쉼표로 여러 개)
+PROMPT_DIRS = [d.strip() for d in os.getenv("PROMPT_DIRS", "prompts").split(",") if d.strip()]
+# 프롬프트 파일 변경 확인 주기 (초). 0 이면 시작할 때 한 번만 읽는다
+PROMPT_POLL_INTERVAL = float(os.getenv("PROMPT_POLL_INTERVAL", "2"))
+PROMPT_EXTENSIONS = (".txt", ".md", ".json")
+
+
+class PromptEntry:
+    __slots__ = ("path", "text", "hash", "signature")
+
+    def __init__(self, path: str, text: str, signature: Tuple[int, int]):
+        self.path = path
+        self.text = text
+        # 캐시 키 / 로그용 내용 해시
+        self.hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        # (mtime_ns, size) - 바뀌었는지 비교용
+        self.signature = signature
+
+
+class PromptRegistry:
     """
-    AI_TEST_ROOT 기준으로 프롬프트 파일을 읽어온다.
-    예) relative_path="prompts/report_v1.txt"
+    AI_TEST_ROOT 의 프롬프트 파일을 시작할 때 전부 읽어서 메모리에 보관한다.
+    - 요청 처리 중에는 파일을 열지 않는다 (dict 조회만)
+    - poll_interval 마다 mtime / 크기를 확인해서 바뀐 파일만 다시 읽는다 (추가 / 삭제 포함)
+    - 경로는 root 기준 상대경로만 허용 (../ 나 절대경로는 ValueError)
     """
-    root = os.getenv("AI_TEST_ROOT")
-    if not root:
-        raise RuntimeError("AI_TEST_ROOT environment variable is missing.")
 
-    abs_path = os.path.join(root, relative_path)
-    if not os.path.exists(abs_path):
-        raise FileNotFoundError(f"Prompt file not found: {abs_path}")
+    def __init__(self, root: str, dirs=("prompts",), poll_interval: float = 2.0):
+        self.root = os.path.realpath(root)
+        self.dirs = list(dirs)
+        self.poll_interval = poll_interval
+
+        self._entries: Dict[str, PromptEntry] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.last_scan = 0.0
+
+    @staticmethod
+    def normalize(rel_path: str) -> str:
+        # 파일시스템 접근 없이 문자열로만 경로 검사 (path traversal 차단)
+        path = posixpath.normpath(rel_path.replace("\\", "/"))
+        if not rel_path or posixpath.isabs(path) or path == ".." or path.startswith("../"):
+            raise ValueError(f"Invalid prompt path: {rel_path}")
+        return path
+
+    def _scan(self) -> Dict[str, Tuple[str, Tuple[int, int]]]:
+        # 상대경로 -> (절대경로, (mtime_ns, size))
+        found = {}
+        for d in self.dirs:
+            base = os.path.join(self.root, d)
+            for dirpath, _, filenames in os.walk(base):
+                for name in filenames:
+                    if not name.endswith(PROMPT_EXTENSIONS):
+                        continue
+                    abs_path = os.path.join(dirpath, name)
+                    # 심볼릭 링크로 root 밖을 가리키는 파일은 제외
+                    if not os.path.realpath(abs_path).startswith(self.root + os.sep):
+                        continue
+                    st = os.stat(abs_path)
+                    rel = os.path.relpath(abs_path, self.root).replace(os.sep, "/")
+                    found[rel] = (abs_path, (st.st_mtime_ns, st.st_size))
+        return found
+
+    def refresh(self) -> int:
+        """
+        바뀐 파일만 다시 읽는다. 반환값: 새로 읽거나 지운 파일 수
+        """
+        found = self._scan()
+        entries = dict(self._entries)
+        changed = 0
+
+        for rel, (abs_path, signature) in found.items():
+            current = entries.get(rel)
+            if current is not None and current.signature == signature:
+                continue
+            try:
+                with open(abs_path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                # 읽기 실패 시 예전 내용 유지
+                logger.warning(f"prompt load failed: {rel} ({e})")
+                continue
+            if not text.strip():
+                logger.warning(f"prompt is empty, skipped: {rel}")
+                continue
+            entries[rel] = PromptEntry(rel, text, signature)
+            changed += 1
+            if current is not None:
+                logger.info(f"prompt reloaded: {rel} ({entries[rel].hash[:12]})")
+
+        for rel in set(entries) - set(found):
+            del entries[rel]
+            changed += 1
+            logger.info(f"prompt removed: {rel}")
 
-    with open(abs_path, "r", encoding="utf-8") as f:
-        return f.read()
\ No newline at end of file
+        with self._lock:
+            self._entries = entries
+            self.last_scan = time.time()
+            if changed:
+                self.reloads += 1
+        return changed
+
+    def load(self):
+        self.refresh()
+        logger.info(f"✅ {len(self._entries)} prompts loaded from {self.root}")
+
+    def get(self, rel_path: str) -> PromptEntry:
+        entry = self._entries.get(self.normalize(rel_path))
+        if entry is None:
+            raise FileNotFoundError(f"Prompt file not found: {rel_path}")
+        return entry
+
+    async def watch(self):
+        # 앱이 떠 있는 동안 주기적으로 변경 확인 (파일 확인은 스레드에서)
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("prompt refresh failed")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "count": len(self._entries),
+            "reloads": self.reloads,
+            "last_scan": self.last_scan,
+        }
+
+
+_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    # 처음 쓸 때 AI_TEST_ROOT 기준으로 만들고 한 번 전부 읽는다 (보통은 create_app 에서)
+    global _registry
+    if _registry is None:
+        root = os.getenv("AI_TEST_ROOT")
+        if not root:
+            raise RuntimeError("AI_TEST_ROOT environment variable is missing.")
+        registry = PromptRegistry(root, PROMPT_DIRS, PROMPT_POLL_INTERVAL)
+        registry.load()
+        _registry = registry
+    return _registry
+
+
+def load_prompt_from_ai_test(relative_path: str) -> str:
+    """
+    AI_TEST_ROOT 기준으로 프롬프트 파일을 읽어온다. (메모리에 올려 둔 내용)
+    예) relative_path="prompts/report_v1.txt"
+    """
+    return get_prompt_registry().get(relative_path).text
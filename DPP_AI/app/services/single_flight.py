@@ -0,0 +1,54 @@
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# 같은 요청이 동시에 여러 번 들어왔을 때 upstream(OpenAI) 호출을 기다리는 최대 시간 (초)
+LLM_SINGLE_FLIGHT_TIMEOUT = float(os.getenv("LLM_SINGLE_FLIGHT_TIMEOUT", "120"))
+
+
+class SingleFlight:
+    """
+    같은 key 로 동시에 들어온 호출을 upstream 호출 하나로 합친다.
+    - 처음 들어온 요청이 upstream 호출(task)을 만들고, 나머지는 같은 task 결과를 기다린다
+    - upstream 이 실패하면 기다리던 요청 모두 같은 예외를 받는다
+    - key 별 timeout 이 지나면 upstream 을 취소하고 모두 asyncio.TimeoutError
+    - 기다리던 요청 하나가 끊겨도(취소) upstream 은 계속 진행 (shield)
+    - 호출이 끝나면 key 를 지운다 (결과 재사용은 캐시의 역할)
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # /health 에 노출하는 카운터
+        self.calls = 0
+        self.shared = 0
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float]):
+        try:
+            return await asyncio.wait_for(fn(), timeout)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(key, fn, timeout if timeout is not None else self.timeout))
+            # 기다리는 쪽이 모두 사라져도 "exception was never retrieved" 경고가 안 나도록
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "upstream_calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._inflight),
+        }
+
+
+# OpenAI 호출 공용 (call_llm / checkin-question)
+llm_flight = SingleFlight(LLM_SINGLE_FLIGHT_TIMEOUT)
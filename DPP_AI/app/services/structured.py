@@ -0,0 +1,309 @@
+import os
+import copy
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+
+# OpenAI structured outputs(json_schema) 사용 여부. 지원하지 않는 모델 / 프록시면 false
+OPENAI_STRUCTURED_OUTPUT = os.getenv("OPENAI_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+# 다시 물어볼 때 이전 출력은 이 길이까지만 붙인다
+REASK_MAX_CHARS = 4000
+
+# strict 모드에서 지원하지 않는 키워드 (길이 제한은 받은 뒤 Pydantic 기준으로 보정)
+_UNSUPPORTED_KEYWORDS = ("title", "default", "minLength", "maxLength")
+# 값이 {이름: 스키마} 인 키워드. 이름(필드 이름 "title" 등)은 그대로 두고 스키마만 정리한다
+_NAMED_SCHEMAS = ("properties", "$defs", "definitions")
+# 값이 스키마가 아닌 데이터인 키워드 (그대로 둔다)
+_LITERAL_KEYWORDS = ("enum", "const", "examples")
+
+
+class StructuredOutputError(RuntimeError):
+    """
+    모델 출력을 스키마에 맞는 객체로 만들지 못했을 때
+    - text: 모델이 준 원문
+    - errors: 다시 물어볼 때 넘길 오류 목록 ("위치: 메시지")
+    """
+
+    def __init__(self, text: str, errors: List[str]):
+        super().__init__("LLM output does not match schema: " + "; ".join(errors[:5]))
+        self.text = text
+        self.errors = errors
+
+
+class StructuredStats:
+    # /health 와 벤치마크용 카운터
+    def __init__(self):
+        self.direct = 0          # json.loads 한 번에 통과
+        self.text_repaired = 0   # 코드펜스 / trailing comma / 잘림 보정 후 통과
+        self.schema_repaired = 0 # 길이 자르기 / 기본값 등 스키마 보정 후 통과
+        self.reasks = 0
+        self.failures = 0
+
+    def stats(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+structured_stats = StructuredStats()
+
+
+def _strict_schema(node):
+    # 스키마 노드의 주석 키워드만 지운다 (properties 안의 필드 이름은 지우지 않는다)
+    if isinstance(node, dict):
+        out = {}
+        for k, v in node.items():
+            if k in _NAMED_SCHEMAS and isinstance(v, dict):
+                out[k] = {name: _strict_schema(sub) for name, sub in v.items()}
+            elif k in _LITERAL_KEYWORDS:
+                out[k] = v
+            elif k not in _UNSUPPORTED_KEYWORDS:
+                out[k] = _strict_schema(v)
+        if out.get("type") == "object" and "properties" in out:
+            out["additionalProperties"] = False
+            out["required"] = list(out["properties"])
+        return out
+    if isinstance(node, list):
+        return [_strict_schema(v) for v in node]
+    return node
+
+
+@lru_cache(maxsize=None)
+def json_schema_spec(model_cls: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Pydantic 모델 -> OpenAI strict json_schema ({"name", "schema", "strict"})
+    - chat completions: response_format={"type": "json_schema", "json_schema": spec}
+    - responses       : text={"format": {"type": "json_schema", **spec}}
+    """
+    return {
+        "name": model_cls.__name__,
+        "schema": _strict_schema(model_cls.model_json_schema()),
+        "strict": True,
+    }
+
+
+def _repair_json_text(text: str) -> str:
+    """
+    한 번 훑으면서 JSON 으로 읽을 수 있게 고친다
+    - 첫 { / [ 앞(코드펜스, 설명 문장)과 최상위 값이 닫힌 뒤의 텍스트는 버린다
+    - } / ] 바로 앞의 trailing comma 제거
+    - 출력이 중간에 잘렸으면: 끝나지 않은 key / 숫자 같은 값은 버리고,
+      열린 문자열은 닫고, 열린 객체 / 배열을 순서대로 닫는다
+    """
+    start = -1
+    for i, ch in enumerate(text):
+        if ch in "{[":
+            start = i
+            break
+    if start < 0:
+        raise ValueError("no JSON object in output")
+
+    out: List[str] = []
+    # 열린 객체 / 배열마다 [닫는 문자, 기대 상태, 지금 멤버가 시작된 out 위치]
+    # 상태: key -> colon -> value -> (literal) -> comma (배열은 value / literal / comma)
+    stack: List[list] = []
+    in_string = False
+    escape = False
+    literal_start = 0
+
+    for ch in text[start:]:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+                top = stack[-1]
+                top[1] = "colon" if top[1] == "key" else "comma"
+            out.append(ch)
+            continue
+
+        top = stack[-1] if stack else None
+        if top is not None and top[1] == "literal" and (ch in ",}]" or ch.isspace()):
+            top[1] = "comma"
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            if top is not None:
+                top[1] = "comma"
+            stack.append(["}" if ch == "{" else "]", "key" if ch == "{" else "value", len(out) + 1])
+        elif ch in "}]":
+            if top is None:
+                break
+            while out and (out[-1].isspace() or out[-1] == ","):
+                out.pop()
+            out.append(stack.pop()[0])
+            if not stack:
+                return "".join(out)
+            continue
+        elif ch == ",":
+            if top is not None:
+                top[1] = "key" if top[0] == "}" else "value"
+                top[2] = len(out) + 1
+        elif ch == ":":
+            if top is not None and top[1] == "colon":
+                top[1] = "value"
+        elif not ch.isspace() and top is not None and top[1] == "value":
+            top[1] = "literal"
+            literal_start = len(out)
+        out.append(ch)
+
+    # 여기까지 왔으면 출력이 잘린 것
+    if in_string:
+        if escape:
+            out.pop()
+        top = stack[-1]
+        if top[1] == "key":
+            del out[top[2]:]
+        else:
+            out.append('"')
+    elif stack:
+        top = stack[-1]
+        if top[1] == "literal":
+            try:
+                json.loads("".join(out[literal_start:]))
+            except ValueError:
+                del out[top[2] if top[0] == "}" else literal_start:]
+        elif top[1] in ("colon", "value") and top[0] == "}":
+            # "key" 또는 "key": 까지만 온 멤버
+            del out[top[2]:]
+
+    while stack:
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+        out.append(stack.pop()[0])
+    return "".join(out)
+
+
+def parse_json_lenient(text: str) -> Any:
+    """
+    LLM 출력 -> JSON. 정상 JSON 이면 json.loads 한 번, 아니면 _repair_json_text 로 한 번 고쳐서 읽는다.
+    실패하면 ValueError
+    """
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    return json.loads(_repair_json_text(text), strict=False)
+
+
+def _locate(data, loc):
+    # loc 의 마지막 칸을 가진 부모와 key 를 찾는다 (없으면 None)
+    parent = data
+    for part in loc[:-1]:
+        try:
+            parent = parent[part]
+        except (KeyError, IndexError, TypeError):
+            return None, None
+    return parent, loc[-1]
+
+
+def _fix_errors(data: dict, errors: list, defaults: Dict[str, Any]) -> bool:
+    # Pydantic 오류 위치만 골라서 고친다. 하나라도 고쳤으면 True
+    fixed = False
+    for err in errors:
+        loc, kind, ctx = err["loc"], err["type"], err.get("ctx") or {}
+        if not loc:
+            continue
+        parent, key = _locate(data, loc)
+        if parent is None:
+            continue
+        try:
+            value = parent[key]
+        except (KeyError, IndexError, TypeError):
+            value = None
+
+        if kind in ("string_too_long", "too_long") and "max_length" in ctx and value is not None:
+            parent[key] = value[:ctx["max_length"]]
+        elif kind == "list_type" and isinstance(value, dict):
+            parent[key] = [value]
+        elif kind == "string_type" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            parent[key] = str(value)
+        elif loc[0] in defaults:
+            # 그 밖의 오류는 기본값이 있는 최상위 필드면 기본값으로
+            data[loc[0]] = copy.deepcopy(defaults[loc[0]])
+        else:
+            continue
+        fixed = True
+    return fixed
+
+
+def validate_output(data: Any, model_cls: Type[BaseModel], defaults: Optional[Dict[str, Any]] = None, text: str = ""):
+    """
+    파싱한 dict 를 model_cls 로 검증. 실패하면 오류 위치만 보정해서 다시 검증 (최대 2번)
+    보정할 수 없으면 StructuredOutputError
+    """
+    defaults = defaults or {}
+    try:
+        return model_cls.model_validate(data), False
+    except ValidationError as e:
+        error = e
+
+    if not isinstance(data, dict):
+        raise StructuredOutputError(text, [f"top-level value must be an object, got {type(data).__name__}"])
+
+    data = copy.deepcopy(data)
+    for _ in range(2):
+        if not _fix_errors(data, error.errors(), defaults):
+            break
+        try:
+            return model_cls.model_validate(data), True
+        except ValidationError as e:
+            error = e
+
+    raise StructuredOutputError(
+        text,
+        [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in error.errors()],
+    )
+
+
+def parse_output(text: str, model_cls: Type[BaseModel], defaults: Optional[Dict[str, Any]] = None) -> BaseModel:
+    """
+    LLM 출력 텍스트 -> 검증된 model_cls 객체 (텍스트 보정 -> 스키마 보정)
+    - defaults: 비었거나 잘못된 최상위 필드에 넣을 기본값 (예: 리포트의 comments / suggestions)
+    """
+    text = (text or "").strip()
+    try:
+        data = json.loads(text)
+        repaired_text = False
+    except ValueError:
+        try:
+            data = json.loads(_repair_json_text(text), strict=False)
+        except ValueError as e:
+            structured_stats.failures += 1
+            raise StructuredOutputError(text, [f"output is not JSON: {e}"])
+        repaired_text = True
+
+    try:
+        result, repaired_schema = validate_output(data, model_cls, defaults, text)
+    except StructuredOutputError:
+        structured_stats.failures += 1
+        raise
+
+    if repaired_schema:
+        structured_stats.schema_repaired += 1
+    elif repaired_text:
+        structured_stats.text_repaired += 1
+    else:
+        structured_stats.direct += 1
+    return result
+
+
+def reask_messages(error: StructuredOutputError) -> List[Dict[str, str]]:
+    """
+    검증 실패 시 한 번만 다시 물어볼 때 대화 뒤에 붙일 메시지 (처음부터 다시 생성 X, 틀린 곳만 고치게)
+    """
+    structured_stats.reasks += 1
+    return [
+        {"role": "assistant", "content": error.text[:REASK_MAX_CHARS]},
+        {
+            "role": "user",
+            "content": (
+                "위 JSON 이 스키마 검증을 통과하지 못했습니다. 아래 항목만 고쳐서 "
+                "전체 JSON 을 다시 출력하세요. JSON 외 텍스트는 출력하지 마세요.\n"
+                + "\n".join(f"- {e}" for e in error.errors[:10])
+            ),
+        },
+    ]
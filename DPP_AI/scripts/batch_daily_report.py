@@ -0,0 +1,87 @@
+# 야간 daily-report 일괄 생성 CLI (서버 없이 이 프로세스에서 바로 OpenAI 호출)
+# - 입력: {"id": ..., "input": ReportGenerationInput} 을 한 줄에 하나씩 (NDJSON) 또는 JSON 배열
+# - 출력: 끝난 순서대로 NDJSON 한 줄씩 (--output 이 없으면 stdout), 마지막 줄은 summary
+# - --checkpoint 파일에 성공 결과를 남긴다. 중간에 끊겨도 같은 파일로 다시 돌리면 남은 것만 처리
+# - 요약(처리량 / 재시도 / 429 / 토큰 / 비용)은 stderr 에도 출력
+# 서버로 보내려면 POST /ai/daily-report:batch 에 {"items": [...], "job_id": "..."} (같은 동작)
+#
+# 사용법 (DPP_AI 폴더에서, .env 에 OPENAI_API_KEY / AI_TEST_ROOT)
+#   python scripts/batch_daily_report.py reports_in.ndjson -o reports_out.ndjson --checkpoint nightly.ckpt
+#   python scripts/batch_daily_report.py reports_in.json --concurrency 16 --rate 10
+#
+# 참고: OpenAI SDK 도 429 를 요청별로 OPENAI_MAX_RETRIES 번 재시도한다.
+#       배치 전체 속도 조절을 bucket 에 맡기려면 OPENAI_MAX_RETRIES=0 으로 실행
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    from dotenv import load_dotenv  # pip3 install python-dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+from app.routers.report import ReportBatchItem, report_batch_error, report_batch_item
+from app.services.batch import (
+    BATCH_CONCURRENCY, BATCH_MAX_RETRIES, BATCH_RATE_PER_SEC, BatchCheckpoint, BatchRunner,
+)
+
+
+def read_items(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    items = [ReportBatchItem.model_validate(row) for row in rows]
+    ids = [item.id for item in items]
+    if len(set(ids)) != len(ids):
+        raise SystemExit("duplicate item id in input")
+    return [(item.id, item.input) for item in items]
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="NDJSON 또는 JSON 배열 파일")
+    parser.add_argument("-o", "--output", help="결과 NDJSON 파일 (없으면 stdout)")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 (있으면 이어서 처리)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=BATCH_RATE_PER_SEC, help="초당 upstream 호출 수 (0 = 제한 없음)")
+    parser.add_argument("--max-retries", type=int, default=BATCH_MAX_RETRIES)
+    args = parser.parse_args()
+
+    items = read_items(args.input)
+    runner = BatchRunner(
+        report_batch_item,
+        concurrency=args.concurrency,
+        rate_per_sec=args.rate,
+        max_retries=args.max_retries,
+        checkpoint=BatchCheckpoint(args.checkpoint) if args.checkpoint else None,
+    )
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        async for row in runner.run(items, report_batch_error):
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            if row["status"] == "error":
+                print(f"  failed: {row['id']} ({row['error']})", file=sys.stderr)
+        summary = runner.summary()
+        out.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2), file=sys.stderr)
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+# /ai/daily-report 일반 모드 vs 스트리밍(?stream=true) 모드 첫 바이트 시간(TTFB) 비교
+# - 가짜 OpenAI 서버가 첫 토큰까지 --latency 초, 이후 토큰마다 --token-delay 초 걸리도록 흉내낸다
+# - 일반 모드: LLM 이 전부 만들 때까지 응답이 없다 (TTFB = 전체 시간)
+# - 스트리밍: 첫 token 이벤트 / title / summary 완성 / 마지막 report 이벤트 도착 시간을 잰다
+# httpx.ASGITransport 는 응답을 다 모아서 돌려주므로 uvicorn 을 실제 소켓으로 띄워서 잰다.
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/bench_report_ttfb.py
+#   python scripts/bench_report_ttfb.py --latency 0.8 --token-delay 0.03 --runs 10
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.4, help="첫 토큰까지 걸리는 시간 (초)")
+parser.add_argument("--token-delay", type=float, default=0.02, help="토큰(chunk) 사이 간격 (초)")
+parser.add_argument("--runs", type=int, default=5)
+args = parser.parse_args()
+
+from fake_openai import REPORT_JSON, start_fake_openai
+
+fake_server, base_url, fake = start_fake_openai(args.latency, args.token_delay)
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+# 매번 LLM 을 타도록 캐시는 끈다 (body 에 nonce 도 넣는다)
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+
+import httpx
+import uvicorn
+
+from app.main import create_app
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+REPORT_BODY = {"user_profile": {}, "today_metrics": {"total_minutes": 164}, "checkin_answers": {"step1": ["피곤"]}}
+
+
+def start_app_server():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(create_app(), log_level="warning"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def body(i: int) -> dict:
+    return {**REPORT_BODY, "user_profile": {"nonce": i}}
+
+
+async def blocking_run(client: httpx.AsyncClient, i: int) -> dict:
+    started = time.perf_counter()
+    ttfb = None
+    chunks = []
+    async with client.stream("POST", "/ai/daily-report", json=body(i)) as r:
+        async for chunk in r.aiter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - started
+            chunks.append(chunk)
+    assert r.status_code == 200, b"".join(chunks)
+    total = time.perf_counter() - started
+    return {"ttfb": ttfb, "title": total, "summary": total, "report": total}
+
+
+async def streaming_run(client: httpx.AsyncClient, i: int) -> dict:
+    started = time.perf_counter()
+    marks = {}
+    event = None
+    async with client.stream("POST", "/ai/daily-report", params={"stream": "true"}, json=body(i)) as r:
+        assert r.status_code == 200
+        async for line in r.aiter_lines():
+            now = time.perf_counter() - started
+            marks.setdefault("ttfb", now)
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                if event == "field":
+                    marks.setdefault(data["name"], now)
+                    assert data["value"] == REPORT_JSON[data["name"]]
+                elif event == "report":
+                    marks["report"] = now
+                    assert data["title"] == REPORT_JSON["title"]
+                elif event == "error":
+                    raise SystemExit(f"FAIL: {data}")
+    assert {"title", "summary", "report"} <= set(marks), marks
+    return marks
+
+
+async def main():
+    app_server, app_url = start_app_server()
+    print(f"fake LLM: first token {args.latency * 1000:.0f} ms, {args.token_delay * 1000:.0f} ms/token\n")
+    print(f"{'mode':<10} {'TTFB':>9} {'title':>9} {'summary':>9} {'report':>9}   (median of {args.runs}, ms)")
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=60) as client:
+        for label, run in (("blocking", blocking_run), ("stream", streaming_run)):
+            await run(client, -1)  # warm-up (커넥션 / import)
+            results = [await run(client, i) for i in range(args.runs)]
+            row = [statistics.median(r[k] for r in results) * 1000 for k in ("ttfb", "title", "summary", "report")]
+            print(f"{label:<10} " + " ".join(f"{v:9.1f}" for v in row))
+
+    app_server.should_exit = True
+    fake_server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,199 @@
+# LLM 출력 파싱 성공률 / 시간 비교 (깨진 출력 코퍼스)
+# - before : json.loads -> 실패 시 find("{") / rfind("}") 구간 -> report.py 의 suggestions / comments 보정 -> 검증
+# - after  : app/services/structured.py parse_output (한 번 훑는 보정 파서 + 스키마 기준 보정)
+# 코퍼스는 정상 출력에서 코드펜스 / 앞뒤 설명 / trailing comma / 잘림 / 길이 초과 / 형식 틀림 등을 만들어 쓴다.
+# after 에서도 실패한 출력은 실제 서버에서 "틀린 곳만 다시 물어보기" 1회로 넘어간다 (재생성 X).
+# 마지막으로 가짜 OpenAI 서버로 /ai/daily-report 를 호출해서 json_schema 요청 / 재질문 흐름을 확인한다.
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/bench_structured_output.py
+#   python scripts/bench_structured_output.py --repeat 2000
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeat", type=int, default=200, help="코퍼스 항목당 반복 횟수 (시간 측정)")
+args = parser.parse_args()
+
+from fake_openai import QUESTION_JSON, REPORT_JSON, start_fake_openai
+
+server, base_url, fake = start_fake_openai(0.01)
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+
+import httpx
+from pydantic import ValidationError
+
+from app.main import create_app
+from app.routers.checkin_question import CheckInQuestionOutput
+from app.routers.report import REPORT_DEFAULTS, ReportGenerationOutput
+from app.services.structured import StructuredOutputError, parse_output, structured_stats
+
+REPORT = {k: v for k, v in REPORT_JSON.items() if k in ReportGenerationOutput.model_fields}
+
+
+def legacy_parse(text: str) -> dict:
+    # 변경 전 call_llm
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except Exception:
+        start = text.find("{")
+        end = text.rfind("}")
+        if start != -1 and end != -1 and end > start:
+            return json.loads(text[start:end + 1])
+        raise RuntimeError("LLM returned non-JSON output")
+
+
+def legacy_fill(result):
+    # 변경 전 report.py 의 보정
+    if isinstance(result, dict) and isinstance(result.get("suggestions"), dict):
+        result["suggestions"] = [result["suggestions"]]
+    if not isinstance(result, dict):
+        result = {}
+    if not result.get("comments"):
+        result["comments"] = copy.deepcopy(REPORT_DEFAULTS["comments"])
+    if not result.get("suggestions"):
+        result["suggestions"] = copy.deepcopy(REPORT_DEFAULTS["suggestions"])
+    return result
+
+
+def legacy_report(text: str):
+    return ReportGenerationOutput.model_validate(legacy_fill(legacy_parse(text)))
+
+
+def legacy_checkin(text: str):
+    # 변경 전 checkin_question.py 는 json.loads 만 (스키마 검증 없음 -> 형식만 봄)
+    return CheckInQuestionOutput.model_validate(json.loads(text.strip()))
+
+
+def trailing_commas(data) -> str:
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    return text.replace("\n}", ",\n}").replace("\n  ]", ",\n  ]")
+
+
+def variants(doc: dict, edits: dict) -> list:
+    pretty = json.dumps(doc, ensure_ascii=False, indent=2)
+    compact = json.dumps(doc, ensure_ascii=False)
+    rows = [
+        ("clean", compact),
+        ("code fence", f"```json\n{pretty}\n```"),
+        ("prose around", f"다음은 요청하신 결과입니다.\n{pretty}\n필요하면 말씀해 주세요 {{:)}}"),
+        ("trailing commas", trailing_commas(doc)),
+        ("fence + trailing commas", "```json\n" + trailing_commas(doc) + "\n```"),
+    ]
+    for pct in (60, 80, 90, 97):
+        rows.append((f"truncated {pct}%", pretty[:len(pretty) * pct // 100]))
+    for name, fn in edits.items():
+        d = copy.deepcopy(doc)
+        fn(d)
+        rows.append((name, json.dumps(d, ensure_ascii=False)))
+    return rows
+
+
+def report_corpus() -> list:
+    edits = {
+        "suggestions as object": lambda d: d.update(suggestions=d["suggestions"][0]),
+        "empty comments": lambda d: d.update(comments=[]),
+        "missing suggestions": lambda d: d.pop("suggestions"),
+        "title too long": lambda d: d.update(title="오늘 하루 사용 패턴을 정리한 아주 긴 리포트 제목입니다"),
+        "too many comments": lambda d: d.update(comments=["a", "b", "c", "d"]),
+        "bad difficulty": lambda d: d["suggestions"][0].update(difficulty="very easy"),
+        "missing title": lambda d: d.pop("title"),
+    }
+    return variants(REPORT, edits)
+
+
+def checkin_corpus() -> list:
+    edits = {
+        "6 options": lambda d: d["options"].append({"value": "more", "label": "더 있음"}),
+        "label too long": lambda d: d["options"][0].update(label="아주 길게 쓴 선택지 라벨이라 스물네 글자를 넘어요"),
+        "step as string": lambda d: d.update(step="one"),
+    }
+    return variants(QUESTION_JSON, edits)
+
+
+def run(label: str, corpus: list, before, after):
+    print(f"\n[{label}] {len(corpus)} outputs")
+    print(f"  {'case':<26} {'before':>8} {'us':>7} {'after':>8} {'us':>7}")
+    totals = defaultdict(lambda: [0, 0.0])
+    for case, text in corpus:
+        cells = []
+        for name, fn in (("before", before), ("after", after)):
+            try:
+                fn(text)
+                ok = True
+            except (ValueError, RuntimeError, ValidationError, StructuredOutputError):
+                ok = False
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                try:
+                    fn(text)
+                except (ValueError, RuntimeError, ValidationError, StructuredOutputError):
+                    pass
+            elapsed = time.perf_counter() - started
+            totals[name][0] += ok
+            totals[name][1] += elapsed
+            cells.append(f"{'ok' if ok else 'FAIL':>8} {elapsed / args.repeat * 1e6:7.1f}")
+        print(f"  {case:<26} {cells[0]} {cells[1]}")
+    for name in ("before", "after"):
+        ok, elapsed = totals[name]
+        print(f"  {name:<7}: {ok}/{len(corpus)} parsed ({ok / len(corpus):.0%}), "
+              f"{elapsed / (len(corpus) * args.repeat) * 1e6:6.1f} us/output")
+
+
+async def end_to_end():
+    print("\n[end-to-end /ai/daily-report, fake OpenAI]")
+    app = create_app()
+    structured_stats.__init__()  # 위 코퍼스 반복 횟수는 빼고 센다
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://check", timeout=30) as client:
+        cases = (
+            ("clean", [json.dumps(REPORT, ensure_ascii=False)], 1),
+            ("truncated -> repaired", [json.dumps(REPORT, ensure_ascii=False)[:-40]], 1),
+            ("missing title -> re-ask", [json.dumps({k: v for k, v in REPORT.items() if k != "title"})], 2),
+            ("garbage twice -> 502", ["죄송합니다, 지금은 답변할 수 없어요.", "여전히 JSON 아님"], 2),
+        )
+        for i, (name, contents, expect_calls) in enumerate(cases):
+            fake.next_contents = list(contents)
+            before = fake.requests
+            r = await client.post("/ai/daily-report", json={"user_profile": {"case": i}})
+            calls = fake.requests - before
+            print(f"  {name:<26} status {r.status_code}, upstream calls {calls}")
+            assert calls == expect_calls
+            assert (r.status_code == 200) == (i < 3), r.text
+            if r.status_code == 200:
+                assert r.json()["title"], r.text
+        fmt = fake.last_request.get("response_format", {})
+        print(f"  response_format: {fmt.get('type')} ({fmt.get('json_schema', {}).get('name')}, strict={fmt.get('json_schema', {}).get('strict')})")
+        assert fmt.get("type") == "json_schema"
+        # 필드 이름 title 이 strict 스키마에서 빠지면 모델이 title 을 낼 수 없다
+        schema = fmt["json_schema"]["schema"]
+        assert "title" in schema["properties"] and "title" in schema["required"], schema
+        assert "title" in schema["$defs"]["Suggestion"]["properties"], schema
+        print("  /health structured_output:", json.dumps((await client.get("/health")).json()["structured_output"]))
+
+
+def main():
+    run("daily-report", report_corpus(), legacy_report, lambda t: parse_output(t, ReportGenerationOutput, REPORT_DEFAULTS))
+    run("checkin-question", checkin_corpus(), legacy_checkin, lambda t: parse_output(t, CheckInQuestionOutput))
+    asyncio.run(end_to_end())
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# 리포트 LLM 응답 캐시 동작 확인 (가짜 OpenAI 서버 사용)
+# - 같은 입력(키 순서만 다른 경우 포함)은 LLM 을 한 번만 호출하는지
+# - 서버 재시작(메모리 캐시 비움) 후에도 디스크(SQLite) 캐시에서 나오는지
+# - TTL 이 지나면 다시 호출하는지, /health 에 카운터가 보이는지
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/check_llm_cache.py
+#   python scripts/check_llm_cache.py --latency 2
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 응답 지연 (초)")
+args = parser.parse_args()
+
+from fake_openai import start_fake_openai
+
+server, base_url, fake = start_fake_openai(args.latency)
+tmp = tempfile.TemporaryDirectory()
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+os.environ["LLM_CACHE_DB"] = os.path.join(tmp.name, "llm_cache.sqlite3")
+
+import httpx
+
+from app.main import create_app
+from app.services.llm_cache import report_cache
+
+INPUT = {
+    "user_profile": {"nickname": "돌핀", "level": 3},
+    "today_metrics": {"total_minutes": 164, "late_night_minutes": 35, "top_categories": ["SNS", "VIDEO"]},
+    "checkin_answers": {"step1": ["피곤"], "step2": ["SNS"], "step3": ["알림 줄이기"]},
+}
+# 같은 내용, 키 순서만 다름
+REORDERED = json.loads(json.dumps({k: INPUT[k] for k in reversed(list(INPUT))}))
+
+
+async def call(client: httpx.AsyncClient, body: dict, label: str):
+    before = fake.requests
+    started = time.perf_counter()
+    resp = await client.post("/ai/daily-report", json=body)
+    resp.raise_for_status()
+    elapsed = (time.perf_counter() - started) * 1000
+    upstream = fake.requests - before
+    print(f"  {label:<28} {elapsed:8.1f} ms  upstream calls={upstream}")
+    return upstream
+
+
+async def main():
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+        print("same input")
+        assert await call(client, INPUT, "first call (miss)") == 1
+        assert await call(client, INPUT, "retry (memory hit)") == 0
+        assert await call(client, REORDERED, "reordered keys (memory hit)") == 0
+
+        # 서버 재시작: 메모리는 비고 디스크 파일만 남은 상태
+        report_cache._memory.clear()
+        assert await call(client, INPUT, "after restart (disk hit)") == 0
+
+        changed = dict(INPUT, today_metrics=dict(INPUT["today_metrics"], total_minutes=165))
+        assert await call(client, changed, "different input (miss)") == 1
+
+        # TTL 경과 (시계만 앞으로)
+        now = [time.time()]
+        report_cache.clock = lambda: now[0]
+        assert await call(client, changed, "memory hit") == 0
+        now[0] += report_cache.ttl + 1
+        assert await call(client, changed, "after TTL (miss)") == 1
+
+        health = (await client.get("/health")).json()
+        print("/health llm_cache:", json.dumps(health["llm_cache"]))
+
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
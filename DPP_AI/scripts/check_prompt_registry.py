@@ -0,0 +1,111 @@
+# 프롬프트 레지스트리(PromptRegistry) 확인
+# - 요청 경로(get)에서 파일을 열지 않는지 (audit hook 으로 open / scandir 호출 수를 센다)
+# - 기존 방식(요청마다 resolve + read)과 조회 시간 비교
+# - 파일을 고치면 poll 주기 안에 새 내용 / 새 해시로 바뀌는지, 추가 / 삭제도 반영되는지
+# - ../ 경로는 막히는지
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/check_prompt_registry.py
+#   python scripts/check_prompt_registry.py --lookups 200000
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.services.prompt_loader import PromptRegistry
+
+IO_EVENTS = {"open": 0, "os.scandir": 0, "os.listdir": 0}
+
+
+def audit(event, args):
+    if event in IO_EVENTS:
+        IO_EVENTS[event] += 1
+
+
+def legacy_read(root: str, rel_path: str) -> str:
+    # 변경 전 _safe_read_text 와 같은 동작
+    root_path = Path(root).resolve()
+    target = (root_path / rel_path).resolve()
+    if not str(target).startswith(str(root_path)):
+        raise ValueError("path traversal")
+    if not target.exists() or not target.is_file():
+        raise FileNotFoundError(rel_path)
+    return target.read_text(encoding="utf-8")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=50000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    shutil.copytree(os.path.join(os.path.dirname(ROOT), "ai-test", "prompts"), os.path.join(tmp, "prompts"))
+    registry = PromptRegistry(tmp, ["prompts"], poll_interval=0.2)
+    registry.load()
+    print(f"loaded {registry.stats()['count']} prompts")
+
+    rel = "prompts/report_v1.txt"
+    sys.addaudithook(audit)
+
+    # 1. 요청 경로: 파일 I/O 없음
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        registry.get(rel)
+    registry_us = (time.perf_counter() - started) / args.lookups * 1e6
+    io_calls = sum(IO_EVENTS.values())
+    print(f"registry.get : {registry_us:7.2f} us/lookup, file I/O calls={io_calls}")
+    assert io_calls == 0
+
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        legacy_read(tmp, rel)
+    legacy_us = (time.perf_counter() - started) / args.lookups * 1e6
+    print(f"legacy read  : {legacy_us:7.2f} us/lookup, file I/O calls={IO_EVENTS['open']}")
+
+    # 2. 경로 검사
+    for bad in ("../secret.txt", "prompts/../../etc/passwd", "/etc/passwd", ""):
+        try:
+            registry.get(bad)
+        except ValueError:
+            print(f"  blocked: {bad!r}")
+        else:
+            raise SystemExit(f"FAIL: {bad!r} was not blocked")
+
+    # 3. 수정 / 추가 / 삭제 반영
+    watcher = asyncio.create_task(registry.watch())
+    old_hash = registry.get(rel).hash
+    time.sleep(0.01)  # mtime 이 확실히 바뀌도록
+    with open(os.path.join(tmp, rel), "a", encoding="utf-8") as f:
+        f.write("\n- 추가 규칙\n")
+    with open(os.path.join(tmp, "prompts", "new_v1.txt"), "w", encoding="utf-8") as f:
+        f.write("새 프롬프트")
+    os.remove(os.path.join(tmp, "prompts", "checkin", "session_based_v1.json"))
+
+    await asyncio.sleep(registry.poll_interval * 3)
+    watcher.cancel()
+
+    new_hash = registry.get(rel).hash
+    print(f"edited   : {old_hash[:12]} -> {new_hash[:12]}")
+    assert new_hash != old_hash and registry.get(rel).text.endswith("- 추가 규칙\n")
+    print(f"added    : prompts/new_v1.txt = {registry.get('prompts/new_v1.txt').text!r}")
+    try:
+        registry.get("prompts/checkin/session_based_v1.json")
+        raise SystemExit("FAIL: removed prompt still served")
+    except FileNotFoundError:
+        print("removed  : prompts/checkin/session_based_v1.json")
+    print("stats    :", registry.stats())
+
+    shutil.rmtree(tmp)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+# /ai/daily-report:batch 확인 + 처리량 비교 (가짜 OpenAI 서버 사용)
+# - before : 사용자마다 /ai/daily-report 한 번씩 순서대로 (기존 야간 생성 방식)
+# - after  : 한 batch 요청, 동시 처리 + token bucket
+# - upstream 초당 한도(--upstream-limit)를 넘기게 보내서 429 / retry-after 를 받아도 모두 성공하는지
+# - 중간에 연결을 끊고 같은 job_id 로 다시 보내면 끝난 item 은 upstream 호출 없이 이어지는지
+# - 본문을 한 줄도 안 읽고 끊어도 job_id 가 풀려서 다시 보낼 때 409 가 안 나는지, 체크포인트 파일이 닫히는지
+#   (안 닫힌 파일은 GC 될 때 ResourceWarning 이 나므로 그걸로 확인)
+# 연결 끊김이 앱까지 전달되도록 httpx.ASGITransport 대신 uvicorn 을 실제 소켓으로 띄운다.
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/check_report_batch.py
+#   python scripts/check_report_batch.py --users 400 --latency 0.5 --concurrency 32 --rate 40
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.3, help="가짜 LLM 응답 지연 (초)")
+parser.add_argument("--users", type=int, default=60)
+parser.add_argument("--concurrency", type=int, default=16)
+parser.add_argument("--rate", type=float, default=40, help="batch token bucket (초당)")
+parser.add_argument("--upstream-limit", type=int, default=30, help="가짜 서버 초당 허용 요청 수")
+args = parser.parse_args()
+
+from fake_openai import start_fake_openai
+
+server, base_url, fake = start_fake_openai(args.latency)
+checkpoint_dir = tempfile.mkdtemp()
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+# 429 는 batch 의 bucket 이 처리하도록 SDK 재시도는 끈다
+os.environ["OPENAI_MAX_RETRIES"] = "0"
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+os.environ["BATCH_CHECKPOINT_DIR"] = checkpoint_dir
+
+import httpx
+import uvicorn
+from starlette.requests import ClientDisconnect
+
+from app.main import create_app
+from app.routers.report import _active_jobs
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+REPORT_BODY = {"user_profile": {}, "today_metrics": {"total_minutes": 164}, "checkin_answers": {"step1": ["피곤"]}}
+
+
+def start_app_server():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(create_app(), log_level="warning"))
+    threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def items(n: int, tag: str) -> list:
+    return [{"id": f"{tag}-{i}", "input": {**REPORT_BODY, "user_profile": {"user_id": i, "tag": tag}}} for i in range(n)]
+
+
+async def post_batch(client: httpx.AsyncClient, body: dict, stop_after: int = None):
+    rows = []
+    async with client.stream("POST", "/ai/daily-report:batch", json=body) as r:
+        assert r.status_code == 200, await r.aread()
+        async for line in r.aiter_lines():
+            if not line:
+                continue
+            rows.append(json.loads(line))
+            if stop_after is not None and len(rows) >= stop_after:
+                break
+    return rows
+
+
+async def call_with_broken_send(body: dict):
+    payload = json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/ai/daily-report:batch", "raw_path": b"/ai/daily-report:batch",
+        "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        raise OSError("client gone")
+
+    try:
+        await create_app()(scope, receive, send)
+    except ClientDisconnect:
+        pass
+
+
+async def main():
+    n = args.users
+    app_server, app_url = start_app_server()
+    async with httpx.AsyncClient(base_url=app_url, timeout=300) as client:
+        # 1. before: 사용자마다 한 번씩
+        started = time.perf_counter()
+        for item in items(n, "seq"):
+            r = await client.post("/ai/daily-report", json=item["input"])
+            assert r.status_code == 200, r.text
+        seq_elapsed = time.perf_counter() - started
+        print(f"sequential  : {n} users in {seq_elapsed:6.2f}s -> {n / seq_elapsed:6.1f} users/s")
+
+        # 2. after: batch (가짜 서버 한도 때문에 429 를 받는다)
+        fake.rate_limit = args.upstream_limit
+        body = {"items": items(n, "batch"), "concurrency": args.concurrency, "rate_per_sec": args.rate}
+        rows = await post_batch(client, body)
+        summary = rows[-1]
+        results = rows[:-1]
+        print(f"batch       : {n} users in {summary['elapsed_sec']:6.2f}s -> {summary['items_per_sec']:6.1f} users/s "
+              f"(concurrency {args.concurrency}, bucket {args.rate}/s, upstream limit {args.upstream_limit}/s)")
+        print("  summary   :", json.dumps(summary))
+        assert summary["type"] == "summary" and summary["ok"] == n and summary["failed"] == 0
+        assert len({row["id"] for row in results}) == n
+        assert all(row["report"]["title"] for row in results)
+
+        # 3. checkpoint / resume
+        fake.rate_limit = None
+        body = {"items": items(n, "resume"), "job_id": "nightly-check", "concurrency": args.concurrency, "rate_per_sec": args.rate}
+        first = await post_batch(client, body, stop_after=n // 3)
+        await asyncio.sleep(args.latency * 2)  # 끊긴 요청의 worker 정리 대기
+        saved = sum(1 for _ in open(os.path.join(checkpoint_dir, "nightly-check.ndjson"), encoding="utf-8"))
+        before = fake.requests
+        rows = await post_batch(client, body)
+        summary = rows[-1]
+        print(f"resume      : interrupted after {len(first)} rows ({saved} checkpointed) -> "
+              f"resumed {summary['resumed']}, new upstream calls {fake.requests - before}")
+        assert summary["resumed"] == saved and summary["ok"] == n - saved
+        assert fake.requests - before == n - saved
+        assert len({row["id"] for row in rows[:-1]}) == n
+
+        # 4. 본문 시작 전에 끊기 (응답 헤더 보내는 중 끊긴 것처럼 send 가 OSError)
+        body = {"items": items(4, "early"), "job_id": "early-disconnect"}
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            await call_with_broken_send(body)
+            gc.collect()
+        assert "early-disconnect" not in _active_jobs, _active_jobs
+        leaked = [w for w in caught if "early-disconnect" in str(w.message)]
+        assert not leaked, leaked[0].message
+        rows = await post_batch(client, body)
+        print(f"early close : job_id released, checkpoint closed, re-sent batch -> {rows[-1]['ok']} / 4 done")
+        assert rows[-1]["ok"] == 4
+
+        health = (await client.get("/health")).json()
+        print("/health llm_usage:", json.dumps(health["llm_usage"]))
+
+    app_server.should_exit = True
+    server.shutdown()
+    shutil.rmtree(checkpoint_dir)
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
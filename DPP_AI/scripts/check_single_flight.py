@@ -0,0 +1,105 @@
+# 동시에 들어온 같은 AI 요청이 OpenAI 호출 하나로 합쳐지는지 확인 (가짜 OpenAI 서버 사용)
+# - 같은 요청 N개 동시 -> upstream 호출 1번, N개 모두 같은 응답
+# - 서로 다른 요청 N개 -> upstream 호출 N번
+# - upstream 오류 -> N개 모두 오류, upstream 호출 1번
+# - key 별 timeout -> N개 모두 504, upstream 호출 1번
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/check_single_flight.py
+#   python scripts/check_single_flight.py --duplicates 50 --latency 1
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 응답 지연 (초)")
+parser.add_argument("--duplicates", type=int, default=20)
+args = parser.parse_args()
+
+from fake_openai import start_fake_openai
+
+server, base_url, fake = start_fake_openai(args.latency)
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+# 오류 케이스에서 SDK 재시도로 upstream 호출 수가 늘지 않도록
+os.environ["OPENAI_MAX_RETRIES"] = "0"
+# 캐시는 끄고 single-flight 만 본다
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+
+import httpx
+
+from app.main import create_app
+from app.services.single_flight import llm_flight
+
+CHECKIN_BODY = json.load(open(os.path.join(os.environ["AI_TEST_ROOT"], "inputs", "checkin_A_day1_step1.json"), encoding="utf-8"))
+REPORT_BODY = {"user_profile": {}, "today_metrics": {"total_minutes": 164}, "checkin_answers": {"step1": ["피곤"]}}
+
+
+async def burst(client: httpx.AsyncClient, path: str, bodies: list, label: str, expect_upstream: int):
+    before = fake.requests
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.post(path, json=body) for body in bodies))
+    elapsed = (time.perf_counter() - started) * 1000
+    upstream = fake.requests - before
+
+    statuses = sorted({r.status_code for r in responses})
+    same = len({r.text for r in responses}) == 1
+    print(f"  {label:<34} {len(bodies):3d} requests -> upstream {upstream:3d}, "
+          f"status {statuses}, identical={same}, {elapsed:7.1f} ms")
+    assert upstream == expect_upstream, f"expected {expect_upstream} upstream calls"
+    return responses
+
+
+async def main():
+    n = args.duplicates
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=60) as client:
+        # (이름, 경로, body, 요청마다 값을 바꿔 넣을 dict 필드)
+        for name, path, body, field in (
+            ("checkin-question", "/ai/checkin-question", CHECKIN_BODY, "user"),
+            ("daily-report", "/ai/daily-report", REPORT_BODY, "user_profile"),
+        ):
+            print(f"[{name}]")
+            responses = await burst(client, path, [body] * n, "same payload", 1)
+            assert all(r.status_code == 200 for r in responses)
+
+            distinct = []
+            for i in range(n):
+                b = copy.deepcopy(body)
+                b[field]["nonce"] = i
+                distinct.append(b)
+            await burst(client, path, distinct, "distinct payloads", n)
+
+            fake.fail_status = 500
+            responses = await burst(client, path, [body] * n, "upstream error (500)", 1)
+            assert all(r.status_code >= 500 for r in responses)
+            fake.fail_status = None
+
+            default_timeout, llm_flight.timeout = llm_flight.timeout, args.latency / 4
+            responses = await burst(client, path, [body] * n, f"timeout ({llm_flight.timeout:.2f}s)", 1)
+            assert all(r.status_code == 504 for r in responses)
+            llm_flight.timeout = default_timeout
+            # 취소된 upstream 요청이 가짜 서버에서 끝날 때까지 잠깐 대기
+            await asyncio.sleep(args.latency)
+
+        health = (await client.get("/health")).json()
+        print("/health single_flight:", json.dumps(health["single_flight"]))
+
+    server.shutdown()
+    print("OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,232 @@
+# 로컬 가짜 OpenAI 서버 (부하 테스트 / 캐시 확인용, API 키와 비용 없이)
+# - POST /v1/chat/completions : REPORT_JSON 을 담은 chat completion
+# - POST /v1/responses        : QUESTION_JSON 을 담은 Responses API 응답
+# 응답마다 latency 초 만큼 기다리고, 요청 수 / 새 TCP 연결 수를 센다.
+# chat completions 는 "stream": true 면 SSE chunk 로 나눠 보낸다 (첫 chunk 까지 latency,
+# 이후 chunk 마다 token_delay). 스트리밍이 아니면 전체를 다 만든 시간만큼 기다렸다가 한 번에 보낸다.
+# stats.rate_limit 을 주면 초당 그 이상 들어온 요청은 429 (retry-after-ms) 로 돌려보낸다.
+# stats.next_contents 에 문자열을 넣어 두면 다음 chat completion 들의 content 로 순서대로 쓴다.
+# 요청에 strict json_schema(response_format / text.format)가 있으면 실제 모델처럼 스키마에 없는 key 는 내보내지 않는다.
+#
+# 사용법 (다른 스크립트에서)
+#   from fake_openai import start_fake_openai
+#   server, base_url, stats = start_fake_openai(latency=0.5)
+#   server, base_url, stats = start_fake_openai(latency=0.3, token_delay=0.02)  # 생성 속도 흉내
+#   os.environ["OPENAI_BASE_URL"] = base_url   # app 모듈 import 전에
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPORT_JSON = {
+    "title": "오늘의 리포트",
+    "summary": "조금 늦게까지 사용했어요.",
+    "comments": ["SNS 사용이 많았어요."],
+    "suggestions": [{"title": "알림 끄기", "description": "자기 전 30분", "difficulty": "easy", "why_this": "수면"}],
+    "comment": "오늘도 고생 많았어!",
+    "suggestion": "내일은 10분 일찍 폰을 내려놓아 보자.",
+}
+# 스트리밍 chunk 하나에 담을 글자 수 (대략 토큰 하나)
+CHUNK_CHARS = 4
+QUESTION_JSON = {
+    "step": 1, "type": "multi_choice", "question": "오늘 가장 오래 쓴 앱은 무엇이었나요?",
+    "options": [{"value": v, "label": l} for v, l in (("sns", "SNS"), ("video", "영상"), ("game", "게임"), ("web", "웹 서핑"), ("etc", "기타"))],
+    "selection_limits": {"min": 1, "max": 2}, "allow_free_text": True, "free_text_max_length": 100,
+}
+
+
+class FakeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        # 다음 응답을 실패시킬 HTTP status (None 이면 정상 응답)
+        self.fail_status = None
+        # 초당 허용 요청 수 (None 이면 제한 없음). 넘으면 429 + retry-after-ms
+        self.rate_limit = None
+        self.rate_limited = 0
+        self.window = []
+        # 다음 chat completion 들의 content 를 순서대로 이 값으로 바꾼다 (깨진 출력 흉내)
+        self.next_contents = []
+        self.last_request = None
+
+    def over_limit(self) -> bool:
+        # 최근 1초 동안 받은 요청 수로 판단 (lock 안에서 호출)
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        self.window = [t for t in self.window if now - t < 1.0]
+        if len(self.window) >= self.rate_limit:
+            self.rate_limited += 1
+            return True
+        self.window.append(now)
+        return False
+
+
+def split_chunks(text: str):
+    return [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+
+
+def _resolve(schema: dict, root: dict) -> dict:
+    ref = schema.get("$ref")
+    if ref and ref.startswith("#/"):
+        for part in ref[2:].split("/"):
+            root = root[part]
+        return root
+    return schema
+
+
+def conform(data, schema: dict, root: dict):
+    # strict 모드 흉내: additionalProperties=false 인 객체에서 properties 에 없는 key 를 버린다
+    schema = _resolve(schema, root)
+    if isinstance(data, dict) and "properties" in schema:
+        props = schema["properties"]
+        return {k: conform(v, props[k], root) for k, v in data.items() if k in props}
+    if isinstance(data, list) and isinstance(schema.get("items"), dict):
+        return [conform(v, schema["items"], root) for v in data]
+    for key in ("anyOf", "oneOf"):
+        for option in schema.get(key, ()):
+            if _resolve(option, root).get("type") in ("object", "array"):
+                return conform(data, option, root)
+    return data
+
+
+def apply_schema(text: str, request: dict, path: str) -> str:
+    # 요청의 strict json_schema 에 맞춰 content 를 거른다 (JSON 이 아니면 그대로)
+    if path.endswith("/responses"):
+        fmt = (request.get("text") or {}).get("format") or {}
+        spec = fmt if fmt.get("type") == "json_schema" else None
+    else:
+        fmt = request.get("response_format") or {}
+        spec = fmt.get("json_schema") if fmt.get("type") == "json_schema" else None
+    if not spec or not spec.get("strict") or not isinstance(spec.get("schema"), dict):
+        return text
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text
+    return json.dumps(conform(data, spec["schema"], spec["schema"]), ensure_ascii=False)
+
+
+def start_fake_openai(latency: float = 0.5, token_delay: float = 0.0):
+    stats = FakeStats()
+    report_text = json.dumps(REPORT_JSON, ensure_ascii=False)
+    report_chunks = split_chunks(report_text)
+    # 프롬프트 토큰은 대략값, 출력 토큰은 chunk 수
+    report_usage = {"prompt_tokens": 900, "completion_tokens": len(report_chunks), "total_tokens": 900 + len(report_chunks)}
+
+    class FakeOpenAI(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # 헤더/본문을 나눠 쓸 때 생기는 40ms 지연 방지
+
+        def setup(self):
+            super().setup()
+            with stats.lock:
+                stats.connections += 1
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with stats.lock:
+                stats.requests += 1
+                stats.last_request = request
+                fail_status = stats.fail_status
+                limited = stats.over_limit()
+                content = report_text
+                if stats.next_contents and self.path.endswith("/chat/completions"):
+                    content = stats.next_contents.pop(0)
+            if self.path.endswith("/chat/completions"):
+                content = apply_schema(content, request, self.path)
+            if limited:
+                self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                               {"retry-after-ms": "250"})
+                return
+            time.sleep(latency)
+
+            if not fail_status and request.get("stream") and self.path.endswith("/chat/completions"):
+                self.send_stream(split_chunks(content))
+                return
+            if not self.path.endswith("/responses"):
+                # 스트리밍이 아니면 전체 생성이 끝날 때까지 기다린다
+                time.sleep(token_delay * len(report_chunks))
+
+            if fail_status:
+                body = {"error": {"message": "fake upstream error", "type": "server_error"}}
+                status = fail_status
+            elif self.path.endswith("/responses"):
+                status = 200
+                question_text = apply_schema(json.dumps(QUESTION_JSON, ensure_ascii=False), request, self.path)
+                body = {
+                    "id": "resp_fake", "object": "response", "created_at": 0, "model": "fake",
+                    "status": "completed", "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+                    "output": [{
+                        "type": "message", "id": "msg_fake", "status": "completed", "role": "assistant",
+                        "content": [{"type": "output_text", "text": question_text, "annotations": []}],
+                    }],
+                }
+            else:
+                status = 200
+                body = {
+                    "id": "chatcmpl_fake", "object": "chat.completion", "created": 0, "model": "fake",
+                    "choices": [{
+                        "index": 0, "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": content},
+                    }],
+                    "usage": report_usage,
+                }
+
+            self.send_json(status, body)
+
+        def send_json(self, status: int, body: dict, headers=None):
+            data = json.dumps(body).encode()
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # 클라이언트가 timeout 으로 먼저 끊은 경우
+                self.close_connection = True
+
+        def send_stream(self, chunks):
+            # Transfer-Encoding: chunked 로 SSE chunk 를 하나씩 flush
+            def write_chunk(data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, piece in enumerate(chunks):
+                    if i:
+                        time.sleep(token_delay)
+                    chunk = {
+                        "id": "chatcmpl_fake", "object": "chat.completion.chunk", "created": 0, "model": "fake",
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+                    }
+                    write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode())
+                last = {
+                    "id": "chatcmpl_fake", "object": "chat.completion.chunk", "created": 0, "model": "fake", "choices": [],
+                    "usage": report_usage,
+                }
+                write_chunk(f"data: {json.dumps(last)}\n\n".encode())
+                write_chunk(b"data: [DONE]\n\n")
+                write_chunk(b"")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+        def log_message(self, *a):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", 0), FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v1", stats
@@ -0,0 +1,168 @@
+# OpenAI 클라이언트 재사용 전/후 동시 처리량 비교 (가짜 OpenAI 서버 사용, API 키/비용 없음)
+# - before : 요청마다 OpenAI(...) 새로 생성 / async def 안에서 동기 클라이언트 호출 (기존 코드)
+# - after  : 앱 공용 AsyncOpenAI 클라이언트 (app/services/llm.py)
+# 가짜 서버는 응답마다 --latency 초 만큼 기다려서 LLM 응답 시간을 흉내내고, 새 TCP 연결 수를 센다.
+#
+# 사용법 (DPP_AI 폴더에서)
+#   python scripts/load_test_openai_client.py
+#   python scripts/load_test_openai_client.py --latency 0.1 --requests 400 --levels 1,16,64,128
+#
+# 참고
+# - 가짜 서버는 평문 HTTP/1.1 이라 HTTP/2 멀티플렉싱은 측정되지 않는다 (실제 api.openai.com 은 TLS + h2)
+# - latency 를 아주 짧게(0.1초 이하) 주고 동시 요청을 크게 하면 httpcore 커넥션 풀의 대기열 스캔
+#   (동시 요청 수 x 커넥션 수) 비용이 보이기 시작한다. 실제 LLM 응답(수 초)에서는 무시할 수준
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 응답 지연 (초)")
+parser.add_argument("--requests", type=int, default=128)
+parser.add_argument("--levels", default="1,16,64")
+args = parser.parse_args()
+
+from fake_openai import start_fake_openai
+
+server, base_url, fake = start_fake_openai(args.latency)
+
+os.environ["OPENAI_API_KEY"] = "sk-fake"
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["AI_TEST_ROOT"] = os.path.join(os.path.dirname(ROOT), "ai-test")
+# 요청마다 body 를 조금씩 바꿔서 보내지만(single-flight 로 합쳐지지 않도록), 캐시도 확실히 끈다
+os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+os.environ["LLM_CACHE_DB"] = ""
+
+import httpx
+from fastapi import FastAPI
+from openai import OpenAI
+
+from app.main import create_app
+from app.routers.checkin_question import CheckInQuestionRequest, _build_messages
+from app.routers.report import ReportGenerationInput
+import app.demo_ai_main as demo
+
+CHECKIN_BODY = json.load(open(os.path.join(os.environ["AI_TEST_ROOT"], "inputs", "checkin_A_day1_step1.json"), encoding="utf-8"))
+DEMO_BODY = {
+    "totalScore": 72,
+    "usage": {"totalTime": 164, "lateNightTime": 35, "longSessions": 2, "shortFormRatio": 0.3, "snsRatio": 0.4, "gameRatio": 0.1},
+    "notifications": {"importantCount": 3, "lowPriorityCount": 40, "hasOverload": True},
+    "checkIn": {"mood": 3, "satisfaction": 2, "goalAchieved": False, "memo": "피곤"},
+    "profile": {
+        "level": 3, "experience": 120, "experienceToNextLevel": 200, "totalDays": 12, "currentStreak": 4,
+        "onboarding": {"targetScreenTime": 120, "targetBedTime": "23:30"},
+    },
+}
+
+
+def read_prompt(rel_path: str) -> str:
+    # 변경 전처럼 요청마다 파일을 읽는다
+    with open(os.path.join(os.environ["AI_TEST_ROOT"], rel_path), encoding="utf-8") as f:
+        return f.read()
+
+
+def legacy_app() -> FastAPI:
+    # 변경 전 코드와 같은 방식
+    legacy = FastAPI()
+    sync_client = OpenAI()
+
+    @legacy.post("/ai/checkin-question")
+    def checkin(req: CheckInQuestionRequest):
+        policy = read_prompt(req.prompt_ref.policy_path)
+        template = read_prompt(req.prompt_ref.template_path)
+        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))  # 요청마다 새 클라이언트
+        resp = client.responses.create(model="gpt-5", input=_build_messages(policy, template, req))
+        return json.loads(resp.output_text)
+
+    @legacy.post("/ai/daily-report-demo")
+    async def demo_report(body: demo.AiCommentRequest):
+        # async def 안에서 동기 호출 -> 이벤트 루프가 응답 올 때까지 멈춘다
+        completion = sync_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": body.model_dump_json()}],
+            response_format={"type": "json_object"},
+        )
+        return json.loads(completion.choices[0].message.content)
+
+    @legacy.post("/ai/daily-report")
+    def report(input: ReportGenerationInput):
+        # 기존 call_llm: 모듈 전역 동기 클라이언트, def 라우트 (스레드풀에서 실행)
+        completion = sync_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": read_prompt("prompts/report_v1.txt")},
+                {"role": "user", "content": input.model_dump_json()},
+            ],
+        )
+        return json.loads(completion.choices[0].message.content)
+
+    return legacy
+
+
+def current_app() -> FastAPI:
+    current = create_app()
+    # demo_ai_main 의 daily-report 도 같은 조건에서 비교하려고 경로만 바꿔서 붙인다
+    for route in demo.app.routes:
+        if getattr(route, "path", None) == "/ai/daily-report":
+            current.add_api_route("/ai/daily-report-demo", route.endpoint, methods=["POST"])
+    return current
+
+
+def varied(body: dict, field: str, key: str):
+    # 요청마다 다른 body (같은 요청은 upstream 호출 하나로 합쳐지므로)
+    def make(i: int) -> dict:
+        b = copy.deepcopy(body)
+        b[field][key] = f"#{i}"
+        return b
+    return make
+
+
+async def measure(target: FastAPI, path: str, make_body, concurrency: int, total: int):
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        remaining = [total]
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                resp = await client.post(path, json=make_body(remaining[0]))
+                resp.raise_for_status()
+
+        before = fake.connections
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return total / elapsed, fake.connections - before
+
+
+async def main():
+    levels = [int(x) for x in args.levels.split(",")]
+    before, after = legacy_app(), current_app()
+    cases = [
+        ("checkin-question", "/ai/checkin-question", varied(CHECKIN_BODY, "user", "nonce")),
+        ("demo daily-report", "/ai/daily-report-demo", varied(DEMO_BODY, "checkIn", "memo")),
+        ("daily-report", "/ai/daily-report", varied({"today_metrics": {"total_minutes": 164}}, "today_metrics", "nonce")),
+    ]
+
+    print(f"fake OpenAI latency {args.latency * 1000:.0f} ms, {args.requests} requests per run")
+    for name, path, make_body in cases:
+        print(f"\n[{name}]")
+        for concurrency in levels:
+            line = f"  concurrency {concurrency:4d}"
+            for label, target in (("before", before), ("after", after)):
+                rps, conns = await measure(target, path, make_body, concurrency, args.requests)
+                line += f"  {label}: {rps:7.1f} req/s ({conns:4d} new conns)"
+            print(line)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())